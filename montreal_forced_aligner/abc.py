@@ -35,13 +35,19 @@ import yaml
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from montreal_forced_aligner import config
-from montreal_forced_aligner.db import CorpusWorkflow, MfaSqlBase
+from montreal_forced_aligner.db import (
+    CorpusWorkflow,
+    MfaSqlBase,
+    configure_sqlite_engine,
+    migrate_indexes,
+)
 from montreal_forced_aligner.exceptions import (
     DatabaseError,
     KaldiProcessingError,
     MultiprocessingError,
 )
 from montreal_forced_aligner.helper import comma_join, load_configuration, mfa_open
+from montreal_forced_aligner.profiling import PROFILER
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -60,6 +66,8 @@ __all__ = [
     "AdapterMixin",
     "TrainerMixin",
     "KaldiFunction",
+    "get_process_engine",
+    "dispose_process_engines",
 ]
 
 # Configuration types
@@ -67,11 +75,100 @@ MetaDict = Dict[str, Any]
 logger = logging.getLogger("mfa")
 
 
+_PROCESS_ENGINES: Dict[typing.Tuple[str, bool], sqlalchemy.engine.Engine] = {}
+_PROCESS_ENGINES_PID = None
+
+
+def read_only_db_string(db_string: str) -> str:
+    """
+    Construct a connection string that opens a SQLite database as read-only
+
+    Parameters
+    ----------
+    db_string: str
+        Connection string for the database
+
+    Returns
+    -------
+    str
+        Read-only connection string, unchanged for non-SQLite databases
+    """
+    if not db_string.startswith("sqlite:///") or "?" in db_string:
+        return db_string
+    return f"sqlite:///file:{db_string[len('sqlite:///'):]}?mode=ro&uri=true"
+
+
+def get_process_engine(db_string: str, read_only: bool = False) -> sqlalchemy.engine.Engine:
+    """
+    Get a database engine for the current process, creating it on first use
+
+    Engines are cached per process and connection string, so that each KaldiFunction run in a
+    worker process reuses the same small connection pool rather than opening new connections.
+    Engines inherited from a parent process are discarded without closing the parent's
+    connections.
+
+    Parameters
+    ----------
+    db_string: str
+        Connection string for the database
+    read_only: bool
+        Flag for opening connections that can only read from the database, defaults to False
+
+    Returns
+    -------
+    :class:`~sqlalchemy.engine.Engine`
+        Cached engine
+    """
+    global _PROCESS_ENGINES_PID
+    if _PROCESS_ENGINES_PID != os.getpid():
+        for engine in _PROCESS_ENGINES.values():
+            engine.dispose(close=False)
+        _PROCESS_ENGINES.clear()
+        _PROCESS_ENGINES_PID = os.getpid()
+    key = (db_string, read_only)
+    if key not in _PROCESS_ENGINES:
+        kwargs = {"pool_pre_ping": True}
+        if db_string.startswith("postgresql"):
+            kwargs["pool_size"] = 2
+            kwargs["max_overflow"] = 2
+            if read_only:
+                kwargs["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+        elif read_only:
+            db_string = read_only_db_string(db_string)
+        _PROCESS_ENGINES[key] = configure_sqlite_engine(
+            sqlalchemy.create_engine(db_string, **kwargs), read_only=read_only
+        )
+    return _PROCESS_ENGINES[key]
+
+
+def dispose_process_engines() -> None:
+    """
+    Close all connections held by engines cached in the current process
+    """
+    if _PROCESS_ENGINES_PID == os.getpid():
+        for engine in _PROCESS_ENGINES.values():
+            engine.dispose()
+    _PROCESS_ENGINES.clear()
+
+
 class KaldiFunction(metaclass=abc.ABCMeta):
     """
     Abstract class for running Kaldi functions
+
+    Attributes
+    ----------
+    read_only: bool
+        Flag for functions that only query the database, which use read-only connections
+        when run in a separate process
+    resumable: bool
+        Flag for functions whose output for a job is complete once the job finishes, so that
+        :func:`~montreal_forced_aligner.utils.run_kaldi_function` can skip jobs that were
+        completed by an interrupted run
     """
 
+    read_only = False
+    resumable = False
+
     def __init__(self, args: MfaArguments):
         self.args = args
         self.db_string = None
@@ -90,7 +187,7 @@ class KaldiFunction(metaclass=abc.ABCMeta):
             with self._session() as session:
                 yield session
         else:
-            db_engine = sqlalchemy.create_engine(self.db_string)
+            db_engine = get_process_engine(self.db_string, read_only=self.read_only)
             with sqlalchemy.orm.Session(db_engine) as session:
                 yield session
 
@@ -264,7 +361,11 @@ class DatabaseMixin(TemporaryDirectoryMixin, metaclass=abc.ABCMeta):
         """
         if self.database_initialized:
             return
-        from montreal_forced_aligner.command_line.utils import check_databases
+        from montreal_forced_aligner.command_line.utils import (
+            check_databases,
+            configure_database_tables,
+            create_database,
+        )
 
         if config.USE_POSTGRES:
             exist_check = True
@@ -272,15 +373,7 @@ class DatabaseMixin(TemporaryDirectoryMixin, metaclass=abc.ABCMeta):
                 check_databases(self.identifier)
             except Exception:
                 try:
-                    subprocess.check_call(
-                        [
-                            "createdb",
-                            f"--host={config.database_socket()}",
-                            self.identifier,
-                        ],
-                        stderr=subprocess.DEVNULL,
-                        stdout=subprocess.DEVNULL,
-                    )
+                    create_database(self.identifier)
                 except Exception:
                     raise DatabaseError(
                         f"There was an error connecting to the {config.CURRENT_PROFILE_NAME} MFA database server "
@@ -297,6 +390,7 @@ class DatabaseMixin(TemporaryDirectoryMixin, metaclass=abc.ABCMeta):
             if config.CLEAN or getattr(self, "dirty", False):
                 self.delete_database()
             else:
+                self.upgrade_database()
                 return
 
         os.makedirs(self.output_directory, exist_ok=True)
@@ -309,6 +403,18 @@ class DatabaseMixin(TemporaryDirectoryMixin, metaclass=abc.ABCMeta):
                 conn.commit()
 
         MfaSqlBase.metadata.create_all(self.db_engine)
+        if config.USE_POSTGRES:
+            configure_database_tables(self.db_engine)
+
+    def upgrade_database(self) -> None:
+        """
+        Bring a database from a previous run up to the current schema by creating any tables
+        added since it was created and rebuilding indexes whose definitions changed
+        """
+        MfaSqlBase.metadata.create_all(self.db_engine)
+        rebuilt = migrate_indexes(self.db_engine)
+        if rebuilt:
+            logger.info(f"Updated indexes of the existing database: {comma_join(rebuilt)}")
 
     @property
     def db_engine(self) -> sqlalchemy.engine.Engine:
@@ -402,9 +508,9 @@ class DatabaseMixin(TemporaryDirectoryMixin, metaclass=abc.ABCMeta):
             SqlAlchemy engine
         """
         db_string = self.db_string
-        if not config.USE_POSTGRES:
-            if kwargs.pop("read_only", False):
-                db_string += "?mode=ro&nolock=1&uri=true"
+        read_only = kwargs.pop("read_only", False)
+        if not config.USE_POSTGRES and read_only:
+            db_string = read_only_db_string(db_string)
         kwargs["pool_size"] = config.NUM_JOBS + 10
         kwargs["max_overflow"] = config.NUM_JOBS + 10
         e = sqlalchemy.create_engine(
@@ -412,7 +518,7 @@ class DatabaseMixin(TemporaryDirectoryMixin, metaclass=abc.ABCMeta):
             **kwargs,
         )
 
-        return e
+        return configure_sqlite_engine(e, read_only=read_only)
 
     @property
     def session(self) -> sqlalchemy.orm.scoped_session:
@@ -573,6 +679,7 @@ class TopLevelMfaWorker(MfaWorker, TemporaryDirectoryMixin, metaclass=abc.ABCMet
         super().__init__(**kwargs)
         self.initialized = False
         self.start_time = time.time()
+        PROFILER.reset()
         self.setup_logger()
         if skipped:
             logger.warning(f"Skipped the following configuration keys: {comma_join(skipped)}")
@@ -589,6 +696,10 @@ class TopLevelMfaWorker(MfaWorker, TemporaryDirectoryMixin, metaclass=abc.ABCMet
     def setup(self) -> None:
         """Setup for worker"""
         self.check_previous_run()
+        if config.USE_WORKER_POOL:
+            from montreal_forced_aligner.utils import start_worker_pool
+
+            start_worker_pool()
         if hasattr(self, "initialize_database"):
             self.initialize_database()
         if hasattr(self, "inspect_database"):
@@ -697,8 +808,18 @@ class TopLevelMfaWorker(MfaWorker, TemporaryDirectoryMixin, metaclass=abc.ABCMet
         Clean up loggers and output final message for top-level workers
         """
         try:
+            if not self.dirty and hasattr(self, "update_job_cost_model"):
+                try:
+                    self.update_job_cost_model()
+                except Exception as e:
+                    logger.debug(f"Could not update job cost model: {e}")
+            if config.USE_WORKER_POOL or config.WORKER_NODES:
+                from montreal_forced_aligner.utils import stop_worker_pool
+
+                stop_worker_pool()
             if hasattr(self, "cleanup_connections"):
                 self.cleanup_connections()
+            self.save_profile()
             if self.dirty:
                 logger.error("There was an error in the run, please see the log.")
             else:
@@ -709,21 +830,11 @@ class TopLevelMfaWorker(MfaWorker, TemporaryDirectoryMixin, metaclass=abc.ABCMet
                     )
                     if hasattr(self, "delete_database"):
                         if config.USE_POSTGRES:
-                            proc = subprocess.run(
-                                [
-                                    "dropdb",
-                                    f"--host={config.database_socket()}",
-                                    "--if-exists",
-                                    "--force",
-                                    self.identifier,
-                                ],
-                                stderr=subprocess.PIPE,
-                                stdout=subprocess.PIPE,
-                                check=True,
-                                encoding="utf-8",
+                            from montreal_forced_aligner.command_line.utils import (
+                                drop_database,
                             )
-                            logger.debug(f"Stdout: {proc.stdout}")
-                            logger.debug(f"Stderr: {proc.stderr}")
+
+                            drop_database(self.identifier)
                         else:
                             self.delete_database()
                     self.clean_working_directory()
@@ -796,6 +907,21 @@ class TopLevelMfaWorker(MfaWorker, TemporaryDirectoryMixin, metaclass=abc.ABCMet
         """Path to the worker's log file"""
         return self.output_directory.joinpath(f"{self.data_source_identifier}.log")
 
+    def save_profile(self) -> None:
+        """
+        Save the profiling report of the run's stages next to the log file and
+        log a summary table
+        """
+        if not PROFILER.records or not self.output_directory.exists():
+            return
+        try:
+            json_path, _ = PROFILER.save(self.output_directory, self.data_source_identifier)
+        except OSError as e:
+            logger.debug(f"Could not save profiling report: {e}")
+            return
+        logger.info(f"Stage profile:\n{PROFILER.summary()}")
+        logger.debug(f"Saved profiling report to {json_path}")
+
     def setup_logger(self) -> None:
         """
         Construct a logger for a command line run
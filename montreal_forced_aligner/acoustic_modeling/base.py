@@ -24,6 +24,7 @@ from montreal_forced_aligner.data import PhoneType
 from montreal_forced_aligner.db import CorpusWorkflow, Phone, Utterance
 from montreal_forced_aligner.exceptions import KaldiProcessingError
 from montreal_forced_aligner.models import AcousticModel
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.utils import log_kaldi_errors, parse_logs, run_kaldi_function
 
 if TYPE_CHECKING:
@@ -369,6 +370,7 @@ class AcousticModelTrainingMixin(
             self.increment_gaussians()
         self.iteration += 1
 
+    @record_stage()
     def train(self) -> None:
         """
         Train the model
@@ -38,8 +38,13 @@ from montreal_forced_aligner.db import (
 from montreal_forced_aligner.exceptions import ConfigError, KaldiProcessingError
 from montreal_forced_aligner.helper import load_configuration, mfa_open, parse_old_features
 from montreal_forced_aligner.models import AcousticModel, DictionaryModel
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.transcription.transcriber import TranscriberMixin
-from montreal_forced_aligner.utils import log_kaldi_errors, run_kaldi_function
+from montreal_forced_aligner.utils import (
+    load_cached_model,
+    log_kaldi_errors,
+    run_kaldi_function,
+)
 
 if TYPE_CHECKING:
     from dataclasses import dataclass
@@ -97,7 +102,7 @@ class TransitionAccFunction(KaldiFunction):
                 .filter(Job.id == self.job_name)
                 .first()
             )
-            transition_model, acoustic_model = read_gmm_model(self.model_path)
+            transition_model, _ = load_cached_model(self.model_path, read_gmm_model)
             for dict_id in job.dictionary_ids:
                 ali_path = job.construct_path(self.working_directory, "ali", "ark", dict_id)
                 if not ali_path.exists():
@@ -566,6 +571,7 @@ class TrainableAligner(TranscriberMixin, TopLevelMfaWorker, ModelExporterMixin):
                         for line in feat_lines:
                             feat_file.write(line)
 
+    @record_stage()
     def train(self) -> None:
         """
         Run through the training configurations to produce a final acoustic model
@@ -744,6 +750,7 @@ class TrainableAligner(TranscriberMixin, TopLevelMfaWorker, ModelExporterMixin):
             options = super().align_options
         return options
 
+    @record_stage()
     def align(self) -> None:
         """
         Multiprocessing function that aligns based on the current model.
@@ -5,13 +5,13 @@ import collections
 import csv
 import functools
 import io
+import itertools
 import logging
 import math
 import multiprocessing as mp
 import os
 import re
 import shutil
-import subprocess
 import time
 import typing
 from multiprocessing.pool import ThreadPool
@@ -45,6 +45,7 @@ from montreal_forced_aligner.alignment.multiprocessing import (
 )
 from montreal_forced_aligner.corpus.acoustic_corpus import AcousticCorpusPronunciationMixin
 from montreal_forced_aligner.data import (
+    CompactCtm,
     CtmInterval,
     PhoneType,
     PronunciationProbabilityCounter,
@@ -64,11 +65,16 @@ from montreal_forced_aligner.db import (
     RuleApplication,
     SoundFile,
     Speaker,
+    SqliteBulkLoader,
     TextFile,
     Utterance,
     Word,
     WordInterval,
     bulk_update,
+    drop_secondary_indexes,
+    get_id_allocator,
+    rebuild_indexes,
+    set_bulk_load_settings,
 )
 from montreal_forced_aligner.exceptions import AlignmentExportError, KaldiProcessingError
 from montreal_forced_aligner.helper import (
@@ -77,8 +83,11 @@ from montreal_forced_aligner.helper import (
     format_probability,
     mfa_open,
 )
+from montreal_forced_aligner.interval_store import PYARROW_ENABLED, IntervalStore
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.textgrid import (
     construct_textgrid_output,
+    construct_textgrid_output_from_ctms,
     output_textgrid_writing_errors,
 )
 from montreal_forced_aligner.utils import log_kaldi_errors, run_kaldi_function
@@ -153,6 +162,11 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             "word_insertion_penalty": getattr(self, "word_insertion_penalty", 0.5),
         }
 
+    @property
+    def interval_store(self) -> IntervalStore:
+        """Columnar store of the current workflow's word and phone intervals"""
+        return IntervalStore(self.working_directory.joinpath("intervals"))
+
     def analyze_alignments_arguments(self) -> List[AnalyzeAlignmentsArguments]:
         return [
             AnalyzeAlignmentsArguments(
@@ -165,6 +179,7 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             for j in self.jobs
         ]
 
+    @record_stage()
     def analyze_alignments(self):
         if not config.USE_POSTGRES:
             logger.warning("Alignment analysis not available without using postgresql")
@@ -341,6 +356,7 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             for j in self.jobs
         ]
 
+    @record_stage()
     def align(self, workflow_name=None) -> None:
         """Run the aligner"""
         self.alignment_mode = True
@@ -371,21 +387,34 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
                 for p in paths.values():
                     if os.path.exists(p):
                         os.remove(p)
+            self.interval_store.delete()
 
-            self.align_utterances()
-            if (
+            second_pass = (
                 acoustic_model is not None
                 and acoustic_model.meta["features"]["uses_speaker_adaptation"]
                 and perform_speaker_adaptation
-            ):
+            )
+            # Alignments are exported straight from the archives, and only loaded into the
+            # database if analysis or evaluation needs them
+            from_archives = (
+                config.EXPORT_FROM_ARCHIVES and not self.use_phone_model and not self.fine_tune
+            )
+            pipeline_extraction = self.pipeline_extraction and not from_archives
+            self.align_utterances(extract_alignments=pipeline_extraction and not second_pass)
+            if second_pass:
                 self.calc_fmllr()
                 if final_alignment:
                     self.final_alignment = True
                 self.uses_speaker_adaptation = True
                 assert self.alignment_model_path.suffix == ".mdl"
                 logger.info("Performing second-pass alignment...")
-                self.align_utterances()
-            self.collect_alignments()
+                self.align_utterances(extract_alignments=pipeline_extraction)
+            if not from_archives:
+                self.collect_alignments(
+                    to_interval_store=config.USE_INTERVAL_STORE
+                    and not self.use_phone_model
+                    and not self.fine_tune
+                )
             if self.use_phone_model:
                 self.transcribe(WorkflowType.phone_transcription)
             elif self.fine_tune:
@@ -786,10 +815,29 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             f"Calculating pronunciation probabilities took {time.time() - begin:.3f} seconds"
         )
 
-    def collect_alignments(self) -> None:
+    @record_stage()
+    def collect_alignments(
+        self,
+        results: Optional[typing.Iterable[typing.Tuple[int, int, CompactCtm]]] = None,
+        to_interval_store: bool = False,
+    ) -> None:
         """
         Process alignment archives to extract word or phone alignments
 
+        If the current workflow's intervals were previously written to the
+        :attr:`.CorpusAligner.interval_store`, they are loaded into the database from
+        there rather than extracted again.
+
+        Parameters
+        ----------
+        results: Iterable[tuple[int, int, :class:`~montreal_forced_aligner.data.CompactCtm`]], optional
+            Extracted utterance alignments to load, defaults to running
+            :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignmentExtractionFunction`
+            over all jobs
+        to_interval_store: bool
+            Flag for writing the intervals to the :attr:`.CorpusAligner.interval_store` instead
+            of the database, defaults to False
+
         See Also
         --------
         :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignmentExtractionFunction`
@@ -797,6 +845,12 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
         :meth:`.CorpusAligner.alignment_extraction_arguments`
             Arguments for extraction
         """
+        interval_store = self.interval_store
+        if to_interval_store and not PYARROW_ENABLED:
+            logger.warning(
+                "pyarrow is not installed, so alignments will be stored in the database instead."
+            )
+            to_interval_store = False
         with self.session() as session:
             workflow = (
                 session.query(CorpusWorkflow)
@@ -805,25 +859,34 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             )
             if workflow.alignments_collected:
                 return
-            if config.USE_POSTGRES:
+            if (
+                workflow.workflow_type is WorkflowType.transcription
+                or workflow.workflow_type is WorkflowType.per_speaker_transcription
+            ):
+                # Transcription text is generated from the interval tables
+                to_interval_store = False
+            store_exists = (
+                interval_store.exists() and interval_store.manifest["workflow_id"] == workflow.id
+            )
+            if to_interval_store and results is None and store_exists:
+                return
+            from_interval_store = results is None and not to_interval_store and store_exists
+            if config.USE_POSTGRES and not to_interval_store:
                 session.execute(sqlalchemy.text("ALTER TABLE word_interval DISABLE TRIGGER all"))
                 session.execute(sqlalchemy.text("ALTER TABLE phone_interval DISABLE TRIGGER all"))
                 session.commit()
-            max_phone_interval_id = session.query(sqlalchemy.func.max(PhoneInterval.id)).scalar()
-            if max_phone_interval_id is None:
-                max_phone_interval_id = 0
-            max_word_interval_id = session.query(sqlalchemy.func.max(WordInterval.id)).scalar()
-            if max_word_interval_id is None:
-                max_word_interval_id = 0
-            mapping_id = session.query(sqlalchemy.func.max(Word.mapping_id)).scalar()
-            if mapping_id is None:
-                mapping_id = -1
-            mapping_id += 1
-
+            drop_indexes = (
+                not to_interval_store
+                and session.query(WordInterval.id).first() is None
+                and session.query(PhoneInterval.id).first() is None
+            )
+            utterance_jobs = {}
+            if to_interval_store:
+                utterance_jobs = dict(session.query(Utterance.id, Utterance.job_id))
             phone_to_phone_id = {}
             ds = session.query(Phone.id, Phone.mapping_id).all()
-            for p_id, mapping_id in ds:
-                phone_to_phone_id[mapping_id] = p_id
+            for p_id, phone_mapping_id in ds:
+                phone_to_phone_id[phone_mapping_id] = p_id
             pronunciation_mappings = {}
             word_mappings = {}
             dictionaries = session.query(Dictionary.id)
@@ -846,183 +909,242 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
                 )
                 for w, pron, p_id in pronunciations:
                     pronunciation_mappings[dict_id][(w, pron)] = p_id
-        word_index = self.get_next_primary_key(Word)
-
-        logger.info(f"Collecting phone and word alignments from {workflow.name} lattices...")
-        all_begin = time.time()
-        arguments = self.alignment_extraction_arguments()
-        has_words = False
-        phone_interval_count = 0
         new_words = []
-        if config.USE_POSTGRES:
-            conn = self.db_engine.raw_connection()
-            cursor = conn.cursor()
-            word_buf = io.StringIO()
-            phone_buf = io.StringIO()
-        else:
-            word_csv_path = self.working_directory.joinpath("word_intervals.csv")
-            phone_csv_path = self.working_directory.joinpath("phone_intervals.csv")
-            word_buf = open(word_csv_path, "w", encoding="utf8", newline="")
-            phone_buf = open(phone_csv_path, "w", encoding="utf8", newline="")
-        word_writer = csv.DictWriter(
-            word_buf,
-            [
-                "id",
-                "begin",
-                "end",
-                "utterance_id",
-                "word_id",
-                "pronunciation_id",
-                "workflow_id",
-            ],
-        )
-        phone_writer = csv.DictWriter(
-            phone_buf,
-            [
-                "id",
-                "begin",
-                "end",
-                "phone_goodness",
-                "phone_id",
-                "word_interval_id",
-                "utterance_id",
-                "workflow_id",
-            ],
-        )
 
-        if not config.USE_POSTGRES:
-            word_writer.writeheader()
-            phone_writer.writeheader()
-        for (
-            utterance,
-            dict_id,
-            ctm,
-        ) in run_kaldi_function(
-            AlignmentExtractionFunction, arguments, total_count=self.num_current_utterances
-        ):
-            new_phone_interval_mappings = []
-            new_word_interval_mappings = []
-            for word_interval in ctm.word_intervals:
-                if word_interval.label not in word_mappings[dict_id]:
-                    new_words.append(
+        def extracted_rows():
+            for utterance, dict_id, ctm in results:
+                new_phone_interval_mappings = []
+                new_word_interval_mappings = []
+                utterance_word_interval_ids = []
+                for label, pronunciation, (begin, end) in zip(
+                    ctm.words, ctm.pronunciations, ctm.word_times.tolist()
+                ):
+                    if label not in word_mappings[dict_id]:
+                        word_id = next(word_ids)
+                        new_words.append(
+                            {
+                                "id": word_id,
+                                "mapping_id": next(mapping_ids),
+                                "word": label,
+                                "dictionary_id": 1,
+                                "word_type": WordType.oov,
+                            }
+                        )
+                        word_mappings[dict_id][label] = word_id
+                    else:
+                        word_id = word_mappings[dict_id][label]
+                    word_interval_id = next(word_interval_ids)
+                    utterance_word_interval_ids.append(word_interval_id)
+                    pronunciation_id = pronunciation_mappings[dict_id].get(
+                        (label, pronunciation), None
+                    )
+
+                    new_word_interval_mappings.append(
                         {
-                            "id": word_index,
-                            "mapping_id": mapping_id,
-                            "word": word_interval.label,
-                            "dictionary_id": 1,
-                            "word_type": WordType.oov,
+                            "id": word_interval_id,
+                            "begin": begin,
+                            "end": end,
+                            "word_id": word_id,
+                            "pronunciation_id": pronunciation_id,
+                            "utterance_id": utterance,
+                            "workflow_id": workflow.id,
                         }
                     )
-                    word_mappings[dict_id][word_interval.label] = word_index
-                    word_id = word_index
-                    word_index += 1
-                    mapping_id += 1
-                else:
-                    word_id = word_mappings[dict_id][word_interval.label]
-                max_word_interval_id += 1
-                pronunciation_id = pronunciation_mappings[dict_id].get(
-                    (word_interval.label, word_interval.pronunciation), None
-                )
-
-                new_word_interval_mappings.append(
-                    {
-                        "id": max_word_interval_id,
-                        "begin": word_interval.begin,
-                        "end": word_interval.end,
-                        "word_id": word_id,
-                        "pronunciation_id": pronunciation_id,
-                        "utterance_id": utterance,
-                        "workflow_id": workflow.id,
-                    }
-                )
-                for interval in word_interval.phones:
-                    max_phone_interval_id += 1
+                for (begin, end, phone_goodness), phone_symbol, word_index_in_utterance in zip(
+                    ctm.phone_times.tolist(),
+                    ctm.phone_ids.tolist(),
+                    ctm.phone_word_indices.tolist(),
+                ):
                     new_phone_interval_mappings.append(
                         {
-                            "id": max_phone_interval_id,
-                            "begin": interval.begin,
-                            "end": interval.end,
-                            "phone_id": phone_to_phone_id[interval.symbol],
+                            "id": next(phone_interval_ids),
+                            "begin": begin,
+                            "end": end,
+                            "phone_id": phone_to_phone_id[phone_symbol],
                             "utterance_id": utterance,
                             "workflow_id": workflow.id,
-                            "word_interval_id": max_word_interval_id,
-                            "phone_goodness": interval.confidence if interval.confidence else 0.0,
+                            "word_interval_id": utterance_word_interval_ids[
+                                word_index_in_utterance
+                            ],
+                            "phone_goodness": phone_goodness,
                         }
                     )
-            phone_writer.writerows(new_phone_interval_mappings)
-            word_writer.writerows(new_word_interval_mappings)
-            if new_word_interval_mappings:
-                has_words = True
-            if config.USE_POSTGRES and phone_interval_count > 100000:
-                if has_words:
+                yield utterance, new_word_interval_mappings, new_phone_interval_mappings
+
+        all_begin = time.time()
+        has_words = False
+        phone_interval_count = 0
+        loader = None
+        store_writer = None
+        conn = None
+        dropped_indexes = []
+        if drop_indexes:
+            # Indexes on empty tables are cheaper to build once after loading, the drop
+            # gets its own session since it commits
+            with self.session() as session:
+                dropped_indexes = drop_secondary_indexes(session, [WordInterval, PhoneInterval])
+        try:
+            if to_interval_store:
+                store_writer = interval_store.writer(workflow.id)
+            elif config.USE_POSTGRES:
+                conn = self.db_engine.raw_connection()
+                cursor = conn.cursor()
+                set_bulk_load_settings(cursor)
+                word_buf = io.StringIO()
+                phone_buf = io.StringIO()
+                word_writer = csv.DictWriter(
+                    word_buf,
+                    [
+                        "id",
+                        "begin",
+                        "end",
+                        "utterance_id",
+                        "word_id",
+                        "pronunciation_id",
+                        "workflow_id",
+                    ],
+                )
+                phone_writer = csv.DictWriter(
+                    phone_buf,
+                    [
+                        "id",
+                        "begin",
+                        "end",
+                        "phone_goodness",
+                        "phone_id",
+                        "word_interval_id",
+                        "utterance_id",
+                        "workflow_id",
+                    ],
+                )
+            else:
+                loader = SqliteBulkLoader(self.db_engine)
+                loader.begin()
+            # Ids are reserved in blocks, on SQLite within the loading transaction
+            id_allocator = get_id_allocator(self.db_engine)
+            allocation_connection = loader.conn if loader is not None else None
+            word_ids = id_allocator.ids(Word, allocation_connection, block_size=100)
+            mapping_ids = id_allocator.ids(
+                Word, allocation_connection, block_size=100, column="mapping_id"
+            )
+            if to_interval_store:
+                # Ids only link phones to their words within the store
+                word_interval_ids = itertools.count(1)
+                phone_interval_ids = itertools.count(1)
+            else:
+                word_interval_ids = id_allocator.ids(WordInterval, allocation_connection)
+                phone_interval_ids = id_allocator.ids(PhoneInterval, allocation_connection)
+            if from_interval_store:
+                logger.info(
+                    f"Loading phone and word alignments of {workflow.name} "
+                    f"from {interval_store.directory}..."
+                )
+                manifest = interval_store.manifest
+                first_word_interval_id = id_allocator.reserve(
+                    WordInterval, sum(manifest["word_intervals"].values()), allocation_connection
+                )
+                first_phone_interval_id = id_allocator.reserve(
+                    PhoneInterval, sum(manifest["phone_intervals"].values()), allocation_connection
+                )
+                rows = (
+                    (None, word_rows, phone_rows)
+                    for word_rows, phone_rows in interval_store.database_rows(
+                        first_word_interval_id, first_phone_interval_id, workflow.id
+                    )
+                )
+            else:
+                logger.info(
+                    f"Collecting phone and word alignments from {workflow.name} lattices..."
+                )
+                if results is None:
+                    results = run_kaldi_function(
+                        AlignmentExtractionFunction,
+                        self.alignment_extraction_arguments(),
+                        total_count=self.num_current_utterances,
+                    )
+                rows = extracted_rows()
+            for utterance, new_word_interval_mappings, new_phone_interval_mappings in rows:
+                if store_writer is not None:
+                    store_writer.add(
+                        utterance_jobs[utterance],
+                        new_word_interval_mappings,
+                        new_phone_interval_mappings,
+                    )
+                    continue
+                if loader is not None:
+                    loader.add(WordInterval, new_word_interval_mappings)
+                    loader.add(PhoneInterval, new_phone_interval_mappings)
+                    continue
+                phone_writer.writerows(new_phone_interval_mappings)
+                word_writer.writerows(new_word_interval_mappings)
+                phone_interval_count += len(new_phone_interval_mappings)
+                if new_word_interval_mappings:
+                    has_words = True
+                if phone_interval_count > 100000:
+                    if has_words:
+                        word_buf.seek(0)
+                        cursor.copy_from(word_buf, WordInterval.__tablename__, sep=",", null="")
+                        word_buf.truncate(0)
+                        word_buf.seek(0)
+
+                    phone_buf.seek(0)
+                    cursor.copy_from(phone_buf, PhoneInterval.__tablename__, sep=",", null="")
+                    phone_buf.truncate(0)
+                    phone_buf.seek(0)
+                    conn.commit()
+                    cursor.close()
+                    conn.close()
+                    conn = self.db_engine.raw_connection()
+                    cursor = conn.cursor()
+                    set_bulk_load_settings(cursor)
+                    phone_interval_count = 0
+                    has_words = False
+
+            if store_writer is not None:
+                store_writer.close()
+            elif config.USE_POSTGRES:
+                if word_buf.tell() != 0:
                     word_buf.seek(0)
                     cursor.copy_from(word_buf, WordInterval.__tablename__, sep=",", null="")
                     word_buf.truncate(0)
                     word_buf.seek(0)
 
-                phone_buf.seek(0)
-                cursor.copy_from(phone_buf, PhoneInterval.__tablename__, sep=",", null="")
-                phone_buf.truncate(0)
-                phone_buf.seek(0)
+                if phone_buf.tell() != 0:
+                    phone_buf.seek(0)
+                    cursor.copy_from(phone_buf, PhoneInterval.__tablename__, sep=",", null="")
+                    phone_buf.truncate(0)
+                    phone_buf.seek(0)
                 conn.commit()
                 cursor.close()
                 conn.close()
-                conn = self.db_engine.raw_connection()
-                cursor = conn.cursor()
-
-        if config.USE_POSTGRES:
-            if word_buf.tell() != 0:
-                word_buf.seek(0)
-                cursor.copy_from(word_buf, WordInterval.__tablename__, sep=",", null="")
-                word_buf.truncate(0)
-                word_buf.seek(0)
-
-            if phone_buf.tell() != 0:
-                phone_buf.seek(0)
-                cursor.copy_from(phone_buf, PhoneInterval.__tablename__, sep=",", null="")
-                phone_buf.truncate(0)
-                phone_buf.seek(0)
-            conn.commit()
-            cursor.close()
-            conn.close()
-        else:
-            word_buf.close()
-            phone_buf.close()
-            if has_words:
-                subprocess.check_call(
-                    [
-                        "sqlite3",
-                        self.db_path.as_posix(),
-                        "--cmd",
-                        ".mode csv",
-                        f".import {word_csv_path.as_posix()} word_interval_temp",
-                    ]
-                )
-            subprocess.check_call(
-                [
-                    "sqlite3",
-                    self.db_path.as_posix(),
-                    "--cmd",
-                    ".mode csv",
-                    f".import {phone_csv_path.as_posix()} phone_interval_temp",
-                ]
-            )
+            else:
+                loader.commit()
+        except Exception:
+            if loader is not None and loader.conn is not None:
+                loader.rollback()
+            elif conn is not None:
+                conn.rollback()
+                conn.close()
+            if dropped_indexes:
+                with self.session() as session:
+                    rebuild_indexes(session, dropped_indexes)
+            raise
         with self.session() as session:
-            if new_words:
-                session.execute(sqlalchemy.insert(Word).values(new_words))
-                session.commit()
-
-            if not config.USE_POSTGRES:
-                session.execute(
-                    sqlalchemy.text("INSERT INTO word_interval SELECT * from word_interval_temp")
-                )
-                session.execute(
-                    sqlalchemy.text("INSERT INTO phone_interval SELECT * from phone_interval_temp")
+            try:
+                if new_words:
+                    session.execute(sqlalchemy.insert(Word).values(new_words))
+                    session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                rebuild_indexes(session, dropped_indexes)
+            if to_interval_store:
+                logger.debug(
+                    f"Storing alignments in {interval_store.directory} took "
+                    f"{time.time() - all_begin:.3f} seconds"
                 )
-                session.commit()
-                session.execute(sqlalchemy.text("DROP TABLE word_interval_temp"))
-                session.execute(sqlalchemy.text("DROP TABLE phone_interval_temp"))
-                session.commit()
+                return
             workflow = (
                 session.query(CorpusWorkflow)
                 .filter(CorpusWorkflow.current == True)  # noqa
@@ -1059,6 +1181,7 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             conn.close()
         logger.debug(f"Collecting alignments took {time.time() - all_begin:.3f} seconds")
 
+    @record_stage()
     def fine_tune_alignments(self) -> None:
         """
         Fine tune aligned boundaries to millisecond precision
@@ -1161,6 +1284,52 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             )
         return args
 
+    def export_textgrids_from_archives(
+        self,
+        output_format: str = TextFileType.TEXTGRID.value,
+        include_original_text: bool = False,
+    ) -> None:
+        """
+        Exports alignments to TextGrid files as they are extracted from the alignment archives,
+        without loading them into the database
+
+        See Also
+        --------
+        :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignmentExtractionFunction`
+            Multiprocessing function for extracting alignments
+        :func:`~montreal_forced_aligner.textgrid.construct_textgrid_output_from_ctms`
+            Function for exporting extracted alignments
+
+        Parameters
+        ----------
+        output_format: str, optional
+            Format to save alignments, one of 'long_textgrids' (the default), 'short_textgrids', or 'json', passed to praatio
+        include_original_text: bool
+            Flag for including the original text of utterances, defaults to False
+        """
+        begin = time.time()
+        logger.info("Exporting TextGrids from alignment archives...")
+        with self.session() as session:
+            results = run_kaldi_function(
+                AlignmentExtractionFunction,
+                self.alignment_extraction_arguments(),
+                total_count=self.num_current_utterances,
+            )
+            for _ in construct_textgrid_output_from_ctms(
+                session,
+                results,
+                config.CLEANUP_TEXTGRIDS,
+                self.clitic_marker,
+                self.export_output_directory,
+                self.export_frame_shift,
+                output_format,
+                include_original_text,
+            ):
+                pass
+        logger.info(f"Finished exporting TextGrids to {self.export_output_directory}!")
+        logger.debug(f"Exported TextGrids in a total of {time.time() - begin:.3f} seconds")
+
+    @record_stage()
     def export_textgrids(
         self,
         output_format: str = TextFileType.TEXTGRID.value,
@@ -1182,8 +1351,19 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
             Format to save alignments, one of 'long_textgrids' (the default), 'short_textgrids', or 'json', passed to praatio
         """
         workflow = self.current_workflow
+        interval_store = None
         if not workflow.alignments_collected:
-            self.collect_alignments()
+            if (
+                PYARROW_ENABLED
+                and self.interval_store.exists()
+                and self.interval_store.manifest["workflow_id"] == workflow.id
+            ):
+                interval_store = self.interval_store
+            elif config.EXPORT_FROM_ARCHIVES and workflow.workflow_type is WorkflowType.alignment:
+                self.export_textgrids_from_archives(output_format, include_original_text)
+                return
+            else:
+                self.collect_alignments()
         begin = time.time()
         error_dict = {}
         with tqdm(total=self.num_files, disable=config.QUIET) as pbar:
@@ -1230,6 +1410,7 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
                         self.export_output_directory,
                         output_format,
                         include_original_text,
+                        interval_store.directory if interval_store is not None else None,
                     )
                     export_proc.start()
                     export_procs.append(export_proc)
@@ -1294,6 +1475,7 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
                     self.export_frame_shift,
                     output_format,
                     include_original_text,
+                    interval_store,
                 ):
                     pbar.update(1)
 
@@ -1311,6 +1493,7 @@ class CorpusAligner(AcousticCorpusPronunciationMixin, AlignMixin, FileExporterMi
         logger.info(f"Finished exporting TextGrids to {self.export_output_directory}!")
         logger.debug(f"Exported TextGrids in a total of {time.time() - begin:.3f} seconds")
 
+    @record_stage()
     def export_files(
         self,
         output_directory: typing.Union[Path, str],
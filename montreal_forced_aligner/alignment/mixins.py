@@ -1,6 +1,7 @@
 """Class definitions for alignment mixins"""
 from __future__ import annotations
 
+import copy
 import datetime
 import logging
 import os
@@ -12,6 +13,8 @@ from typing import TYPE_CHECKING, List
 
 from montreal_forced_aligner import config
 from montreal_forced_aligner.alignment.multiprocessing import (
+    AlignAndExtractArguments,
+    AlignAndExtractFunction,
     AlignArguments,
     AlignFunction,
     CompileTrainGraphsArguments,
@@ -19,9 +22,11 @@ from montreal_forced_aligner.alignment.multiprocessing import (
     PhoneConfidenceArguments,
     PhoneConfidenceFunction,
 )
+from montreal_forced_aligner.data import BeamScheduler
 from montreal_forced_aligner.db import CorpusWorkflow, Job, PhoneInterval, Utterance, bulk_update
 from montreal_forced_aligner.dictionary.mixins import DictionaryMixin
 from montreal_forced_aligner.exceptions import NoAlignmentsError
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.utils import run_kaldi_function
 
 if TYPE_CHECKING:
@@ -49,6 +54,14 @@ class AlignMixin(DictionaryMixin):
         Size of the beam to use in decoding, defaults to 10
     retry_beam : int
         Size of the beam to use in decoding if it fails with the initial beam width, defaults to 40
+    adaptive_beam : bool
+        Flag for escalating beams per utterance from ``beam`` up to ``retry_beam`` and remembering
+        the beam that succeeded for each speaker, defaults to False
+    beam_likelihood_threshold : float, optional
+        Per-frame log-likelihood below which an adaptive beam alignment is escalated
+    pipeline_extraction : bool
+        Flag for extracting and loading each job's alignments as soon as the job is aligned in the
+        final pass, rather than after all jobs are aligned, defaults to False
 
 
     See Also
@@ -76,6 +89,9 @@ class AlignMixin(DictionaryMixin):
         fine_tune: bool = False,
         phone_confidence: bool = False,
         use_phone_model: bool = False,
+        adaptive_beam: bool = False,
+        beam_likelihood_threshold: float = None,
+        pipeline_extraction: bool = False,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -90,6 +106,16 @@ class AlignMixin(DictionaryMixin):
         self.use_phone_model = use_phone_model
         if self.retry_beam <= self.beam:
             self.retry_beam = self.beam * 4
+        self.adaptive_beam = adaptive_beam
+        self.beam_likelihood_threshold = beam_likelihood_threshold
+        self.pipeline_extraction = pipeline_extraction
+        self.beam_scheduler = None
+        if self.adaptive_beam:
+            self.beam_scheduler = BeamScheduler(
+                self.beam,
+                self.retry_beam,
+                likelihood_threshold=self.beam_likelihood_threshold,
+            )
         self.unaligned_files = set()
         self.final_alignment = False
 
@@ -151,6 +177,10 @@ class AlignMixin(DictionaryMixin):
                 log_path = self.working_log_directory.joinpath(f"align.{j.id}.log")
             if getattr(self, "uses_speaker_adaptation", False):
                 log_path = log_path.with_suffix(".fmllr.log")
+            beam_scheduler = None
+            if self.beam_scheduler is not None:
+                beam_scheduler = copy.deepcopy(self.beam_scheduler)
+                beam_scheduler.reset_counts()
             args.append(
                 AlignArguments(
                     j.id,
@@ -161,6 +191,7 @@ class AlignMixin(DictionaryMixin):
                     self.align_options,
                     self.phone_confidence,
                     getattr(self, "final_alignment", False),
+                    beam_scheduler,
                 )
             )
         return args
@@ -211,6 +242,8 @@ class AlignMixin(DictionaryMixin):
             "boost_silence": self.boost_silence,
             "beam": self.beam,
             "retry_beam": self.retry_beam,
+            "adaptive_beam": self.adaptive_beam,
+            "beam_likelihood_threshold": self.beam_likelihood_threshold,
         }
 
     @property
@@ -218,6 +251,7 @@ class AlignMixin(DictionaryMixin):
         """Number of current utterances"""
         return getattr(self, "num_utterances", 0)
 
+    @record_stage()
     def compile_train_graphs(self) -> None:
         """
         Multiprocessing function that compiles training graphs for utterances.
@@ -260,10 +294,19 @@ class AlignMixin(DictionaryMixin):
             session.commit()
         logger.debug(f"Calculating phone confidences took {time.time() - begin:.3f} seconds")
 
-    def align_utterances(self, training=False) -> None:
+    @record_stage()
+    def align_utterances(self, training=False, extract_alignments=False) -> None:
         """
         Multiprocessing function that aligns based on the current model.
 
+        Parameters
+        ----------
+        training: bool
+            Flag for alignment during training, which does not store likelihoods, defaults to False
+        extract_alignments: bool
+            Flag for extracting each job's alignments into the database as soon as the job is
+            aligned, see :meth:`.CorpusAligner.collect_alignments`, defaults to False
+
         See Also
         --------
         :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignFunction`
@@ -283,9 +326,54 @@ class AlignMixin(DictionaryMixin):
         update_mappings = []
         num_errors = 0
         num_successful = 0
-        for utterance, log_likelihood in run_kaldi_function(
-            AlignFunction, self.align_arguments(), total_count=self.num_current_utterances
-        ):
+        if self.beam_scheduler is not None:
+            self.beam_scheduler.reset_counts()
+        if extract_alignments:
+            arguments = [
+                AlignAndExtractArguments(
+                    align_args.job_name,
+                    align_args.session,
+                    align_args.log_path,
+                    align_args,
+                    extraction_args,
+                )
+                for align_args, extraction_args in zip(
+                    self.align_arguments(), self.alignment_extraction_arguments()
+                )
+            ]
+            align_results = []
+
+            def extraction_results():
+                for stage, result in run_kaldi_function(
+                    AlignAndExtractFunction,
+                    arguments,
+                    total_count=self.num_current_utterances * 2,
+                ):
+                    if stage == 0:
+                        align_results.append(result)
+                    else:
+                        yield result
+
+            # Extracted alignments are loaded as jobs finish, alignment results are
+            # buffered and processed below once every job is done
+            results = extraction_results()
+            self.collect_alignments(
+                results=results,
+                to_interval_store=config.USE_INTERVAL_STORE
+                and not self.use_phone_model
+                and not self.fine_tune,
+            )
+            for _ in results:
+                pass
+        else:
+            align_results = run_kaldi_function(
+                AlignFunction, self.align_arguments(), total_count=self.num_current_utterances
+            )
+        for result in align_results:
+            if isinstance(result, BeamScheduler):
+                self.beam_scheduler.add_counts(result)
+                continue
+            utterance, log_likelihood = result
             if log_likelihood:
                 num_successful += 1
                 if log_likelihood:
@@ -326,6 +414,11 @@ class AlignMixin(DictionaryMixin):
         logger.debug(
             f"Aligned {num_successful}, errors on {num_errors}, total {num_successful + num_errors}"
         )
+        if self.beam_scheduler is not None:
+            logger.debug(
+                "Beam distribution: "
+                + ", ".join(f"{k}: {v}" for k, v in self.beam_scheduler.distribution.items())
+            )
         logger.debug(f"Alignment round took {time.time() - begin:.3f} seconds")
 
     @property
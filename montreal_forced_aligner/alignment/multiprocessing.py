@@ -5,6 +5,8 @@ Alignment multiprocessing functions
 from __future__ import annotations
 
 import collections
+import copy
+import functools
 import json
 import logging
 import math
@@ -27,10 +29,16 @@ from _kalpy import transform as kalpy_transform
 from _kalpy.gmm import gmm_compute_likes
 from _kalpy.hmm import TransitionModel
 from _kalpy.matrix import FloatMatrix, FloatSubMatrix
-from _kalpy.util import RandomAccessBaseDoubleMatrixReader, RandomAccessBaseFloatMatrixReader
+from _kalpy.util import (
+    BaseFloatVectorWriter,
+    Int32VectorWriter,
+    RandomAccessBaseDoubleMatrixReader,
+    RandomAccessBaseFloatMatrixReader,
+)
 from kalpy.data import Segment
 from kalpy.decoder.data import FstArchive
 from kalpy.decoder.training_graphs import TrainingGraphCompiler
+from kalpy.feat.data import FeatureArchive
 from kalpy.feat.mfcc import MfccComputer
 from kalpy.feat.pitch import PitchComputer
 from kalpy.fstext.lexicon import LexiconCompiler
@@ -38,13 +46,15 @@ from kalpy.gmm.align import GmmAligner
 from kalpy.gmm.data import AlignmentArchive, TranscriptionArchive
 from kalpy.gmm.train import GmmStatsAccumulator
 from kalpy.gmm.utils import read_gmm_model
-from kalpy.utils import generate_read_specifier, read_kaldi_object
+from kalpy.utils import generate_read_specifier, generate_write_specifier, read_kaldi_object
 from sqlalchemy.orm import joinedload, selectinload, subqueryload
 
-from montreal_forced_aligner.abc import KaldiFunction
+from montreal_forced_aligner.abc import KaldiFunction, get_process_engine
 from montreal_forced_aligner.data import (
     WORD_BEGIN_SYMBOL,
     WORD_END_SYMBOL,
+    BeamScheduler,
+    CompactCtm,
     MfaArguments,
     PhoneType,
     PronunciationProbabilityCounter,
@@ -63,16 +73,20 @@ from montreal_forced_aligner.db import (
     Utterance,
     Word,
     WordInterval,
+    job_utterance_query,
 )
 from montreal_forced_aligner.exceptions import AlignmentCollectionError, AlignmentExportError
 from montreal_forced_aligner.helper import (
     align_words,
+    atomic_archive,
     fix_unk_words,
     mfa_open,
     split_phone_position,
 )
+from montreal_forced_aligner.interval_store import IntervalStore
+from montreal_forced_aligner.online.alignment import align_with_beam_schedule
 from montreal_forced_aligner.textgrid import construct_textgrid_output
-from montreal_forced_aligner.utils import thread_logger
+from montreal_forced_aligner.utils import load_cached_model, thread_logger
 
 if TYPE_CHECKING:
     from dataclasses import dataclass
@@ -84,6 +98,8 @@ else:
 
 __all__ = [
     "AlignmentExtractionFunction",
+    "AlignAndExtractFunction",
+    "AlignAndExtractArguments",
     "ExportTextGridProcessWorker",
     "AlignmentExtractionArguments",
     "ExportTextGridArguments",
@@ -174,6 +190,29 @@ class AlignmentExtractionArguments(MfaArguments):
     use_g2p: bool
 
 
+@dataclass
+class AlignAndExtractArguments(MfaArguments):
+    """
+    Arguments for :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignAndExtractFunction`
+
+    Parameters
+    ----------
+    job_name: int
+        Integer ID of the job
+    session: :class:`sqlalchemy.orm.scoped_session` or str
+        SqlAlchemy scoped session or string for database connections
+    log_path: :class:`~pathlib.Path`
+        Path to save logging information during the run
+    align_arguments: :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignArguments`
+        Arguments for aligning the job
+    extraction_arguments: :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignmentExtractionArguments`
+        Arguments for extracting alignments for the job
+    """
+
+    align_arguments: AlignArguments
+    extraction_arguments: AlignmentExtractionArguments
+
+
 @dataclass
 class ExportTextGridArguments(MfaArguments):
     """
@@ -260,6 +299,10 @@ class AlignArguments(MfaArguments):
         Alignment options
     confidence: bool
         Flag for outputting confidence
+    final: bool
+        Flag for whether this is the final alignment
+    beam_scheduler: :class:`~montreal_forced_aligner.data.BeamScheduler`, optional
+        Scheduler for escalating beams per utterance, uses fixed beams if None
     """
 
     working_directory: Path
@@ -267,6 +310,7 @@ class AlignArguments(MfaArguments):
     align_options: MetaDict
     confidence: bool
     final: bool
+    beam_scheduler: typing.Optional[BeamScheduler]
 
 
 @dataclass
@@ -401,6 +445,8 @@ class CompileTrainGraphsFunction(KaldiFunction):
         Arguments for the function
     """
 
+    resumable = True
+
     def __init__(self, args: CompileTrainGraphsArguments):
         super().__init__(args)
         self.tree_path = args.tree_path
@@ -475,13 +521,14 @@ class CompileTrainGraphsFunction(KaldiFunction):
                     query = query.filter(Utterance.in_subset == True)  # noqa
                 graph_logger.info(f"Compiling graphs for {d.name}")
                 fst_ark_path = job.construct_path(workflow.working_directory, "fsts", "ark", d.id)
-                compiler.export_graphs(
-                    fst_ark_path,
-                    query,
-                    # callback=self.callback,
-                    interjection_words=interjection_costs,
-                    # cutoff_pattern = d.cutoff_word
-                )
+                with atomic_archive(fst_ark_path) as (temp_fst_ark_path, _):
+                    compiler.export_graphs(
+                        temp_fst_ark_path,
+                        query,
+                        # callback=self.callback,
+                        interjection_words=interjection_costs,
+                        # cutoff_pattern = d.cutoff_word
+                    )
                 graph_logger.debug(f"Total compilation time: {time.time() - begin} seconds")
                 del compiler
                 del lexicon
@@ -547,6 +594,37 @@ class AccStatsFunction(KaldiFunction):
                 self.callback((accumulator.transition_accs, accumulator.gmm_accs))
 
 
+def _load_aligner(
+    model_path: str,
+    boost_silence: float,
+    silence_phones: typing.Tuple[int, ...],
+    align_options: typing.Tuple[typing.Tuple[str, typing.Any], ...],
+) -> GmmAligner:
+    """
+    Construct an aligner with silence boosted, for use with
+    :func:`~montreal_forced_aligner.utils.load_cached_model`
+
+    Parameters
+    ----------
+    model_path: str
+        Path to the acoustic model
+    boost_silence: float
+        Factor to boost silence probabilities by
+    silence_phones: tuple[int, ...]
+        Silence phone IDs
+    align_options: tuple[tuple[str, Any], ...]
+        Keyword arguments for :class:`~kalpy.gmm.align.GmmAligner` as sorted items
+
+    Returns
+    -------
+    :class:`~kalpy.gmm.align.GmmAligner`
+        Aligner
+    """
+    aligner = GmmAligner(model_path, **dict(align_options))
+    aligner.boost_silence(boost_silence, list(silence_phones))
+    return aligner
+
+
 class AlignFunction(KaldiFunction):
     """
     Multiprocessing function for alignment.
@@ -575,6 +653,63 @@ class AlignFunction(KaldiFunction):
         self.align_options = args.align_options
         self.confidence = args.confidence
         self.final = args.final
+        self.beam_scheduler = args.beam_scheduler
+
+    def _align_adaptive(
+        self,
+        aligner: GmmAligner,
+        training_graph_archive: FstArchive,
+        feature_archive: FeatureArchive,
+        ali_path: Path,
+        words_path: Path,
+        likes_path: Path,
+        align_logger: logging.Logger,
+    ) -> None:
+        """
+        Align utterances one at a time, escalating the beam only for utterances that need it
+
+        Parameters
+        ----------
+        aligner: :class:`~kalpy.gmm.align.GmmAligner`
+            Aligner to use
+        training_graph_archive: :class:`~kalpy.decoder.data.FstArchive`
+            Training graphs for the utterances
+        feature_archive: :class:`~kalpy.feat.data.FeatureArchive`
+            Features for the utterances
+        ali_path: :class:`~pathlib.Path`
+            Path to export alignments
+        words_path: :class:`~pathlib.Path`
+            Path to export word alignments
+        likes_path: :class:`~pathlib.Path`
+            Path to export per-frame likelihoods
+        align_logger: :class:`~logging.Logger`
+            Logger for the job
+        """
+        ali_writer = Int32VectorWriter(generate_write_specifier(ali_path))
+        words_writer = Int32VectorWriter(generate_write_specifier(words_path))
+        likes_writer = BaseFloatVectorWriter(generate_write_specifier(likes_path))
+        for utt_id, training_graph in training_graph_archive:
+            feats = feature_archive[utt_id]
+            speaker = utt_id.split("-")[0]
+            best_alignment, best_beam = align_with_beam_schedule(
+                aligner, self.beam_scheduler, speaker, training_graph, feats, utt_id
+            )
+            if best_alignment is None:
+                beams = self.beam_scheduler.beams_for_speaker(speaker)
+                align_logger.warning(f"Did not align {utt_id} with beams {beams}")
+                self.callback((utt_id, None))
+                continue
+            align_logger.debug(f"Aligned {utt_id} with beam {best_beam}")
+            ali_writer.Write(utt_id, best_alignment.alignment)
+            words_writer.Write(utt_id, best_alignment.words)
+            if best_alignment.per_frame_likelihoods is None:
+                align_logger.warning(f"No per-frame likelihoods for {utt_id}, skipping")
+            else:
+                likes_writer.Write(utt_id, best_alignment.per_frame_likelihoods)
+            self.callback((utt_id, best_alignment.likelihood))
+        ali_writer.Close()
+        words_writer.Close()
+        likes_writer.Close()
 
     def _run(self) -> None:
         """Run the function"""
@@ -596,11 +731,15 @@ class AlignFunction(KaldiFunction):
                     Phone.phone_type == PhoneType.silence, Phone.phone != "<eps>"
                 )
             ]
-            aligner = GmmAligner(
-                self.model_path,
-                **align_options,
+            aligner = copy.copy(
+                load_cached_model(
+                    self.model_path,
+                    _load_aligner,
+                    boost_silence,
+                    tuple(silence_phones),
+                    tuple(sorted(align_options.items())),
+                )
             )
-            aligner.boost_silence(boost_silence, silence_phones)
             for d in job.training_dictionaries:
                 align_logger.debug(f"Aligning for dictionary {d.name} ({d.id})")
                 align_logger.debug(f"Aligning with model: {aligner.acoustic_model_path}")
@@ -636,14 +775,25 @@ class AlignFunction(KaldiFunction):
                     likes_path = job.construct_path(
                         self.working_directory, "likelihoods_first_pass", "ark", dict_id
                     )
-                aligner.export_alignments(
-                    ali_path,
-                    training_graph_archive,
-                    feature_archive,
-                    word_file_name=words_path,
-                    likelihood_file_name=likes_path,
-                    callback=self.callback,
-                )
+                if self.beam_scheduler is not None:
+                    self._align_adaptive(
+                        aligner,
+                        training_graph_archive,
+                        feature_archive,
+                        ali_path,
+                        words_path,
+                        likes_path,
+                        align_logger,
+                    )
+                else:
+                    aligner.export_alignments(
+                        ali_path,
+                        training_graph_archive,
+                        feature_archive,
+                        word_file_name=words_path,
+                        likelihood_file_name=likes_path,
+                        callback=self.callback,
+                    )
                 if aligner.acoustic_model_path.endswith(".alimdl"):
                     try:
                         job.construct_path(
@@ -670,6 +820,9 @@ class AlignFunction(KaldiFunction):
                                 self.working_directory, "likelihoods", "ark", dict_id
                             ),
                         )
+            if self.beam_scheduler is not None:
+                align_logger.debug(f"Beam distribution: {self.beam_scheduler.distribution}")
+                self.callback(self.beam_scheduler)
 
 
 class AnalyzeAlignmentsFunction(KaldiFunction):
@@ -1092,7 +1245,7 @@ class PhoneConfidenceFunction(KaldiFunction):
             phone_total = sum(pdf_counts.values())
             for pdf, count in pdf_counts.items():
                 phone_pdf_mapping[phone][int(pdf)] = count / phone_total
-        _, acoustic_model = read_gmm_model(self.model_path)
+        _, acoustic_model = load_cached_model(self.model_path, read_gmm_model)
         with self.session() as session:
             job: typing.Optional[Job] = session.get(
                 Job, self.job_name, options=[joinedload(Job.dictionaries), joinedload(Job.corpus)]
@@ -1277,6 +1430,9 @@ class AlignmentExtractionFunction(KaldiFunction):
     """
     Multiprocessing function to collect phone alignments from the aligned lattice
 
+    Results are tuples of the utterance id, dictionary id and a
+    :class:`~montreal_forced_aligner.data.CompactCtm` of the utterance's intervals
+
     See Also
     --------
     :meth:`.CorpusAligner.collect_alignments`
@@ -1302,6 +1458,8 @@ class AlignmentExtractionFunction(KaldiFunction):
         Arguments for the function
     """
 
+    read_only = True
+
     def __init__(self, args: AlignmentExtractionArguments):
         super().__init__(args)
         self.lexicon_compilers = args.lexicon_compilers
@@ -1334,29 +1492,28 @@ class AlignmentExtractionFunction(KaldiFunction):
                 utterance_times = {}
                 utterance_texts = {}
                 if self.use_g2p:
-                    utts = (
-                        session.query(
-                            Utterance.id,
-                            Utterance.begin,
-                            Utterance.end,
-                            Utterance.normalized_character_text,
-                        )
-                        .join(Utterance.speaker)
-                        .filter(Utterance.job_id == self.job_name)
-                        .filter(Speaker.dictionary_id == d.id)
+                    utts = job_utterance_query(
+                        session,
+                        self.job_name,
+                        d.id,
+                        Utterance.id,
+                        Utterance.begin,
+                        Utterance.end,
+                        Utterance.normalized_character_text,
                     )
                     for u_id, begin, end, text in utts:
                         utterance_times[u_id] = (begin, end)
                         utterance_texts[u_id] = text
 
                 else:
-                    utts = (
-                        session.query(
-                            Utterance.id, Utterance.begin, Utterance.end, Utterance.normalized_text
-                        )
-                        .join(Utterance.speaker)
-                        .filter(Utterance.job_id == self.job_name)
-                        .filter(Speaker.dictionary_id == d.id)
+                    utts = job_utterance_query(
+                        session,
+                        self.job_name,
+                        d.id,
+                        Utterance.id,
+                        Utterance.begin,
+                        Utterance.end,
+                        Utterance.normalized_text,
                     )
                     for u_id, begin, end, text in utts:
                         utterance_times[u_id] = (begin, end)
@@ -1417,7 +1574,7 @@ class AlignmentExtractionFunction(KaldiFunction):
                                 traceback_lines,
                                 self.log_path,
                             )
-                        self.callback((utterance_id, d.id, ctm))
+                        self.callback((utterance_id, d.id, CompactCtm.from_ctm(ctm)))
                 else:
                     ali_path = job.construct_path(workflow.working_directory, "ali", "ark", d.id)
                     if not ali_path.exists():
@@ -1452,7 +1609,7 @@ class AlignmentExtractionFunction(KaldiFunction):
                                     text.split(), ctm.word_intervals, lexicon_compiler
                                 )
                             extraction_logger.debug(f"Processed {utterance}")
-                            self.callback((utterance, d.id, ctm))
+                            self.callback((utterance, d.id, CompactCtm.from_ctm(ctm)))
                         except Exception:
                             exc_type, exc_value, exc_traceback = sys.exc_info()
                             utterance, sound_file_path, text_file_path = (
@@ -1553,7 +1710,7 @@ class AlignmentExtractionFunction(KaldiFunction):
                                         traceback_lines,
                                         self.log_path,
                                     )
-                                self.callback((utterance, d.id, ctm))
+                                self.callback((utterance, d.id, CompactCtm.from_ctm(ctm)))
                                 extraction_logger.debug(f"Processed {utt_id}")
                             except (KeyError, RuntimeError):
                                 extraction_logger.debug(f"Did not find {utt_id}")
@@ -1564,6 +1721,47 @@ class AlignmentExtractionFunction(KaldiFunction):
             extraction_logger.debug("Finished extraction")
 
 
+class AlignAndExtractFunction(KaldiFunction):
+    """
+    Multiprocessing function that aligns a job and then immediately extracts its alignments,
+    so that extraction and database loading of finished jobs overlap with alignment of the others
+
+    Results are tuples of the stage index and the result from the stage's function, with 0 for
+    :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignFunction` and 1 for
+    :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignmentExtractionFunction`
+
+    See Also
+    --------
+    :meth:`.AlignMixin.align_utterances`
+        Main function that calls this function in parallel
+
+    Parameters
+    ----------
+    args: :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignAndExtractArguments`
+        Arguments for the function
+    """
+
+    def __init__(self, args: AlignAndExtractArguments):
+        super().__init__(args)
+        self.align_arguments = args.align_arguments
+        self.extraction_arguments = args.extraction_arguments
+
+    def _run(self) -> None:
+        """Run the function"""
+        for stage, (function_class, arguments) in enumerate(
+            [
+                (AlignFunction, self.align_arguments),
+                (AlignmentExtractionFunction, self.extraction_arguments),
+            ]
+        ):
+            function = function_class(arguments)
+            function.callback = functools.partial(self._stage_callback, stage)
+            function._run()
+
+    def _stage_callback(self, stage: int, result: typing.Any) -> None:
+        self.callback((stage, result))
+
+
 class ExportTextGridProcessWorker(mp.Process):
     """
     Multiprocessing worker for exporting TextGrids
@@ -1587,6 +1785,9 @@ class ExportTextGridProcessWorker(mp.Process):
         Arguments to pass to the TextGrid export function
     exported_file_count: :class:`~montreal_forced_aligner.utils.Counter`
         Counter for exported files
+    interval_store_directory: :class:`~pathlib.Path`, optional
+        Directory of an :class:`~montreal_forced_aligner.interval_store.IntervalStore` to read
+        intervals from instead of the database
     """
 
     def __init__(
@@ -1602,6 +1803,7 @@ class ExportTextGridProcessWorker(mp.Process):
         output_directory: Path,
         output_format: str,
         include_original_text: bool,
+        interval_store_directory: typing.Optional[Path] = None,
     ):
         super().__init__()
         self.db_string = db_string
@@ -1617,10 +1819,14 @@ class ExportTextGridProcessWorker(mp.Process):
         self.include_original_text = include_original_text
         self.cleanup_textgrids = cleanup_textgrids
         self.clitic_marker = clitic_marker
+        self.interval_store_directory = interval_store_directory
 
     def run(self) -> None:
         """Run the exporter function"""
-        db_engine = sqlalchemy.create_engine(self.db_string)
+        interval_store = None
+        if self.interval_store_directory is not None:
+            interval_store = IntervalStore(self.interval_store_directory)
+        db_engine = get_process_engine(self.db_string, read_only=True)
         with sqlalchemy.orm.Session(db_engine) as session:
             workflow: CorpusWorkflow = (
                 session.query(CorpusWorkflow)
@@ -1649,6 +1855,7 @@ class ExportTextGridProcessWorker(mp.Process):
                         self.export_frame_shift,
                         self.output_format,
                         self.include_original_text,
+                        interval_store,
                     ):
                         self.return_queue.put(1)
                 except Exception:
@@ -8,10 +8,11 @@ import shutil
 import time
 import typing
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from _kalpy.matrix import DoubleMatrix, FloatMatrix
 from kalpy.data import Segment
+from kalpy.gmm.data import HierarchicalCtm
 from kalpy.utils import read_kaldi_object
 from kalpy.utterance import Utterance as KalpyUtterance
 from sqlalchemy.orm import Session
@@ -38,8 +39,9 @@ from montreal_forced_aligner.helper import (
 from montreal_forced_aligner.models import AcousticModel
 from montreal_forced_aligner.online.alignment import (
     align_utterance_online,
-    update_utterance_intervals,
+    bulk_update_utterance_intervals,
 )
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.transcription.transcriber import TranscriberMixin
 from montreal_forced_aligner.utils import log_kaldi_errors, run_kaldi_function
 
@@ -283,7 +285,19 @@ class PretrainedAligner(TranscriberMixin, TopLevelMfaWorker):
         session: :class:`~sqlalchemy.orm.session.Session`
             Session to use
         """
-        dictionary_id = utterance.speaker.dictionary_id
+        self.align_online_utterances([utterance], session)
+
+    def align_online_utterances(self, utterances: List[Utterance], session: Session) -> None:
+        """
+        Align utterances one after the other and update all of their intervals at once
+
+        Parameters
+        ----------
+        utterances: list[:class:`~montreal_forced_aligner.db.Utterance`]
+            Utterance objects to align
+        session: :class:`~sqlalchemy.orm.session.Session`
+            Session to use
+        """
         workflow = self.get_latest_workflow_run(WorkflowType.online_alignment, session)
         if workflow is None:
             workflow = CorpusWorkflow(
@@ -294,6 +308,26 @@ class PretrainedAligner(TranscriberMixin, TopLevelMfaWorker):
             )
             session.add(workflow)
             session.flush()
+        utterance_ctms = []
+        for utterance in utterances:
+            utterance_ctms.append((utterance, self.align_utterance_ctm(utterance)))
+        bulk_update_utterance_intervals(session, workflow.id, utterance_ctms)
+
+    def align_utterance_ctm(self, utterance: Utterance) -> HierarchicalCtm:
+        """
+        Align an utterance without saving its intervals
+
+        Parameters
+        ----------
+        utterance: :class:`~montreal_forced_aligner.db.Utterance`
+            Utterance object to align
+
+        Returns
+        -------
+        :class:`~kalpy.gmm.data.HierarchicalCtm`
+            Word and phone alignment of the utterance
+        """
+        dictionary_id = utterance.speaker.dictionary_id
         segment = Segment(
             str(utterance.file.sound_file.sound_file_path),
             utterance.begin,
@@ -313,15 +347,16 @@ class PretrainedAligner(TranscriberMixin, TopLevelMfaWorker):
         if self.use_g2p:
             text = utterance.normalized_character_text
         utterance_data = KalpyUtterance(segment, text, cmvn_string, fmllr_string)
-        ctm = align_utterance_online(
+        return align_utterance_online(
             self.acoustic_model,
             utterance_data,
             self.lexicon_compilers[dictionary_id],
             cmvn=cmvn,
             fmllr_trans=fmllr_trans,
+            beam_scheduler=self.beam_scheduler,
+            speaker=utterance.speaker_id,
             **self.align_options,
         )
-        update_utterance_intervals(session, utterance, workflow.id, ctm)
 
     def verify_transcripts(self, workflow_name=None) -> None:
         self.initialize_database()
@@ -351,6 +386,7 @@ class PretrainedAligner(TranscriberMixin, TopLevelMfaWorker):
             bulk_update(session, Utterance, update_mappings)
             session.commit()
 
+    @record_stage()
     def align(self, workflow_name=None) -> None:
         """Run the aligner"""
         self.initialize_database()
@@ -119,7 +119,8 @@ def align_corpus_cli(context, **kwargs) -> None:
     )
     try:
         aligner.align()
-        aligner.analyze_alignments()
+        if not config.EXPORT_FROM_ARCHIVES:
+            aligner.analyze_alignments()
         if aligner.use_phone_model:
             aligner.export_files(
                 output_directory,
@@ -133,6 +134,8 @@ def align_corpus_cli(context, **kwargs) -> None:
                 include_original_text=include_original_text,
             )
         if reference_directory:
+            # Evaluation reads the alignments from the database
+            aligner.collect_alignments()
             aligner.load_reference_alignments(reference_directory)
             mapping = None
             if custom_mapping_path:
@@ -1,6 +1,7 @@
 """Command line functions for aligning single files"""
 from __future__ import annotations
 
+import logging
 from pathlib import Path
 
 import pywrapfst
@@ -19,11 +20,13 @@ from montreal_forced_aligner.command_line.utils import (
     validate_g2p_model,
 )
 from montreal_forced_aligner.corpus.classes import FileData
+from montreal_forced_aligner.corpus.features import FeatureCache
 from montreal_forced_aligner.data import (
     BRACKETED_WORD,
     CUTOFF_WORD,
     LAUGHTER_WORD,
     OOV_WORD,
+    BeamScheduler,
     Language,
 )
 from montreal_forced_aligner.dictionary.mixins import (
@@ -34,12 +37,18 @@ from montreal_forced_aligner.dictionary.mixins import (
     DEFAULT_WORD_BREAK_MARKERS,
 )
 from montreal_forced_aligner.models import AcousticModel, G2PModel
-from montreal_forced_aligner.online.alignment import align_utterance_online
+from montreal_forced_aligner.online.alignment import (
+    OovPronunciationCache,
+    align_utterance_online,
+    set_oov_cache,
+)
 from montreal_forced_aligner.tokenization.simple import SimpleTokenizer
 from montreal_forced_aligner.tokenization.spacy import generate_language_tokenizer
 
 __all__ = ["align_one_cli"]
 
+logger = logging.getLogger("mfa")
+
 
 @click.command(
     name="align_one",
@@ -79,6 +88,12 @@ __all__ = ["align_one_cli"]
     help="Path to G2P model to use for OOV items.",
     type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=Path),
 )
+@click.option(
+    "--use_feature_cache/--no_use_feature_cache",
+    "use_feature_cache",
+    help="Reuse MFCCs cached in the temporary directory from previous runs on the same audio.",
+    default=True,
+)
 @common_options
 @click.help_option("-h", "--help")
 @click.pass_context
@@ -99,6 +114,7 @@ def align_one_cli(context, **kwargs) -> None:
         output_path = output_path.joinpath(sound_file_path.stem + ".TextGrid")
     output_format = kwargs["output_format"]
     g2p_model_path = kwargs.get("g2p_model_path", None)
+    use_feature_cache = kwargs.get("use_feature_cache", True)
 
     acoustic_model = AcousticModel(acoustic_model_path)
     g2p_model = None
@@ -137,6 +153,19 @@ def align_one_cli(context, **kwargs) -> None:
         lexicon_compiler.word_table.write_text(words_path)
         lexicon_compiler.phone_table.write_text(phones_path)
         lexicon_compiler.clear()
+    oov_cache = None
+    if g2p_model is not None:
+        oov_cache = OovPronunciationCache(
+            cache_path=config.TEMPORARY_DIRECTORY.joinpath("g2p_cache", "oov_pronunciations.json")
+        )
+
+        def reset_lexicon(lc: LexiconCompiler) -> None:
+            lc.load_l_from_file(l_fst_path)
+            lc.load_l_align_from_file(l_align_fst_path)
+            lc.word_table = pywrapfst.SymbolTable.read_text(words_path)
+
+        oov_cache.register_lexicon(lexicon_compiler, reset_lexicon)
+        set_oov_cache(oov_cache)
 
     if acoustic_model.language is Language.unknown:
         tokenizer = SimpleTokenizer(
@@ -161,9 +190,16 @@ def align_one_cli(context, **kwargs) -> None:
     cmvn_computer = CmvnComputer()
     for utterance in file.utterances:
         seg = Segment(sound_file_path, utterance.begin, utterance.end, utterance.channel)
-        utt = KalpyUtterance(seg, utterance.text)
-        utt.generate_mfccs(acoustic_model.mfcc_computer)
-        utterances.append(utt)
+        utterances.append(KalpyUtterance(seg, utterance.text))
+    feature_cache = FeatureCache(
+        config.TEMPORARY_DIRECTORY.joinpath("feature_cache"),
+        acoustic_model.mfcc_computer,
+        acoustic_model.pitch_computer,
+    )
+    num_cached = feature_cache.generate_mfccs(
+        utterances, use_cache=use_feature_cache and not config.CLEAN
+    )
+    logger.debug(f"Loaded features for {num_cached}/{len(utterances)} utterances from cache")
 
     cmvn = cmvn_computer.compute_cmvn_from_features([utt.mfccs for utt in utterances])
     align_options = {
@@ -179,6 +215,13 @@ def align_one_cli(context, **kwargs) -> None:
             "boost_silence",
         ]
     }
+    beam_scheduler = None
+    if c.get("adaptive_beam", False):
+        beam_scheduler = BeamScheduler(
+            c.get("beam", 10),
+            c.get("retry_beam", 40),
+            likelihood_threshold=c.get("beam_likelihood_threshold", None),
+        )
     for utt in utterances:
         utt.apply_cmvn(cmvn)
         ctm = align_utterance_online(
@@ -187,9 +230,16 @@ def align_one_cli(context, **kwargs) -> None:
             lexicon_compiler,
             tokenizer=tokenizer,
             g2p_model=g2p_model,
+            beam_scheduler=beam_scheduler,
+            speaker=file_name,
             **align_options,
         )
         file_ctm.word_intervals.extend(ctm.word_intervals)
+    if beam_scheduler is not None:
+        logger.debug(f"Beam distribution: {beam_scheduler.distribution}")
+    if oov_cache is not None:
+        logger.debug(f"OOV pronunciation cache: {oov_cache.hits} hits, {oov_cache.misses} misses")
+        oov_cache.save()
     if str(output_path) != "-":
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
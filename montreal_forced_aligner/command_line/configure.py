@@ -105,6 +105,15 @@ __all__ = ["configure_cli"]
     f"Currently defaults to {config.USE_POSTGRES}.",
     default=None,
 )
+@click.option(
+    "--database_tuning_profile",
+    help="Tuning profile for the PostgreSQL server, bulk_load turns off fsync, full page writes "
+    "and synchronous commits, uses minimal write-ahead logging and unlogged interval tables, "
+    "so that a server crash loses the run's database. "
+    f"Currently defaults to {config.DATABASE_TUNING_PROFILE}.",
+    type=click.Choice(["interactive", "bulk_load"]),
+    default=None,
+)
 @click.option(
     "--blas_num_threads",
     help="Number of threads to use for BLAS libraries, 1 is recommended "
@@ -125,6 +134,19 @@ __all__ = ["configure_cli"]
     help="Bytes limit for Joblib Memory caching on disk.",
     type=int,
 )
+@click.option(
+    "--result_batch_size",
+    default=None,
+    help="Maximum number of results that worker processes send to the main process at once.",
+    type=int,
+)
+@click.option(
+    "--result_queue_bytes_limit",
+    default=None,
+    help="Bytes limit for results waiting to be processed by the main process, "
+    "worker processes pause when it is reached.",
+    type=int,
+)
 @click.option(
     "--seed",
     default=None,
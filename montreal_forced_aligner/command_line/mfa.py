@@ -34,6 +34,7 @@ from montreal_forced_aligner.command_line.train_lm import train_lm_cli
 from montreal_forced_aligner.command_line.train_tokenizer import train_tokenizer_cli
 from montreal_forced_aligner.command_line.transcribe import (
     transcribe_corpus_cli,
+    transcribe_server_cli,
     transcribe_speechbrain_cli,
     transcribe_whisper_cli,
 )
@@ -41,6 +42,7 @@ from montreal_forced_aligner.command_line.validate import (
     validate_corpus_cli,
     validate_dictionary_cli,
 )
+from montreal_forced_aligner.command_line.worker_node import worker_node_cli
 from montreal_forced_aligner.utils import check_third_party
 
 BEGIN = time.time()
@@ -133,6 +135,8 @@ def mfa_cli(ctx: click.Context) -> None:
         "history",
         "server",
         "align_one",
+        "transcribe_server",
+        "worker_node",
     ]:
         auto_server = False
         run_check = False
@@ -198,11 +202,13 @@ mfa_cli.add_command(train_ivector_cli)
 mfa_cli.add_command(train_lm_cli)
 mfa_cli.add_command(train_tokenizer_cli)
 mfa_cli.add_command(transcribe_corpus_cli)
+mfa_cli.add_command(transcribe_server_cli)
 mfa_cli.add_command(transcribe_speechbrain_cli)
 mfa_cli.add_command(transcribe_whisper_cli)
 mfa_cli.add_command(validate_corpus_cli)
 mfa_cli.add_command(validate_dictionary_cli)
 mfa_cli.add_command(version_cli)
+mfa_cli.add_command(worker_node_cli)
 
 if __name__ == "__main__":
     mfa_cli()
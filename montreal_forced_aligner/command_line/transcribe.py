@@ -1,11 +1,13 @@
 """Command line functions for transcribing corpora"""
 from __future__ import annotations
 
+import logging
 import sys
 from pathlib import Path
 
 import rich_click as click
 from kalpy.data import Segment
+from kalpy.decoder.decode_graph import DecodeGraphCompiler
 
 from montreal_forced_aligner import config
 from montreal_forced_aligner.command_line.utils import (
@@ -15,6 +17,8 @@ from montreal_forced_aligner.command_line.utils import (
     validate_language_model,
 )
 from montreal_forced_aligner.data import Language
+from montreal_forced_aligner.models import AcousticModel, LanguageModel
+from montreal_forced_aligner.online.server import TranscriptionServer, TranscriptionWorker
 from montreal_forced_aligner.online.transcription import transcribe_utterance_online_whisper
 from montreal_forced_aligner.transcription.transcriber import (
     SpeechbrainTranscriber,
@@ -23,7 +27,14 @@ from montreal_forced_aligner.transcription.transcriber import (
 )
 from montreal_forced_aligner.utils import mfa_open
 
-__all__ = ["transcribe_corpus_cli", "transcribe_speechbrain_cli", "transcribe_whisper_cli"]
+__all__ = [
+    "transcribe_corpus_cli",
+    "transcribe_speechbrain_cli",
+    "transcribe_whisper_cli",
+    "transcribe_server_cli",
+]
+
+logger = logging.getLogger("mfa")
 
 
 @click.command(
@@ -366,3 +377,95 @@ def transcribe_whisper_cli(context, **kwargs) -> None:
         raise
     finally:
         transcriber.cleanup()
+
+
+@click.command(
+    name="transcribe_server",
+    context_settings=dict(
+        ignore_unknown_options=True,
+        allow_extra_args=True,
+        allow_interspersed_args=True,
+    ),
+    short_help="Serve low-latency transcription requests",
+)
+@click.argument("dictionary_path", type=click.UNPROCESSED, callback=validate_dictionary)
+@click.argument("acoustic_model_path", type=click.UNPROCESSED, callback=validate_acoustic_model)
+@click.argument("language_model_path", type=click.UNPROCESSED, callback=validate_language_model)
+@click.option(
+    "--config_path",
+    "-c",
+    help="Path to config file to use for transcription.",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--host",
+    help="Host to listen on, defaults to 127.0.0.1.",
+    type=str,
+    default="127.0.0.1",
+)
+@click.option(
+    "--port",
+    help="Port to listen on, defaults to 8765.",
+    type=int,
+    default=8765,
+)
+@common_options
+@click.help_option("-h", "--help")
+@click.pass_context
+def transcribe_server_cli(context, **kwargs) -> None:
+    """
+    Keep an acoustic model and decoding graph loaded and transcribe sound files sent over a
+    local socket.
+
+    Requests are newline-delimited JSON objects with a "path" to a sound file and optional
+    "begin", "end" and "channel" keys, and each response is a JSON line with the transcribed
+    text, likelihood and word intervals.
+    """
+    if kwargs.get("profile", None) is not None:
+        config.profile = kwargs.pop("profile")
+    config.update_configuration(kwargs)
+    config_path = kwargs.get("config_path", None)
+    dictionary_path: Path = kwargs["dictionary_path"]
+    acoustic_model = AcousticModel(kwargs["acoustic_model_path"])
+    language_model = LanguageModel(kwargs["language_model_path"])
+    c = Transcriber.parse_parameters(config_path, context.params, context.args)
+
+    lexicon_compiler = acoustic_model.lexicon_compiler
+    lexicon_compiler.disambiguation = True
+    lexicon_compiler.load_pronunciations(dictionary_path)
+    graph_directory = config.TEMPORARY_DIRECTORY.joinpath(
+        "transcribe_server", f"{dictionary_path.stem}_{language_model.name}"
+    )
+    graph_directory.mkdir(parents=True, exist_ok=True)
+    hclg_path = graph_directory.joinpath("HCLG.fst")
+    if config.CLEAN or not hclg_path.exists():
+        logger.info("Generating HCLG.fst...")
+        compiler = DecodeGraphCompiler(
+            acoustic_model.model_path,
+            acoustic_model.tree_path,
+            lexicon_compiler,
+            self_loop_scale=c.get("self_loop_scale", 0.1),
+            transition_scale=c.get("transition_scale", 1.0),
+        )
+        compiler.export_hclg(language_model.small_arpa_path, hclg_path)
+        del compiler
+    decode_options = {
+        k: v
+        for k, v in c.items()
+        if k in ["beam", "lattice_beam", "max_active", "acoustic_scale", "boost_silence"]
+    }
+    worker = TranscriptionWorker(
+        acoustic_model=acoustic_model,
+        lexicon_compiler=lexicon_compiler,
+        hclg_path=hclg_path,
+        **decode_options,
+    )
+    server = TranscriptionServer(worker, kwargs["host"], kwargs["port"])
+    host, port = server.address
+    logger.info(f"Listening for transcription requests on {host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -2,18 +2,23 @@
 from __future__ import annotations
 
 import functools
+import hashlib
+import json
 import logging
 import os
 import re
 import shutil
 import subprocess
 import sys
+import time
 import typing
 from pathlib import Path
 
 import rich_click as click
 import sqlalchemy
 import yaml
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from montreal_forced_aligner import config
 from montreal_forced_aligner.exceptions import (
@@ -23,7 +28,7 @@ from montreal_forced_aligner.exceptions import (
     ModelTypeNotSupportedError,
     PretrainedModelNotFoundError,
 )
-from montreal_forced_aligner.helper import mfa_open
+from montreal_forced_aligner.helper import comma_join, mfa_open
 from montreal_forced_aligner.models import MODEL_TYPES
 
 __all__ = [
@@ -35,8 +40,40 @@ __all__ = [
     "validate_dictionary",
     "check_databases",
     "common_options",
+    "PG_TUNING_PROFILES",
+    "PG_UNLOGGED_TABLES",
+    "server_engine",
+    "apply_tuning_profile",
+    "tuning_profile_changes",
+    "template_database_name",
+    "create_database",
+    "drop_database",
+    "configure_database_tables",
+    "restart_server",
 ]
 
+PG_TUNING_PROFILES = {
+    "interactive": {},
+    "bulk_load": {
+        "fsync": "off",
+        "synchronous_commit": "off",
+        "full_page_writes": "off",
+        "wal_level": "minimal",
+        "max_wal_senders": "0",
+        "maintenance_work_mem": "2GB",
+        "max_wal_size": "8GB",
+        "checkpoint_timeout": "30min",
+    },
+}
+
+PG_UNLOGGED_TABLES = {
+    "interactive": [],
+    "bulk_load": ["phone_interval", "word_interval"],
+}
+
+TEMPLATE_DATABASE_PREFIX = "mfa_template_"
+TEMPLATE_LOCK_KEY = 7270110
+
 
 def common_options(f: typing.Callable) -> typing.Callable:
     """
@@ -131,6 +168,63 @@ def common_options(f: typing.Callable) -> typing.Callable:
             "This mode also disables speaker adaptation equivalent to `--uses_speaker_adaptation false`.",
             default=False,
         ),
+        click.option(
+            "--use_job_cost_model/--no_use_job_cost_model",
+            "use_job_cost_model",
+            help="Balance jobs using a cost model learned from the timings of previous runs, "
+            "rather than by audio duration alone, "
+            f"default is {config.USE_JOB_COST_MODEL}",
+            default=None,
+        ),
+        click.option(
+            "--chunks_per_job",
+            "chunks_per_job",
+            help="Split the corpus into this many chunks per job, which are handed to processes as they become idle, "
+            f"defaults to {config.CHUNKS_PER_JOB}",
+            type=int,
+            default=None,
+        ),
+        click.option(
+            "--use_worker_pool/--no_use_worker_pool",
+            "use_worker_pool",
+            help="Keep worker processes running between stages and reuse them for each multiprocessing step, "
+            f"default is {config.USE_WORKER_POOL}",
+            default=None,
+        ),
+        click.option(
+            "--use_cpu_affinity/--no_use_cpu_affinity",
+            "use_cpu_affinity",
+            help="Pin each worker process to its own CPUs, spread across NUMA nodes, "
+            f"default is {config.USE_CPU_AFFINITY}",
+            default=None,
+        ),
+        click.option(
+            "--use_interval_store/--no_use_interval_store",
+            "use_interval_store",
+            help="Write word and phone alignments to per-job Parquet files instead of the "
+            "database, the database tables are only filled if a later step needs them, "
+            "requires pyarrow, "
+            f"default is {config.USE_INTERVAL_STORE}",
+            default=None,
+        ),
+        click.option(
+            "--export_from_archives/--no_export_from_archives",
+            "export_from_archives",
+            help="Export alignments straight from the alignment archives without loading them "
+            "into the database, which is only filled if a later step such as evaluation needs "
+            "the intervals, and skip alignment analysis, "
+            f"default is {config.EXPORT_FROM_ARCHIVES}",
+            default=None,
+        ),
+        click.option(
+            "--worker_nodes",
+            "worker_nodes",
+            help="Comma-separated host:port addresses of nodes started with `mfa worker_node` "
+            "to run multiprocessing jobs on, which need the same paths through a shared "
+            "filesystem and the MFA_WORKER_AUTHKEY environment variable set to the nodes' key",
+            type=str,
+            default=None,
+        ),
         click.option(
             "--textgrid_cleanup/--no_textgrid_cleanup",
             "--cleanup_textgrids/--no_cleanup_textgrids",
@@ -293,19 +387,320 @@ def configure_pg(directory):
         f.write(c)
 
 
+def server_engine(db_name: str = "postgres") -> sqlalchemy.engine.Engine:
+    """
+    Construct an autocommit engine for a database on the MFA server for the current profile
+
+    Parameters
+    ----------
+    db_name: str, optional
+        Database to connect to, defaults to the "postgres" maintenance database
+
+    Returns
+    -------
+    :class:`~sqlalchemy.engine.Engine`
+        Engine without connection pooling
+    """
+    return sqlalchemy.create_engine(
+        f"postgresql+psycopg2://@/{db_name}?host={config.database_socket()}",
+        poolclass=sqlalchemy.NullPool,
+        pool_reset_on_return=None,
+        logging_name="server_engine",
+        isolation_level="AUTOCOMMIT",
+    ).execution_options(logging_token="server_engine")
+
+
+def tuning_state_path() -> Path:
+    """
+    Path to the record of the settings MFA last applied to the server for the current profile
+
+    Returns
+    -------
+    :class:`~pathlib.Path`
+        Path to a JSON file
+    """
+    return config.get_temporary_directory().joinpath(
+        f"pg_tuning_{config.CURRENT_PROFILE_NAME}.json"
+    )
+
+
+def tuning_profile_changes(
+    settings: typing.Dict[str, str],
+    current: typing.Dict[str, str],
+    managed: typing.Dict[str, str],
+) -> typing.Tuple[typing.Dict[str, str], typing.List[str]]:
+    """
+    Work out which server settings to change for a tuning profile
+
+    Parameters
+    ----------
+    settings: dict[str, str]
+        Settings of the tuning profile
+    current: dict[str, str]
+        Settings currently in ``postgresql.auto.conf``
+    managed: dict[str, str]
+        Settings that MFA last applied
+
+    Returns
+    -------
+    dict[str, str]
+        Settings to set
+    list[str]
+        Settings to reset, which MFA applied before, that are not in the profile and that
+        still have the value MFA gave them
+    """
+    to_set = {k: v for k, v in settings.items() if current.get(k) != v}
+    to_reset = sorted(
+        k for k, v in managed.items() if k not in settings and k in current and current[k] == v
+    )
+    return to_set, to_reset
+
+
+def apply_tuning_profile(profile: str = None, restart: bool = False) -> typing.List[str]:
+    """
+    Apply a named tuning profile to the running MFA server for the current profile through
+    ``ALTER SYSTEM``, resetting settings that MFA set for a previous profile back to the values
+    in ``postgresql.conf``
+
+    Only settings whose values differ are changed, and the configuration is not reloaded when
+    nothing changes.  Settings that were changed outside of MFA since it last set them are
+    left alone, see :func:`tuning_profile_changes`.
+
+    Parameters
+    ----------
+    profile: str, optional
+        Name of a profile in :data:`PG_TUNING_PROFILES`, defaults to
+        :code:`config.DATABASE_TUNING_PROFILE`
+    restart: bool
+        Flag for restarting the server when a setting can only change at server start,
+        otherwise those settings take effect the next time the server starts
+
+    Returns
+    -------
+    list[str]
+        Settings that are waiting on a server restart
+    """
+    logger = logging.getLogger("mfa")
+    if profile is None:
+        profile = config.DATABASE_TUNING_PROFILE
+    if profile not in PG_TUNING_PROFILES:
+        raise DatabaseError(
+            f"Unknown database tuning profile {profile}, "
+            f"must be one of {', '.join(PG_TUNING_PROFILES)}"
+        )
+    settings = PG_TUNING_PROFILES[profile]
+    state_path = tuning_state_path()
+    managed = {}
+    if state_path.exists():
+        with mfa_open(state_path, "r") as f:
+            managed = json.load(f)
+    engine = server_engine()
+    with engine.connect() as conn:
+        current = dict(
+            conn.execute(
+                sqlalchemy.text(
+                    "SELECT name, setting FROM pg_file_settings "
+                    "WHERE sourcefile LIKE '%postgresql.auto.conf' AND error IS NULL"
+                )
+            ).all()
+        )
+        to_set, to_reset = tuning_profile_changes(settings, current, managed)
+        load_time = conn.execute(sqlalchemy.text("SELECT pg_conf_load_time()")).scalar()
+        for name, value in to_set.items():
+            conn.execute(sqlalchemy.text(f"ALTER SYSTEM SET {name} = '{value}'"))
+        for name in to_reset:
+            conn.execute(sqlalchemy.text(f"ALTER SYSTEM RESET {name}"))
+        if to_set or to_reset:
+            conn.execute(sqlalchemy.text("SELECT pg_reload_conf()"))
+    if managed != settings:
+        with mfa_open(state_path, "w") as f:
+            json.dump(settings, f)
+    setting_names = set(settings) | set(to_reset)
+    pending_query = sqlalchemy.text(
+        "SELECT name FROM pg_settings WHERE pending_restart ORDER BY name"
+    )
+    # The server reloads its configuration asynchronously, and new connections pick it up
+    begin = time.time()
+    while True:
+        with engine.connect() as conn:
+            if not (to_set or to_reset) or (
+                conn.execute(sqlalchemy.text("SELECT pg_conf_load_time()")).scalar() > load_time
+            ):
+                pending = [x for x in conn.execute(pending_query).scalars() if x in setting_names]
+                break
+        if time.time() - begin > 10:
+            logger.warning("Timed out waiting for the database server to reload its settings.")
+            pending = []
+            break
+        time.sleep(0.05)
+    engine.dispose()
+    logger.debug(f"Applied the {profile} database tuning profile.")
+    if pending:
+        if restart:
+            restart_server()
+            pending = []
+        else:
+            logger.warning(
+                f"The {profile} database tuning profile will only change {comma_join(pending)} "
+                f"after the {config.CURRENT_PROFILE_NAME} MFA database server restarts."
+            )
+    return pending
+
+
+def template_database_name() -> str:
+    """
+    Name of the template database for the current database schema, which changes whenever
+    tables or indexes change so that outdated templates are never copied
+
+    Returns
+    -------
+    str
+        Template database name
+    """
+    from montreal_forced_aligner.db import MfaSqlBase
+
+    dialect = postgresql.dialect()
+    schema_hash = hashlib.sha1()
+    for table in MfaSqlBase.metadata.sorted_tables:
+        schema_hash.update(str(CreateTable(table).compile(dialect=dialect)).encode("utf8"))
+        for index in sorted(table.indexes, key=lambda x: x.name):
+            schema_hash.update(str(CreateIndex(index).compile(dialect=dialect)).encode("utf8"))
+    return f"{TEMPLATE_DATABASE_PREFIX}{schema_hash.hexdigest()[:12]}"
+
+
+def _create_template_database(conn: sqlalchemy.engine.Connection, template_name: str) -> None:
+    """
+    Build a template database with MFA's extensions and schema, replacing older templates
+
+    Parameters
+    ----------
+    conn: :class:`~sqlalchemy.engine.Connection`
+        Autocommit connection to the maintenance database
+    template_name: str
+        Name of the template database
+    """
+    from montreal_forced_aligner.db import MfaSqlBase
+
+    logger = logging.getLogger("mfa")
+    logger.debug(f"Creating template database {template_name}...")
+    old_templates = conn.execute(
+        sqlalchemy.text("SELECT datname FROM pg_database WHERE datname LIKE :prefix"),
+        {"prefix": f"{TEMPLATE_DATABASE_PREFIX}%"},
+    ).scalars()
+    for old_template in list(old_templates):
+        conn.execute(sqlalchemy.text(f'ALTER DATABASE "{old_template}" IS_TEMPLATE false'))
+        conn.execute(sqlalchemy.text(f'DROP DATABASE IF EXISTS "{old_template}" WITH (FORCE)'))
+    # Build under a temporary name so that an interrupted build is never used as a template
+    build_name = f"{template_name}_build"
+    conn.execute(sqlalchemy.text(f'CREATE DATABASE "{build_name}"'))
+    engine = server_engine(build_name)
+    with engine.connect() as build_conn:
+        build_conn.execute(sqlalchemy.text("CREATE EXTENSION IF NOT EXISTS vector"))
+        build_conn.execute(sqlalchemy.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        build_conn.execute(sqlalchemy.text("CREATE EXTENSION IF NOT EXISTS pg_stat_statements"))
+    MfaSqlBase.metadata.create_all(engine)
+    engine.dispose()
+    conn.execute(sqlalchemy.text(f'ALTER DATABASE "{build_name}" RENAME TO "{template_name}"'))
+    conn.execute(
+        sqlalchemy.text(
+            f'ALTER DATABASE "{template_name}" WITH IS_TEMPLATE true ALLOW_CONNECTIONS false'
+        )
+    )
+
+
+def create_database(db_name: str) -> None:
+    """
+    Create a database on the MFA server for the current profile as a copy of the template
+    database for the current schema, building the template first if it does not exist
+
+    Parameters
+    ----------
+    db_name: str
+        Name of the database to create
+    """
+    template_name = template_database_name()
+    engine = server_engine()
+    with engine.connect() as conn:
+        conn.execute(sqlalchemy.text("SELECT pg_advisory_lock(:key)"), {"key": TEMPLATE_LOCK_KEY})
+        try:
+            template_exists = conn.execute(
+                sqlalchemy.text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": template_name},
+            ).first()
+            if template_exists is None:
+                _create_template_database(conn, template_name)
+            conn.execute(
+                sqlalchemy.text(f'CREATE DATABASE "{db_name}" TEMPLATE "{template_name}"')
+            )
+        finally:
+            conn.execute(
+                sqlalchemy.text("SELECT pg_advisory_unlock(:key)"), {"key": TEMPLATE_LOCK_KEY}
+            )
+    engine.dispose()
+
+
+def drop_database(db_name: str) -> None:
+    """
+    Drop a database on the MFA server for the current profile, closing any open connections
+
+    Parameters
+    ----------
+    db_name: str
+        Name of the database to drop
+    """
+    engine = server_engine()
+    with engine.connect() as conn:
+        conn.execute(sqlalchemy.text(f'DROP DATABASE IF EXISTS "{db_name}" WITH (FORCE)'))
+    engine.dispose()
+
+
+def configure_database_tables(engine: sqlalchemy.engine.Engine, profile: str = None) -> None:
+    """
+    Switch tables between unlogged and logged storage for a database tuning profile,
+    unlogged tables skip the write-ahead log but are emptied if the server crashes
+
+    Parameters
+    ----------
+    engine: :class:`~sqlalchemy.engine.Engine`
+        PostgreSQL database engine
+    profile: str, optional
+        Name of a profile in :data:`PG_UNLOGGED_TABLES`, defaults to
+        :code:`config.DATABASE_TUNING_PROFILE`
+    """
+    if profile is None:
+        profile = config.DATABASE_TUNING_PROFILE
+    unlogged_tables = PG_UNLOGGED_TABLES.get(profile, [])
+    table_names = []
+    for tables in PG_UNLOGGED_TABLES.values():
+        table_names.extend(t for t in tables if t not in table_names)
+    with engine.connect() as conn:
+        persistence = dict(
+            conn.execute(
+                sqlalchemy.text(
+                    "SELECT relname, relpersistence FROM pg_class "
+                    "WHERE relkind = 'r' AND relname = ANY(:names)"
+                ),
+                {"names": table_names},
+            ).all()
+        )
+        # Tables referencing others come first, since logged tables cannot reference
+        # unlogged ones
+        for table in unlogged_tables:
+            if persistence.get(table, "u") != "u":
+                conn.execute(sqlalchemy.text(f"ALTER TABLE {table} SET UNLOGGED"))
+        for table in reversed(table_names):
+            if table not in unlogged_tables and persistence.get(table, "p") == "u":
+                conn.execute(sqlalchemy.text(f"ALTER TABLE {table} SET LOGGED"))
+        conn.commit()
+
+
 def check_databases(db_name: str) -> None:
     """Check for existence of necessary databases"""
     logger = logging.getLogger("mfa")
     logger.debug(f"Checking the {config.CURRENT_PROFILE_NAME} MFA database server...")
 
     try:
-        engine = sqlalchemy.create_engine(
-            f"postgresql+psycopg2://@/{db_name}?host={config.database_socket()}",
-            poolclass=sqlalchemy.NullPool,
-            pool_reset_on_return=None,
-            logging_name="check_databases_engine",
-            isolation_level="AUTOCOMMIT",
-        ).execution_options(logging_token="check_databases_engine")
+        engine = server_engine(db_name)
         with engine.connect():
             pass
         logger.debug(f"Connected to {config.CURRENT_PROFILE_NAME} MFA database server!")
@@ -417,10 +812,13 @@ def start_server() -> None:
     logger = logging.getLogger("mfa")
     try:
         check_server()
+        running = True
+    except Exception:
+        running = False
+    if running:
         logger.info(f"{config.CURRENT_PROFILE_NAME} MFA database server already running.")
+        apply_tuning_profile()
         return
-    except Exception:
-        pass
 
     db_directory = config.get_temporary_directory().joinpath(
         f"pg_mfa_{config.CURRENT_PROFILE_NAME}"
@@ -455,6 +853,31 @@ def start_server() -> None:
         )
 
     logger.info(f"{config.CURRENT_PROFILE_NAME} MFA database server started!")
+    apply_tuning_profile(restart=True)
+
+
+def restart_server() -> None:
+    """Restart the MFA server for the current profile, so that all settings take effect"""
+    logger = logging.getLogger("mfa")
+
+    db_directory = config.get_temporary_directory().joinpath(
+        f"pg_mfa_{config.CURRENT_PROFILE_NAME}"
+    )
+    log_path = config.get_temporary_directory().joinpath(
+        f"pg_log_{config.CURRENT_PROFILE_NAME}.txt"
+    )
+    logger.info(f"Restarting the {config.CURRENT_PROFILE_NAME} MFA database server...")
+    try:
+        subprocess.check_call(
+            ["pg_ctl", "-D", db_directory, "-l", log_path, "-m", "fast", "-w", "restart"],
+            env=os.environ,
+        )
+    except Exception:
+        raise DatabaseError(
+            f"There was an error encountered restarting the {config.CURRENT_PROFILE_NAME} "
+            "MFA database server, "
+            f"please see {log_path} for more details and/or look at the logged errors above."
+        )
 
 
 def stop_server(mode: str = "smart") -> None:
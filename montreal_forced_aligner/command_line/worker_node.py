@@ -0,0 +1,82 @@
+"""Command line functions for running distributed worker nodes"""
+from __future__ import annotations
+
+import logging
+
+import rich_click as click
+
+from montreal_forced_aligner import config
+from montreal_forced_aligner.command_line.utils import common_options
+from montreal_forced_aligner.distributed import (
+    WORKER_AUTHKEY_VARIABLE,
+    KaldiWorkerNode,
+    get_worker_authkey,
+)
+
+__all__ = ["worker_node_cli"]
+
+logger = logging.getLogger("mfa")
+
+
+@click.command(
+    name="worker_node",
+    context_settings=dict(
+        ignore_unknown_options=True,
+        allow_extra_args=True,
+        allow_interspersed_args=True,
+    ),
+    short_help="Run jobs for MFA commands on other machines",
+)
+@click.option(
+    "--host",
+    help="Host to listen on, defaults to 127.0.0.1.",
+    type=str,
+    default="127.0.0.1",
+)
+@click.option(
+    "--port",
+    help="Port to listen on, defaults to 8766.",
+    type=int,
+    default=8766,
+)
+@click.option(
+    "--authkey",
+    help="Key shared with the coordinating MFA command for authenticating connections.",
+    type=str,
+    envvar=WORKER_AUTHKEY_VARIABLE,
+    default=None,
+)
+@click.option(
+    "--database_string",
+    help="Database connection string to use in place of the coordinator's, "
+    "for when the database is reached through a different address from this node.",
+    type=str,
+    default=None,
+)
+@common_options
+@click.help_option("-h", "--help")
+@click.pass_context
+def worker_node_cli(context, **kwargs) -> None:
+    """
+    Run jobs sent by MFA commands that were started with ``--worker_nodes``.
+
+    The corpus, models and temporary directories must be available at the same paths as on the
+    coordinating machine, and the node uses ``--num_jobs`` processes to run jobs.
+    """
+    if kwargs.get("profile", None) is not None:
+        config.profile = kwargs.pop("profile")
+    config.update_configuration(kwargs)
+    node = KaldiWorkerNode(
+        (kwargs["host"], kwargs["port"]),
+        get_worker_authkey(kwargs.get("authkey", None)),
+        num_workers=config.NUM_JOBS,
+        database_string=kwargs.get("database_string", None),
+    )
+    host, port = node.address
+    logger.info(f"Listening for jobs on {host}:{port} with {node.num_workers} workers")
+    try:
+        node.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.close()
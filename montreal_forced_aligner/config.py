@@ -148,13 +148,26 @@ NUM_JOBS = 3
 USE_MP = True
 USE_THREADING = False
 SINGLE_SPEAKER = False
+USE_JOB_COST_MODEL = True
+CHUNKS_PER_JOB = 1
+USE_WORKER_POOL = False
+USE_CPU_AFFINITY = False
+USE_INTERVAL_STORE = False
+EXPORT_FROM_ARCHIVES = False
+WORKER_NODES = ""
 DATABASE_LIMITED_MODE = False
+DATABASE_TUNING_PROFILE = "interactive"
 AUTO_SERVER = True
 TEMPORARY_DIRECTORY = get_temporary_directory()
 GITHUB_TOKEN = None
 HF_TOKEN = None
 BLAS_NUM_THREADS = 1
 BYTES_LIMIT = 100e6
+RESULT_BATCH_SIZE = 500
+RESULT_QUEUE_BYTES_LIMIT = 200000000
+SQLITE_CACHE_SIZE = -65536
+SQLITE_MMAP_SIZE = 1073741824
+SQLITE_BUSY_TIMEOUT = 60000
 CURRENT_PROFILE_NAME = os.getenv(MFA_PROFILE_VARIABLE, "global")
 
 
@@ -178,13 +191,26 @@ class MfaProfile:
     cleanup_textgrids: bool = True
     use_postgres: bool = False
     database_limited_mode: bool = False
+    database_tuning_profile: str = "interactive"
     bytes_limit: int = 100e6
+    result_batch_size: int = 500
+    result_queue_bytes_limit: int = 200000000
+    sqlite_cache_size: int = -65536
+    sqlite_mmap_size: int = 1073741824
+    sqlite_busy_timeout: int = 60000
     seed: int = 0
     num_jobs: int = 3
     blas_num_threads: int = 1
     use_mp: bool = True
     use_threading: bool = True
     single_speaker: bool = False
+    use_job_cost_model: bool = True
+    chunks_per_job: int = 1
+    use_worker_pool: bool = False
+    use_cpu_affinity: bool = False
+    use_interval_store: bool = False
+    export_from_archives: bool = False
+    worker_nodes: str = ""
     auto_server: bool = True
     temporary_directory: pathlib.Path = get_temporary_directory()
     github_token: typing.Optional[str] = None
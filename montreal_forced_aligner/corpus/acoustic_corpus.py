@@ -63,6 +63,7 @@ from montreal_forced_aligner.exceptions import (
     TextParseError,
 )
 from montreal_forced_aligner.helper import load_scp, mfa_open
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.textgrid import parse_aligned_textgrid
 from montreal_forced_aligner.utils import Counter, run_kaldi_function
 
@@ -373,6 +374,7 @@ class AcousticCorpusMixin(CorpusMixin, FeatureConfigMixin, metaclass=ABCMeta):
                     "for details on how to structure your corpus"
                 )
 
+    @record_stage()
     def load_corpus(self) -> None:
         """
         Load the corpus
@@ -445,6 +447,7 @@ class AcousticCorpusMixin(CorpusMixin, FeatureConfigMixin, metaclass=ABCMeta):
                 for path in paths:
                     path.unlink(missing_ok=True)
 
+    @record_stage()
     def generate_final_features(self) -> None:
         """
         Generate features for the corpus
@@ -515,6 +518,7 @@ class AcousticCorpusMixin(CorpusMixin, FeatureConfigMixin, metaclass=ABCMeta):
                 )
         logger.debug(f"Generating final features took {time.time() - time_begin:.3f} seconds")
 
+    @record_stage()
     def generate_features(self) -> None:
         """
         Generate features for the corpus
@@ -759,6 +763,7 @@ class AcousticCorpusMixin(CorpusMixin, FeatureConfigMixin, metaclass=ABCMeta):
                 session.commit()
         logger.debug(f"Fmllr calculation took {time.time() - begin:.3f} seconds")
 
+    @record_stage()
     def compute_vad(self) -> None:
         """
         Compute Voice Activity Detection features over the corpus
@@ -1089,6 +1094,7 @@ class AcousticCorpusPronunciationMixin(
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    @record_stage()
     def load_corpus(self) -> None:
         """
         Load the corpus
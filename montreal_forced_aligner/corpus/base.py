@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import collections
+import hashlib
+import json
 import logging
 import os
 import re
@@ -11,6 +13,7 @@ import typing
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
 
+import numpy as np
 import sqlalchemy.engine
 from sqlalchemy.orm import Session, joinedload, selectinload, subqueryload
 
@@ -38,6 +41,8 @@ from montreal_forced_aligner.db import (
     Dictionary2Job,
     File,
     Job,
+    JobCheckpoint,
+    M2M2Job,
     Pronunciation,
     SoundFile,
     Speaker,
@@ -45,16 +50,172 @@ from montreal_forced_aligner.db import (
     TextFile,
     Utterance,
     Word,
+    Word2Job,
     bulk_update,
+    deferred_indexes,
 )
 from montreal_forced_aligner.exceptions import CorpusError
 from montreal_forced_aligner.helper import mfa_open, output_mapping
-from montreal_forced_aligner.utils import run_kaldi_function
+from montreal_forced_aligner.utils import JOB_TIMINGS, run_kaldi_function
 
-__all__ = ["CorpusMixin"]
+__all__ = ["CorpusMixin", "JobCostModel"]
 
 logger = logging.getLogger("mfa")
 
+STALE_JOB_FILE_PATTERN = re.compile(r"^[A-Za-z_]\w*(\.\d+)?\.(?P<job_id>\d+)\.\w+$")
+
+
+class JobCostModel:
+    """
+    Linear model of how long a job takes to process, used to balance jobs
+
+    The cost of a set of utterances is ``seconds_per_second * duration + seconds_per_utterance * num_utterances``.
+    Without any previous runs, the cost is just the audio duration.
+
+    Parameters
+    ----------
+    seconds_per_second: float
+        Processing seconds per second of audio
+    seconds_per_utterance: float
+        Fixed processing seconds per utterance
+    num_updates: int
+        Number of runs the model has been fit to
+    """
+
+    def __init__(
+        self,
+        seconds_per_second: float = 1.0,
+        seconds_per_utterance: float = 0.0,
+        num_updates: int = 0,
+    ):
+        self.seconds_per_second = seconds_per_second
+        self.seconds_per_utterance = seconds_per_utterance
+        self.num_updates = num_updates
+
+    @staticmethod
+    def default_path(corpus_directory: typing.Optional[Path] = None) -> Path:
+        """
+        Path to the cost model of a corpus in the temporary directory
+
+        Parameters
+        ----------
+        corpus_directory: :class:`~pathlib.Path`, optional
+            Corpus the cost model was fit on, the cost model for unspecified corpora is used
+            if not specified
+
+        Returns
+        -------
+        :class:`~pathlib.Path`
+            Path to the cost model
+        """
+        directory = config.TEMPORARY_DIRECTORY.joinpath("job_cost_models")
+        if corpus_directory is None:
+            return directory.joinpath("job_cost_model.json")
+        corpus_directory = Path(corpus_directory).resolve()
+        key = hashlib.sha1(str(corpus_directory).encode("utf8")).hexdigest()[:12]
+        return directory.joinpath(f"{corpus_directory.name}_{key}.json")
+
+    @classmethod
+    def load(cls, path: Path = None) -> JobCostModel:
+        """
+        Load a cost model, falling back to duration-only costs if it does not exist
+
+        Parameters
+        ----------
+        path: :class:`~pathlib.Path`, optional
+            Path to load from, defaults to :meth:`~JobCostModel.default_path`
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.corpus.base.JobCostModel`
+            Cost model
+        """
+        if path is None:
+            path = cls.default_path()
+        if not path.exists():
+            return cls()
+        try:
+            with mfa_open(path, "r") as f:
+                return cls(**json.load(f))
+        except (ValueError, TypeError):
+            return cls()
+
+    def save(self, path: Path = None) -> None:
+        """
+        Save the cost model
+
+        Parameters
+        ----------
+        path: :class:`~pathlib.Path`, optional
+            Path to save to, defaults to :meth:`~JobCostModel.default_path`
+        """
+        if path is None:
+            path = self.default_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent runs never read a partial model
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with mfa_open(temp_path, "w") as f:
+            json.dump(
+                {
+                    "seconds_per_second": self.seconds_per_second,
+                    "seconds_per_utterance": self.seconds_per_utterance,
+                    "num_updates": self.num_updates,
+                },
+                f,
+            )
+        os.replace(temp_path, path)
+
+    def cost(self, duration: float, num_utterances: int = 1) -> float:
+        """
+        Estimate the processing cost of utterances
+
+        Parameters
+        ----------
+        duration: float
+            Total duration of the utterances in seconds
+        num_utterances: int
+            Number of utterances
+
+        Returns
+        -------
+        float
+            Estimated cost
+        """
+        return self.seconds_per_second * duration + self.seconds_per_utterance * num_utterances
+
+    def update(self, job_statistics: typing.List[typing.Tuple[float, int, float]]) -> bool:
+        """
+        Fit the model to the timings of a run and average it with previous fits
+
+        Parameters
+        ----------
+        job_statistics: list[tuple[float, int, float]]
+            Total duration, number of utterances, and elapsed seconds for each job
+
+        Returns
+        -------
+        bool
+            True if the model was updated
+        """
+        job_statistics = [x for x in job_statistics if x[2] > 0 and x[1] > 0]
+        if len(job_statistics) < 2:
+            return False
+        x = np.array([[d, n] for d, n, _ in job_statistics], dtype=float)
+        y = np.array([t for _, _, t in job_statistics], dtype=float)
+        coefficients = np.linalg.lstsq(x, y, rcond=None)[0]
+        coefficients = np.maximum(coefficients, 0)
+        if not coefficients.any():
+            return False
+        if self.num_updates == 0:
+            self.seconds_per_second, self.seconds_per_utterance = coefficients
+        else:
+            self.seconds_per_second = (self.seconds_per_second + coefficients[0]) / 2
+            self.seconds_per_utterance = (self.seconds_per_utterance + coefficients[1]) / 2
+        self.seconds_per_second = float(self.seconds_per_second)
+        self.seconds_per_utterance = float(self.seconds_per_utterance)
+        self.num_updates += 1
+        return True
+
 
 class CorpusMixin(MfaWorker, DatabaseMixin, metaclass=ABCMeta):
     """
@@ -486,6 +647,7 @@ class CorpusMixin(MfaWorker, DatabaseMixin, metaclass=ABCMeta):
         Initialize the corpus's Jobs
         """
 
+        JOB_TIMINGS.clear()
         with self.session() as session:
             if session.query(sqlalchemy.sql.exists().where(Utterance.job_id > 1)).scalar():
                 logger.info("Jobs already initialized.")
@@ -499,9 +661,6 @@ class CorpusMixin(MfaWorker, DatabaseMixin, metaclass=ABCMeta):
                     f"utterances across jobs regardless of their speaker."
                 )
                 config.NUM_JOBS = self.num_speakers
-                session.query(Job).filter(Job.id > config.NUM_JOBS).delete()
-                session.query(Corpus).update({Corpus.num_jobs: config.NUM_JOBS})
-                session.commit()
             elif config.SINGLE_SPEAKER and self.num_utterances < config.NUM_JOBS:
                 logger.warning(
                     f"Number of jobs was specified as {config.NUM_JOBS}, "
@@ -509,39 +668,82 @@ class CorpusMixin(MfaWorker, DatabaseMixin, metaclass=ABCMeta):
                     f"will only use {self.num_utterances} jobs."
                 )
                 config.NUM_JOBS = self.num_utterances
-                session.query(Job).filter(Job.id > config.NUM_JOBS).delete()
-                session.query(Corpus).update({Corpus.num_jobs: config.NUM_JOBS})
-                session.commit()
 
-            jobs = session.query(Job).all()
+            num_chunks = config.NUM_JOBS * max(1, config.CHUNKS_PER_JOB)
+            if config.SINGLE_SPEAKER:
+                num_chunks = min(num_chunks, self.num_utterances)
+            else:
+                num_chunks = min(num_chunks, self.num_speakers)
+            num_existing = session.query(Job).count()
+            if num_chunks > num_existing:
+                corpus_id = session.query(Corpus.id).first()[0]
+                session.execute(
+                    sqlalchemy.insert(Job.__table__),
+                    [
+                        {"id": j, "corpus_id": corpus_id}
+                        for j in range(num_existing + 1, num_chunks + 1)
+                    ],
+                )
+            elif num_chunks < num_existing:
+                self._remove_stale_jobs(session, num_chunks)
+            session.query(Corpus).update({Corpus.num_jobs: session.query(Job).count()})
+            session.commit()
+            jobs = session.query(Job).order_by(Job.id).all()
+            cost_model = (
+                JobCostModel.load(JobCostModel.default_path(self.corpus_directory))
+                if config.USE_JOB_COST_MODEL
+                else JobCostModel()
+            )
             update_mappings = []
             if config.SINGLE_SPEAKER:
-                utts_per_job = int(self.num_utterances / config.NUM_JOBS)
-                if utts_per_job == 0:
-                    utts_per_job = 1
-                for i, j in enumerate(jobs):
-                    update_mappings.extend(
-                        {"id": u, "job_id": j.id}
-                        for u in range((utts_per_job * i) + 1, (utts_per_job * (i + 1)) + 1)
-                    )
-                last_ind = update_mappings[-1]["id"] + 1
-                for u in range(last_ind, self.num_utterances):
-                    update_mappings.append({"id": u, "job_id": jobs[-1].id})
+                utterances = (
+                    session.query(Utterance.id, Utterance.duration)
+                    .order_by(Utterance.id)
+                    .all()
+                )
+                costs = [cost_model.cost(duration) for _, duration in utterances]
+                cost_per_job = sum(costs) / len(jobs)
+                job_index = 0
+                job_cost = 0
+                for i, ((u_id, _), cost) in enumerate(zip(utterances, costs)):
+                    remaining_jobs = len(jobs) - job_index - 1
+                    remaining_utterances = len(utterances) - i
+                    if (
+                        job_cost > 0
+                        and remaining_jobs > 0
+                        and (
+                            job_cost + cost / 2 > cost_per_job
+                            or remaining_utterances <= remaining_jobs
+                        )
+                    ):
+                        job_index += 1
+                        job_cost = 0
+                    update_mappings.append({"id": u_id, "job_id": jobs[job_index].id})
+                    job_cost += cost
                 bulk_update(session, Utterance, update_mappings)
             else:
-                utt_counts = {j.id: 0 for j in jobs}
+                job_costs = {j.id: 0 for j in jobs}
                 speakers = (
-                    session.query(Speaker.id, sqlalchemy.func.count(Utterance.id))
+                    session.query(
+                        Speaker.id,
+                        sqlalchemy.func.count(Utterance.id),
+                        sqlalchemy.func.sum(Utterance.duration),
+                    )
                     .outerjoin(Speaker.utterances)
                     .group_by(Speaker.id)
-                    .order_by(sqlalchemy.func.count(Utterance.id).desc())
                 )
-                for s_id, speaker_utt_count in speakers:
-                    if not speaker_utt_count:
-                        continue
-                    job_id = min(utt_counts.keys(), key=lambda x: utt_counts[x])
+                speakers = sorted(
+                    (
+                        (s_id, cost_model.cost(speaker_duration or 0, speaker_utt_count))
+                        for s_id, speaker_utt_count, speaker_duration in speakers
+                        if speaker_utt_count
+                    ),
+                    key=lambda x: -x[1],
+                )
+                for s_id, speaker_cost in speakers:
+                    job_id = min(job_costs.keys(), key=lambda x: job_costs[x])
                     update_mappings.append({"speaker_id": s_id, "job_id": job_id})
-                    utt_counts[job_id] += speaker_utt_count
+                    job_costs[job_id] += speaker_cost
                 bulk_update(session, Utterance, update_mappings, id_field="speaker_id")
             session.commit()
             if session.query(Dictionary2Job).count() == 0:
@@ -559,35 +761,113 @@ class CorpusMixin(MfaWorker, DatabaseMixin, metaclass=ABCMeta):
                     session.execute(Dictionary2Job.insert().values(dict_job_mappings))
                 session.commit()
 
+    def _remove_stale_jobs(self, session: Session, num_jobs: int) -> None:
+        """
+        Remove jobs left over from a previous run that used more jobs, along with their
+        job mappings and any per-job files in the output directory
+
+        Dictionary mappings are cleared for every job, since utterances are reassigned
+        afterwards and the mappings get regenerated from the new assignment
+
+        Parameters
+        ----------
+        session: :class:`~sqlalchemy.orm.Session`
+            Session to use
+        num_jobs: int
+            Number of jobs to keep
+        """
+        logger.debug(f"Removing jobs above {num_jobs} from a previous run.")
+        session.execute(sqlalchemy.delete(Dictionary2Job))
+        for mapping_table in (M2M2Job.__table__, Word2Job.__table__):
+            session.execute(
+                sqlalchemy.delete(mapping_table).where(mapping_table.c.job_id > num_jobs)
+            )
+        session.query(JobCheckpoint).filter(JobCheckpoint.job_id > num_jobs).delete(
+            synchronize_session=False
+        )
+        session.query(Utterance).filter(Utterance.job_id > num_jobs).update(
+            {Utterance.job_id: 1}, synchronize_session=False
+        )
+        session.query(Job).filter(Job.id > num_jobs).delete(synchronize_session=False)
+        if not self.output_directory.exists():
+            return
+        for root, _, files in os.walk(self.output_directory):
+            for file_name in files:
+                match = STALE_JOB_FILE_PATTERN.match(file_name)
+                if match is not None and int(match.group("job_id")) > num_jobs:
+                    os.remove(os.path.join(root, file_name))
+
+    def update_job_cost_model(self) -> None:
+        """
+        Update the :class:`~montreal_forced_aligner.corpus.base.JobCostModel` with the time each job
+        spent in multi-job stages of this run
+        """
+        if not config.USE_JOB_COST_MODEL or not JOB_TIMINGS:
+            return
+        with self.session() as session:
+            job_data = {
+                job_id: (duration or 0, num_utterances)
+                for job_id, num_utterances, duration in session.query(
+                    Utterance.job_id,
+                    sqlalchemy.func.count(Utterance.id),
+                    sqlalchemy.func.sum(Utterance.duration),
+                ).group_by(Utterance.job_id)
+            }
+        function_jobs = collections.defaultdict(set)
+        for function_name, job_name in JOB_TIMINGS.keys():
+            function_jobs[function_name].add(job_name)
+        job_timings = collections.Counter()
+        for (function_name, job_name), elapsed in JOB_TIMINGS.items():
+            if function_jobs[function_name] == job_data.keys():
+                job_timings[job_name] += elapsed
+        job_statistics = [
+            (duration, num_utterances, job_timings[job_id])
+            for job_id, (duration, num_utterances) in job_data.items()
+        ]
+        cost_model_path = JobCostModel.default_path(self.corpus_directory)
+        cost_model = JobCostModel.load(cost_model_path)
+        if cost_model.update(job_statistics):
+            logger.debug(
+                f"Updated job cost model: {cost_model.seconds_per_second:.4f} seconds per second of audio, "
+                f"{cost_model.seconds_per_utterance:.4f} seconds per utterance"
+            )
+            cost_model.save(cost_model_path)
+        JOB_TIMINGS.clear()
+
     def _finalize_load(self, session: Session, import_data: DatabaseImportData):
         """Finalize the import of database objects after parsing"""
-        with session.begin_nested():
-            c = session.query(Corpus).first()
-            job_objs = [{"id": j, "corpus_id": c.id} for j in range(1, config.NUM_JOBS + 1)]
-            session.execute(sqlalchemy.insert(Job.__table__), job_objs)
-            c.num_jobs = config.NUM_JOBS
-            if import_data.speaker_objects:
-                session.execute(sqlalchemy.insert(Speaker.__table__), import_data.speaker_objects)
-            if import_data.file_objects:
-                session.execute(sqlalchemy.insert(File.__table__), import_data.file_objects)
-            if import_data.text_file_objects:
-                session.execute(
-                    sqlalchemy.insert(TextFile.__table__), import_data.text_file_objects
-                )
-            if import_data.sound_file_objects:
-                session.execute(
-                    sqlalchemy.insert(SoundFile.__table__), import_data.sound_file_objects
-                )
-            if import_data.speaker_ordering_objects:
-                session.execute(
-                    sqlalchemy.insert(SpeakerOrdering),
-                    import_data.speaker_ordering_objects,
-                )
-            if import_data.utterance_objects:
-                session.execute(
-                    sqlalchemy.insert(Utterance.__table__), import_data.utterance_objects
-                )
-            session.flush()
+        with deferred_indexes(session, [Utterance]):
+            with session.begin_nested():
+                c = session.query(Corpus).first()
+                job_objs = [
+                    {"id": j, "corpus_id": c.id} for j in range(1, config.NUM_JOBS + 1)
+                ]
+                session.execute(sqlalchemy.insert(Job.__table__), job_objs)
+                c.num_jobs = len(job_objs)
+                if import_data.speaker_objects:
+                    session.execute(
+                        sqlalchemy.insert(Speaker.__table__), import_data.speaker_objects
+                    )
+                if import_data.file_objects:
+                    session.execute(sqlalchemy.insert(File.__table__), import_data.file_objects)
+                if import_data.text_file_objects:
+                    session.execute(
+                        sqlalchemy.insert(TextFile.__table__), import_data.text_file_objects
+                    )
+                if import_data.sound_file_objects:
+                    session.execute(
+                        sqlalchemy.insert(SoundFile.__table__), import_data.sound_file_objects
+                    )
+                if import_data.speaker_ordering_objects:
+                    session.execute(
+                        sqlalchemy.insert(SpeakerOrdering),
+                        import_data.speaker_ordering_objects,
+                    )
+                if import_data.utterance_objects:
+                    session.execute(
+                        sqlalchemy.insert(Utterance.__table__), import_data.utterance_objects
+                    )
+                session.flush()
 
         self.imported = True
         speakers = (
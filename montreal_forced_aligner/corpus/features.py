@@ -1,17 +1,26 @@
 """Classes for configuring feature generation"""
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os
+import threading
 import typing
 from abc import abstractmethod
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Union
 
 import dataclassy
 from _kalpy.feat import paste_feats
-from _kalpy.matrix import CompressedMatrix, FloatVector
-from _kalpy.util import BaseFloatMatrixWriter, BaseFloatVectorWriter, CompressedMatrixWriter
+from _kalpy.matrix import CompressedMatrix, FloatMatrix, FloatVector
+from _kalpy.util import (
+    BaseFloatMatrixWriter,
+    BaseFloatVectorWriter,
+    CompressedMatrixWriter,
+    RandomAccessBaseFloatMatrixReader,
+)
 from kalpy.data import KaldiMapping, MatrixArchive, Segment
 from kalpy.feat.data import FeatureArchive
 from kalpy.feat.fmllr import FmllrComputer
@@ -20,14 +29,15 @@ from kalpy.feat.pitch import PitchComputer
 from kalpy.feat.vad import VadComputer
 from kalpy.gmm.data import AlignmentArchive
 from kalpy.ivector.extractor import IvectorExtractor
-from kalpy.utils import generate_write_specifier
+from kalpy.utterance import Utterance as KalpyUtterance
+from kalpy.utils import generate_read_specifier, generate_write_specifier
 from sqlalchemy.orm import joinedload
 
 from montreal_forced_aligner import config
 from montreal_forced_aligner.abc import KaldiFunction
 from montreal_forced_aligner.data import MfaArguments
 from montreal_forced_aligner.db import File, Job, Phone, SoundFile, Utterance
-from montreal_forced_aligner.helper import mfa_open
+from montreal_forced_aligner.helper import atomic_archive, mfa_open
 from montreal_forced_aligner.utils import thread_logger
 
 if TYPE_CHECKING:
@@ -49,6 +59,7 @@ __all__ = [
     "ExtractIvectorsArguments",
     "ExportIvectorsFunction",
     "ExportIvectorsArguments",
+    "FeatureCache",
 ]
 
 logger = logging.getLogger("mfa")
@@ -184,6 +195,9 @@ class MfccFunction(KaldiFunction):
         Arguments for the function
     """
 
+    read_only = True
+    resumable = True
+
     def __init__(self, args: MfccArguments):
         super().__init__(args)
         self.data_directory = args.data_directory
@@ -204,50 +218,60 @@ class MfccFunction(KaldiFunction):
             limit = 10000
             offset = 0
             min_length = 0.1
-            mfcc_specifier = generate_write_specifier(raw_ark_path, True)
-            pitch_specifier = generate_write_specifier(raw_pitch_ark_path, True)
-            mfcc_writer = CompressedMatrixWriter(mfcc_specifier)
-            pitch_writer = None
-            if self.pitch_computer is not None:
-                mfcc_logger.debug(f"Pitch parameters: {self.pitch_computer.parameters}")
-                pitch_writer = CompressedMatrixWriter(pitch_specifier)
-            num_done = 0
-            num_error = 0
-            while True:
-                utterances = (
-                    session.query(Utterance, SoundFile)
-                    .join(Utterance.file)
-                    .join(File.sound_file)
-                    .filter(
-                        Utterance.job_id == self.job_name,
-                        Utterance.duration >= min_length,
+            mfcc_archive = atomic_archive(raw_ark_path, raw_ark_path.with_suffix(".scp"))
+            pitch_archive = atomic_archive(
+                raw_pitch_ark_path, raw_pitch_ark_path.with_suffix(".scp")
+            )
+            with mfcc_archive as (mfcc_ark_path, mfcc_scp_path), pitch_archive as (
+                pitch_ark_path,
+                pitch_scp_path,
+            ):
+                mfcc_writer = CompressedMatrixWriter(f"ark,scp:{mfcc_ark_path},{mfcc_scp_path}")
+                pitch_writer = None
+                if self.pitch_computer is not None:
+                    mfcc_logger.debug(f"Pitch parameters: {self.pitch_computer.parameters}")
+                    pitch_writer = CompressedMatrixWriter(
+                        f"ark,scp:{pitch_ark_path},{pitch_scp_path}"
                     )
-                    .order_by(Utterance.kaldi_id)
-                    .limit(limit)
-                    .offset(offset)
-                )
-                if utterances.count() == 0:
-                    break
-                for u, sf in utterances:
-                    seg = Segment(str(sf.sound_file_path), u.begin, u.end, u.channel)
-                    mfcc_logger.info(f"Processing {u.kaldi_id}")
-                    try:
-                        mfccs = self.mfcc_computer.compute_mfccs_for_export(seg, compress=True)
-                    except Exception as e:
-                        mfcc_logger.warning(str(e))
-                        num_error += 1
-                        continue
-
-                    mfcc_writer.Write(u.kaldi_id, mfccs)
-                    if self.pitch_computer is not None:
-                        pitch = self.pitch_computer.compute_pitch_for_export(seg, compress=True)
-                        pitch_writer.Write(u.kaldi_id, pitch)
-                    num_done += 1
-                    self.callback(1)
-                offset += limit
-            mfcc_writer.Close()
-            if self.pitch_computer is not None:
-                pitch_writer.Close()
+                num_done = 0
+                num_error = 0
+                while True:
+                    utterances = (
+                        session.query(Utterance, SoundFile)
+                        .join(Utterance.file)
+                        .join(File.sound_file)
+                        .filter(
+                            Utterance.job_id == self.job_name,
+                            Utterance.duration >= min_length,
+                        )
+                        .order_by(Utterance.kaldi_id)
+                        .limit(limit)
+                        .offset(offset)
+                    )
+                    if utterances.count() == 0:
+                        break
+                    for u, sf in utterances:
+                        seg = Segment(str(sf.sound_file_path), u.begin, u.end, u.channel)
+                        mfcc_logger.info(f"Processing {u.kaldi_id}")
+                        try:
+                            mfccs = self.mfcc_computer.compute_mfccs_for_export(seg, compress=True)
+                        except Exception as e:
+                            mfcc_logger.warning(str(e))
+                            num_error += 1
+                            continue
+
+                        mfcc_writer.Write(u.kaldi_id, mfccs)
+                        if self.pitch_computer is not None:
+                            pitch = self.pitch_computer.compute_pitch_for_export(
+                                seg, compress=True
+                            )
+                            pitch_writer.Write(u.kaldi_id, pitch)
+                        num_done += 1
+                        self.callback(1)
+                    offset += limit
+                mfcc_writer.Close()
+                if self.pitch_computer is not None:
+                    pitch_writer.Close()
             mfcc_logger.info(f"Done {num_done} utterances, errors on {num_error}.")
 
 
@@ -276,6 +300,9 @@ class FinalFeatureFunction(KaldiFunction):
         Arguments for the function
     """
 
+    read_only = True
+    resumable = True
+
     def __init__(self, args: FinalFeatureArguments):
         super().__init__(args)
         self.data_directory = args.data_directory
@@ -314,6 +341,9 @@ class FinalFeatureFunction(KaldiFunction):
             raw_ark_path = job.construct_path(self.data_directory, "feats", "ark")
             temp_ark_path = job.construct_path(self.data_directory, "final_features", "ark")
             temp_scp_path = job.construct_path(self.data_directory, "final_features", "scp")
+            if not raw_ark_path.exists() and feats_scp_path.exists():
+                mfcc_logger.info("Features were already finalized.")
+                return
             write_specifier = generate_write_specifier(temp_ark_path, write_scp=True)
             feature_writer = CompressedMatrixWriter(write_specifier)
             num_done = 0
@@ -367,12 +397,11 @@ class FinalFeatureFunction(KaldiFunction):
                     self.callback(1)
             feature_writer.Close()
             mfcc_archive.close()
+            os.replace(temp_scp_path, feats_scp_path)
             raw_ark_path.unlink()
             if pitch_scp_path.exists():
                 pitch_ark_path.unlink()
                 pitch_scp_path.unlink()
-            feats_scp_path.unlink()
-            temp_scp_path.rename(feats_scp_path)
             mfcc_logger.info(f"Done {num_done} utterances, errors on {num_error}.")
 
 
@@ -395,6 +424,8 @@ class ComputeVadFunction(KaldiFunction):
         Arguments for the function
     """
 
+    read_only = True
+
     def __init__(self, args: VadArguments):
         super().__init__(args)
         self.vad_options = args.vad_options
@@ -980,6 +1011,8 @@ class ExtractIvectorsFunction(KaldiFunction):
         Arguments for the function
     """
 
+    read_only = True
+
     def __init__(self, args: ExtractIvectorsArguments):
         super().__init__(args)
         self.ivector_options = args.ivector_options
@@ -1076,3 +1109,177 @@ class ExportIvectorsFunction(KaldiFunction):
                     utt_id, ark_path = line.split(maxsplit=1)
                     utt_id = int(utt_id.split("-")[1])
                     self.callback((utt_id, ark_path))
+
+
+class FeatureCache:
+    """
+    On-disk cache of compressed MFCC features for audio segments
+
+    Entries are keyed on a hash of the audio file contents, the segment boundaries and channel,
+    and the MFCC and pitch options, so features are reused across runs on the same recordings
+    regardless of the transcript or alignment options.
+
+    Parameters
+    ----------
+    cache_directory: :class:`~pathlib.Path`
+        Directory to store cached features
+    mfcc_computer: :class:`~kalpy.feat.mfcc.MfccComputer`
+        MFCC computer used to generate features
+    pitch_computer: :class:`~kalpy.feat.pitch.PitchComputer`, optional
+        Pitch computer used to generate features
+    """
+
+    def __init__(
+        self,
+        cache_directory: Path,
+        mfcc_computer: MfccComputer,
+        pitch_computer: typing.Optional[PitchComputer] = None,
+    ):
+        self.cache_directory = cache_directory
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.mfcc_computer = mfcc_computer
+        options = {
+            "mfcc": mfcc_computer.parameters,
+            "pitch": pitch_computer.parameters if pitch_computer is not None else None,
+        }
+        self.options_hash = hashlib.sha1(
+            json.dumps(options, sort_keys=True, default=str).encode("utf8")
+        ).hexdigest()
+        self._audio_hashes = {}
+        self.lock = threading.Lock()
+
+    def audio_hash(self, sound_file_path: typing.Union[Path, str]) -> str:
+        """
+        Hash the contents of an audio file
+
+        Parameters
+        ----------
+        sound_file_path: :class:`~pathlib.Path` or str
+            Path to the audio file
+
+        Returns
+        -------
+        str
+            Hex digest of the file contents
+        """
+        stat = os.stat(sound_file_path)
+        key = (str(sound_file_path), stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if key in self._audio_hashes:
+                return self._audio_hashes[key]
+        h = hashlib.sha1()
+        with open(sound_file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self.lock:
+            self._audio_hashes[key] = digest
+        return digest
+
+    def cache_path(self, segment: Segment) -> Path:
+        """
+        Generate the path to the cached features for a segment
+
+        Parameters
+        ----------
+        segment: :class:`~kalpy.data.Segment`
+            Audio segment
+
+        Returns
+        -------
+        :class:`~pathlib.Path`
+            Path to the cache entry
+        """
+        key = (
+            f"{self.audio_hash(segment.file_path)}-{segment.begin}-{segment.end}-"
+            f"{segment.channel}-{self.options_hash}"
+        )
+        key = hashlib.sha1(key.encode("utf8")).hexdigest()
+        return self.cache_directory.joinpath(key[:2], f"{key}.ark")
+
+    def load(self, segment: Segment) -> typing.Optional[FloatMatrix]:
+        """
+        Load cached features for a segment
+
+        Parameters
+        ----------
+        segment: :class:`~kalpy.data.Segment`
+            Audio segment
+
+        Returns
+        -------
+        :class:`_kalpy.matrix.FloatMatrix` or None
+            Cached features, or None if the segment is not in the cache
+        """
+        path = self.cache_path(segment)
+        if not path.exists():
+            return None
+        reader = RandomAccessBaseFloatMatrixReader(generate_read_specifier(path))
+        try:
+            if not reader.HasKey("mfccs"):
+                return None
+            return FloatMatrix(reader.Value("mfccs"))
+        finally:
+            reader.Close()
+
+    def save(self, segment: Segment, mfccs: FloatMatrix) -> None:
+        """
+        Save features for a segment to the cache
+
+        Parameters
+        ----------
+        segment: :class:`~kalpy.data.Segment`
+            Audio segment
+        mfccs: :class:`_kalpy.matrix.FloatMatrix`
+            Features to save
+        """
+        path = self.cache_path(segment)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        writer = CompressedMatrixWriter(generate_write_specifier(temp_path))
+        writer.Write("mfccs", mfccs)
+        writer.Close()
+        os.replace(temp_path, path)
+
+    def generate_mfccs(
+        self,
+        utterances: typing.List[KalpyUtterance],
+        use_cache: bool = True,
+        num_jobs: int = None,
+    ) -> int:
+        """
+        Generate MFCCs for utterances, loading them from the cache where possible and
+        computing the rest in a thread pool
+
+        Parameters
+        ----------
+        utterances: list[:class:`~kalpy.utterance.Utterance`]
+            Utterances to generate features for
+        use_cache: bool
+            Flag for reading features from the cache, new features are saved either way
+        num_jobs: int, optional
+            Number of threads to use for cache misses, defaults to the number of jobs
+
+        Returns
+        -------
+        int
+            Number of utterances loaded from the cache
+        """
+        if num_jobs is None:
+            num_jobs = config.NUM_JOBS
+        to_compute = []
+        for utterance in utterances:
+            mfccs = self.load(utterance.segment) if use_cache else None
+            if mfccs is None:
+                to_compute.append(utterance)
+            else:
+                utterance.mfccs = mfccs
+        if to_compute:
+
+            def compute(utterance: KalpyUtterance):
+                utterance.generate_mfccs(self.mfcc_computer)
+                self.save(utterance.segment, utterance.mfccs)
+
+            with ThreadPool(max(1, min(num_jobs, len(to_compute)))) as pool:
+                pool.map(compute, to_compute)
+        return len(utterances) - len(to_compute)
@@ -43,6 +43,7 @@ from montreal_forced_aligner.data import WorkflowType
 from montreal_forced_aligner.db import Corpus, Speaker, Utterance, bulk_update
 from montreal_forced_aligner.exceptions import IvectorTrainingError
 from montreal_forced_aligner.helper import mfa_open
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.utils import run_kaldi_function
 
 __all__ = ["IvectorCorpusMixin"]
@@ -282,6 +283,7 @@ class IvectorCorpusMixin(AcousticCorpusMixin, IvectorConfigMixin):
             self.plda = plda
         logger.debug(f"Computing PLDA took {time.time() - begin:.3f} seconds.")
 
+    @record_stage()
     def extract_ivectors(self) -> None:
         """
         Multiprocessing function that extracts job_name-vectors.
@@ -17,7 +17,7 @@ from montreal_forced_aligner.abc import KaldiFunction
 from montreal_forced_aligner.corpus.classes import FileData
 from montreal_forced_aligner.corpus.helper import find_exts
 from montreal_forced_aligner.data import Language, MfaArguments
-from montreal_forced_aligner.db import Dictionary, Job, Speaker, Utterance
+from montreal_forced_aligner.db import Dictionary, Job, Speaker, Utterance, job_utterance_query
 from montreal_forced_aligner.exceptions import SoundFileError, TextGridParseError, TextParseError
 from montreal_forced_aligner.helper import mfa_open
 from montreal_forced_aligner.utils import Counter
@@ -292,13 +292,9 @@ class NormalizeTextFunction(KaldiFunction):
                             tokenizer, ignore_case=self.ignore_case
                         )
 
-                    utterances = (
-                        session.query(Utterance.id, Utterance.text)
-                        .join(Utterance.speaker)
-                        .filter(Utterance.text != "")
-                        .filter(Utterance.job_id == self.job_name)
-                        .filter(Speaker.dictionary_id == d.id)
-                    )
+                    utterances = job_utterance_query(
+                        session, self.job_name, d.id, Utterance.id, Utterance.text
+                    ).filter(Utterance.text != "")
                     for u_id, u_text in utterances:
                         if simple_tokenization:
                             normalized_text, normalized_character_text, oovs = tokenizer(u_text)
@@ -396,6 +392,8 @@ class ExportKaldiFilesFunction(KaldiFunction):
         Arguments for the function
     """
 
+    read_only = True
+
     def __init__(self, args: ExportKaldiFilesArguments):
         super().__init__(args)
         self.split_directory = args.split_directory
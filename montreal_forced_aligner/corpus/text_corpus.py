@@ -19,6 +19,7 @@ from montreal_forced_aligner.corpus.multiprocessing import CorpusProcessWorker
 from montreal_forced_aligner.data import DatabaseImportData
 from montreal_forced_aligner.dictionary.multispeaker import MultispeakerDictionaryMixin
 from montreal_forced_aligner.exceptions import TextGridParseError, TextParseError
+from montreal_forced_aligner.profiling import record_stage
 
 logger = logging.getLogger("mfa")
 
@@ -253,6 +254,7 @@ class DictionaryTextCorpusMixin(TextCorpusMixin, MultispeakerDictionaryMixin):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    @record_stage()
     def load_corpus(self) -> None:
         """
         Load the corpus
@@ -289,6 +291,7 @@ class TextCorpus(TextCorpusMixin, MfaWorker, TemporaryDirectoryMixin):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    @record_stage()
     def load_corpus(self) -> None:
         """
         Load the corpus
@@ -15,6 +15,7 @@ import typing
 from pathlib import Path
 
 import dataclassy
+import numpy as np
 import pynini
 import pywrapfst
 from praatio.utilities.constants import Interval, TextgridFormats
@@ -25,6 +26,7 @@ from montreal_forced_aligner.exceptions import CtmError
 __all__ = [
     "MfaArguments",
     "CtmInterval",
+    "CompactCtm",
     "TextFileType",
     "TextgridFormats",
     "SoundFileType",
@@ -34,10 +36,12 @@ __all__ = [
     "WordData",
     "DatabaseImportData",
     "PronunciationProbabilityCounter",
+    "BeamScheduler",
     "ManifoldAlgorithm",
     "ClusterType",
     "DistanceMetric",
     "WorkflowType",
+    "BulkUpdateStrategy",
     "DatasetType",
     "Language",
     "ArpaNgramModel",
@@ -455,6 +459,14 @@ class WordType(enum.Enum):
         }
 
 
+class BulkUpdateStrategy(enum.Enum):
+    """Enum for ways of updating many rows of a database table"""
+
+    executemany = "executemany"  #: One prepared UPDATE statement executed per row
+    values = "values"  #: Chunked UPDATE ... FROM (VALUES ...) statements
+    staging = "staging"  #: Load rows into a temporary staging table and update from it
+
+
 class DistanceMetric(enum.Enum):
     cosine = "cosine"
     plda = "plda"
@@ -2013,6 +2025,157 @@ class PronunciationProbabilityCounter:
         self.non_silence_before_counts.update(other_counter.non_silence_before_counts)
 
 
+class BeamScheduler:
+    """
+    Schedule of escalating beam widths for aligning utterances
+
+    Utterances are first aligned with a narrow beam and only escalated to wider beams when
+    alignment fails or the per-frame log-likelihood falls below a threshold.  The beam that
+    succeeded for each speaker is remembered so that later utterances from that speaker
+    start there, and it steps back down once ``decay_after`` utterances in a row have been
+    accepted at the speaker's starting beam.
+
+    Parameters
+    ----------
+    beam: int
+        Initial beam width, defaults to 10
+    retry_beam: int
+        Widest beam to escalate to, defaults to 40
+    escalation_factor: int
+        Factor to multiply the beam by on each escalation, defaults to 4
+    likelihood_threshold: float, optional
+        Minimum per-frame log-likelihood for an alignment to be accepted without escalating
+    decay_after: int
+        Number of consecutive utterances accepted at a speaker's starting beam before that
+        speaker starts from the next narrower beam, defaults to 10
+
+    Attributes
+    ----------
+    beams: list[int]
+        Beam widths to try in order
+    speaker_beams: dict[str, int]
+        Index into ``beams`` for the beam that each speaker's utterances start from
+    speaker_streaks: dict[str, int]
+        Number of consecutive utterances accepted at each speaker's starting beam
+    beam_counts: collections.Counter
+        Counts of utterances aligned with each beam
+    num_failures: int
+        Number of utterances that could not be aligned with any beam
+    """
+
+    def __init__(
+        self,
+        beam: int = 10,
+        retry_beam: int = 40,
+        escalation_factor: int = 4,
+        likelihood_threshold: typing.Optional[float] = None,
+        decay_after: int = 10,
+    ):
+        self.beams = [beam]
+        while self.beams[-1] * escalation_factor < retry_beam:
+            self.beams.append(self.beams[-1] * escalation_factor)
+        if retry_beam > beam:
+            self.beams.append(retry_beam)
+        self.likelihood_threshold = likelihood_threshold
+        self.decay_after = decay_after
+        self.speaker_beams: typing.Dict[str, int] = {}
+        self.speaker_streaks: typing.Dict[str, int] = {}
+        self.beam_counts = collections.Counter()
+        self.num_failures = 0
+
+    def beams_for_speaker(self, speaker: typing.Union[int, str]) -> typing.List[int]:
+        """
+        Get the beams to try for an utterance from a speaker
+
+        Parameters
+        ----------
+        speaker: int or str
+            Speaker identifier
+
+        Returns
+        -------
+        list[int]
+            Beam widths in the order to try them
+        """
+        return self.beams[self.speaker_beams.get(str(speaker), 0) :]
+
+    def accept(self, log_likelihood: typing.Optional[float], num_frames: int) -> bool:
+        """
+        Check whether an alignment is good enough to stop escalating
+
+        Parameters
+        ----------
+        log_likelihood: float or None
+            Total log-likelihood of the alignment, None if the alignment failed
+        num_frames: int
+            Number of frames in the utterance
+
+        Returns
+        -------
+        bool
+            True if the alignment should be accepted
+        """
+        if log_likelihood is None:
+            return False
+        if self.likelihood_threshold is None or not num_frames:
+            return True
+        return log_likelihood / num_frames >= self.likelihood_threshold
+
+    def record(self, speaker: typing.Union[int, str], beam: typing.Optional[int]) -> None:
+        """
+        Record the beam that an utterance was aligned with
+
+        Parameters
+        ----------
+        speaker: int or str
+            Speaker identifier
+        beam: int or None
+            Beam that produced the alignment, None if the utterance could not be aligned
+        """
+        if beam is None:
+            self.num_failures += 1
+            return
+        self.beam_counts[beam] += 1
+        speaker = str(speaker)
+        start_index = self.speaker_beams.get(speaker, 0)
+        beam_index = self.beams.index(beam)
+        if beam_index > start_index:
+            self.speaker_beams[speaker] = beam_index
+            self.speaker_streaks[speaker] = 0
+            return
+        streak = self.speaker_streaks.get(speaker, 0) + 1
+        if streak >= self.decay_after and start_index > 0:
+            self.speaker_beams[speaker] = start_index - 1
+            streak = 0
+        self.speaker_streaks[speaker] = streak
+
+    def add_counts(self, other_scheduler: BeamScheduler) -> None:
+        """
+        Combine counts and speaker beams of two :class:`~montreal_forced_aligner.data.BeamScheduler`
+
+        Parameters
+        ----------
+        other_scheduler: :class:`~montreal_forced_aligner.data.BeamScheduler`
+            Other scheduler with beam counts
+        """
+        self.beam_counts.update(other_scheduler.beam_counts)
+        self.num_failures += other_scheduler.num_failures
+        self.speaker_beams.update(other_scheduler.speaker_beams)
+        self.speaker_streaks.update(other_scheduler.speaker_streaks)
+
+    def reset_counts(self) -> None:
+        """Reset beam counts while keeping speaker beams"""
+        self.beam_counts = collections.Counter()
+        self.num_failures = 0
+
+    @property
+    def distribution(self) -> typing.Dict[str, int]:
+        """Number of utterances aligned with each beam"""
+        distribution = {str(b): self.beam_counts[b] for b in self.beams}
+        distribution["failed"] = self.num_failures
+        return distribution
+
+
 # noinspection PyUnresolvedReferences
 @dataclassy.dataclass(slots=True)
 class CtmInterval:
@@ -2106,3 +2269,98 @@ class WordCtmInterval:
     def __lt__(self, other: WordCtmInterval):
         """Sorting function for WordCtmIntervals"""
         return self.begin < other.begin
+
+
+class CompactCtm:
+    """
+    Word and phone intervals for an utterance stored in arrays, which pickle far more compactly
+    than a :class:`~kalpy.gmm.data.HierarchicalCtm` when sent between processes
+
+    Parameters
+    ----------
+    words: list[str]
+        Label of each word interval
+    pronunciations: list[str]
+        Pronunciation of each word interval
+    word_times: :class:`numpy.ndarray`
+        Begin and end of each word interval
+    phone_times: :class:`numpy.ndarray`
+        Begin, end and confidence of each phone interval
+    phone_ids: :class:`numpy.ndarray`
+        Phone symbol id of each phone interval
+    phone_word_indices: :class:`numpy.ndarray`
+        Index of the word interval that contains each phone interval
+    """
+
+    __slots__ = (
+        "words",
+        "pronunciations",
+        "word_times",
+        "phone_times",
+        "phone_ids",
+        "phone_word_indices",
+    )
+
+    def __init__(
+        self,
+        words: typing.List[str],
+        pronunciations: typing.List[str],
+        word_times: np.ndarray,
+        phone_times: np.ndarray,
+        phone_ids: np.ndarray,
+        phone_word_indices: np.ndarray,
+    ):
+        self.words = words
+        self.pronunciations = pronunciations
+        self.word_times = word_times
+        self.phone_times = phone_times
+        self.phone_ids = phone_ids
+        self.phone_word_indices = phone_word_indices
+
+    @classmethod
+    def from_ctm(cls, ctm) -> CompactCtm:
+        """
+        Convert a hierarchical CTM
+
+        Parameters
+        ----------
+        ctm: :class:`~kalpy.gmm.data.HierarchicalCtm`
+            Word intervals with their phone intervals
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.data.CompactCtm`
+            Compact intervals
+        """
+        words = []
+        pronunciations = []
+        word_times = []
+        phone_times = []
+        phone_ids = []
+        phone_word_indices = []
+        for i, word_interval in enumerate(ctm.word_intervals):
+            words.append(word_interval.label)
+            pronunciations.append(word_interval.pronunciation)
+            word_times.append((word_interval.begin, word_interval.end))
+            for interval in word_interval.phones:
+                phone_times.append(
+                    (
+                        interval.begin,
+                        interval.end,
+                        interval.confidence if interval.confidence else 0.0,
+                    )
+                )
+                phone_ids.append(interval.symbol)
+                phone_word_indices.append(i)
+        return cls(
+            words,
+            pronunciations,
+            np.array(word_times, dtype=np.float64).reshape(-1, 2),
+            np.array(phone_times, dtype=np.float64).reshape(-1, 3),
+            np.array(phone_ids, dtype=np.int32),
+            np.array(phone_word_indices, dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        """Number of word intervals"""
+        return len(self.words)
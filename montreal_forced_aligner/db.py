@@ -1,10 +1,15 @@
 """Database classes"""
 from __future__ import annotations
 
+import csv
+import io
 import logging
 import os
 import re
+import sqlite3
+import time
 import typing
+from contextlib import contextmanager
 from pathlib import Path
 
 import librosa
@@ -26,6 +31,7 @@ from sqlalchemy.orm import Bundle, declarative_base, joinedload, relationship
 
 from montreal_forced_aligner import config
 from montreal_forced_aligner.data import (
+    BulkUpdateStrategy,
     CtmInterval,
     PhoneSetType,
     PhoneType,
@@ -60,18 +66,35 @@ __all__ = [
     "WordInterval",
     "M2MSymbol",
     "Job",
+    "JobCheckpoint",
+    "IdAllocation",
+    "IdAllocator",
     "Word2Job",
     "M2M2Job",
     "Dictionary2Job",
     "Grapheme",
     "MfaSqlBase",
     "bulk_update",
+    "bulk_update_strategy",
+    "deferred_indexes",
+    "drop_secondary_indexes",
+    "rebuild_indexes",
+    "migrate_indexes",
+    "job_utterance_query",
+    "set_bulk_load_settings",
+    "SqliteBulkLoader",
     "get_next_primary_key",
+    "configure_sqlite_engine",
+    "sqlite_connection_pragmas",
+    "get_id_allocator",
     "full_load_utterance",
 ]
 
 MfaSqlBase = declarative_base()
 
+#: SQLite supports ``RETURNING`` clauses from version 3.35
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 
 class PathType(types.TypeDecorator):
     impl = types.String
@@ -89,6 +112,75 @@ class PathType(types.TypeDecorator):
         return Path(value)
 
 
+def sqlite_connection_pragmas(read_only: bool = False) -> typing.List[str]:
+    """
+    Generate the PRAGMA statements that tune new SQLite connections, based on the
+    :code:`SQLITE_*` configuration values
+
+    Parameters
+    ----------
+    read_only: bool
+        Flag for connections that only read from the database, defaults to False
+
+    Returns
+    -------
+    list[str]
+        PRAGMA statements
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT)}",
+        f"PRAGMA cache_size={int(config.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # WAL lets readers continue while a writer commits, which makes NORMAL syncing safe
+        pragmas.extend(["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"])
+    return pragmas
+
+
+def configure_sqlite_engine(
+    engine: sqlalchemy.engine.Engine, read_only: bool = False
+) -> sqlalchemy.engine.Engine:
+    """
+    Apply the SQLite connection profile from
+    :func:`~montreal_forced_aligner.db.sqlite_connection_pragmas` to every new connection of
+    an engine, engines for other databases are returned unchanged
+
+    Parameters
+    ----------
+    engine: :class:`~sqlalchemy.engine.Engine`
+        Database engine
+    read_only: bool
+        Flag for engines that only read from the database, defaults to False
+
+    Returns
+    -------
+    :class:`~sqlalchemy.engine.Engine`
+        Configured engine
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+    pragmas = sqlite_connection_pragmas(read_only)
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                try:
+                    cursor.execute(pragma)
+                except sqlite3.OperationalError as e:
+                    # Other connections in a transaction keep the journal mode from changing
+                    logger.debug(f"Could not apply {pragma}: {e}")
+        finally:
+            cursor.close()
+
+    sqlalchemy.event.listen(engine, "connect", set_pragmas)
+    return engine
+
+
 def get_next_primary_key(session: sqlalchemy.orm.Session, database_table: MfaSqlBase):
     pk = session.query(sqlalchemy.func.max(database_table.id)).scalar()
     if not pk:
@@ -109,15 +201,49 @@ def full_load_utterance(session: sqlalchemy.orm.Session, utterance_id: int):
     return utterance
 
 
+BULK_UPDATE_EXECUTEMANY_LIMIT = 1000
+BULK_UPDATE_STAGING_LIMIT = 100000
+BULK_UPDATE_CHUNK_SIZE = 1000
+
+
+def bulk_update_strategy(num_rows: int, dialect_name: str) -> BulkUpdateStrategy:
+    """
+    Select how to update rows of a table based on the number of rows and the database backend
+
+    Parameters
+    ----------
+    num_rows: int
+        Number of rows to update
+    dialect_name: str
+        Name of the SQLAlchemy dialect of the database
+
+    Returns
+    -------
+    :class:`~montreal_forced_aligner.data.BulkUpdateStrategy`
+        Strategy to use
+    """
+    if dialect_name != "postgresql" or num_rows <= BULK_UPDATE_EXECUTEMANY_LIMIT:
+        # Statements run in-process on SQLite, so there are no round trips to save
+        return BulkUpdateStrategy.executemany
+    if num_rows > BULK_UPDATE_STAGING_LIMIT:
+        return BulkUpdateStrategy.staging
+    return BulkUpdateStrategy.values
+
+
 def bulk_update(
     session: sqlalchemy.orm.Session,
     table: MfaSqlBase,
     values: typing.Collection[typing.Dict[str, typing.Any]],
     id_field=None,
+    strategy: typing.Optional[BulkUpdateStrategy] = None,
 ) -> None:
     """
     Perform a bulk update of a database.
 
+    Updates on SQLite and small updates on PostgreSQL run a single prepared statement per row,
+    medium ones on PostgreSQL run chunked ``UPDATE ... FROM (VALUES ...)`` statements, and large
+    ones are copied into a temporary staging table that the table is updated from.
+
     Parameters
     ----------
     session: :class:`sqlalchemy.orm.Session`
@@ -128,53 +254,453 @@ def bulk_update(
         List of field-value dictionaries to insert
     id_field: str, optional
         Optional specifier of the primary key field
+    strategy: :class:`~montreal_forced_aligner.data.BulkUpdateStrategy`, optional
+        Strategy to use, defaults to one selected by
+        :func:`~montreal_forced_aligner.db.bulk_update_strategy`
     """
     if len(values) == 0:
         return
     if id_field is None:
         id_field = "id"
+    if not isinstance(values, list):
+        values = list(values)
+    dialect = session.get_bind().dialect
+    if strategy is None:
+        strategy = bulk_update_strategy(len(values), dialect.name)
+    column_names = [x for x in values[0].keys() if x != id_field]
+    columns = [table.__table__.c[x] for x in column_names]
+    id_column = table.__table__.c[id_field]
+    table_name = table.__tablename__
+    sql_column_names = [f'"{x}"' for x in column_names]
+    set_statements = ", ".join(f"{c} = b.{c}" for c in sql_column_names)
+    if strategy is BulkUpdateStrategy.executemany:
+        statement = sqlalchemy.text(
+            f"UPDATE {table_name} SET "
+            + ", ".join(f"{c} = :{x}" for c, x in zip(sql_column_names, column_names))
+            + f" WHERE {id_field} = :{id_field}"
+        ).bindparams(
+            *(sqlalchemy.bindparam(c.name, type_=c.type) for c in [id_column, *columns])
+        )
+        session.execute(statement, values)
+    elif strategy is BulkUpdateStrategy.values:
+        _bulk_update_values(session, table_name, id_column, columns, values, set_statements)
+    else:
+        _bulk_update_staging(session, table_name, id_column, columns, values, set_statements)
+
 
-    column_names = [x for x in values[0].keys()]
-    columns = [getattr(table, x)._copy() for x in column_names if x != id_field]
-    sql_column_names = [f'"{x}"' for x in column_names if x != id_field]
-    if config.USE_POSTGRES:
-        session.execute(sqlalchemy.text(f"ALTER TABLE {table.__tablename__} DISABLE TRIGGER all"))
-        session.commit()
-    with session.begin_nested():
-        temp_table = sqlalchemy.Table(
-            f"temp_{table.__tablename__}",
-            MfaSqlBase.metadata,
-            sqlalchemy.Column(id_field, sqlalchemy.Integer, primary_key=True),
-            *columns,
-            prefixes=["TEMPORARY"],
-            extend_existing=True,
+def _bulk_update_values(
+    session: sqlalchemy.orm.Session,
+    table_name: str,
+    id_column: sqlalchemy.Column,
+    columns: typing.List[sqlalchemy.Column],
+    values: typing.List[typing.Dict[str, typing.Any]],
+    set_statements: str,
+) -> None:
+    """Update rows through ``UPDATE ... FROM (VALUES ...)`` statements over chunks of rows"""
+    dialect = session.get_bind().dialect
+    all_columns = [id_column, *columns]
+    column_list = ", ".join(f'"{c.name}"' for c in all_columns)
+    # Keep under SQLite's limit of 32766 parameters per statement
+    chunk_size = max(1, min(BULK_UPDATE_CHUNK_SIZE, 32000 // len(all_columns)))
+    casts = {}
+    if dialect.name == "postgresql":
+        # Parameters are otherwise typed as text, which does not assign to enums or numbers
+        casts = {c.name: c.type.compile(dialect=dialect) for c in all_columns}
+    statements = {}
+    for chunk_begin in range(0, len(values), chunk_size):
+        chunk = values[chunk_begin : chunk_begin + chunk_size]
+        if len(chunk) not in statements:
+            # Every full chunk reuses the same statement, so it is only compiled once
+            rows = []
+            bind_params = []
+            for i in range(len(chunk)):
+                placeholders = []
+                for c in all_columns:
+                    key = f"{c.name}_{i}"
+                    bind_params.append(sqlalchemy.bindparam(key, type_=c.type))
+                    if c.name in casts:
+                        placeholders.append(f"CAST(:{key} AS {casts[c.name]})")
+                    else:
+                        placeholders.append(f":{key}")
+                rows.append(f"({', '.join(placeholders)})")
+            statements[len(chunk)] = sqlalchemy.text(
+                f"WITH b({column_list}) AS (VALUES {', '.join(rows)}) "
+                f"UPDATE {table_name} SET {set_statements} "
+                f'FROM b WHERE {table_name}."{id_column.name}" = b."{id_column.name}"'
+            ).bindparams(*bind_params)
+        parameters = {
+            f"{c.name}_{i}": row[c.name] for i, row in enumerate(chunk) for c in all_columns
+        }
+        session.execute(statements[len(chunk)], parameters)
+
+
+def _bulk_update_staging(
+    session: sqlalchemy.orm.Session,
+    table_name: str,
+    id_column: sqlalchemy.Column,
+    columns: typing.List[sqlalchemy.Column],
+    values: typing.List[typing.Dict[str, typing.Any]],
+    set_statements: str,
+) -> None:
+    """
+    Update rows from a temporary staging table, loaded through ``COPY`` on PostgreSQL and
+    prepared inserts otherwise
+    """
+    dialect = session.get_bind().dialect
+    all_columns = [id_column, *columns]
+    column_list = ", ".join(f'"{c.name}"' for c in all_columns)
+    staging_table = f"temp_{table_name}"
+    if dialect.name == "postgresql":
+        session.execute(sqlalchemy.text(f"ALTER TABLE {table_name} DISABLE TRIGGER all"))
+    session.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {staging_table}"))
+    session.execute(
+        sqlalchemy.text(
+            f"CREATE TEMPORARY TABLE {staging_table} AS "
+            f"SELECT {column_list} FROM {table_name} WHERE 1 = 0"
+        )
+    )
+    if dialect.name == "postgresql":
+        processors = [c.type.bind_processor(dialect) for c in all_columns]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in values:
+            data = []
+            for c, processor in zip(all_columns, processors):
+                value = row[c.name]
+                if processor is not None:
+                    value = processor(value)
+                # Empty strings are written as empty fields, so NULLs need their own marker
+                data.append("\\N" if value is None else value)
+            writer.writerow(data)
+        buffer.seek(0)
+        cursor = session.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
         )
-        create_statement = str(
-            sqlalchemy.schema.CreateTable(temp_table).compile(session.get_bind())
+        cursor.close()
+        session.execute(sqlalchemy.text(f"ANALYZE {staging_table}"))
+    else:
+        session.execute(
+            sqlalchemy.text(
+                f"INSERT INTO {staging_table} ({column_list}) VALUES "
+                f"({', '.join(':' + c.name for c in all_columns)})"
+            ).bindparams(*(sqlalchemy.bindparam(c.name, type_=c.type) for c in all_columns)),
+            values,
         )
-        session.execute(sqlalchemy.text(create_statement))
-        session.execute(temp_table.insert(), values)
-
-        set_statements = []
-        for c in sql_column_names:
-            set_statements.append(f""" {c} = b.{c}""")
-        set_statements = ",\n".join(set_statements)
-        sql = f"""
-        UPDATE {table.__tablename__}
-        SET
-            {set_statements}
-        FROM temp_{table.__tablename__} AS b
-        WHERE {table.__tablename__}.{id_field}=b.{id_field};
-        """
-        session.execute(sqlalchemy.text(sql))
-
-        # drop temp table
-        session.execute(sqlalchemy.text(f"DROP TABLE temp_{table.__tablename__}"))
-    if config.USE_POSTGRES:
-        session.execute(sqlalchemy.text(f"ALTER TABLE {table.__tablename__} ENABLE TRIGGER all"))
-        session.commit()
-        session.execute(sqlalchemy.text("DISCARD TEMP"))
-    MfaSqlBase.metadata.remove(temp_table)
+    session.execute(
+        sqlalchemy.text(
+            f"UPDATE {table_name} SET {set_statements} FROM {staging_table} AS b "
+            f'WHERE {table_name}."{id_column.name}" = b."{id_column.name}"'
+        )
+    )
+    session.execute(sqlalchemy.text(f"DROP TABLE {staging_table}"))
+    if dialect.name == "postgresql":
+        session.execute(sqlalchemy.text(f"ALTER TABLE {table_name} ENABLE TRIGGER all"))
+
+
+def drop_secondary_indexes(
+    session: sqlalchemy.orm.Session, tables: typing.List[MfaSqlBase]
+) -> typing.List[sqlalchemy.Index]:
+    """
+    Drop the non-unique indexes of tables ahead of a bulk load and commit the session
+
+    The session is committed part-way through, along with anything the caller had pending in
+    it, so callers that need their own transaction kept open should pass a separate session.
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        SqlAlchemy session to use
+    tables: list[:class:`~montreal_forced_aligner.db.MfaSqlBase`]
+        Tables to load
+
+    Returns
+    -------
+    list[:class:`sqlalchemy.Index`]
+        Dropped indexes, to pass to :func:`~montreal_forced_aligner.db.rebuild_indexes`
+    """
+    indexes = [
+        index
+        for table in tables
+        for index in sorted(table.__table__.indexes, key=lambda x: x.name)
+        if not index.unique
+    ]
+    conn = session.connection()
+    for index in indexes:
+        index.drop(conn, checkfirst=True)
+    session.commit()
+    return indexes
+
+
+def set_bulk_load_settings(cursor, index_build: bool = False) -> None:
+    """
+    Apply transaction-local PostgreSQL settings for a bulk stage, so that it does not wait on
+    write-ahead log flushes whatever the server's tuning profile is
+
+    Parameters
+    ----------
+    cursor: :class:`psycopg2.extensions.cursor`
+        Cursor of the connection running the bulk stage, with a transaction open or about
+        to begin
+    index_build: bool
+        Flag for also letting index builds use parallel workers
+    """
+    settings = {"synchronous_commit": "off"}
+    if index_build:
+        settings["max_parallel_maintenance_workers"] = str(config.NUM_JOBS)
+    for name, value in settings.items():
+        cursor.execute(f"SET LOCAL {name} = '{value}'")
+
+
+def rebuild_indexes(session: sqlalchemy.orm.Session, indexes: typing.List[sqlalchemy.Index]):
+    """
+    Create indexes dropped by :func:`~montreal_forced_aligner.db.drop_secondary_indexes`
+    and commit the session
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        SqlAlchemy session to use
+    indexes: list[:class:`sqlalchemy.Index`]
+        Indexes to create
+    """
+    if not indexes:
+        return
+    begin = time.time()
+    conn = session.connection()
+    if conn.dialect.name == "postgresql":
+        cursor = conn.connection.cursor()
+        set_bulk_load_settings(cursor, index_build=True)
+        cursor.close()
+    for index in indexes:
+        index.create(conn, checkfirst=True)
+    session.commit()
+    logger.debug(f"Rebuilding {len(indexes)} indexes took {time.time() - begin:.3f} seconds")
+
+
+def migrate_indexes(engine: sqlalchemy.engine.Engine) -> typing.List[str]:
+    """
+    Create the indexes of existing tables that are missing from a database, and drop and
+    recreate the ones whose columns or uniqueness no longer match their definitions
+
+    Indexes that are not defined on the tables, such as the ivector indexes, are left alone.
+
+    Parameters
+    ----------
+    engine: :class:`sqlalchemy.engine.Engine`
+        Engine of the database to update
+
+    Returns
+    -------
+    list[str]
+        Names of the indexes that were created or rebuilt
+    """
+    begin = time.time()
+    rebuilt = []
+    with engine.begin() as conn:
+        inspector = sqlalchemy.inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in MfaSqlBase.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {x["name"]: x for x in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda x: x.name):
+                current = existing.get(index.name, None)
+                if current is not None:
+                    if current["column_names"] == [x.name for x in index.columns] and bool(
+                        current["unique"]
+                    ) == bool(index.unique):
+                        continue
+                    index.drop(conn)
+                index.create(conn)
+                rebuilt.append(index.name)
+    if rebuilt:
+        logger.debug(
+            f"Rebuilding {len(rebuilt)} outdated indexes took {time.time() - begin:.3f} seconds"
+        )
+    return rebuilt
+
+
+@contextmanager
+def deferred_indexes(
+    session: sqlalchemy.orm.Session, tables: typing.List[MfaSqlBase]
+) -> typing.Generator:
+    """
+    Drop the non-unique indexes of tables for a bulk load and rebuild them once it finishes,
+    so that inserted rows do not update every index one at a time
+
+    The session is committed when the indexes are dropped and again when they are rebuilt,
+    see :func:`~montreal_forced_aligner.db.drop_secondary_indexes`.
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        SqlAlchemy session to use
+    tables: list[:class:`~montreal_forced_aligner.db.MfaSqlBase`]
+        Tables to load
+    """
+    indexes = drop_secondary_indexes(session, tables)
+    try:
+        yield
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        rebuild_indexes(session, indexes)
+
+
+def job_utterance_query(
+    session: sqlalchemy.orm.Session, job_id: int, dictionary_id: int, *columns
+) -> sqlalchemy.orm.Query:
+    """
+    Query columns of the utterances in a job that belong to speakers of a dictionary
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        SqlAlchemy session to use
+    job_id: int
+        Job of the utterances
+    dictionary_id: int
+        Dictionary of the utterances' speakers
+    columns: :class:`sqlalchemy.orm.InstrumentedAttribute`
+        Columns to query
+
+    Returns
+    -------
+    :class:`sqlalchemy.orm.Query`
+        Utterance query
+    """
+    return (
+        session.query(*columns)
+        .join(Utterance.speaker)
+        .filter(Utterance.job_id == job_id)
+        .filter(Speaker.dictionary_id == dictionary_id)
+    )
+
+
+class SqliteBulkLoader:
+    """
+    Loader that inserts rows straight into SQLite tables with prepared statements, in a single
+    transaction on one connection with synchronous writes turned off
+
+    Parameters
+    ----------
+    engine: :class:`~sqlalchemy.engine.Engine`
+        SQLite database engine
+    batch_size: int
+        Number of rows to buffer for each table before inserting them, defaults to 100000
+    cache_size: int
+        Page cache size for the connection while loading, negative values are in KiB,
+        defaults to 256 MiB
+    """
+
+    def __init__(
+        self, engine: sqlalchemy.engine.Engine, batch_size: int = 100000, cache_size: int = -262144
+    ):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.conn = None
+        self.cursor = None
+        self.buffers: typing.Dict[str, typing.List[typing.Dict[str, typing.Any]]] = {}
+        self.statements: typing.Dict[str, str] = {}
+        self._previous_pragmas = {}
+
+    def __enter__(self) -> SqliteBulkLoader:
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def begin(self) -> None:
+        """Open a connection, relax durability settings and start the transaction"""
+        self.conn = self.engine.raw_connection()
+        self.cursor = self.conn.cursor()
+        try:
+            for pragma in ["synchronous", "cache_size"]:
+                self._previous_pragmas[pragma] = self.cursor.execute(
+                    f"PRAGMA {pragma}"
+                ).fetchone()[0]
+            try:
+                self.cursor.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError as e:
+                # Other connections can keep the journal mode from changing
+                logger.debug(f"Could not switch the database to WAL journaling: {e}")
+            self.cursor.execute("PRAGMA synchronous=OFF")
+            self.cursor.execute(f"PRAGMA cache_size={self.cache_size}")
+            self.cursor.execute("BEGIN")
+        except Exception:
+            self.rollback()
+            raise
+
+    def commit(self) -> None:
+        """Insert any buffered rows, commit the transaction and close the connection"""
+        try:
+            self.flush()
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._close()
+
+    def rollback(self) -> None:
+        """Discard the transaction and close the connection"""
+        try:
+            self.conn.rollback()
+        finally:
+            self._close()
+
+    def _close(self) -> None:
+        try:
+            for pragma, value in self._previous_pragmas.items():
+                self.cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            self.cursor.close()
+            self.conn.close()
+            self.cursor = None
+            self.conn = None
+            self.buffers = {}
+            self.statements = {}
+
+    def add(self, table: MfaSqlBase, rows: typing.List[typing.Dict[str, typing.Any]]) -> None:
+        """
+        Buffer rows for a table, inserting them once the table has ``batch_size`` rows buffered
+
+        Parameters
+        ----------
+        table: :class:`~montreal_forced_aligner.db.MfaSqlBase`
+            Table to insert into
+        rows: list[dict[str, Any]]
+            Column-value dictionaries, with the same columns for every row of a table
+        """
+        if not rows:
+            return
+        table_name = table.__tablename__
+        if table_name not in self.statements:
+            columns = list(rows[0].keys())
+            column_names = ", ".join(f'"{x}"' for x in columns)
+            placeholders = ", ".join(f":{x}" for x in columns)
+            self.statements[table_name] = (
+                f"INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})"
+            )
+            self.buffers[table_name] = []
+        self.buffers[table_name].extend(rows)
+        if len(self.buffers[table_name]) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert all buffered rows, in the order their tables were first added"""
+        for table_name, rows in self.buffers.items():
+            if rows:
+                self.cursor.executemany(self.statements[table_name], rows)
+                self.buffers[table_name] = []
 
 
 Dictionary2Job = sqlalchemy.Table(
@@ -193,6 +719,205 @@ SpeakerOrdering = sqlalchemy.Table(
 )
 
 
+class IdAllocator:
+    """
+    Allocator that reserves contiguous blocks of primary keys, so that writers can assign ids
+    locally without querying for the largest id of a table or colliding with other writers
+
+    On PostgreSQL, blocks are reserved by advancing the table's id sequence under an advisory
+    lock, and on SQLite by updating the table's row in
+    :class:`~montreal_forced_aligner.db.IdAllocation`.  Reservations always start after the
+    largest id in the table, so rows inserted without the allocator are skipped over.  Other
+    integer columns that need unique values, like ``word.mapping_id``, are reserved the same way
+    with their own sequence or allocation row.
+
+    On SQLite 3.35 and later a reservation is a single upsert with ``RETURNING``, and on older
+    versions it is an insert, an update and a select in the same transaction.  The allocation
+    table is created along with the rest of the schema.
+
+    Parameters
+    ----------
+    engine: :class:`~sqlalchemy.engine.Engine`
+        Database engine
+    block_size: int
+        Number of ids to reserve at a time in :meth:`.IdAllocator.ids`, defaults to 10000
+    """
+
+    def __init__(self, engine: sqlalchemy.engine.Engine, block_size: int = 10000):
+        self.engine = engine
+        self.block_size = block_size
+        self.sequences: typing.Dict[str, str] = {}
+
+    def reserve(self, table: MfaSqlBase, count: int, connection=None, column: str = "id") -> int:
+        """
+        Reserve a contiguous block of ids for a table
+
+        Parameters
+        ----------
+        table: :class:`~montreal_forced_aligner.db.MfaSqlBase`
+            Table to reserve ids for
+        count: int
+            Number of ids to reserve
+        connection: optional
+            DBAPI connection to reserve the ids with, which on SQLite must be the connection of
+            any open write transaction, defaults to a new connection that is committed right away
+        column: str
+            Integer column to reserve values of, defaults to the primary key
+
+        Returns
+        -------
+        int
+            First id of the block
+        """
+        own_connection = connection is None
+        if own_connection:
+            connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if self.engine.dialect.name == "postgresql":
+                first_id = self._reserve_postgres(cursor, table.__tablename__, column, count)
+            else:
+                first_id = self._reserve_sqlite(cursor, table.__tablename__, column, count)
+            cursor.close()
+            if own_connection:
+                connection.commit()
+        finally:
+            if own_connection:
+                connection.close()
+        return first_id
+
+    def ids(
+        self,
+        table: MfaSqlBase,
+        connection=None,
+        block_size: typing.Optional[int] = None,
+        column: str = "id",
+    ) -> typing.Generator[int]:
+        """
+        Generate ids for a table, reserving a new block each time the current one runs out
+
+        Parameters
+        ----------
+        table: :class:`~montreal_forced_aligner.db.MfaSqlBase`
+            Table to generate ids for
+        connection: optional
+            DBAPI connection to reserve blocks with, see :meth:`.IdAllocator.reserve`
+        block_size: int, optional
+            Number of ids to reserve at a time, defaults to the allocator's block size
+        column: str
+            Integer column to generate values of, defaults to the primary key
+
+        Yields
+        ------
+        int
+            Unused id
+        """
+        if block_size is None:
+            block_size = self.block_size
+        while True:
+            first_id = self.reserve(table, block_size, connection, column)
+            yield from range(first_id, first_id + block_size)
+
+    @staticmethod
+    def _allocation_key(table_name: str, column: str) -> str:
+        if column == "id":
+            return table_name
+        return f"{table_name}.{column}"
+
+    def _reserve_postgres(self, cursor, table_name: str, column: str, count: int) -> int:
+        key = self._allocation_key(table_name, column)
+        if key not in self.sequences:
+            cursor.execute(
+                "SELECT pg_get_serial_sequence(%(table)s, %(column)s)",
+                {"table": table_name, "column": column},
+            )
+            sequence = cursor.fetchone()[0]
+            if sequence is None:
+                sequence = f"{table_name}_{column}_allocation_seq"
+                cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+            self.sequences[key] = sequence
+        sequence = self.sequences[key]
+        cursor.execute("SELECT pg_advisory_lock(hashtext(%(sequence)s))", {"sequence": sequence})
+        try:
+            cursor.execute(
+                "SELECT GREATEST("
+                f"(SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END "
+                f"FROM {sequence}), "
+                f"(SELECT coalesce(max({column}), 0) FROM {table_name})) + 1"
+            )
+            first_id = cursor.fetchone()[0]
+            if count > 0:
+                cursor.execute(
+                    "SELECT setval(%(sequence)s, %(last_id)s)",
+                    {"sequence": sequence, "last_id": first_id + count - 1},
+                )
+        finally:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(hashtext(%(sequence)s))", {"sequence": sequence}
+            )
+        return first_id
+
+    def _reserve_sqlite(self, cursor, table_name: str, column: str, count: int) -> int:
+        key = self._allocation_key(table_name, column)
+        table_start = f"(SELECT coalesce(max({column}), 0) + 1 FROM {table_name})"
+        if SQLITE_RETURNING:
+            cursor.execute(
+                f"INSERT INTO {IdAllocation.__tablename__} (table_name, next_id) "
+                f"VALUES (:table_name, {table_start} + :count) "
+                "ON CONFLICT (table_name) DO UPDATE SET next_id = "
+                f"max({IdAllocation.__tablename__}.next_id + :count, excluded.next_id) "
+                "RETURNING next_id - :count",
+                {"table_name": key, "count": count},
+            )
+            return cursor.fetchone()[0]
+        # The first write takes the database's write lock, so the block read back afterwards
+        # cannot be handed out to another connection
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {IdAllocation.__tablename__} (table_name, next_id) "
+            f"VALUES (:table_name, {table_start})",
+            {"table_name": key},
+        )
+        cursor.execute(
+            f"UPDATE {IdAllocation.__tablename__} "
+            f"SET next_id = max(next_id, {table_start}) + :count WHERE table_name = :table_name",
+            {"table_name": key, "count": count},
+        )
+        cursor.execute(
+            f"SELECT next_id - :count FROM {IdAllocation.__tablename__} "
+            "WHERE table_name = :table_name",
+            {"table_name": key, "count": count},
+        )
+        return cursor.fetchone()[0]
+
+
+_ID_ALLOCATORS: typing.Dict[str, IdAllocator] = {}
+_ID_ALLOCATORS_PID = None
+
+
+def get_id_allocator(engine: sqlalchemy.engine.Engine) -> IdAllocator:
+    """
+    Get the id allocator of the current process for a database
+
+    Parameters
+    ----------
+    engine: :class:`~sqlalchemy.engine.Engine`
+        Database engine
+
+    Returns
+    -------
+    :class:`~montreal_forced_aligner.db.IdAllocator`
+        Cached allocator
+    """
+    global _ID_ALLOCATORS_PID
+    if _ID_ALLOCATORS_PID != os.getpid():
+        _ID_ALLOCATORS.clear()
+        _ID_ALLOCATORS_PID = os.getpid()
+    key = engine.url.render_as_string(hide_password=False)
+    if key not in _ID_ALLOCATORS:
+        _ID_ALLOCATORS[key] = IdAllocator(engine)
+    return _ID_ALLOCATORS[key]
+
+
 class DictBundle(Bundle):
     """
     SqlAlchemy custom Bundle class for loading variable column counts
@@ -1500,6 +2225,7 @@ class Utterance(MfaSqlBase):
         sqlalchemy.Index(
             "utterance_position_index", "file_id", "speaker_id", "begin", "end", "channel"
         ),
+        sqlalchemy.Index("utterance_job_speaker_index", "job_id", "speaker_id"),
     )
 
     @hybrid_property
@@ -1859,7 +2585,14 @@ class PhoneInterval(MfaSqlBase):
     workflow = relationship("CorpusWorkflow", back_populates="phone_intervals")
 
     __table_args__ = (
-        sqlalchemy.Index("phone_utterance_workflow_index", "utterance_id", "workflow_id"),
+        sqlalchemy.Index(
+            "phone_utterance_workflow_index",
+            "utterance_id",
+            "workflow_id",
+            "begin",
+            "end",
+            "phone_id",
+        ),
     )
 
     @hybrid_property
@@ -1983,7 +2716,14 @@ class WordInterval(MfaSqlBase):
     )
 
     __table_args__ = (
-        sqlalchemy.Index("word_utterance_workflow_index", "utterance_id", "workflow_id"),
+        sqlalchemy.Index(
+            "word_utterance_workflow_index",
+            "utterance_id",
+            "workflow_id",
+            "begin",
+            "end",
+            "word_id",
+        ),
     )
 
     @hybrid_property
@@ -2266,6 +3006,52 @@ class Job(MfaSqlBase):
         return output
 
 
+class JobCheckpoint(MfaSqlBase):
+    """
+    Database class for recording that a job finished a resumable stage
+
+    Parameters
+    ----------
+    job_id: int
+        Foreign key to :class:`~montreal_forced_aligner.db.Job`
+    stage: str
+        Name of the multiprocessing function for the stage
+    fingerprint: str
+        Hash of the job's arguments for the stage
+    time_stamp: :class:`datetime.datetime`
+        Time that the job finished
+    job: :class:`~montreal_forced_aligner.db.Job`
+        Job object
+    """
+
+    __tablename__ = "job_checkpoint"
+
+    job_id = Column(ForeignKey("job.id", ondelete="CASCADE"), primary_key=True)
+    stage = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    time_stamp = Column(DateTime, nullable=False, server_default=sqlalchemy.func.now())
+    job = relationship("Job")
+
+
+class IdAllocation(MfaSqlBase):
+    """
+    Database class for tracking the ids reserved for tables by
+    :class:`~montreal_forced_aligner.db.IdAllocator` on SQLite
+
+    Parameters
+    ----------
+    table_name: str
+        Name of the table, or ``table.column`` for columns other than the primary key
+    next_id: int
+        Next id that has not been reserved
+    """
+
+    __tablename__ = "id_allocation"
+
+    table_name = Column(String, primary_key=True)
+    next_id = Column(Integer, nullable=False)
+
+
 class M2MSymbol(MfaSqlBase):
     """
 
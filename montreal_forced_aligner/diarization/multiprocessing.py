@@ -38,6 +38,7 @@ from montreal_forced_aligner.data import (
     MfaArguments,
 )
 from montreal_forced_aligner.db import File, Job, SoundFile, Speaker, Utterance
+from montreal_forced_aligner.resources import plan_resources, set_blas_threads
 
 try:
     import warnings
@@ -276,13 +277,9 @@ def cluster_matrix(
     logger.debug(f"Running {cluster_type}...")
 
     if sys.platform == "win32" and cluster_type is ClusterType.kmeans:
-        os.environ["OMP_NUM_THREADS"] = "1"
-        os.environ["OPENBLAS_NUM_THREADS"] = "1"
-        os.environ["MKL_NUM_THREADS"] = "1"
+        set_blas_threads(1)
     else:
-        os.environ["OMP_NUM_THREADS"] = f"{config.NUM_JOBS}"
-        os.environ["OPENBLAS_NUM_THREADS"] = f"{config.NUM_JOBS}"
-        os.environ["MKL_NUM_THREADS"] = f"{config.NUM_JOBS}"
+        set_blas_threads(plan_resources(1, config.NUM_JOBS).blas_threads)
     distance_threshold = kwargs.pop("distance_threshold", None)
     plda: Plda = kwargs.pop("plda", None)
     min_cluster_size = kwargs.pop("min_cluster_size", 15)
@@ -458,9 +455,7 @@ def cluster_matrix(
             )
             if strict:
                 raise
-    os.environ["OMP_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
-    os.environ["OPENBLAS_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
-    os.environ["MKL_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
+    set_blas_threads(config.BLAS_NUM_THREADS)
 
     return c_labels
 
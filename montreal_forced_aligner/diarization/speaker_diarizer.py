@@ -72,6 +72,7 @@ from montreal_forced_aligner.diarization.multiprocessing import (
 from montreal_forced_aligner.exceptions import KaldiProcessingError
 from montreal_forced_aligner.helper import load_configuration, mfa_open
 from montreal_forced_aligner.models import IvectorExtractorModel
+from montreal_forced_aligner.resources import plan_resources, set_blas_threads
 from montreal_forced_aligner.textgrid import construct_output_path, export_textgrid
 from montreal_forced_aligner.utils import log_kaldi_errors, run_kaldi_function, thirdparty_binary
 
@@ -1086,9 +1087,7 @@ class SpeakerDiarizer(IvectorCorpusMixin, TopLevelMfaWorker, FileExporterMixin):
             return
         self.setup()
 
-        os.environ["OMP_NUM_THREADS"] = f"{config.NUM_JOBS}"
-        os.environ["OPENBLAS_NUM_THREADS"] = f"{config.NUM_JOBS}"
-        os.environ["MKL_NUM_THREADS"] = f"{config.NUM_JOBS}"
+        set_blas_threads(plan_resources(1, config.NUM_JOBS).blas_threads)
         if self.metric is DistanceMetric.plda:
             self.plda = read_kaldi_object(Plda, self.plda_path)
         if self.evaluation_mode and config.DEBUG:
@@ -1198,9 +1197,7 @@ class SpeakerDiarizer(IvectorCorpusMixin, TopLevelMfaWorker, FileExporterMixin):
         if self.evaluation_mode:
             self.evaluate_clustering()
 
-        os.environ["OMP_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
-        os.environ["OPENBLAS_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
-        os.environ["MKL_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
+        set_blas_threads(config.BLAS_NUM_THREADS)
 
     def clean_up_unknown_speaker(self):
         with self.session() as session:
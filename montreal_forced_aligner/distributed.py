@@ -0,0 +1,344 @@
+"""
+Distributed execution
+=====================
+
+Backend for running multiprocessing jobs on worker nodes over TCP.  Worker nodes must see the
+same paths for the corpus, models and working directories, for instance through a shared
+filesystem, and must be able to connect to the database.
+
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import typing
+from multiprocessing.connection import Client, Connection, Listener
+
+from montreal_forced_aligner import config
+from montreal_forced_aligner.exceptions import MFAError, MultiprocessingError
+from montreal_forced_aligner.resources import ResourcePlan, plan_stage
+from montreal_forced_aligner.utils import (
+    JobFinished,
+    KaldiExecutor,
+    KaldiProcessWorkerMp,
+    ResultBatch,
+    ResultBudget,
+)
+
+__all__ = ["KaldiWorkerNode", "RemoteKaldiExecutor", "parse_worker_nodes", "get_worker_authkey"]
+
+logger = logging.getLogger("mfa")
+
+WORKER_AUTHKEY_VARIABLE = "MFA_WORKER_AUTHKEY"
+
+
+def get_worker_authkey(authkey: typing.Optional[str] = None) -> bytes:
+    """
+    Get the key that worker nodes and the coordinator use to authenticate connections
+
+    Parameters
+    ----------
+    authkey: str, optional
+        Key to use, defaults to the ``MFA_WORKER_AUTHKEY`` environment variable
+
+    Returns
+    -------
+    bytes
+        Authentication key
+
+    Raises
+    ------
+    :class:`~montreal_forced_aligner.exceptions.MFAError`
+        If no key is specified
+    """
+    if not authkey:
+        authkey = os.environ.get(WORKER_AUTHKEY_VARIABLE, "")
+    if not authkey:
+        raise MFAError(
+            "An authentication key is required for worker nodes, "
+            f"please set {WORKER_AUTHKEY_VARIABLE}."
+        )
+    return authkey.encode("utf8")
+
+
+def parse_worker_nodes(worker_nodes: str) -> typing.List[typing.Tuple[str, int]]:
+    """
+    Parse a comma-separated list of worker node addresses
+
+    Parameters
+    ----------
+    worker_nodes: str
+        Addresses in the form ``host:port,host:port``
+
+    Returns
+    -------
+    list[tuple[str, int]]
+        Host and port for each node
+    """
+    nodes = []
+    for node in worker_nodes.split(","):
+        node = node.strip()
+        if not node:
+            continue
+        host, port = node.rsplit(":", maxsplit=1)
+        nodes.append((host, int(port)))
+    return nodes
+
+
+class KaldiWorkerNode:
+    """
+    Server that runs jobs sent by a
+    :class:`~montreal_forced_aligner.distributed.RemoteKaldiExecutor`
+
+    Each connection from the coordinator is a slot that runs one job at a time in its own process,
+    and the node advertises ``num_workers`` slots when a connection is opened.
+
+    Parameters
+    ----------
+    address: tuple[str, int]
+        Host and port to listen on, port 0 picks any free port
+    authkey: bytes
+        Key for authenticating connections
+    num_workers: int, optional
+        Number of jobs to run at once, defaults to the number of jobs
+    database_string: str, optional
+        Connection string to use in place of the coordinator's, for when the database
+        is reached through a different address from worker nodes
+    """
+
+    def __init__(
+        self,
+        address: typing.Tuple[str, int],
+        authkey: bytes,
+        num_workers: int = None,
+        database_string: typing.Optional[str] = None,
+    ):
+        if num_workers is None:
+            num_workers = config.NUM_JOBS
+        self.num_workers = num_workers
+        self.database_string = database_string
+        self.listener = Listener(address, authkey=authkey)
+        self.slots = queue.Queue()
+        for i in range(num_workers):
+            self.slots.put(i)
+        self.budget = ResultBudget()
+        self.stage_resources = {}
+        self.stopped = threading.Event()
+
+    def stage_plan(self, stage: str) -> ResourcePlan:
+        """
+        Get the resource plan for a stage's jobs on this node
+
+        Parameters
+        ----------
+        stage: str
+            Name of the KaldiFunction for the stage
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.resources.ResourcePlan`
+            Plan for the stage
+        """
+        if stage not in self.stage_resources:
+            self.stage_resources[stage] = plan_stage(stage, self.num_workers)
+        return self.stage_resources[stage]
+
+    @property
+    def address(self) -> typing.Tuple[str, int]:
+        """Host and port the node is listening on"""
+        return self.listener.address
+
+    def run_task(self, conn: Connection, function_class, args) -> None:
+        """
+        Run a job in a separate process and send its results back to the coordinator
+
+        Parameters
+        ----------
+        conn: :class:`~multiprocessing.connection.Connection`
+            Connection to the coordinator
+        function_class: type
+            KaldiFunction class
+        args: :class:`~montreal_forced_aligner.data.MfaArguments`
+            Arguments for the job
+        """
+        if self.database_string is not None and isinstance(args.session, str):
+            args.session = self.database_string
+        return_queue = mp.Queue(10000)
+        stopped = mp.Event()
+        slot = self.slots.get()
+        try:
+            proc = KaldiProcessWorkerMp(
+                args.job_name,
+                return_queue,
+                function_class(args),
+                stopped,
+                self.budget,
+                self.stage_plan(function_class.__name__),
+                slot,
+            )
+            proc.start()
+            while True:
+                try:
+                    result = return_queue.get(timeout=1)
+                except queue.Empty:
+                    if proc.finished.is_set():
+                        break
+                    continue
+                conn.send(result)
+                if isinstance(result, ResultBatch):
+                    self.budget.release(result.size)
+            proc.join()
+        finally:
+            self.slots.put(slot)
+        conn.send(JobFinished(args.job_name, proc.elapsed, proc.succeeded, proc.usage))
+
+    def handle(self, conn: Connection) -> None:
+        """
+        Run jobs from a coordinator connection until it is closed
+
+        Parameters
+        ----------
+        conn: :class:`~multiprocessing.connection.Connection`
+            Connection to the coordinator
+        """
+        with conn:
+            try:
+                conn.send(self.num_workers)
+                while not self.stopped.is_set():
+                    task = conn.recv()
+                    if task is None:
+                        break
+                    function_class, args = task
+                    logger.debug(f"Running {function_class.__name__} for job {args.job_name}")
+                    self.run_task(conn, function_class, args)
+            except (EOFError, OSError):
+                pass
+
+    def serve_forever(self) -> None:
+        """Accept coordinator connections until the node is stopped"""
+        while not self.stopped.is_set():
+            try:
+                conn = self.listener.accept()
+            except (OSError, mp.AuthenticationError) as e:
+                if self.stopped.is_set():
+                    break
+                logger.warning(f"Rejected connection: {e}")
+                continue
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        """Stop accepting connections"""
+        self.stopped.set()
+        self.listener.close()
+
+
+class RemoteKaldiExecutor(KaldiExecutor):
+    """
+    Executor that sends jobs to
+    :class:`~montreal_forced_aligner.distributed.KaldiWorkerNode` servers
+
+    A connection is opened for every slot advertised by each node, and a thread per connection
+    sends the next queued job once the previous one has finished.
+
+    Parameters
+    ----------
+    nodes: list[tuple[str, int]]
+        Host and port of each worker node
+    authkey: bytes
+        Key for authenticating connections
+    """
+
+    def __init__(self, nodes: typing.List[typing.Tuple[str, int]], authkey: bytes):
+        if not nodes:
+            raise MFAError("No worker nodes were specified.")
+        self.task_queue = queue.Queue()
+        self.return_queue = queue.Queue(10000)
+        self.stopped = threading.Event()
+        self.connections = []
+        for address in nodes:
+            conn = Client(address, authkey=authkey)
+            num_slots = conn.recv()
+            self.connections.append(conn)
+            for _ in range(num_slots - 1):
+                self.connections.append(Client(address, authkey=authkey))
+                self.connections[-1].recv()
+            logger.debug(
+                f"Connected to worker node {address[0]}:{address[1]} with {num_slots} slots"
+            )
+        self.threads = [
+            threading.Thread(target=self._forward, args=(conn,), daemon=True)
+            for conn in self.connections
+        ]
+        for t in self.threads:
+            t.start()
+
+    @classmethod
+    def from_config(cls) -> RemoteKaldiExecutor:
+        """
+        Construct an executor for the nodes in :code:`config.WORKER_NODES`
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.distributed.RemoteKaldiExecutor`
+            Executor
+        """
+        return cls(parse_worker_nodes(config.WORKER_NODES), get_worker_authkey())
+
+    @property
+    def num_workers(self) -> int:
+        """Total number of slots across worker nodes"""
+        return len(self.connections)
+
+    @property
+    def max_in_flight(self) -> int:
+        """Maximum number of jobs to submit at once"""
+        return self.num_workers
+
+    def is_alive(self) -> bool:
+        """Check that all node connections are still open"""
+        return all(t.is_alive() for t in self.threads)
+
+    def _forward(self, conn: Connection) -> None:
+        while True:
+            task = self.task_queue.get()
+            if task is None:
+                break
+            function_class, args = task
+            if self.stopped.is_set():
+                self.return_queue.put(JobFinished(args.job_name, 0.0, False))
+                continue
+            begin = time.time()
+            try:
+                conn.send(task)
+                while True:
+                    result = conn.recv()
+                    self.return_queue.put(result)
+                    if isinstance(result, JobFinished):
+                        break
+            except (EOFError, OSError) as e:
+                self.stopped.set()
+                self.return_queue.put(
+                    MultiprocessingError(args.job_name, f"Lost connection to worker node: {e}")
+                )
+                self.return_queue.put(JobFinished(args.job_name, time.time() - begin, False))
+                break
+
+    def close(self) -> None:
+        """Close connections to the worker nodes"""
+        self.stopped.set()
+        for _ in self.threads:
+            self.task_queue.put(None)
+        for t in self.threads:
+            t.join(timeout=10)
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        self.connections = []
+        self.threads = []
@@ -10,6 +10,7 @@ import functools
 import itertools
 import json
 import logging
+import os
 import re
 import typing
 from contextlib import contextmanager
@@ -50,6 +51,7 @@ __all__ = [
     "align_pronunciations",
     "configure_logger",
     "mfa_open",
+    "atomic_archive",
     "load_configuration",
     "format_correction",
     "format_probability",
@@ -88,6 +90,54 @@ def mfa_open(path, mode="r", encoding="utf8", newline=""):
         file.close()
 
 
+@contextmanager
+def atomic_archive(
+    ark_path: Path, scp_path: Optional[Path] = None
+) -> typing.Generator[Tuple[Path, Optional[Path]], None, None]:
+    """
+    Context manager for writing a Kaldi archive that only appears at its final path when complete
+
+    The archive and optional SCP file are written to temporary paths, and moved into place
+    when the block exits without an error.  SCP entries are rewritten to point at the final
+    archive path, and the SCP file is moved before the archive, so an existing archive
+    always has a complete index.
+
+    Parameters
+    ----------
+    ark_path: :class:`~pathlib.Path`
+        Final path of the archive
+    scp_path: :class:`~pathlib.Path`, optional
+        Final path of the SCP file
+
+    Yields
+    ------
+    :class:`~pathlib.Path`
+        Temporary archive path to write to
+    :class:`~pathlib.Path`, optional
+        Temporary SCP path to write to
+    """
+    temp_ark_path = ark_path.with_suffix(".tmp" + ark_path.suffix)
+    temp_scp_path = None
+    if scp_path is not None:
+        temp_scp_path = scp_path.with_suffix(".tmp" + scp_path.suffix)
+    try:
+        yield temp_ark_path, temp_scp_path
+    except BaseException:
+        for path in (temp_ark_path, temp_scp_path):
+            if path is not None and path.exists():
+                path.unlink()
+        raise
+    if temp_scp_path is not None and temp_scp_path.exists():
+        with mfa_open(temp_scp_path, "r") as f:
+            lines = f.readlines()
+        with mfa_open(temp_scp_path, "w") as f:
+            for line in lines:
+                f.write(line.replace(f"{temp_ark_path}:", f"{ark_path}:", 1))
+        os.replace(temp_scp_path, scp_path)
+    if temp_ark_path.exists():
+        os.replace(temp_ark_path, ark_path)
+
+
 def load_configuration(config_path: typing.Union[str, Path]) -> Dict[str, Any]:
     """
     Load a configuration file
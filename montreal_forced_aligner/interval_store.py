@@ -0,0 +1,422 @@
+"""
+Interval store
+==============
+
+Columnar storage of word and phone intervals as compressed Parquet files, one pair of files per job,
+as an alternative to the interval tables of the database for reading alignments in bulk.
+
+TextGrid export reads the store directly.  Alignment analysis and evaluation still query the
+interval tables, which are loaded from the store rather than from lattices when they are needed.
+
+"""
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import typing
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_ENABLED = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_ENABLED = False
+
+__all__ = ["IntervalStore", "IntervalStoreWriter", "PYARROW_ENABLED"]
+
+logger = logging.getLogger("mfa")
+
+WORD_COLUMNS = ["utterance_id", "begin", "end", "label_id", "pronunciation_id"]
+PHONE_COLUMNS = ["utterance_id", "begin", "end", "label_id", "word_interval_index", "goodness"]
+
+
+def word_schema() -> pa.Schema:
+    """Schema of word interval files, labels are :class:`~montreal_forced_aligner.db.Word` ids"""
+    return pa.schema(
+        [
+            ("utterance_id", pa.int64()),
+            ("begin", pa.float64()),
+            ("end", pa.float64()),
+            ("label_id", pa.int32()),
+            ("pronunciation_id", pa.int32()),
+        ]
+    )
+
+
+def phone_schema() -> pa.Schema:
+    """
+    Schema of phone interval files, labels are :class:`~montreal_forced_aligner.db.Phone` ids
+    and word interval indices are row numbers in the job's word interval file
+    """
+    return pa.schema(
+        [
+            ("utterance_id", pa.int64()),
+            ("begin", pa.float64()),
+            ("end", pa.float64()),
+            ("label_id", pa.int32()),
+            ("word_interval_index", pa.int64()),
+            ("goodness", pa.float64()),
+        ]
+    )
+
+
+class IntervalStore:
+    """
+    Word and phone intervals of a workflow stored as Parquet files in a directory
+
+    Parameters
+    ----------
+    directory: :class:`~pathlib.Path`
+        Directory of the store
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def __repr__(self) -> str:
+        return f"<IntervalStore {self.directory}>"
+
+    @property
+    def manifest_path(self) -> Path:
+        """Path to the manifest that is written once all intervals have been stored"""
+        return self.directory.joinpath("manifest.json")
+
+    def exists(self) -> bool:
+        """Check whether the store has been completely written"""
+        return self.manifest_path.exists()
+
+    @property
+    def manifest(self) -> typing.Dict[str, typing.Any]:
+        """Workflow, jobs and row counts of the store"""
+        with open(self.manifest_path, encoding="utf8") as f:
+            return json.load(f)
+
+    def word_path(self, job_name: int) -> Path:
+        """Path to a job's word interval file"""
+        return self.directory.joinpath(f"word_intervals.{job_name}.parquet")
+
+    def phone_path(self, job_name: int) -> Path:
+        """Path to a job's phone interval file"""
+        return self.directory.joinpath(f"phone_intervals.{job_name}.parquet")
+
+    def writer(self, workflow_id: int) -> IntervalStoreWriter:
+        """
+        Clear the store and construct a writer for it
+
+        Parameters
+        ----------
+        workflow_id: int
+            Workflow that generated the intervals
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.interval_store.IntervalStoreWriter`
+            Writer for the store
+        """
+        self.delete()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return IntervalStoreWriter(self, workflow_id)
+
+    def delete(self) -> None:
+        """Remove all files of the store"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _read(
+        self,
+        paths: typing.List[Path],
+        schema: pa.Schema,
+        utterance_ids: typing.Optional[typing.Collection[int]] = None,
+        columns: typing.Optional[typing.List[str]] = None,
+    ) -> pa.Table:
+        filters = None
+        if utterance_ids is not None:
+            filters = [("utterance_id", "in", list(utterance_ids))]
+        tables = [
+            pq.read_table(p, columns=columns, filters=filters, memory_map=True)
+            for p in paths
+            if p.exists()
+        ]
+        if not tables:
+            table = schema.empty_table()
+            if columns is not None:
+                table = table.select(columns)
+            return table
+        return pa.concat_tables(tables)
+
+    def _job_names(
+        self, job_names: typing.Optional[typing.Collection[int]] = None
+    ) -> typing.List[int]:
+        jobs = self.manifest["jobs"]
+        if job_names is None:
+            return jobs
+        job_names = set(job_names)
+        return [j for j in jobs if j in job_names]
+
+    def read_words(
+        self,
+        utterance_ids: typing.Optional[typing.Collection[int]] = None,
+        columns: typing.Optional[typing.List[str]] = None,
+        job_names: typing.Optional[typing.Collection[int]] = None,
+    ) -> pa.Table:
+        """
+        Read word intervals across jobs
+
+        Parameters
+        ----------
+        utterance_ids: Collection[int], optional
+            Utterances to read intervals for, defaults to all utterances
+        columns: list[str], optional
+            Columns to read, defaults to all columns
+        job_names: Collection[int], optional
+            Jobs whose files to read, defaults to all jobs
+
+        Returns
+        -------
+        :class:`pyarrow.Table`
+            Word intervals
+        """
+        paths = [self.word_path(j) for j in self._job_names(job_names)]
+        return self._read(paths, word_schema(), utterance_ids, columns)
+
+    def read_phones(
+        self,
+        utterance_ids: typing.Optional[typing.Collection[int]] = None,
+        columns: typing.Optional[typing.List[str]] = None,
+        job_names: typing.Optional[typing.Collection[int]] = None,
+    ) -> pa.Table:
+        """
+        Read phone intervals across jobs
+
+        Parameters
+        ----------
+        utterance_ids: Collection[int], optional
+            Utterances to read intervals for, defaults to all utterances
+        columns: list[str], optional
+            Columns to read, defaults to all columns, note that word interval indices
+            refer to rows of each job's own word interval file
+        job_names: Collection[int], optional
+            Jobs whose files to read, defaults to all jobs
+
+        Returns
+        -------
+        :class:`pyarrow.Table`
+            Phone intervals
+        """
+        paths = [self.phone_path(j) for j in self._job_names(job_names)]
+        return self._read(paths, phone_schema(), utterance_ids, columns)
+
+    def database_rows(
+        self, word_interval_id: int, phone_interval_id: int, workflow_id: int
+    ) -> typing.Generator[
+        typing.Tuple[typing.List[typing.Dict[str, typing.Any]], typing.List[typing.Dict]]
+    ]:
+        """
+        Generate rows for the interval tables of the database, reading each job's files in
+        batches
+
+        Parameters
+        ----------
+        word_interval_id: int
+            First primary key to use for word intervals
+        phone_interval_id: int
+            First primary key to use for phone intervals
+        workflow_id: int
+            Workflow to assign to the intervals
+
+        Yields
+        ------
+        list[dict[str, Any]]
+            Word interval rows
+        list[dict[str, Any]]
+            Phone interval rows
+        """
+        for job_name in self.manifest["jobs"]:
+            word_index = 0
+            for batch in pq.ParquetFile(self.word_path(job_name), memory_map=True).iter_batches(
+                columns=WORD_COLUMNS
+            ):
+                word_rows = []
+                for utterance_id, begin, end, word_id, pronunciation_id in zip(
+                    *(batch.column(x).to_pylist() for x in WORD_COLUMNS)
+                ):
+                    word_rows.append(
+                        {
+                            "id": word_interval_id + word_index,
+                            "begin": begin,
+                            "end": end,
+                            "word_id": word_id,
+                            "pronunciation_id": pronunciation_id,
+                            "utterance_id": utterance_id,
+                            "workflow_id": workflow_id,
+                        }
+                    )
+                    word_index += 1
+                yield word_rows, []
+            for batch in pq.ParquetFile(self.phone_path(job_name), memory_map=True).iter_batches(
+                columns=PHONE_COLUMNS
+            ):
+                phone_rows = []
+                for utterance_id, begin, end, phone_id, word_interval_index, goodness in zip(
+                    *(batch.column(x).to_pylist() for x in PHONE_COLUMNS)
+                ):
+                    phone_rows.append(
+                        {
+                            "id": phone_interval_id,
+                            "begin": begin,
+                            "end": end,
+                            "phone_id": phone_id,
+                            "utterance_id": utterance_id,
+                            "workflow_id": workflow_id,
+                            "word_interval_id": word_interval_id + word_interval_index
+                            if word_interval_index >= 0
+                            else None,
+                            "phone_goodness": goodness,
+                        }
+                    )
+                    phone_interval_id += 1
+                yield [], phone_rows
+            word_interval_id += word_index
+
+
+class IntervalStoreWriter:
+    """
+    Writer that buffers the database rows of intervals for each job and appends them to the job's
+    Parquet files as zstd-compressed row groups
+
+    Parameters
+    ----------
+    store: :class:`~montreal_forced_aligner.interval_store.IntervalStore`
+        Store to write
+    workflow_id: int
+        Workflow that generated the intervals
+    batch_size: int
+        Number of phone intervals to buffer for a job before writing a row group, defaults to 100000
+    """
+
+    def __init__(self, store: IntervalStore, workflow_id: int, batch_size: int = 100000):
+        self.store = store
+        self.workflow_id = workflow_id
+        self.batch_size = batch_size
+        self.word_writers: typing.Dict[int, pq.ParquetWriter] = {}
+        self.phone_writers: typing.Dict[int, pq.ParquetWriter] = {}
+        self.word_buffers: typing.Dict[int, typing.Dict[str, typing.List]] = {}
+        self.phone_buffers: typing.Dict[int, typing.Dict[str, typing.List]] = {}
+        self.word_counts: typing.Dict[int, int] = {}
+        self.phone_counts: typing.Dict[int, int] = {}
+
+    def __enter__(self) -> IntervalStoreWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(
+        self,
+        job_name: int,
+        word_rows: typing.List[typing.Dict[str, typing.Any]],
+        phone_rows: typing.List[typing.Dict[str, typing.Any]],
+    ) -> None:
+        """
+        Add the interval table rows of an utterance
+
+        Parameters
+        ----------
+        job_name: int
+            Job of the utterance
+        word_rows: list[dict[str, Any]]
+            Word interval rows, with consecutive ids
+        phone_rows: list[dict[str, Any]]
+            Phone interval rows, with word interval ids referring to ``word_rows``
+        """
+        if job_name not in self.word_buffers:
+            self.word_buffers[job_name] = {x: [] for x in WORD_COLUMNS}
+            self.phone_buffers[job_name] = {x: [] for x in PHONE_COLUMNS}
+            self.word_counts[job_name] = 0
+            self.phone_counts[job_name] = 0
+        words = self.word_buffers[job_name]
+        phones = self.phone_buffers[job_name]
+        word_offset = self.word_counts[job_name] + len(words["utterance_id"])
+        first_word_id = word_rows[0]["id"] if word_rows else 0
+        for row in word_rows:
+            words["utterance_id"].append(row["utterance_id"])
+            words["begin"].append(row["begin"])
+            words["end"].append(row["end"])
+            words["label_id"].append(row["word_id"])
+            words["pronunciation_id"].append(row["pronunciation_id"])
+        for row in phone_rows:
+            phones["utterance_id"].append(row["utterance_id"])
+            phones["begin"].append(row["begin"])
+            phones["end"].append(row["end"])
+            phones["label_id"].append(row["phone_id"])
+            if row["word_interval_id"] is None:
+                phones["word_interval_index"].append(-1)
+            else:
+                phones["word_interval_index"].append(
+                    word_offset + row["word_interval_id"] - first_word_id
+                )
+            phones["goodness"].append(row["phone_goodness"])
+        if len(phones["utterance_id"]) >= self.batch_size:
+            self.flush(job_name)
+
+    def flush(self, job_name: int) -> None:
+        """
+        Write a job's buffered intervals as row groups
+
+        Parameters
+        ----------
+        job_name: int
+            Job to write
+        """
+        words = self.word_buffers[job_name]
+        phones = self.phone_buffers[job_name]
+        if job_name not in self.word_writers:
+            self.word_writers[job_name] = pq.ParquetWriter(
+                self.store.word_path(job_name), word_schema(), compression="zstd"
+            )
+            self.phone_writers[job_name] = pq.ParquetWriter(
+                self.store.phone_path(job_name), phone_schema(), compression="zstd"
+            )
+        if words["utterance_id"]:
+            self.word_writers[job_name].write_table(
+                pa.Table.from_pydict(words, schema=word_schema())
+            )
+        if phones["utterance_id"]:
+            self.phone_writers[job_name].write_table(
+                pa.Table.from_pydict(phones, schema=phone_schema())
+            )
+        self.word_counts[job_name] += len(words["utterance_id"])
+        self.phone_counts[job_name] += len(phones["utterance_id"])
+        self.word_buffers[job_name] = {x: [] for x in WORD_COLUMNS}
+        self.phone_buffers[job_name] = {x: [] for x in PHONE_COLUMNS}
+
+    def close(self) -> None:
+        """Write remaining intervals, close the files and write the manifest"""
+        for job_name in list(self.word_buffers.keys()):
+            self.flush(job_name)
+        for writer in [*self.word_writers.values(), *self.phone_writers.values()]:
+            writer.close()
+        jobs = sorted(self.word_buffers.keys())
+        with open(self.store.manifest_path, "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "workflow_id": self.workflow_id,
+                    "jobs": jobs,
+                    "word_intervals": {str(j): self.word_counts[j] for j in jobs},
+                    "phone_intervals": {str(j): self.phone_counts[j] for j in jobs},
+                },
+                f,
+            )
+
+    def abort(self) -> None:
+        """Close the files and remove the incomplete store"""
+        for writer in [*self.word_writers.values(), *self.phone_writers.values()]:
+            writer.close()
+        self.store.delete()
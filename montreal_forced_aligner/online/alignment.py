@@ -1,31 +1,424 @@
 """Classes for calculating alignments online"""
 from __future__ import annotations
 
+import collections
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
 import typing
+import weakref
+from pathlib import Path
 
+import numpy as np
+import pywrapfst
 import sqlalchemy.orm
-from _kalpy.matrix import DoubleMatrix, FloatMatrix
+from _kalpy.fstext import VectorFst
+from _kalpy.gmm import gmm_align_compiled
+from _kalpy.matrix import DoubleMatrix, FloatMatrix, FloatSubMatrix
+from kalpy.data import Segment
 from kalpy.decoder.training_graphs import TrainingGraphCompiler
 from kalpy.feat.cmvn import CmvnComputer
 from kalpy.fstext.lexicon import LexiconCompiler
 from kalpy.fstext.lexicon import Pronunciation as KalpyPronunciation
 from kalpy.gmm.align import GmmAligner
-from kalpy.gmm.data import HierarchicalCtm
+from kalpy.gmm.data import Alignment, HierarchicalCtm
 from kalpy.utterance import Utterance as KalpyUtterance
 
-from montreal_forced_aligner.data import Language, WordType
+from montreal_forced_aligner.data import BeamScheduler, Language, WordType
 from montreal_forced_aligner.db import (
     Phone,
     PhoneInterval,
     Pronunciation,
+    Speaker,
     Utterance,
     Word,
     WordInterval,
-    get_next_primary_key,
+    bulk_update,
+    get_id_allocator,
 )
 from montreal_forced_aligner.exceptions import AlignerError
 from montreal_forced_aligner.models import AcousticModel, G2PModel
 
+if typing.TYPE_CHECKING:
+    from montreal_forced_aligner.g2p.generator import Rewriter
+
+logger = logging.getLogger("mfa")
+
+
+class OovPronunciationCache:
+    """
+    Bounded cache of G2P pronunciations for OOV words, shared across online alignment requests
+
+    Pronunciations are keyed on the G2P model file and the word, and the least recently used
+    entries are evicted once ``max_size`` is reached.  The cache also tracks words it has added
+    to each lexicon compiler, so that a lexicon that has grown past ``max_lexicon_words`` dynamic
+    entries can be restored to its base state, either via a registered reset function or from a
+    copy of the lexicon saved before the first word was added to it.
+
+    Parameters
+    ----------
+    max_size: int
+        Maximum number of pronunciations to keep, defaults to 100000
+    cache_path: :class:`~pathlib.Path`, optional
+        JSON file to load pronunciations from and save them to
+    max_lexicon_words: int
+        Maximum number of dynamically added words per lexicon compiler before it is reset,
+        defaults to 10000
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100000,
+        cache_path: typing.Optional[Path] = None,
+        max_lexicon_words: int = 10000,
+    ):
+        self.max_size = max_size
+        self.cache_path = cache_path
+        self.max_lexicon_words = max_lexicon_words
+        self.pronunciations: collections.OrderedDict[
+            typing.Tuple[str, str], str
+        ] = collections.OrderedDict()
+        self.rewriters: typing.Dict[str, Rewriter] = {}
+        self.added_words: weakref.WeakKeyDictionary[
+            LexiconCompiler, typing.List[typing.Tuple[str, str]]
+        ] = weakref.WeakKeyDictionary()
+        self.lexicon_resets: weakref.WeakKeyDictionary[
+            LexiconCompiler, typing.Callable[[LexiconCompiler], None]
+        ] = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        if self.cache_path is not None and self.cache_path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.pronunciations)
+
+    @staticmethod
+    def model_key(g2p_model: G2PModel) -> str:
+        """Key identifying a G2P model file in the cache, from its path and modification time"""
+        source = Path(g2p_model.source)
+        return f"{source}:{source.stat().st_mtime_ns}"
+
+    def load(self) -> None:
+        """Load pronunciations from the cache path"""
+        with open(self.cache_path, encoding="utf8") as f:
+            data = json.load(f)
+        with self.lock:
+            for model_key, words in data.items():
+                for word, pronunciation in words.items():
+                    self._put((model_key, word), pronunciation)
+
+    def save(self) -> None:
+        """Save pronunciations to the cache path"""
+        if self.cache_path is None:
+            return
+        data = {}
+        with self.lock:
+            for (model_key, word), pronunciation in self.pronunciations.items():
+                data.setdefault(model_key, {})[word] = pronunciation
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.cache_path)
+
+    def _put(self, key: typing.Tuple[str, str], pronunciation: str) -> None:
+        self.pronunciations[key] = pronunciation
+        self.pronunciations.move_to_end(key)
+        while len(self.pronunciations) > self.max_size:
+            self.pronunciations.popitem(last=False)
+
+    def pronounce(self, g2p_model: G2PModel, word: str) -> typing.Optional[str]:
+        """
+        Look up the pronunciation of a word, running G2P if it has not been seen before
+
+        Parameters
+        ----------
+        g2p_model: :class:`~montreal_forced_aligner.models.G2PModel`
+            G2P model to generate pronunciations
+        word: str
+            Word to pronounce
+
+        Returns
+        -------
+        str or None
+            Pronunciation of the word, or None if G2P could not generate one
+        """
+        model_key = self.model_key(g2p_model)
+        key = (model_key, word)
+        with self.lock:
+            if key in self.pronunciations:
+                self.hits += 1
+                self.pronunciations.move_to_end(key)
+                return self.pronunciations[key]
+            self.misses += 1
+            if model_key not in self.rewriters:
+                self.rewriters[model_key] = g2p_model.rewriter
+            rewriter = self.rewriters[model_key]
+        if rewriter is None:
+            return None
+        # G2P runs outside the lock so that threads only wait on each other for cache access
+        pronunciations = rewriter(word)
+        if not pronunciations:
+            return None
+        with self.lock:
+            self._put(key, pronunciations[0])
+        return pronunciations[0]
+
+    def register_lexicon(
+        self,
+        lexicon_compiler: LexiconCompiler,
+        reset_function: typing.Callable[[LexiconCompiler], None],
+    ) -> None:
+        """
+        Register a function that restores a lexicon compiler to its base pronunciations
+
+        Parameters
+        ----------
+        lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`
+            Lexicon compiler that OOV pronunciations will be added to
+        reset_function: Callable
+            Function that takes the lexicon compiler and reloads its base lexicon
+        """
+        with self.lock:
+            self.lexicon_resets[lexicon_compiler] = reset_function
+
+    def compact_lexicon(self, lexicon_compiler: LexiconCompiler) -> bool:
+        """
+        Reset a lexicon compiler if more than ``max_lexicon_words`` have been added to it
+
+        Pronunciations stay in the cache, so words that are seen again are re-added without running G2P.
+
+        Parameters
+        ----------
+        lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`
+            Lexicon compiler to check
+
+        Returns
+        -------
+        bool
+            True if the lexicon compiler was reset
+        """
+        with self.lock:
+            added = self.added_words.get(lexicon_compiler, [])
+            if len(added) < self.max_lexicon_words:
+                return False
+            reset_function = self.lexicon_resets.get(lexicon_compiler, None)
+            if reset_function is None:
+                return False
+            logger.debug(f"Resetting lexicon after adding {len(added)} OOV words")
+            reset_function(lexicon_compiler)
+            cached_pronunciations = getattr(lexicon_compiler, "_cached_pronunciations", None)
+            if cached_pronunciations is not None:
+                # Allow the removed words to be added back when they are seen again
+                cached_pronunciations.difference_update(added)
+            self.added_words[lexicon_compiler] = []
+            return True
+
+    def _snapshot_lexicon(self, lexicon_compiler: LexiconCompiler) -> None:
+        """Save the base state of a lexicon compiler so that it can be reset after compaction"""
+        directory = Path(tempfile.mkdtemp(prefix="mfa_lexicon_"))
+        weakref.finalize(lexicon_compiler, shutil.rmtree, directory, True)
+        l_fst_path = directory.joinpath("L.fst")
+        l_align_fst_path = directory.joinpath("L_align.fst")
+        words_path = directory.joinpath("words.txt")
+        lexicon_compiler.fst.write(str(l_fst_path))
+        lexicon_compiler.align_fst.write(str(l_align_fst_path))
+        lexicon_compiler.word_table.write_text(str(words_path))
+
+        def reset_lexicon(lc: LexiconCompiler) -> None:
+            lc.load_l_from_file(l_fst_path)
+            lc.load_l_align_from_file(l_align_fst_path)
+            lc.word_table = pywrapfst.SymbolTable.read_text(str(words_path))
+
+        self.lexicon_resets[lexicon_compiler] = reset_lexicon
+
+    def add_to_lexicon(
+        self, lexicon_compiler: LexiconCompiler, word: str, pronunciation: str
+    ) -> None:
+        """
+        Add an OOV pronunciation to a lexicon compiler and track it
+
+        Parameters
+        ----------
+        lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`
+            Lexicon compiler to add the pronunciation to
+        word: str
+            Normalized word
+        pronunciation: str
+            Pronunciation of the word
+        """
+        with self.lock:
+            if lexicon_compiler.word_table.member(word):
+                return
+            if lexicon_compiler not in self.lexicon_resets:
+                self._snapshot_lexicon(lexicon_compiler)
+            lexicon_compiler.add_pronunciation(
+                KalpyPronunciation(word, pronunciation, None, None, None, None, None)
+            )
+            if lexicon_compiler not in self.added_words:
+                self.added_words[lexicon_compiler] = []
+            self.added_words[lexicon_compiler].append((word, pronunciation))
+
+
+_oov_cache: typing.Optional[OovPronunciationCache] = None
+
+
+def get_oov_cache() -> OovPronunciationCache:
+    """Get the process-wide OOV pronunciation cache, creating it if necessary"""
+    global _oov_cache
+    if _oov_cache is None:
+        _oov_cache = OovPronunciationCache()
+    return _oov_cache
+
+
+def set_oov_cache(cache: typing.Optional[OovPronunciationCache]) -> None:
+    """Replace the process-wide OOV pronunciation cache"""
+    global _oov_cache
+    _oov_cache = cache
+
+
+def tokenize_utterance_text(
+    acoustic_model: AcousticModel,
+    text: str,
+    lexicon_compiler: LexiconCompiler,
+    tokenizer=None,
+    g2p_model: G2PModel = None,
+    oov_cache: OovPronunciationCache = None,
+) -> str:
+    """
+    Normalize a transcript and add G2P pronunciations for any OOV words to the lexicon
+
+    Parameters
+    ----------
+    acoustic_model: :class:`~montreal_forced_aligner.models.AcousticModel`
+        Acoustic model to align with
+    text: str
+        Transcript to normalize
+    lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`
+        Lexicon compiler to add OOV pronunciations to
+    tokenizer: :class:`~montreal_forced_aligner.tokenization.simple.SimpleTokenizer`, optional
+        Tokenizer to normalize the transcript
+    g2p_model: :class:`~montreal_forced_aligner.models.G2PModel`, optional
+        G2P model to generate pronunciations for OOV words
+    oov_cache: :class:`~montreal_forced_aligner.online.alignment.OovPronunciationCache`, optional
+        Cache of OOV pronunciations, defaults to the process-wide cache
+
+    Returns
+    -------
+    str
+        Normalized transcript
+    """
+    if tokenizer is None:
+        return text
+    if acoustic_model.language is Language.unknown:
+        text, _, oovs = tokenizer(text)
+        word_pairs = [(w, w) for w in oovs]
+    else:
+        text, pronunciation_form = tokenizer(text)
+        if not pronunciation_form:
+            pronunciation_form = text
+        word_pairs = list(zip(text.split(), pronunciation_form.split()))
+    if g2p_model is None:
+        return text
+    if oov_cache is None:
+        oov_cache = get_oov_cache()
+    oov_cache.compact_lexicon(lexicon_compiler)
+    for norm_w, w in word_pairs:
+        if lexicon_compiler.word_table.member(norm_w):
+            continue
+        pron = oov_cache.pronounce(g2p_model, w)
+        if pron is not None:
+            oov_cache.add_to_lexicon(lexicon_compiler, norm_w, pron)
+    return text
+
+
+def align_with_beam_schedule(
+    aligner: GmmAligner,
+    beam_scheduler: BeamScheduler,
+    speaker: typing.Union[int, str],
+    training_graph: VectorFst,
+    features: FloatMatrix,
+    utterance_id: str = None,
+) -> typing.Tuple[typing.Optional[Alignment], typing.Optional[int]]:
+    """
+    Align an utterance with a speaker's beam schedule, decoding each beam at most once
+
+    Each call to the decoder uses the next beam in the schedule as its retry beam, so a
+    retried decode stands in for that beam, and the last beam has retries turned off so that
+    decoding never goes past the widest beam of the schedule.  The beam recorded for the
+    utterance is the one whose decode produced the alignment.
+
+    Parameters
+    ----------
+    aligner: :class:`~kalpy.gmm.align.GmmAligner`
+        Aligner with the acoustic model and scales to use
+    beam_scheduler: :class:`~montreal_forced_aligner.data.BeamScheduler`
+        Beam schedule, updated with the beam that aligned the utterance
+    speaker: int or str
+        Speaker identifier
+    training_graph: :class:`~_kalpy.fstext.VectorFst`
+        Training graph for the utterance, which is not modified
+    features: :class:`~_kalpy.matrix.FloatMatrix`
+        Features for the utterance
+    utterance_id: str, optional
+        Identifier of the utterance
+
+    Returns
+    -------
+    :class:`~kalpy.gmm.data.Alignment` or None
+        Best alignment, None if no beam aligned the utterance
+    int or None
+        Beam of the best alignment
+    """
+    beams = beam_scheduler.beams_for_speaker(speaker)
+    num_frames = features.NumRows()
+    best_alignment = None
+    best_beam = None
+    index = 0
+    while index < len(beams):
+        beam = beams[index]
+        retry_beam = beams[index + 1] if index + 1 < len(beams) else 0
+        # Decoding adds transition probabilities to the graph, so each decode gets a copy
+        (
+            alignment,
+            words,
+            likelihood,
+            per_frame_likelihoods,
+            successful,
+            retried,
+        ) = gmm_align_compiled(
+            aligner.transition_model,
+            aligner.acoustic_model,
+            VectorFst(training_graph),
+            features,
+            acoustic_scale=aligner.acoustic_scale,
+            transition_scale=aligner.transition_scale,
+            self_loop_scale=aligner.self_loop_scale,
+            beam=beam,
+            retry_beam=retry_beam,
+            careful=aligner.careful,
+        )
+        if retried:
+            index += 1
+            beam = retry_beam
+        index += 1
+        if not successful:
+            continue
+        if best_alignment is None or likelihood > best_alignment.likelihood:
+            best_alignment = Alignment(
+                utterance_id, alignment, words, likelihood, per_frame_likelihoods
+            )
+            best_beam = beam
+        if beam_scheduler.accept(likelihood, num_frames):
+            break
+    beam_scheduler.record(speaker, best_beam)
+    return best_alignment, best_beam
+
 
 def align_utterance_online(
     acoustic_model: AcousticModel,
@@ -41,39 +434,12 @@ def align_utterance_online(
     acoustic_scale: float = 0.1,
     self_loop_scale: float = 0.1,
     boost_silence: float = 1.0,
+    beam_scheduler: BeamScheduler = None,
+    speaker: typing.Union[int, str] = None,
 ) -> HierarchicalCtm:
-    text = utterance.transcript
-    rewriter = None
-    if g2p_model is not None:
-        rewriter = g2p_model.rewriter
-    if tokenizer is not None:
-        if acoustic_model.language is Language.unknown:
-            text, _, oovs = tokenizer(text)
-            if rewriter is not None:
-                for w in oovs:
-                    if not lexicon_compiler.word_table.member(w):
-                        pron = rewriter(w)
-                        if pron:
-                            lexicon_compiler.add_pronunciation(
-                                KalpyPronunciation(w, pron[0], None, None, None, None, None)
-                            )
-
-        else:
-            text, pronunciation_form = tokenizer(text)
-            if not pronunciation_form:
-                pronunciation_form = text
-            g2p_cache = {}
-            if rewriter is not None:
-                for norm_w, w in zip(text.split(), pronunciation_form.split()):
-                    if w not in g2p_cache:
-                        pron = rewriter(w)
-                        if not pron:
-                            continue
-                        g2p_cache[w] = pron[0]
-                    if w in g2p_cache and not lexicon_compiler.word_table.member(norm_w):
-                        lexicon_compiler.add_pronunciation(
-                            KalpyPronunciation(norm_w, g2p_cache[w], None, None, None, None, None)
-                        )
+    text = tokenize_utterance_text(
+        acoustic_model, utterance.transcript, lexicon_compiler, tokenizer, g2p_model
+    )
 
     graph_compiler = TrainingGraphCompiler(
         acoustic_model.alignment_model_path,
@@ -105,7 +471,10 @@ def align_utterance_online(
     )
     if boost_silence != 1.0:
         aligner.boost_silence(boost_silence, lexicon_compiler.silence_symbols)
-    alignment = aligner.align_utterance(fst, feats)
+    if beam_scheduler is not None:
+        alignment, _ = align_with_beam_schedule(aligner, beam_scheduler, speaker, fst, feats)
+    else:
+        alignment = aligner.align_utterance(fst, feats)
     if alignment is None:
         raise AlignerError(
             f"Could not align the file with the current beam size ({aligner.beam}, "
@@ -124,117 +493,567 @@ def align_utterance_online(
     return ctm
 
 
+class StreamingAligner:
+    """
+    Incrementally align a growing audio buffer against a transcript that is known ahead of time
+
+    Audio is consumed as a window that starts at the last committed word boundary and ends at
+    the current end of the buffer.  Each time the buffer is extended, the window is aligned
+    against prefixes of the remaining transcript and the best scoring prefix is kept.  Words
+    that end more than ``lookahead`` seconds before the end of the buffer are committed and the
+    window advances past them, so audio that has been committed is never featurized or decoded
+    again.  Raw MFCCs are computed once for each newly arrived chunk of audio and reused by later
+    windows, and committed audio only contributes running CMVN statistics, so memory does not
+    grow with the length of the stream.
+
+    Kalpy's aligner decodes a whole training graph at a time and does not expose decoder state
+    to resume from, and the graph changes with the transcript prefix, so each window is decoded
+    from its start.  The work per extension is instead bounded: at most
+    ``2 * prefix_candidates + 1`` prefixes are decoded, and once the window is longer than
+    ``maximum_window``, the aligner forces a commit of the best prefix, skips leading audio
+    that no word aligned to, and drops the oldest audio if the window is still too long, so
+    the window never exceeds ``maximum_window`` seconds.
+
+    Parameters
+    ----------
+    acoustic_model: :class:`~montreal_forced_aligner.models.AcousticModel`
+        Acoustic model to align with
+    lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`
+        Lexicon compiler for the dictionary
+    transcript: str
+        Full transcript of the audio
+    sound_file_path: :class:`~pathlib.Path` or str
+        Path to the audio file that is being written to
+    channel: int
+        Channel of the audio file, defaults to 0
+    tokenizer: :class:`~montreal_forced_aligner.tokenization.simple.SimpleTokenizer`, optional
+        Tokenizer to normalize the transcript
+    g2p_model: :class:`~montreal_forced_aligner.models.G2PModel`, optional
+        G2P model to generate pronunciations for OOV words
+    lookahead: float
+        Amount of audio in seconds that must follow a word before it is committed, defaults to 1.0
+    minimum_window: float
+        Minimum duration of uncommitted audio in seconds before attempting an alignment,
+        defaults to 2.0
+    maximum_window: float
+        Duration of uncommitted audio in seconds after which a commit is forced, defaults
+        to 10.0
+    words_per_second: float
+        Initial estimate of the speaking rate, updated from committed words, defaults to 3.0
+    prefix_candidates: int
+        Number of transcript prefix lengths on either side of the speaking rate estimate
+        to evaluate for each window, defaults to 3
+    beam: int
+        Size of the beam to use in aligning windows, defaults to 10
+    retry_beam: int
+        Size of the beam to use in aligning the final window, defaults to 40
+    transition_scale : float
+        Transition scale, defaults to 1.0
+    acoustic_scale : float
+        Acoustic scale, defaults to 0.1
+    self_loop_scale : float
+        Self-loop scale, defaults to 0.1
+    boost_silence : float
+        Factor to boost silence probabilities, 1.0 is no boost or reduction
+    """
+
+    def __init__(
+        self,
+        acoustic_model: AcousticModel,
+        lexicon_compiler: LexiconCompiler,
+        transcript: str,
+        sound_file_path: typing.Union[Path, str],
+        channel: int = 0,
+        tokenizer=None,
+        g2p_model: G2PModel = None,
+        lookahead: float = 1.0,
+        minimum_window: float = 2.0,
+        maximum_window: float = 10.0,
+        words_per_second: float = 3.0,
+        prefix_candidates: int = 3,
+        beam: int = 10,
+        retry_beam: int = 40,
+        transition_scale: float = 1.0,
+        acoustic_scale: float = 0.1,
+        self_loop_scale: float = 0.1,
+        boost_silence: float = 1.0,
+    ):
+        self.acoustic_model = acoustic_model
+        self.lexicon_compiler = lexicon_compiler
+        self.sound_file_path = str(sound_file_path)
+        self.channel = channel
+        self.lookahead = lookahead
+        self.minimum_window = max(minimum_window, lookahead)
+        self.maximum_window = max(maximum_window, self.minimum_window + lookahead)
+        self.default_words_per_second = words_per_second
+        self.prefix_candidates = prefix_candidates
+        self.beam = beam
+        self.retry_beam = retry_beam
+        self.silence_word = getattr(lexicon_compiler, "silence_word", "<eps>")
+        text = tokenize_utterance_text(
+            acoustic_model, transcript, lexicon_compiler, tokenizer, g2p_model
+        )
+        self.words = text.split()
+        self.num_committed_words = 0
+        self.committed_time = 0.0
+        self.buffer_end = 0.0
+        self.ctm = HierarchicalCtm([])
+        self._cmvn_stats = None
+        self._pending_mfccs = []
+        self._featurized_end = 0.0
+        self.graph_compiler = TrainingGraphCompiler(
+            acoustic_model.alignment_model_path,
+            acoustic_model.tree_path,
+            lexicon_compiler,
+        )
+        self.aligner = GmmAligner(
+            acoustic_model.alignment_model_path,
+            beam=beam,
+            retry_beam=retry_beam,
+            transition_scale=transition_scale,
+            acoustic_scale=acoustic_scale,
+            self_loop_scale=self_loop_scale,
+        )
+        if boost_silence != 1.0:
+            self.aligner.boost_silence(boost_silence, lexicon_compiler.silence_symbols)
+
+    @property
+    def remaining_words(self) -> typing.List[str]:
+        """Transcript words that have not been committed yet"""
+        return self.words[self.num_committed_words :]
+
+    @property
+    def finished(self) -> bool:
+        """Flag for whether every word in the transcript has been committed"""
+        return self.num_committed_words >= len(self.words)
+
+    @property
+    def words_per_second(self) -> float:
+        """Speaking rate estimated from committed words"""
+        if self.num_committed_words < 5 or self.committed_time <= 0:
+            return self.default_words_per_second
+        return self.num_committed_words / self.committed_time
+
+    def _window_features(
+        self, end: float
+    ) -> typing.Optional[typing.Tuple[KalpyUtterance, FloatMatrix, FloatMatrix]]:
+        frame_shift = self.acoustic_model.mfcc_computer.frame_shift
+        if end - self._featurized_end >= 2 * frame_shift:
+            # Only audio that arrived since the last window is featurized, starting on the
+            # frame grid of the previous chunks
+            chunk = KalpyUtterance(
+                Segment(self.sound_file_path, self._featurized_end, end, self.channel), ""
+            )
+            chunk.generate_mfccs(self.acoustic_model.mfcc_computer)
+            num_frames = chunk.mfccs.NumRows()
+            if num_frames > 0:
+                self._pending_mfccs.append(chunk.mfccs)
+                self._featurized_end += num_frames * frame_shift
+        if not self._pending_mfccs:
+            return None
+        raw_mfccs = FloatMatrix()
+        raw_mfccs.from_numpy(np.concatenate([m.numpy() for m in self._pending_mfccs]))
+        self._pending_mfccs = [raw_mfccs]
+        segment = Segment(
+            self.sound_file_path, self.committed_time, self._featurized_end, self.channel
+        )
+        utterance = KalpyUtterance(segment, "")
+        utterance.mfccs = FloatMatrix(
+            FloatSubMatrix(raw_mfccs, 0, raw_mfccs.NumRows(), 0, raw_mfccs.NumCols())
+        )
+        if self.acoustic_model.uses_cmvn:
+            cmvn = DoubleMatrix()
+            cmvn.from_numpy(self._accumulate_cmvn_stats(self._cmvn_stats, raw_mfccs.numpy()))
+            utterance.apply_cmvn(cmvn)
+        feats = utterance.generate_features(
+            self.acoustic_model.mfcc_computer,
+            self.acoustic_model.pitch_computer,
+            lda_mat=self.acoustic_model.lda_mat,
+        )
+        return utterance, raw_mfccs, feats
+
+    def _align_window(
+        self,
+        utterance: KalpyUtterance,
+        feats: FloatMatrix,
+        words: typing.List[str],
+        beam: typing.Optional[int] = None,
+    ) -> typing.Optional[HierarchicalCtm]:
+        text = " ".join(words)
+        fst = self.graph_compiler.compile_fst(text)
+        if beam is None:
+            alignment = self.aligner.align_utterance(fst, feats)
+        else:
+            self.aligner.beam = beam
+            try:
+                alignment = self.aligner.align_utterance(fst, feats)
+            finally:
+                self.aligner.beam = self.beam
+        if alignment is None:
+            return None
+        phone_intervals = alignment.generate_ctm(
+            self.aligner.transition_model,
+            self.lexicon_compiler.phone_table,
+            self.acoustic_model.mfcc_computer.frame_shift,
+        )
+        ctm = self.lexicon_compiler.phones_to_pronunciations(
+            alignment.words, phone_intervals, transcription=False, text=text
+        )
+        ctm.likelihood = alignment.likelihood
+        ctm.update_utterance_boundaries(utterance.segment.begin, utterance.segment.end)
+        return ctm
+
+    def _commit(
+        self,
+        ctm: HierarchicalCtm,
+        raw_mfccs: FloatMatrix,
+        num_words: int,
+        limit: float,
+    ) -> typing.List:
+        committed = []
+        consumed = 0
+        for word_interval in ctm.word_intervals:
+            if word_interval.end > limit or consumed >= num_words:
+                break
+            committed.append(word_interval)
+            if word_interval.label != self.silence_word:
+                consumed += 1
+        while committed and committed[-1].label == self.silence_word:
+            committed.pop()
+        if not committed:
+            return committed
+        self._advance(committed[-1].end, raw_mfccs)
+        self.ctm.word_intervals.extend(committed)
+        self.num_committed_words += consumed
+        return committed
+
+    @staticmethod
+    def _accumulate_cmvn_stats(
+        stats: typing.Optional[np.ndarray], mfccs: np.ndarray
+    ) -> np.ndarray:
+        """Add frames to CMVN statistics in Kaldi's layout, without modifying ``stats``"""
+        dim = mfccs.shape[1]
+        if stats is None:
+            stats = np.zeros((2, dim + 1), dtype=np.float64)
+        else:
+            stats = stats.copy()
+        mfccs = mfccs.astype(np.float64)
+        stats[0, :dim] += mfccs.sum(axis=0)
+        stats[1, :dim] += np.square(mfccs).sum(axis=0)
+        stats[0, dim] += mfccs.shape[0]
+        return stats
+
+    def _advance(self, start: float, raw_mfccs: FloatMatrix) -> None:
+        """
+        Move the start of the window to a time, folding the frames before it into the running
+        CMVN statistics and keeping the rest as pending frames
+        """
+        frame_shift = self.acoustic_model.mfcc_computer.frame_shift
+        num_frames = min(
+            int(round((start - self.committed_time) / frame_shift)), raw_mfccs.NumRows()
+        )
+        self._pending_mfccs = []
+        if num_frames > 0:
+            self._cmvn_stats = self._accumulate_cmvn_stats(
+                self._cmvn_stats, raw_mfccs.numpy()[:num_frames]
+            )
+        if num_frames < raw_mfccs.NumRows():
+            self._pending_mfccs.append(
+                FloatMatrix(
+                    FloatSubMatrix(
+                        raw_mfccs,
+                        num_frames,
+                        raw_mfccs.NumRows() - num_frames,
+                        0,
+                        raw_mfccs.NumCols(),
+                    )
+                )
+            )
+        self.committed_time = start
+
+    def _force_commit(
+        self,
+        ctm: typing.Optional[HierarchicalCtm],
+        raw_mfccs: FloatMatrix,
+        num_words: int,
+    ) -> typing.List:
+        """
+        Shorten a window that has grown past ``maximum_window`` without committing anything
+        """
+        limit = self.buffer_end - self.lookahead
+        committed = []
+        if ctm is not None:
+            committed = self._commit(ctm, raw_mfccs, num_words, limit)
+            if not committed:
+                for word_interval in ctm.word_intervals:
+                    if word_interval.label == self.silence_word:
+                        continue
+                    if self.committed_time < word_interval.begin <= limit:
+                        # Only silence aligned to the audio before the first word
+                        self._advance(word_interval.begin, raw_mfccs)
+                    break
+        start = self.buffer_end - self.maximum_window
+        if start > self.committed_time and self._pending_mfccs:
+            logger.warning(
+                f"Could not align the audio from {self.committed_time:.3f} to "
+                f"{self.buffer_end:.3f}, skipping the audio before {start:.3f}"
+            )
+            self._advance(start, self._pending_mfccs[0])
+        return committed
+
+    def extend(self, end: float) -> typing.List:
+        """
+        Extend the audio buffer and commit any words that are now stable
+
+        Parameters
+        ----------
+        end: float
+            New end time of the audio buffer in seconds
+
+        Returns
+        -------
+        list[:class:`~kalpy.gmm.data.WordCtmInterval`]
+            Newly committed word intervals
+        """
+        self.buffer_end = max(self.buffer_end, end)
+        if self.finished or self.buffer_end - self.committed_time < self.minimum_window:
+            return []
+        window = self._window_features(self.buffer_end)
+        if window is None:
+            return []
+        utterance, raw_mfccs, feats = window
+        remaining = self.remaining_words
+        window_length = min(self.buffer_end - self.committed_time, self.maximum_window)
+        estimate = int(round(window_length * self.words_per_second))
+        highest = min(len(remaining), estimate + self.prefix_candidates)
+        lowest = max(1, min(estimate - self.prefix_candidates, highest))
+        best_ctm = None
+        best_num_words = 0
+        best_score = None
+        for num_words in range(lowest, highest + 1):
+            ctm = self._align_window(utterance, feats, remaining[:num_words])
+            if ctm is None:
+                continue
+            score = ctm.likelihood / max(feats.NumRows(), 1)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_ctm = ctm
+                best_num_words = num_words
+        committed = []
+        if best_ctm is not None:
+            # The last word of the prefix absorbs any audio that belongs to later words,
+            # so it is not committed until more audio arrives
+            committed = self._commit(
+                best_ctm, raw_mfccs, best_num_words - 1, self.buffer_end - self.lookahead
+            )
+        if self.buffer_end - self.committed_time > self.maximum_window:
+            # The features and alignment of the window are stale after a partial commit
+            committed.extend(
+                self._force_commit(None if committed else best_ctm, raw_mfccs, best_num_words)
+            )
+        return committed
+
+    def finalize(self, end: float = None) -> typing.List:
+        """
+        Align the remaining audio against the rest of the transcript and commit everything
+
+        Parameters
+        ----------
+        end: float, optional
+            Final end time of the audio, defaults to the current end of the buffer
+
+        Returns
+        -------
+        list[:class:`~kalpy.gmm.data.WordCtmInterval`]
+            Newly committed word intervals
+
+        Raises
+        ------
+        :class:`~montreal_forced_aligner.exceptions.AlignerError`
+            If the remaining audio could not be aligned
+        """
+        if end is not None:
+            self.buffer_end = max(self.buffer_end, end)
+        if self.finished:
+            return []
+        window = self._window_features(self.buffer_end)
+        ctm = None
+        remaining = self.remaining_words
+        if window is not None:
+            utterance, raw_mfccs, feats = window
+            ctm = self._align_window(utterance, feats, remaining)
+            if ctm is None:
+                ctm = self._align_window(utterance, feats, remaining, beam=self.retry_beam)
+        if ctm is None:
+            raise AlignerError(
+                f"Could not align the audio from {self.committed_time} to {self.buffer_end} "
+                f"with the current beam size ({self.retry_beam}), "
+                "please try increasing the beam size via `--beam X`"
+            )
+        return self._commit(ctm, raw_mfccs, len(remaining), self.buffer_end)
+
+
 def update_utterance_intervals(
     session: sqlalchemy.orm.Session,
     utterance: typing.Union[int, Utterance],
     workflow_id: int,
     ctm: HierarchicalCtm,
 ):
-    if isinstance(utterance, int):
-        utterance = session.get(Utterance, utterance)
-    max_phone_interval_id = session.query(sqlalchemy.func.max(PhoneInterval.id)).scalar()
-    if max_phone_interval_id is None:
-        max_phone_interval_id = 0
-    max_word_interval_id = session.query(sqlalchemy.func.max(WordInterval.id)).scalar()
-    if max_word_interval_id is None:
-        max_word_interval_id = 0
-    mapping_id = session.query(sqlalchemy.func.max(Word.mapping_id)).scalar()
-    if mapping_id is None:
-        mapping_id = -1
-    mapping_id += 1
-    word_index = get_next_primary_key(session, Word)
-    new_phone_interval_mappings = []
-    new_word_interval_mappings = []
-    words = (
-        session.query(Word.word, Word.id)
-        .filter(Word.dictionary_id == utterance.speaker.dictionary_id)
-        .filter(Word.word.in_(utterance.normalized_text.split()))
+    bulk_update_utterance_intervals(session, workflow_id, [(utterance, ctm)])
+
+
+def bulk_update_utterance_intervals(
+    session: sqlalchemy.orm.Session,
+    workflow_id: int,
+    utterance_ctms: typing.Iterable[typing.Tuple[typing.Union[int, Utterance], HierarchicalCtm]],
+) -> None:
+    """
+    Replace the word and phone intervals of many utterances for a workflow, resolving word and
+    pronunciation ids in one query, deleting and inserting intervals with set-based statements
+    and committing once
+
+    Parameters
+    ----------
+    session: :class:`~sqlalchemy.orm.Session`
+        Session to use
+    workflow_id: int
+        Workflow that the intervals belong to
+    utterance_ctms: list[tuple[int, HierarchicalCtm]]
+        Utterance ids, or :class:`~montreal_forced_aligner.db.Utterance` objects, along with
+        their alignments
+    """
+    utterance_ctms = [
+        (utterance.id if isinstance(utterance, Utterance) else utterance, ctm)
+        for utterance, ctm in utterance_ctms
+    ]
+    if not utterance_ctms:
+        return
+    utterance_ids = [x[0] for x in utterance_ctms]
+    utterance_dictionaries = dict(
+        session.query(Utterance.id, Speaker.dictionary_id)
+        .join(Utterance.speaker)
+        .filter(Utterance.id.in_(utterance_ids))
     )
-    phone_to_phone_id = {}
+    word_keys = {}
+    for utterance_id, ctm in utterance_ctms:
+        for word_interval in ctm.word_intervals:
+            word_keys[(utterance_dictionaries[utterance_id], word_interval.label)] = None
     word_mapping = {}
     pronunciation_mapping = {}
-    ds = session.query(Phone.id, Phone.mapping_id).all()
-    for p_id, mapping_id in ds:
-        phone_to_phone_id[mapping_id] = p_id
-    new_words = []
-    for w, w_id in words:
-        word_mapping[w] = w_id
-    pronunciations = (
-        session.query(Word.word, Pronunciation.pronunciation, Pronunciation.id)
-        .join(Pronunciation.word)
-        .filter(Word.dictionary_id == utterance.speaker.dictionary_id)
-        .filter(Word.word.in_(utterance.normalized_text.split()))
+    words = (
+        session.query(
+            Word.dictionary_id,
+            Word.word,
+            Word.id,
+            Pronunciation.pronunciation,
+            Pronunciation.id,
+        )
+        .outerjoin(Word.pronunciations)
+        .filter(Word.dictionary_id.in_(set(utterance_dictionaries.values())))
+        .filter(Word.word.in_({x[1] for x in word_keys}))
+    )
+    for dictionary_id, w, w_id, pron, p_id in words:
+        word_mapping[(dictionary_id, w)] = w_id
+        if p_id is not None:
+            pronunciation_mapping[(dictionary_id, w, pron)] = p_id
+    phone_to_phone_id = {}
+    for p_id, phone_mapping_id in session.query(Phone.id, Phone.mapping_id):
+        phone_to_phone_id[phone_mapping_id] = p_id
+    # OOV words go into dictionary 1, as when collecting alignments, so reuse any added before
+    missing_labels = {x[1] for x in word_keys if x not in word_mapping}
+    oov_words = {}
+    if missing_labels:
+        oov_words = dict(
+            session.query(Word.word, Word.id)
+            .filter(Word.dictionary_id == 1)
+            .filter(Word.word_type == WordType.oov)
+            .filter(Word.word.in_(missing_labels))
+        )
+    for key in word_keys:
+        if key not in word_mapping and key[1] in oov_words:
+            word_mapping[key] = oov_words[key[1]]
+    new_word_keys = [x for x in word_keys if x not in word_mapping]
+    new_labels = list(dict.fromkeys(x[1] for x in new_word_keys))
+    num_word_intervals = sum(len(ctm.word_intervals) for _, ctm in utterance_ctms)
+    num_phone_intervals = sum(
+        len(x.phones) for _, ctm in utterance_ctms for x in ctm.word_intervals
     )
-    for w, pron, p_id in pronunciations:
-        pronunciation_mapping[(w, pron)] = p_id
-    for word_interval in ctm.word_intervals:
-        if word_interval.label not in word_mapping:
+
+    # Reserve ids within the session's transaction, so that concurrent updates never share them
+    id_allocator = get_id_allocator(session.get_bind())
+    connection = session.connection().connection
+    word_index = id_allocator.reserve(Word, len(new_labels), connection)
+    mapping_id = id_allocator.reserve(Word, len(new_labels), connection, column="mapping_id")
+    word_interval_id = id_allocator.reserve(WordInterval, num_word_intervals, connection) - 1
+    phone_interval_id = id_allocator.reserve(PhoneInterval, num_phone_intervals, connection) - 1
+    new_words = []
+    if new_labels:
+        for label in new_labels:
             new_words.append(
                 {
                     "id": word_index,
                     "mapping_id": mapping_id,
-                    "word": word_interval.label,
+                    "word": label,
                     "dictionary_id": 1,
                     "word_type": WordType.oov,
                 }
             )
-            word_mapping[word_interval.label] = word_index
-            word_id = word_index
-        else:
-            word_id = word_mapping[word_interval.label]
-        max_word_interval_id += 1
-        pronunciation_id = pronunciation_mapping.get(
-            (word_interval.label, word_interval.pronunciation), None
-        )
+            oov_words[label] = word_index
+            word_index += 1
+            mapping_id += 1
+        for key in new_word_keys:
+            word_mapping[key] = oov_words[key[1]]
 
-        new_word_interval_mappings.append(
-            {
-                "id": max_word_interval_id,
-                "begin": word_interval.begin,
-                "end": word_interval.end,
-                "word_id": word_id,
-                "pronunciation_id": pronunciation_id,
-                "utterance_id": utterance.id,
-                "workflow_id": workflow_id,
-            }
-        )
-        for interval in word_interval.phones:
-            max_phone_interval_id += 1
-            new_phone_interval_mappings.append(
+    new_word_interval_mappings = []
+    new_phone_interval_mappings = []
+    utterance_updates = []
+    for utterance_id, ctm in utterance_ctms:
+        dictionary_id = utterance_dictionaries[utterance_id]
+        utterance_updates.append({"id": utterance_id, "alignment_log_likelihood": ctm.likelihood})
+        for word_interval in ctm.word_intervals:
+            word_interval_id += 1
+            new_word_interval_mappings.append(
                 {
-                    "id": max_phone_interval_id,
-                    "begin": interval.begin,
-                    "end": interval.end,
-                    "phone_id": phone_to_phone_id[interval.symbol],
-                    "utterance_id": utterance.id,
+                    "id": word_interval_id,
+                    "begin": word_interval.begin,
+                    "end": word_interval.end,
+                    "word_id": word_mapping[(dictionary_id, word_interval.label)],
+                    "pronunciation_id": pronunciation_mapping.get(
+                        (dictionary_id, word_interval.label, word_interval.pronunciation), None
+                    ),
+                    "utterance_id": utterance_id,
                     "workflow_id": workflow_id,
-                    "word_interval_id": max_word_interval_id,
-                    "phone_goodness": interval.confidence if interval.confidence else 0.0,
                 }
             )
-    session.query(Utterance).filter(Utterance.id == utterance.id).update(
-        {Utterance.alignment_log_likelihood: ctm.likelihood}
+            for interval in word_interval.phones:
+                phone_interval_id += 1
+                new_phone_interval_mappings.append(
+                    {
+                        "id": phone_interval_id,
+                        "begin": interval.begin,
+                        "end": interval.end,
+                        "phone_id": phone_to_phone_id[interval.symbol],
+                        "utterance_id": utterance_id,
+                        "workflow_id": workflow_id,
+                        "word_interval_id": word_interval_id,
+                        "phone_goodness": interval.confidence if interval.confidence else 0.0,
+                    }
+                )
+    bulk_update(session, Utterance, utterance_updates)
+    session.execute(
+        sqlalchemy.delete(PhoneInterval)
+        .where(PhoneInterval.utterance_id.in_(utterance_ids))
+        .where(PhoneInterval.workflow_id == workflow_id)
+    )
+    session.execute(
+        sqlalchemy.delete(WordInterval)
+        .where(WordInterval.utterance_id.in_(utterance_ids))
+        .where(WordInterval.workflow_id == workflow_id)
     )
-    session.query(PhoneInterval).filter(PhoneInterval.utterance_id == utterance.id).filter(
-        PhoneInterval.workflow_id == workflow_id
-    ).delete(synchronize_session=False)
-    session.flush()
-    session.query(WordInterval).filter(WordInterval.utterance_id == utterance.id).filter(
-        WordInterval.workflow_id == workflow_id
-    ).delete(synchronize_session=False)
-    session.flush()
     if new_words:
-        session.bulk_insert_mappings(Word, new_words, return_defaults=False, render_nulls=True)
-        session.flush()
+        session.execute(sqlalchemy.insert(Word), new_words)
     if new_word_interval_mappings:
-        session.bulk_insert_mappings(
-            WordInterval, new_word_interval_mappings, return_defaults=False, render_nulls=True
-        )
-        session.flush()
-        session.bulk_insert_mappings(
-            PhoneInterval,
-            new_phone_interval_mappings,
-            return_defaults=False,
-            render_nulls=True,
-        )
+        session.execute(sqlalchemy.insert(WordInterval), new_word_interval_mappings)
+    if new_phone_interval_mappings:
+        session.execute(sqlalchemy.insert(PhoneInterval), new_phone_interval_mappings)
     session.commit()
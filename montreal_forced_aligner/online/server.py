@@ -0,0 +1,286 @@
+"""Long-running workers for serving online transcription requests"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import socketserver
+import threading
+import time
+import typing
+from concurrent.futures import Future
+from pathlib import Path
+
+from _kalpy.fstext import ConstFst
+from kalpy.data import Segment
+from kalpy.fstext.lexicon import LexiconCompiler
+from kalpy.utterance import Utterance as KalpyUtterance
+
+from montreal_forced_aligner.exceptions import MFAError
+from montreal_forced_aligner.models import AcousticModel
+from montreal_forced_aligner.online.transcription import (
+    create_online_decoder,
+    transcribe_segments_online_whisper,
+    transcribe_utterance_online,
+    transcribe_utterances_online_speechbrain,
+)
+from montreal_forced_aligner.tokenization.simple import SimpleTokenizer
+
+if typing.TYPE_CHECKING:
+    from montreal_forced_aligner.transcription.models import MfaFasterWhisperPipeline
+    from montreal_forced_aligner.transcription.multiprocessing import EncoderASR, WhisperASR
+
+__all__ = ["TranscriptionWorker", "TranscriptionServer"]
+
+logger = logging.getLogger("mfa")
+
+
+class TranscriptionWorker(threading.Thread):
+    """
+    Thread that keeps a transcription model loaded and serves requests from an in-process queue
+
+    Exactly one of ``acoustic_model``, ``whisper_model`` or ``speechbrain_model`` should be specified.
+    For Kaldi decoding, the HCLG graph is read once and a single decoder is reused for every
+    request, decoding one request at a time.  For Whisper and SpeechBrain models, requests that
+    arrive within ``batch_timeout`` of each other are grouped into batches of up to ``batch_size``,
+    which are transcribed in a single pass.
+
+    Parameters
+    ----------
+    acoustic_model: :class:`~montreal_forced_aligner.models.AcousticModel`, optional
+        Acoustic model for Kaldi decoding
+    lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`, optional
+        Lexicon compiler used to construct the decoding graph
+    hclg_path: :class:`~pathlib.Path`, optional
+        Path to the compiled HCLG.fst
+    whisper_model: :class:`~montreal_forced_aligner.transcription.models.MfaFasterWhisperPipeline`, optional
+        Whisper model
+    speechbrain_model: :class:`~speechbrain.inference.ASR.WhisperASR` or :class:`~speechbrain.inference.ASR.EncoderASR`, optional
+        SpeechBrain model
+    tokenizer: :class:`~montreal_forced_aligner.tokenization.simple.SimpleTokenizer`, optional
+        Tokenizer to normalize Whisper and SpeechBrain output
+    batch_size: int
+        Maximum number of requests to process together for Whisper and SpeechBrain models,
+        defaults to 8
+    batch_timeout: float
+        Time in seconds to wait for more requests after the first one in a batch, defaults to 0.01
+    decode_options: dict[str, Any]
+        Options for :func:`~montreal_forced_aligner.online.transcription.create_online_decoder`
+    """
+
+    def __init__(
+        self,
+        acoustic_model: typing.Optional[AcousticModel] = None,
+        lexicon_compiler: typing.Optional[LexiconCompiler] = None,
+        hclg_path: typing.Optional[Path] = None,
+        whisper_model: typing.Optional[MfaFasterWhisperPipeline] = None,
+        speechbrain_model: typing.Optional[typing.Union[WhisperASR, EncoderASR]] = None,
+        tokenizer: typing.Optional[SimpleTokenizer] = None,
+        batch_size: int = 8,
+        batch_timeout: float = 0.01,
+        **decode_options,
+    ):
+        super().__init__(daemon=True)
+        models = [x for x in (acoustic_model, whisper_model, speechbrain_model) if x is not None]
+        if len(models) != 1:
+            raise MFAError(
+                "Exactly one of an acoustic model, whisper model, or speechbrain model must be specified."
+            )
+        self.acoustic_model = acoustic_model
+        self.lexicon_compiler = lexicon_compiler
+        self.whisper_model = whisper_model
+        self.speechbrain_model = speechbrain_model
+        self.tokenizer = tokenizer
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.decoder = None
+        if self.acoustic_model is not None:
+            if lexicon_compiler is None or hclg_path is None:
+                raise MFAError(
+                    "A lexicon compiler and HCLG path are required for transcribing with an acoustic model."
+                )
+            self.hclg_fst = ConstFst.Read(str(hclg_path))
+            self.decoder = create_online_decoder(
+                self.acoustic_model, self.lexicon_compiler, self.hclg_fst, **decode_options
+            )
+            # The decoder processes one utterance at a time, so batching would only delay replies
+            self.batch_size = 1
+        self.job_queue: queue.Queue[typing.Tuple[Segment, Future]] = queue.Queue()
+        self.stopped = threading.Event()
+
+    def submit(self, segment: Segment) -> Future:
+        """
+        Queue a segment for transcription
+
+        Parameters
+        ----------
+        segment: :class:`~kalpy.data.Segment`
+            Audio segment to transcribe
+
+        Returns
+        -------
+        :class:`~concurrent.futures.Future`
+            Future that resolves to a dictionary with the transcribed ``text``,
+            and for Kaldi decoding, the ``likelihood`` and word ``intervals``
+        """
+        if self.stopped.is_set():
+            raise MFAError("Transcription worker has been stopped.")
+        future = Future()
+        self.job_queue.put((segment, future))
+        return future
+
+    def transcribe(self, segment: Segment, timeout: float = None) -> typing.Dict[str, typing.Any]:
+        """
+        Transcribe a segment, blocking until the result is ready
+
+        Parameters
+        ----------
+        segment: :class:`~kalpy.data.Segment`
+            Audio segment to transcribe
+        timeout: float, optional
+            Maximum time in seconds to wait
+
+        Returns
+        -------
+        dict[str, Any]
+            Transcription result
+        """
+        return self.submit(segment).result(timeout=timeout)
+
+    def stop(self) -> None:
+        """Stop processing requests and cancel any that are still queued"""
+        self.stopped.set()
+        while True:
+            try:
+                _, future = self.job_queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+
+    def _next_batch(self) -> typing.List[typing.Tuple[Segment, Future]]:
+        try:
+            batch = [self.job_queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.job_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return [x for x in batch if x[1].set_running_or_notify_cancel()]
+
+    def _transcribe_batch(self, segments: typing.List[Segment]) -> typing.List[typing.Any]:
+        if self.whisper_model is not None:
+            texts = transcribe_segments_online_whisper(
+                self.whisper_model, segments, tokenizer=self.tokenizer
+            )
+            return [{"text": text} for text in texts]
+        utterances = [KalpyUtterance(segment, "") for segment in segments]
+        if self.speechbrain_model is not None:
+            texts = transcribe_utterances_online_speechbrain(
+                self.speechbrain_model, utterances, tokenizer=self.tokenizer
+            )
+            return [{"text": text} for text in texts]
+        ctm = transcribe_utterance_online(
+            self.acoustic_model,
+            utterances[0],
+            self.lexicon_compiler,
+            self.hclg_fst,
+            decoder=self.decoder,
+        )
+        return [
+            {
+                "text": " ".join(x.label for x in ctm.word_intervals),
+                "likelihood": ctm.likelihood,
+                "intervals": [[x.begin, x.end, x.label] for x in ctm.word_intervals],
+            }
+        ]
+
+    def run(self) -> None:
+        """Run the worker until it is stopped"""
+        while not self.stopped.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = self._transcribe_batch([x[0] for x in batch])
+            except Exception as e:
+                logger.debug(f"Transcription batch of {len(batch)} failed: {e}")
+                results = [e for _ in batch]
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class TranscriptionRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handler for newline-delimited JSON transcription requests
+
+    Each request line should be an object with a ``path`` to a sound file, and optionally
+    ``begin``, ``end`` and ``channel``.  Each response line is the transcription result,
+    or an object with an ``error`` message.
+    """
+
+    server: TranscriptionServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                segment = Segment(
+                    data["path"],
+                    data.get("begin", 0),
+                    data.get("end", None),
+                    data.get("channel", 0),
+                )
+                result = self.server.worker.transcribe(segment)
+            except Exception as e:
+                result = {"error": str(e)}
+            self.wfile.write(json.dumps(result).encode("utf8") + b"\n")
+            self.wfile.flush()
+
+
+class TranscriptionServer(socketserver.ThreadingTCPServer):
+    """
+    Local TCP server that forwards requests from any number of connections to a single
+    :class:`~montreal_forced_aligner.online.server.TranscriptionWorker`
+
+    Parameters
+    ----------
+    worker: :class:`~montreal_forced_aligner.online.server.TranscriptionWorker`
+        Worker holding the loaded models
+    host: str
+        Host to bind, defaults to ``127.0.0.1``
+    port: int
+        Port to bind, defaults to 0 to pick any free port
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, worker: TranscriptionWorker, host: str = "127.0.0.1", port: int = 0):
+        self.worker = worker
+        super().__init__((host, port), TranscriptionRequestHandler)
+
+    @property
+    def address(self) -> typing.Tuple[str, int]:
+        """Host and port the server is listening on"""
+        return self.server_address[:2]
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Start the worker if needed and serve requests until shutdown"""
+        if not self.worker.is_alive():
+            self.worker.start()
+        try:
+            super().serve_forever(poll_interval=poll_interval)
+        finally:
+            self.worker.stop()
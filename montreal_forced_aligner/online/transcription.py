@@ -25,6 +25,59 @@ from montreal_forced_aligner.transcription.multiprocessing import (
 )
 
 
+def create_online_decoder(
+    acoustic_model: AcousticModel,
+    lexicon_compiler: LexiconCompiler,
+    hclg_fst: ConstFst,
+    acoustic_scale: float = 0.1,
+    boost_silence: float = 1.0,
+    beam: int = 10,
+    lattice_beam: int = 10,
+    max_active: int = 7000,
+    min_active: int = 200,
+    prune_interval: int = 25,
+    beam_delta: float = 0.5,
+    hash_ratio: float = 2.0,
+    prune_scale: float = 0.1,
+    allow_partial: bool = True,
+) -> GmmDecoder:
+    """
+    Construct a decoder for online transcription that can be reused across utterances
+
+    Parameters
+    ----------
+    acoustic_model: :class:`~montreal_forced_aligner.models.AcousticModel`
+        Acoustic model to decode with
+    lexicon_compiler: :class:`~kalpy.fstext.lexicon.LexiconCompiler`
+        Lexicon compiler for the dictionary used in the decoding graph
+    hclg_fst: :class:`_kalpy.fstext.ConstFst`
+        Decoding graph
+
+    Returns
+    -------
+    :class:`~kalpy.gmm.decode.GmmDecoder`
+        Decoder with silence boosting applied
+    """
+    decoder = GmmDecoder(
+        acoustic_model.alignment_model_path,
+        hclg_fst,
+        acoustic_scale=acoustic_scale,
+        beam=beam,
+        lattice_beam=lattice_beam,
+        max_active=max_active,
+        min_active=min_active,
+        prune_interval=prune_interval,
+        beam_delta=beam_delta,
+        hash_ratio=hash_ratio,
+        prune_scale=prune_scale,
+        allow_partial=allow_partial,
+        fast=True,
+    )
+    if boost_silence != 1.0:
+        decoder.boost_silence(boost_silence, lexicon_compiler.silence_symbols)
+    return decoder
+
+
 def transcribe_utterance_online(
     acoustic_model: AcousticModel,
     utterance: KalpyUtterance,
@@ -43,6 +96,7 @@ def transcribe_utterance_online(
     hash_ratio: float = 2.0,
     prune_scale: float = 0.1,
     allow_partial: bool = True,
+    decoder: GmmDecoder = None,
 ) -> HierarchicalCtm:
     if utterance.mfccs is None:
         utterance.generate_mfccs(acoustic_model.mfcc_computer)
@@ -57,23 +111,23 @@ def transcribe_utterance_online(
         lda_mat=acoustic_model.lda_mat,
         fmllr_trans=fmllr_trans,
     )
-    decoder = GmmDecoder(
-        acoustic_model.alignment_model_path,
-        hclg_fst,
-        acoustic_scale=acoustic_scale,
-        beam=beam,
-        lattice_beam=lattice_beam,
-        max_active=max_active,
-        min_active=min_active,
-        prune_interval=prune_interval,
-        beam_delta=beam_delta,
-        hash_ratio=hash_ratio,
-        prune_scale=prune_scale,
-        allow_partial=allow_partial,
-        fast=True,
-    )
-    if boost_silence != 1.0:
-        decoder.boost_silence(boost_silence, lexicon_compiler.silence_symbols)
+    if decoder is None:
+        decoder = create_online_decoder(
+            acoustic_model,
+            lexicon_compiler,
+            hclg_fst,
+            acoustic_scale=acoustic_scale,
+            boost_silence=boost_silence,
+            beam=beam,
+            lattice_beam=lattice_beam,
+            max_active=max_active,
+            min_active=min_active,
+            prune_interval=prune_interval,
+            beam_delta=beam_delta,
+            hash_ratio=hash_ratio,
+            prune_scale=prune_scale,
+            allow_partial=allow_partial,
+        )
     alignment = decoder.decode_utterance(feats)
     if alignment is None:
         raise AlignerError(
@@ -101,22 +155,52 @@ def transcribe_utterance_online_whisper(
     segment: Segment,
     tokenizer: SimpleTokenizer = None,
 ) -> str:
+    return transcribe_segments_online_whisper(model, [segment], tokenizer=tokenizer)[0]
+
+
+def transcribe_segments_online_whisper(
+    model: MfaFasterWhisperPipeline,
+    segments: typing.List[Segment],
+    tokenizer: SimpleTokenizer = None,
+) -> typing.List[str]:
+    """
+    Transcribe multiple segments with a single batched pass through a Whisper model
+
+    Parameters
+    ----------
+    model: :class:`~montreal_forced_aligner.transcription.models.MfaFasterWhisperPipeline`
+        Whisper model
+    segments: list[:class:`~kalpy.data.Segment`]
+        Audio segments to transcribe
+    tokenizer: :class:`~montreal_forced_aligner.tokenization.simple.SimpleTokenizer`, optional
+        Tokenizer to normalize output text
+
+    Returns
+    -------
+    list[str]
+        Transcripts in the same order as the segments
+    """
     if not FOUND_WHISPERX:
         raise Exception(
             "Could not import transformers, please ensure it is installed via `conda install transformers`"
         )
-    audio = segment.wave.astype(np.float32)
-    vad_segments = model.vad_model.segment_for_whisper(audio, **model._vad_params)
-    result = model.transcribe(
-        vad_segments, [0 for _ in range(len(vad_segments))], batch_size=config.NUM_JOBS
-    )
+    vad_segments = []
+    segment_indices = []
+    for i, segment in enumerate(segments):
+        audio = segment.wave.astype(np.float32)
+        for vad_segment in model.vad_model.segment_for_whisper(audio, **model._vad_params):
+            vad_segments.append(vad_segment)
+            segment_indices.append(i)
+    result = {}
+    if vad_segments:
+        result = model.transcribe(vad_segments, segment_indices, batch_size=config.NUM_JOBS)
     texts = []
-    for seg in result[0]:
-        texts.append(seg["text"].strip())
-    text = " ".join(texts)
-    if tokenizer is not None:
-        text = tokenizer(text)[0]
-    return text.strip()
+    for i in range(len(segments)):
+        text = " ".join(seg["text"].strip() for seg in result.get(i, []))
+        if tokenizer is not None:
+            text = tokenizer(text)[0]
+        texts.append(text.strip())
+    return texts
 
 
 def transcribe_utterance_online_speechbrain(
@@ -124,18 +208,50 @@ def transcribe_utterance_online_speechbrain(
     utterance: KalpyUtterance,
     tokenizer: SimpleTokenizer = None,
 ) -> str:
+    return transcribe_utterances_online_speechbrain(model, [utterance], tokenizer=tokenizer)[0]
+
+
+def transcribe_utterances_online_speechbrain(
+    model: typing.Union[WhisperASR, EncoderASR],
+    utterances: typing.List[KalpyUtterance],
+    tokenizer: SimpleTokenizer = None,
+) -> typing.List[str]:
+    """
+    Transcribe multiple utterances as a single padded batch with a SpeechBrain model
+
+    Parameters
+    ----------
+    model: :class:`~speechbrain.inference.ASR.WhisperASR` or :class:`~speechbrain.inference.ASR.EncoderASR`
+        SpeechBrain model
+    utterances: list[:class:`~kalpy.utterance.Utterance`]
+        Utterances to transcribe
+    tokenizer: :class:`~montreal_forced_aligner.tokenization.simple.SimpleTokenizer`, optional
+        Tokenizer to normalize output text
+
+    Returns
+    -------
+    list[str]
+        Transcripts in the same order as the utterances
+    """
     if not FOUND_SPEECHBRAIN:
         raise Exception(
             "Could not import speechbrain, please ensure it is installed via `pip install speechbrain`"
         )
     import torch
 
-    segment = utterance.segment
-    waveform = segment.load_audio()
-    waveform = model.audio_normalizer(waveform, 16000).unsqueeze(0)
-    lens = torch.tensor([1.0])
-    predicted_words, predicted_tokens = model.transcribe_batch(waveform, lens)
-    text = predicted_words[0]
-    if tokenizer is not None:
-        text = tokenizer(text)[0]
-    return text
+    waveforms = [
+        model.audio_normalizer(utterance.segment.load_audio(), 16000)
+        for utterance in utterances
+    ]
+    max_length = max(w.shape[0] for w in waveforms)
+    batch = torch.zeros((len(waveforms), max_length))
+    for i, w in enumerate(waveforms):
+        batch[i, : w.shape[0]] = w
+    lens = torch.tensor([w.shape[0] / max_length for w in waveforms])
+    predicted_words, predicted_tokens = model.transcribe_batch(batch, lens)
+    texts = []
+    for text in predicted_words:
+        if tokenizer is not None:
+            text = tokenizer(text)[0]
+        texts.append(text)
+    return texts
@@ -0,0 +1,420 @@
+"""
+Profiling
+=========
+
+Resource usage of top-level stages and multiprocessing functions, collected into a report for
+each command.
+
+"""
+from __future__ import annotations
+
+import csv
+import functools
+import json
+import logging
+import os
+import sys
+import time
+import typing
+from contextlib import contextmanager
+from pathlib import Path
+
+import dataclassy
+
+try:
+    import resource
+
+    RESOURCE_ENABLED = True
+except ImportError:  # Windows
+    resource = None
+    RESOURCE_ENABLED = False
+
+__all__ = [
+    "ResourceUsage",
+    "StageRecord",
+    "Profiler",
+    "PROFILER",
+    "record_stage",
+]
+
+logger = logging.getLogger("mfa")
+
+
+def _read_io_counters() -> typing.Tuple[int, int]:
+    """Bytes read from and written to storage by the current process, where available"""
+    read_bytes = 0
+    write_bytes = 0
+    try:
+        with open(f"/proc/{os.getpid()}/io", encoding="utf8") as f:
+            for line in f:
+                key, value = line.split(":")
+                if key == "read_bytes":
+                    read_bytes = int(value)
+                elif key == "write_bytes":
+                    write_bytes = int(value)
+    except (OSError, ValueError):
+        pass
+    return read_bytes, write_bytes
+
+
+# noinspection PyUnresolvedReferences
+@dataclassy.dataclass(slots=True)
+class ResourceUsage:
+    """
+    Data class for resource usage counters
+
+    Parameters
+    ----------
+    cpu_time: float
+        User and system CPU time in seconds
+    peak_rss: int
+        Peak resident set size in bytes
+    read_bytes: int
+        Bytes read from storage
+    write_bytes: int
+        Bytes written to storage
+    """
+
+    cpu_time: float = 0.0
+    peak_rss: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+
+    @classmethod
+    def current(cls, include_children: bool = True) -> ResourceUsage:
+        """
+        Get the cumulative usage of the current process
+
+        Parameters
+        ----------
+        include_children: bool
+            Flag for including child processes that have been waited for, defaults to True
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+            Usage so far
+        """
+        read_bytes, write_bytes = _read_io_counters()
+        usage = cls(read_bytes=read_bytes, write_bytes=write_bytes)
+        if not RESOURCE_ENABLED:
+            return usage
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss_scale = 1 if sys.platform == "darwin" else 1024
+        who = [resource.RUSAGE_SELF]
+        if include_children:
+            who.append(resource.RUSAGE_CHILDREN)
+        for w in who:
+            r = resource.getrusage(w)
+            usage.cpu_time += r.ru_utime + r.ru_stime
+            usage.peak_rss = max(usage.peak_rss, r.ru_maxrss * rss_scale)
+        return usage
+
+    def since(self, begin: ResourceUsage) -> ResourceUsage:
+        """
+        Get the usage between an earlier snapshot and this one, keeping the later peak RSS
+
+        Parameters
+        ----------
+        begin: :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+            Earlier snapshot
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+            Usage in between
+        """
+        return ResourceUsage(
+            self.cpu_time - begin.cpu_time,
+            self.peak_rss,
+            self.read_bytes - begin.read_bytes,
+            self.write_bytes - begin.write_bytes,
+        )
+
+    def add(self, other: ResourceUsage) -> None:
+        """
+        Accumulate another process's usage
+
+        Parameters
+        ----------
+        other: :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+            Usage to add
+        """
+        self.cpu_time += other.cpu_time
+        self.peak_rss = max(self.peak_rss, other.peak_rss)
+        self.read_bytes += other.read_bytes
+        self.write_bytes += other.write_bytes
+
+
+# noinspection PyUnresolvedReferences
+@dataclassy.dataclass(slots=True)
+class StageRecord:
+    """
+    Data class for the profile of a top-level stage or multiprocessing function
+
+    Parameters
+    ----------
+    name: str
+        Name of the stage or function
+    kind: str
+        Either "stage" or "function"
+    depth: int
+        Number of stages that enclose this one
+    begin: float
+        Seconds from the start of profiling to the start of the stage
+    wall_time: float
+        Elapsed seconds
+    usage: :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+        CPU time, peak RSS and storage I/O of the main process and its workers
+    num_utterances: int, optional
+        Number of utterances (or other items) processed, when known
+    job_times: dict[int, float]
+        Seconds spent on each job, for multiprocessing functions
+    """
+
+    name: str
+    kind: str
+    depth: int
+    begin: float
+    wall_time: float = 0.0
+    usage: ResourceUsage = None
+    num_utterances: typing.Optional[int] = None
+    job_times: typing.Dict[int, float] = {}
+
+    @property
+    def straggler_ratio(self) -> typing.Optional[float]:
+        """Ratio of the slowest job's time to the mean job time"""
+        if len(self.job_times) < 2:
+            return None
+        mean = sum(self.job_times.values()) / len(self.job_times)
+        if mean <= 0:
+            return None
+        return max(self.job_times.values()) / mean
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Convert the record for JSON serialization
+
+        Returns
+        -------
+        dict[str, Any]
+            Record data
+        """
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "depth": self.depth,
+            "begin": round(self.begin, 3),
+            "wall_time": round(self.wall_time, 3),
+            "cpu_time": round(self.usage.cpu_time, 3),
+            "peak_rss": self.usage.peak_rss,
+            "read_bytes": self.usage.read_bytes,
+            "write_bytes": self.usage.write_bytes,
+            "num_utterances": self.num_utterances,
+            "straggler_ratio": self.straggler_ratio,
+            "job_times": {str(k): round(v, 3) for k, v in self.job_times.items()},
+        }
+
+
+class Profiler:
+    """
+    Collects :class:`~montreal_forced_aligner.profiling.StageRecord` objects for a command
+
+    Usage of worker processes that the main process does not wait on, such as persistent pool
+    workers and worker nodes, is reported through
+    :meth:`~montreal_forced_aligner.profiling.Profiler.add_worker_usage` and included in the
+    records of the stages that were running.
+    """
+
+    def __init__(self):
+        self.records: typing.List[StageRecord] = []
+        self.start_time = time.time()
+        self.stack: typing.List[StageRecord] = []
+        self.worker_usage = ResourceUsage()
+
+    def reset(self) -> None:
+        """Clear records for a new command"""
+        self.records = []
+        self.start_time = time.time()
+        self.stack = []
+        self.worker_usage = ResourceUsage()
+
+    @property
+    def current(self) -> typing.Optional[StageRecord]:
+        """Innermost record that is still open"""
+        if not self.stack:
+            return None
+        return self.stack[-1]
+
+    def add_worker_usage(self, usage: ResourceUsage) -> None:
+        """
+        Accumulate the usage of a job run by a worker process that is not a waited-for child
+
+        Parameters
+        ----------
+        usage: :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+            Usage of the job
+        """
+        self.worker_usage.add(usage)
+
+    def snapshot(self) -> ResourceUsage:
+        """
+        Get the cumulative usage of the main process, its children and reported workers
+
+        Returns
+        -------
+        :class:`~montreal_forced_aligner.profiling.ResourceUsage`
+            Usage so far
+        """
+        usage = ResourceUsage.current()
+        usage.add(self.worker_usage)
+        return usage
+
+    @contextmanager
+    def record(
+        self, name: str, kind: str = "stage", num_utterances: typing.Optional[int] = None
+    ) -> typing.Generator[StageRecord]:
+        """
+        Record the wall time and resource usage of a section
+
+        Parameters
+        ----------
+        name: str
+            Name of the stage or function
+        kind: str
+            Either "stage" or "function", defaults to "stage"
+        num_utterances: int, optional
+            Number of utterances processed, can also be set on the yielded record
+
+        Yields
+        ------
+        :class:`~montreal_forced_aligner.profiling.StageRecord`
+            Record that is filled in when the section exits
+        """
+        begin_usage = self.snapshot()
+        begin = time.time()
+        stage_record = StageRecord(
+            name, kind, len(self.stack), begin - self.start_time, num_utterances=num_utterances
+        )
+        self.records.append(stage_record)
+        self.stack.append(stage_record)
+        try:
+            yield stage_record
+        finally:
+            self.stack = [x for x in self.stack if x is not stage_record]
+            stage_record.wall_time = time.time() - begin
+            stage_record.usage = self.snapshot().since(begin_usage)
+
+    def save(self, directory: Path, identifier: str) -> typing.Tuple[Path, Path]:
+        """
+        Write the records to JSON and CSV files
+
+        Parameters
+        ----------
+        directory: :class:`~pathlib.Path`
+            Directory to save the report in
+        identifier: str
+            Prefix for the file names
+
+        Returns
+        -------
+        :class:`~pathlib.Path`
+            Path to the JSON report
+        :class:`~pathlib.Path`
+            Path to the CSV report
+        """
+        json_path = directory.joinpath(f"{identifier}_profile.json")
+        csv_path = directory.joinpath(f"{identifier}_profile.csv")
+        records = [x.to_dict() for x in self.records if x.usage is not None]
+        with open(json_path, "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "start_time": self.start_time,
+                    "wall_time": time.time() - self.start_time,
+                    "stages": records,
+                },
+                f,
+                indent=2,
+            )
+        columns = [
+            "name",
+            "kind",
+            "depth",
+            "begin",
+            "wall_time",
+            "cpu_time",
+            "peak_rss",
+            "read_bytes",
+            "write_bytes",
+            "num_utterances",
+            "straggler_ratio",
+        ]
+        with open(csv_path, "w", encoding="utf8", newline="") as f:
+            writer = csv.DictWriter(f, columns, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+        return json_path, csv_path
+
+    def summary(self) -> str:
+        """
+        Format the records as a table
+
+        Returns
+        -------
+        str
+            Summary table
+        """
+        lines = [
+            f"{'Stage':<48} {'Wall (s)':>10} {'CPU (s)':>10} {'RSS (MB)':>9} "
+            f"{'Read (MB)':>10} {'Write (MB)':>10} {'Utts':>8} {'Slowest':>8}"
+        ]
+        for r in self.records:
+            if r.usage is None:
+                continue
+            name = ("  " * r.depth + r.name)[:48]
+            straggler = f"{r.straggler_ratio:.2f}x" if r.straggler_ratio is not None else ""
+            utterances = r.num_utterances if r.num_utterances is not None else ""
+            lines.append(
+                f"{name:<48} {r.wall_time:>10.3f} {r.usage.cpu_time:>10.3f} "
+                f"{r.usage.peak_rss / 1e6:>9.1f} {r.usage.read_bytes / 1e6:>10.1f} "
+                f"{r.usage.write_bytes / 1e6:>10.1f} {utterances:>8} {straggler:>8}"
+            )
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
+
+
+def record_stage(name: typing.Optional[str] = None) -> typing.Callable:
+    """
+    Decorator for recording a worker method as a top-level stage in
+    :data:`~montreal_forced_aligner.profiling.PROFILER`
+
+    Parameters
+    ----------
+    name: str, optional
+        Name of the stage, defaults to the class name of the instance and the method name
+
+    Returns
+    -------
+    Callable
+        Decorator
+    """
+
+    def decorator(func: typing.Callable) -> typing.Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            stage_name = name if name is not None else f"{type(self).__name__}.{func.__name__}"
+            current = PROFILER.current
+            if current is not None and current.name == stage_name:
+                # Overridden stages calling the base class's implementation are recorded once
+                return func(self, *args, **kwargs)
+            with PROFILER.record(stage_name) as stage_record:
+                try:
+                    return func(self, *args, **kwargs)
+                finally:
+                    stage_record.num_utterances = getattr(self, "_num_utterances", None)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,437 @@
+"""
+Query plans
+===========
+
+Seeding of synthetic corpora and query plan checks for the ORM queries on hot paths
+
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+import typing
+from pathlib import Path
+
+import dataclassy
+import sqlalchemy
+
+from montreal_forced_aligner.data import PhoneType, WordType, WorkflowType
+from montreal_forced_aligner.db import (
+    CorpusWorkflow,
+    Dictionary,
+    File,
+    Job,
+    MfaSqlBase,
+    Phone,
+    PhoneInterval,
+    Speaker,
+    Utterance,
+    Word,
+    WordInterval,
+    job_utterance_query,
+)
+from montreal_forced_aligner.textgrid import textgrid_interval_queries
+
+__all__ = [
+    "QueryPlan",
+    "seed_synthetic_corpus",
+    "hot_queries",
+    "explain_query",
+    "sequential_scans",
+    "check_query_plans",
+    "benchmark_query_plans",
+]
+
+logger = logging.getLogger("mfa")
+
+SEED_BATCH_SIZE = 10000
+
+
+@dataclassy.dataclass(slots=True)
+class QueryPlan:
+    """
+    Query plan and timing of a hot query
+
+    Parameters
+    ----------
+    name: str
+        Name of the query
+    plan: list[str]
+        Lines of the plan from ``EXPLAIN``
+    sequential_scans: list[str]
+        Tables that the plan scans in full
+    duration: float
+        Time to run the query and fetch its rows, in seconds
+    num_rows: int
+        Number of rows returned
+    """
+
+    name: str
+    plan: typing.List[str]
+    sequential_scans: typing.List[str]
+    duration: float
+    num_rows: int
+
+
+def _insert_batches(
+    session: sqlalchemy.orm.Session,
+    table: MfaSqlBase,
+    rows: typing.Iterable[typing.Dict[str, typing.Any]],
+) -> int:
+    """Insert rows in batches of executemany statements and return the number inserted"""
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= SEED_BATCH_SIZE:
+            session.execute(sqlalchemy.insert(table), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        session.execute(sqlalchemy.insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def seed_synthetic_corpus(
+    session: sqlalchemy.orm.Session,
+    num_speakers: int = 10,
+    num_files: int = 100,
+    utterances_per_file: int = 10,
+    words_per_utterance: int = 8,
+    phones_per_word: int = 4,
+    vocabulary_size: int = 1000,
+    num_phones: int = 40,
+    num_jobs: int = 4,
+) -> int:
+    """
+    Fill an empty database with a synthetic aligned corpus and update its planner statistics
+
+    Every speaker has one file in turn, every utterance is assigned to a job in turn, and every
+    word and phone interval belongs to a single alignment workflow, with one silence phone and
+    word ahead of each utterance's speech.
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        Session on an empty database with MFA's schema
+    num_speakers: int
+        Number of speakers
+    num_files: int
+        Number of files
+    utterances_per_file: int
+        Number of utterances in each file
+    words_per_utterance: int
+        Number of speech words in each utterance
+    phones_per_word: int
+        Number of phones in each word
+    vocabulary_size: int
+        Number of distinct speech words
+    num_phones: int
+        Number of distinct speech phones
+    num_jobs: int
+        Number of jobs
+
+    Returns
+    -------
+    int
+        Id of the alignment workflow
+    """
+    begin = time.time()
+    session.execute(sqlalchemy.insert(Dictionary), [{"id": 1, "name": "synthetic"}])
+    session.execute(
+        sqlalchemy.insert(CorpusWorkflow),
+        [
+            {
+                "id": 1,
+                "name": "synthetic_alignment",
+                "workflow_type": WorkflowType.alignment,
+                "working_directory": Path("synthetic_alignment"),
+                "current": True,
+            }
+        ],
+    )
+    _insert_batches(session, Job, ({"id": i} for i in range(1, num_jobs + 1)))
+    _insert_batches(
+        session,
+        Phone,
+        (
+            {
+                "id": i + 1,
+                "mapping_id": i,
+                "phone": f"p{i}" if i else "sil",
+                "kaldi_label": f"p{i}" if i else "sil",
+                "phone_type": PhoneType.non_silence if i else PhoneType.silence,
+            }
+            for i in range(num_phones + 1)
+        ),
+    )
+    _insert_batches(
+        session,
+        Word,
+        (
+            {
+                "id": i + 1,
+                "mapping_id": i,
+                "word": f"w{i}" if i else "<eps>",
+                "word_type": WordType.speech if i else WordType.silence,
+                "dictionary_id": 1,
+            }
+            for i in range(vocabulary_size + 1)
+        ),
+    )
+    _insert_batches(
+        session,
+        Speaker,
+        ({"id": i, "name": f"s{i}", "dictionary_id": 1} for i in range(1, num_speakers + 1)),
+    )
+    _insert_batches(
+        session,
+        File,
+        ({"id": i, "name": f"f{i}", "relative_path": ""} for i in range(1, num_files + 1)),
+    )
+    utterance_duration = (words_per_utterance + 1) * phones_per_word * 0.1
+
+    def utterances():
+        for file_id in range(1, num_files + 1):
+            for i in range(utterances_per_file):
+                utterance_id = (file_id - 1) * utterances_per_file + i + 1
+                yield {
+                    "id": utterance_id,
+                    "begin": i * utterance_duration,
+                    "end": (i + 1) * utterance_duration,
+                    "channel": 0,
+                    "text": "synthetic",
+                    "normalized_text": "synthetic",
+                    "file_id": file_id,
+                    "speaker_id": (file_id - 1) % num_speakers + 1,
+                    "job_id": (utterance_id - 1) % num_jobs + 1,
+                }
+
+    num_utterances = _insert_batches(session, Utterance, utterances())
+
+    def word_intervals():
+        for utterance_id in range(1, num_utterances + 1):
+            utterance_begin = ((utterance_id - 1) % utterances_per_file) * utterance_duration
+            for i in range(words_per_utterance + 1):
+                word_interval_id = (utterance_id - 1) * (words_per_utterance + 1) + i + 1
+                yield {
+                    "id": word_interval_id,
+                    "begin": utterance_begin + i * phones_per_word * 0.1,
+                    "end": utterance_begin + (i + 1) * phones_per_word * 0.1,
+                    "utterance_id": utterance_id,
+                    "word_id": (word_interval_id % vocabulary_size) + 2 if i else 1,
+                    "workflow_id": 1,
+                }
+
+    def phone_intervals():
+        phone_interval_id = 0
+        for word_interval in word_intervals():
+            for i in range(phones_per_word):
+                phone_interval_id += 1
+                yield {
+                    "id": phone_interval_id,
+                    "begin": word_interval["begin"] + i * 0.1,
+                    "end": word_interval["begin"] + (i + 1) * 0.1,
+                    "phone_id": (phone_interval_id % num_phones) + 2
+                    if word_interval["word_id"] != 1
+                    else 1,
+                    "utterance_id": word_interval["utterance_id"],
+                    "word_interval_id": word_interval["id"],
+                    "workflow_id": 1,
+                }
+
+    _insert_batches(session, WordInterval, word_intervals())
+    _insert_batches(session, PhoneInterval, phone_intervals())
+    session.commit()
+    session.execute(sqlalchemy.text("ANALYZE"))
+    session.commit()
+    logger.debug(f"Seeding the synthetic corpus took {time.time() - begin:.3f} seconds")
+    return 1
+
+
+def hot_queries(
+    session: sqlalchemy.orm.Session,
+    workflow_id: int,
+    file_ids: typing.List[int],
+    job_id: int,
+    dictionary_id: int,
+) -> typing.Dict[str, sqlalchemy.Select]:
+    """
+    Construct the queries used on hot paths, as they are run in TextGrid export, alignment
+    extraction and text normalization
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        Session to construct ORM queries with
+    workflow_id: int
+        Workflow of the intervals
+    file_ids: list[int]
+        Files in a TextGrid export batch
+    job_id: int
+        Job to extract or normalize
+    dictionary_id: int
+        Dictionary of the job's speakers
+
+    Returns
+    -------
+    dict[str, :class:`sqlalchemy.Select`]
+        Queries by name
+    """
+    phone_interval_query, word_interval_query = textgrid_interval_queries(
+        workflow_id, file_ids, True
+    )
+    return {
+        "textgrid_phone_intervals": phone_interval_query,
+        "textgrid_word_intervals": word_interval_query,
+        "alignment_extraction_utterances": job_utterance_query(
+            session,
+            job_id,
+            dictionary_id,
+            Utterance.id,
+            Utterance.begin,
+            Utterance.end,
+            Utterance.normalized_text,
+        ).statement,
+        "normalize_text_utterances": job_utterance_query(
+            session, job_id, dictionary_id, Utterance.id, Utterance.text
+        )
+        .filter(Utterance.text != "")
+        .statement,
+    }
+
+
+def explain_query(
+    session: sqlalchemy.orm.Session, statement: sqlalchemy.Select
+) -> typing.List[str]:
+    """
+    Get the plan of a query, with sequential scans disabled on PostgreSQL so that any that
+    remain in the plan are for tables without a usable index
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        Session to use
+    statement: :class:`sqlalchemy.Select`
+        Query to explain
+
+    Returns
+    -------
+    list[str]
+        Lines of the query plan
+    """
+    dialect = session.get_bind().dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    conn = session.connection()
+    if dialect.name == "postgresql":
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = on")
+        return plan
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def sequential_scans(plan: typing.List[str], dialect_name: str) -> typing.List[str]:
+    """
+    Find the tables that a query plan reads in full
+
+    Parameters
+    ----------
+    plan: list[str]
+        Lines of a plan from :func:`~montreal_forced_aligner.query_plans.explain_query`
+    dialect_name: str
+        Name of the database dialect
+
+    Returns
+    -------
+    list[str]
+        Tables read in full, full scans of an index on SQLite count as well
+    """
+    if dialect_name == "postgresql":
+        pattern = re.compile(r"Seq Scan on (\w+)")
+    else:
+        pattern = re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)")
+    scans = []
+    for line in plan:
+        m = pattern.search(line.strip())
+        if m:
+            scans.append(m.group(1))
+    return scans
+
+
+def check_query_plans(
+    session: sqlalchemy.orm.Session,
+    workflow_id: int,
+    file_ids: typing.List[int],
+    job_id: int = 1,
+    dictionary_id: int = 1,
+) -> typing.Dict[str, QueryPlan]:
+    """
+    Explain and time each hot query
+
+    Parameters
+    ----------
+    session: :class:`sqlalchemy.orm.Session`
+        Session to use
+    workflow_id: int
+        Workflow of the intervals
+    file_ids: list[int]
+        Files in a TextGrid export batch
+    job_id: int
+        Job to extract or normalize
+    dictionary_id: int
+        Dictionary of the job's speakers
+
+    Returns
+    -------
+    dict[str, :class:`~montreal_forced_aligner.query_plans.QueryPlan`]
+        Query plans by query name
+    """
+    dialect_name = session.get_bind().dialect.name
+    plans = {}
+    queries = hot_queries(session, workflow_id, file_ids, job_id, dictionary_id)
+    for name, statement in queries.items():
+        plan = explain_query(session, statement)
+        begin = time.time()
+        num_rows = len(session.execute(statement).all())
+        plans[name] = QueryPlan(
+            name, plan, sequential_scans(plan, dialect_name), time.time() - begin, num_rows
+        )
+        logger.debug(
+            f"{name} returned {num_rows} rows in {plans[name].duration:.3f} seconds with plan:\n"
+            + "\n".join(plan)
+        )
+    session.rollback()
+    return plans
+
+
+def benchmark_query_plans(
+    engine: sqlalchemy.engine.Engine, file_batch_size: int = 100, **kwargs
+) -> typing.Dict[str, QueryPlan]:
+    """
+    Create MFA's schema in an empty database, seed it with a synthetic corpus and check the
+    plans of the hot queries
+
+    Parameters
+    ----------
+    engine: :class:`~sqlalchemy.engine.Engine`
+        Engine for an empty database
+    file_batch_size: int
+        Number of files in the TextGrid export batch
+    kwargs
+        Sizes of the synthetic corpus, passed to
+        :func:`~montreal_forced_aligner.query_plans.seed_synthetic_corpus`
+
+    Returns
+    -------
+    dict[str, :class:`~montreal_forced_aligner.query_plans.QueryPlan`]
+        Query plans by query name
+    """
+    MfaSqlBase.metadata.create_all(engine)
+    with sqlalchemy.orm.Session(engine) as session:
+        workflow_id = seed_synthetic_corpus(session, **kwargs)
+        num_files = kwargs.get("num_files", 100)
+        file_ids = list(range(1, min(num_files, file_batch_size) + 1))
+        return check_query_plans(session, workflow_id, file_ids)
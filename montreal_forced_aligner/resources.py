@@ -0,0 +1,293 @@
+"""
+Resource planning
+=================
+
+Assignment of CPUs and BLAS threads to worker processes, so that stages do not run more threads
+than there are cores.
+
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import typing
+from pathlib import Path
+
+from montreal_forced_aligner import config
+
+try:
+    import threadpoolctl
+
+    THREADPOOLCTL_ENABLED = True
+except ImportError:
+    threadpoolctl = None
+    THREADPOOLCTL_ENABLED = False
+
+__all__ = [
+    "ResourcePlan",
+    "available_cpus",
+    "numa_nodes",
+    "plan_resources",
+    "plan_stage",
+    "set_blas_threads",
+]
+
+logger = logging.getLogger("mfa")
+
+BLAS_THREAD_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+NUMA_NODE_DIRECTORY = Path("/sys/devices/system/node")
+
+#: BLAS threads per process for pipeline stages, keyed by KaldiFunction name. Alignment,
+#: decoding and feature generation search graphs or process frames in a single thread, so
+#: they run one thread per process regardless of :code:`config.BLAS_NUM_THREADS`. Stages
+#: dominated by matrix operations use 0 to spread the CPUs left over by other processes.
+#: Stages not listed use :code:`config.BLAS_NUM_THREADS`.
+STAGE_BLAS_THREADS: typing.Dict[str, int] = {
+    "AlignFunction": 1,
+    "AlignAndExtractFunction": 1,
+    "CompileTrainGraphsFunction": 1,
+    "DecodeFunction": 1,
+    "DecodePhoneFunction": 1,
+    "PerSpeakerDecodeFunction": 1,
+    "LmRescoreFunction": 1,
+    "CarpaLmRescoreFunction": 1,
+    "MfccFunction": 1,
+    "FinalFeatureFunction": 1,
+    "ComputeVadFunction": 1,
+    "CalcFmllrFunction": 0,
+    "InitialFmllrFunction": 0,
+    "FinalFmllrFunction": 0,
+    "CalcLdaMlltFunction": 0,
+    "ExtractIvectorsFunction": 0,
+}
+
+
+def available_cpus() -> typing.List[int]:
+    """
+    Get the CPUs that the current process is allowed to run on
+
+    Returns
+    -------
+    list[int]
+        CPU indices
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(cpu_list: str) -> typing.List[int]:
+    """
+    Parse a Linux CPU list such as ``0-3,8-11``
+
+    Parameters
+    ----------
+    cpu_list: str
+        CPU list
+
+    Returns
+    -------
+    list[int]
+        CPU indices
+    """
+    cpus = []
+    for part in cpu_list.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            begin, end = part.split("-")
+            cpus.extend(range(int(begin), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def numa_nodes() -> typing.List[typing.List[int]]:
+    """
+    Group the available CPUs by NUMA node, with a single group when the topology is unknown
+
+    Returns
+    -------
+    list[list[int]]
+        Available CPU indices for each node
+    """
+    cpus = available_cpus()
+    allowed = set(cpus)
+    nodes = []
+    if NUMA_NODE_DIRECTORY.exists():
+        for node_directory in sorted(NUMA_NODE_DIRECTORY.iterdir()):
+            if not re.match(r"^node\d+$", node_directory.name):
+                continue
+            try:
+                with open(node_directory.joinpath("cpulist"), encoding="utf8") as f:
+                    node_cpus = [x for x in parse_cpu_list(f.read()) if x in allowed]
+            except (OSError, ValueError):
+                continue
+            if node_cpus:
+                nodes.append(node_cpus)
+    if not nodes or sum(len(x) for x in nodes) != len(cpus):
+        nodes = [cpus]
+    return nodes
+
+
+class ResourcePlan:
+    """
+    Number of BLAS threads and CPU set for each worker process of a stage
+
+    Parameters
+    ----------
+    num_processes: int
+        Number of worker processes
+    blas_threads: int
+        Number of BLAS threads per process
+    cpu_sets: list[list[int]], optional
+        Disjoint CPUs for each process, None if processes should not be pinned
+    """
+
+    def __init__(
+        self,
+        num_processes: int,
+        blas_threads: int,
+        cpu_sets: typing.Optional[typing.List[typing.List[int]]] = None,
+    ):
+        self.num_processes = num_processes
+        self.blas_threads = blas_threads
+        self.cpu_sets = cpu_sets
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResourcePlan {self.num_processes} processes x {self.blas_threads} threads, "
+            f"pinned={self.cpu_sets is not None}>"
+        )
+
+    def apply(self, slot: int) -> None:
+        """
+        Set the BLAS threads of the current process and pin it to its CPUs if
+        :code:`config.USE_CPU_AFFINITY` is set
+
+        Parameters
+        ----------
+        slot: int
+            Index of the worker process in the plan
+        """
+        set_blas_threads(self.blas_threads)
+        if not config.USE_CPU_AFFINITY or not self.cpu_sets:
+            return
+        if not hasattr(os, "sched_setaffinity"):
+            return
+        cpus = self.cpu_sets[slot % len(self.cpu_sets)]
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.debug(f"Could not pin worker {slot} to CPUs {cpus}: {e}")
+
+    def stage_threads(self, stage: str, slot: int) -> int:
+        """
+        Get the BLAS threads for a stage run on this plan's processes, limited to the CPUs of
+        the process if it is pinned
+
+        Parameters
+        ----------
+        stage: str
+            Name of the KaldiFunction for the stage
+        slot: int
+            Index of the worker process in the plan
+
+        Returns
+        -------
+        int
+            Number of BLAS threads
+        """
+        blas_threads = plan_stage(stage, self.num_processes).blas_threads
+        if config.USE_CPU_AFFINITY and self.cpu_sets:
+            blas_threads = min(blas_threads, len(self.cpu_sets[slot % len(self.cpu_sets)]))
+        return blas_threads
+
+
+def plan_resources(num_processes: int, blas_threads: typing.Optional[int] = None) -> ResourcePlan:
+    """
+    Plan BLAS threads and disjoint CPU sets for a stage's worker processes
+
+    Processes are spread across NUMA nodes and each process's CPUs come from a single node.
+    Threads per process are reduced until every process fits on its own CPUs, and processes
+    are left unpinned if there are more processes than CPUs.
+
+    Parameters
+    ----------
+    num_processes: int
+        Number of worker processes
+    blas_threads: int, optional
+        Requested BLAS threads per process, defaults to :code:`config.BLAS_NUM_THREADS`,
+        and 0 uses every CPU not needed by other processes
+
+    Returns
+    -------
+    :class:`~montreal_forced_aligner.resources.ResourcePlan`
+        Plan for the stage
+    """
+    num_processes = max(1, num_processes)
+    if blas_threads is None:
+        blas_threads = config.BLAS_NUM_THREADS
+    nodes = numa_nodes()
+    num_cpus = sum(len(x) for x in nodes)
+    if blas_threads <= 0:
+        blas_threads = num_cpus // num_processes
+    blas_threads = max(1, min(blas_threads, num_cpus // num_processes))
+    if num_processes > num_cpus:
+        return ResourcePlan(num_processes, blas_threads)
+    while True:
+        chunks_per_node = [
+            [
+                node[i : i + blas_threads]
+                for i in range(0, len(node) - blas_threads + 1, blas_threads)
+            ]
+            for node in nodes
+        ]
+        if sum(len(x) for x in chunks_per_node) >= num_processes or blas_threads == 1:
+            break
+        blas_threads -= 1
+    cpu_sets = []
+    index = 0
+    while len(cpu_sets) < num_processes:
+        for chunks in chunks_per_node:
+            if index < len(chunks) and len(cpu_sets) < num_processes:
+                cpu_sets.append(chunks[index])
+        index += 1
+    return ResourcePlan(num_processes, blas_threads, cpu_sets)
+
+
+def plan_stage(stage: str, num_processes: int) -> ResourcePlan:
+    """
+    Plan BLAS threads and CPU sets for the worker processes of a pipeline stage, using the
+    stage's entry in :const:`~montreal_forced_aligner.resources.STAGE_BLAS_THREADS`
+
+    Parameters
+    ----------
+    stage: str
+        Name of the KaldiFunction for the stage
+    num_processes: int
+        Number of worker processes
+
+    Returns
+    -------
+    :class:`~montreal_forced_aligner.resources.ResourcePlan`
+        Plan for the stage
+    """
+    return plan_resources(num_processes, STAGE_BLAS_THREADS.get(stage, None))
+
+
+def set_blas_threads(num_threads: int) -> None:
+    """
+    Set the number of BLAS threads for libraries loaded later through environment variables,
+    and for already loaded libraries through threadpoolctl if it is available
+
+    Parameters
+    ----------
+    num_threads: int
+        Number of threads
+    """
+    for variable in BLAS_THREAD_VARIABLES:
+        os.environ[variable] = f"{num_threads}"
+    if THREADPOOLCTL_ENABLED:
+        threadpoolctl.threadpool_limits(num_threads, user_api="blas")
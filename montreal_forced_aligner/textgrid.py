@@ -20,6 +20,7 @@ from praatio.utilities import utils as tgio_utils
 from sqlalchemy.orm import Session
 
 from montreal_forced_aligner.data import (
+    CompactCtm,
     CtmInterval,
     PhoneType,
     TextFileType,
@@ -28,20 +29,26 @@ from montreal_forced_aligner.data import (
 )
 from montreal_forced_aligner.db import (
     CorpusWorkflow,
+    File,
     Phone,
     PhoneInterval,
+    SoundFile,
     Speaker,
+    TextFile,
     Utterance,
     Word,
     WordInterval,
 )
 from montreal_forced_aligner.exceptions import AlignmentExportError, TextGridParseError
 from montreal_forced_aligner.helper import mfa_open
+from montreal_forced_aligner.interval_store import IntervalStore
 
 __all__ = [
     "process_ctm_line",
     "export_textgrid",
     "construct_textgrid_output",
+    "construct_textgrid_output_from_ctms",
+    "textgrid_interval_queries",
     "construct_output_path",
     "output_textgrid_writing_errors",
 ]
@@ -276,17 +283,373 @@ def parse_aligned_textgrid(
     return data
 
 
-def construct_textgrid_output(
+def add_word_interval(
+    words: List[CtmInterval],
+    begin: float,
+    end: float,
+    word: str,
+    cleanup_textgrids: bool,
+    clitic_marker: str,
+) -> None:
+    """
+    Add a word interval to a speaker's tier, merging clitics into their host word when
+    cleaning up TextGrids
+
+    Parameters
+    ----------
+    words: list[:class:`~montreal_forced_aligner.data.CtmInterval`]
+        Word intervals of the speaker so far
+    begin: float
+        Start of the word
+    end: float
+        End of the word
+    word: str
+        Word label
+    cleanup_textgrids: bool
+        Flag for cleaning up TextGrids
+    clitic_marker: str
+        Marker for clitics
+    """
+    if (
+        cleanup_textgrids
+        and words
+        and begin - words[-1].end < 0.02
+        and clitic_marker
+        and (words[-1].label.endswith(clitic_marker) or word.startswith(clitic_marker))
+    ):
+        words[-1].end = end
+        words[-1].label += word
+    else:
+        words.append(CtmInterval(begin, end, word))
+
+
+def construct_textgrid_output_from_store(
     session: Session,
     file_batch: typing.Dict[int, typing.Tuple],
-    workflow: CorpusWorkflow,
+    interval_store: IntervalStore,
     cleanup_textgrids: bool,
     clitic_marker: str,
     output_directory: Path,
     frame_shift: float,
     output_format: str = TextgridFormats.SHORT_TEXTGRID,
     include_original_text: bool = False,
-):
+) -> typing.Generator[Path]:
+    """
+    Export TextGrids for a batch of files from an interval store, reading only the intervals
+    of the batch's utterances
+
+    See :func:`~montreal_forced_aligner.textgrid.construct_textgrid_output` for parameters
+    """
+    file_ids = list(file_batch.keys())
+    utterances = {}
+    job_names = set()
+    query = (
+        session.query(Utterance.id, Utterance.file_id, Utterance.job_id, Speaker.name)
+        .join(Utterance.speaker)
+        .filter(Utterance.file_id.in_(file_ids))
+    )
+    for utterance_id, file_id, job_id, speaker_name in query:
+        utterances[utterance_id] = (file_id, speaker_name)
+        job_names.add(job_id)
+    if not utterances:
+        return
+    columns = ["utterance_id", "begin", "end", "label_id"]
+    word_table = interval_store.read_words(utterances.keys(), columns, job_names)
+    phone_table = interval_store.read_phones(utterances.keys(), columns, job_names)
+    word_ids = set(word_table.column("label_id").to_pylist())
+    words = {
+        w_id: (word, word_type)
+        for w_id, word, word_type in session.query(Word.id, Word.word, Word.word_type).filter(
+            Word.id.in_(word_ids)
+        )
+    }
+    phones = {
+        p_id: (phone, phone_type)
+        for p_id, phone, phone_type in session.query(Phone.id, Phone.phone, Phone.phone_type)
+    }
+    file_phones = {}
+    file_words = {}
+    for table, labels, silence_type, file_data in [
+        (phone_table, phones, PhoneType.silence, file_phones),
+        (word_table, words, WordType.silence, file_words),
+    ]:
+        for utterance_id, begin, end, label_id in zip(
+            *(table.column(x).to_pylist() for x in columns)
+        ):
+            if end - begin <= 0:
+                continue
+            label, label_type = labels[label_id]
+            if cleanup_textgrids and label_type is silence_type:
+                continue
+            file_id, speaker_name = utterances[utterance_id]
+            if file_id not in file_data:
+                file_data[file_id] = []
+            file_data[file_id].append((begin, end, label, speaker_name))
+    file_utterances = {}
+    if include_original_text:
+        query = (
+            session.query(
+                Utterance.begin, Utterance.end, Utterance.text, Speaker.name, Utterance.file_id
+            )
+            .join(Utterance.speaker)
+            .filter(Utterance.file_id.in_(file_ids))
+        )
+        for begin, end, text, speaker_name, file_id in query:
+            if file_id not in file_utterances:
+                file_utterances[file_id] = []
+            file_utterances[file_id].append((begin, end, text, speaker_name))
+    for file_id in sorted(file_phones.keys()):
+        yield export_file_intervals(
+            file_batch[file_id],
+            file_phones[file_id],
+            file_words.get(file_id, []),
+            file_utterances.get(file_id, []) if include_original_text else None,
+            cleanup_textgrids,
+            clitic_marker,
+            output_directory,
+            frame_shift,
+            output_format,
+        )
+
+
+def export_file_intervals(
+    file_info: typing.Tuple[str, str, float, str],
+    phone_intervals: typing.List[typing.Tuple[float, float, str, str]],
+    word_intervals: typing.List[typing.Tuple[float, float, str, str]],
+    utterance_intervals: typing.Optional[typing.List[typing.Tuple[float, float, str, str]]],
+    cleanup_textgrids: bool,
+    clitic_marker: str,
+    output_directory: Path,
+    frame_shift: float,
+    output_format: str = TextgridFormats.SHORT_TEXTGRID,
+) -> Path:
+    """
+    Export a file's phone and word intervals, grouping them into tiers by speaker
+
+    Parameters
+    ----------
+    file_info: tuple[str, str, float, str]
+        File name, relative path, duration and text file path
+    phone_intervals: list[tuple[float, float, str, str]]
+        Begin, end, phone label and speaker name of the file's phone intervals
+    word_intervals: list[tuple[float, float, str, str]]
+        Begin, end, word label and speaker name of the file's word intervals
+    utterance_intervals: list[tuple[float, float, str, str]], optional
+        Begin, end, text and speaker name of the file's utterances, if original text should be
+        included
+    cleanup_textgrids: bool
+        Flag for cleaning up word intervals
+    clitic_marker: str
+        Marker for clitics
+    output_directory: :class:`~pathlib.Path`
+        Directory to export to
+    frame_shift: float
+        Frame shift of alignments
+    output_format: str
+        Format of the output file
+
+    Returns
+    -------
+    :class:`~pathlib.Path`
+        Path of the exported file
+    """
+    data = {}
+    for begin, end, phone, speaker_name in sorted(phone_intervals):
+        if speaker_name not in data:
+            data[speaker_name] = {"words": [], "phones": []}
+            if utterance_intervals is not None:
+                data[speaker_name]["utterances"] = []
+        data[speaker_name]["phones"].append(CtmInterval(begin, end, phone))
+    for begin, end, word, speaker_name in sorted(word_intervals):
+        add_word_interval(
+            data[speaker_name]["words"], begin, end, word, cleanup_textgrids, clitic_marker
+        )
+    if utterance_intervals is not None:
+        for begin, end, text, speaker_name in utterance_intervals:
+            if speaker_name in data:
+                data[speaker_name]["utterances"].append(CtmInterval(begin, end, text))
+    file_name, relative_path, file_duration, text_file_path = file_info
+    output_path = construct_output_path(
+        file_name, relative_path, output_directory, text_file_path, output_format
+    )
+    export_textgrid(data, output_path, file_duration, frame_shift, output_format)
+    return output_path
+
+
+def construct_textgrid_output_from_ctms(
+    session: Session,
+    results: typing.Iterable[typing.Tuple[int, int, CompactCtm]],
+    cleanup_textgrids: bool,
+    clitic_marker: str,
+    output_directory: Path,
+    frame_shift: float,
+    output_format: str = TextgridFormats.SHORT_TEXTGRID,
+    include_original_text: bool = False,
+    batch_size: int = 1000,
+) -> typing.Generator[Path]:
+    """
+    Export TextGrids straight from extracted utterance alignments, without loading them into
+    the database
+
+    Files and their utterances are looked up for each batch of results as they come in, and a
+    file's intervals and metadata are only held until the last of its aligned utterances has
+    been extracted, at which point the file is exported.  Files with utterances that were not
+    aligned are exported once all results have been processed.
+
+    Parameters
+    ----------
+    session: :class:`~sqlalchemy.orm.Session`
+        Session to look up files, utterances, words and phones
+    results: Iterable[tuple[int, int, :class:`~montreal_forced_aligner.data.CompactCtm`]]
+        Utterance id, dictionary id and alignment of extracted utterances, see
+        :class:`~montreal_forced_aligner.alignment.multiprocessing.AlignmentExtractionFunction`
+    batch_size: int
+        Number of results to look up files for at once
+
+    See :func:`~montreal_forced_aligner.textgrid.construct_textgrid_output` for the remaining
+    parameters
+    """
+    file_batch = {}
+    utterances = {}
+    file_utterance_ids = {}
+    remaining_utterances = {}
+    file_utterances = {}
+    file_phones = {}
+    file_words = {}
+    phones = {
+        mapping_id: (phone, phone_type)
+        for mapping_id, phone, phone_type in session.query(
+            Phone.mapping_id, Phone.phone, Phone.phone_type
+        )
+    }
+    silence_words = {
+        w for (w,) in session.query(Word.word).filter(Word.word_type == WordType.silence)
+    }
+    columns = [Utterance.id, Utterance.file_id, Speaker.name]
+    if include_original_text:
+        columns.extend([Utterance.begin, Utterance.end, Utterance.text])
+
+    def load_files(utterance_ids: typing.List[int]) -> None:
+        file_ids = {
+            file_id
+            for (file_id,) in session.query(Utterance.file_id)
+            .filter(Utterance.id.in_(utterance_ids))
+            .distinct()
+            if file_id not in file_batch
+        }
+        if not file_ids:
+            return
+        query = (
+            session.query(
+                File.id,
+                File.name,
+                File.relative_path,
+                SoundFile.duration,
+                TextFile.text_file_path,
+            )
+            .join(File.sound_file)
+            .outerjoin(File.text_file)
+            .filter(File.id.in_(file_ids))
+        )
+        for file_id, file_name, relative_path, file_duration, text_file_path in query:
+            file_batch[file_id] = (file_name, relative_path, file_duration, text_file_path)
+            file_utterance_ids[file_id] = []
+            file_phones[file_id] = []
+            file_words[file_id] = []
+            if include_original_text:
+                file_utterances[file_id] = []
+        query = (
+            session.query(*columns)
+            .join(Utterance.speaker)
+            .filter(Utterance.file_id.in_(list(file_batch.keys() & file_ids)))
+        )
+        for utterance_id, file_id, speaker_name, *utterance_data in query:
+            utterances[utterance_id] = (file_id, speaker_name)
+            file_utterance_ids[file_id].append(utterance_id)
+            if include_original_text:
+                file_utterances[file_id].append((*utterance_data, speaker_name))
+        query = (
+            session.query(Utterance.file_id, sqlalchemy.func.count(Utterance.id))
+            .filter(Utterance.job_id != None)  # noqa
+            .filter(Utterance.file_id.in_(list(file_batch.keys() & file_ids)))
+            .group_by(Utterance.file_id)
+        )
+        for file_id, count in query:
+            remaining_utterances[file_id] = count
+
+    def export_file(file_id: int) -> Path:
+        for utterance_id in file_utterance_ids.pop(file_id):
+            del utterances[utterance_id]
+        remaining_utterances.pop(file_id, None)
+        return export_file_intervals(
+            file_batch.pop(file_id),
+            file_phones.pop(file_id),
+            file_words.pop(file_id),
+            file_utterances.pop(file_id, None) if include_original_text else None,
+            cleanup_textgrids,
+            clitic_marker,
+            output_directory,
+            frame_shift,
+            output_format,
+        )
+
+    def process_batch(batch: typing.List[typing.Tuple[int, int, CompactCtm]]):
+        load_files([x[0] for x in batch if x[0] not in utterances])
+        for utterance_id, _, ctm in batch:
+            file_id, speaker_name = utterances[utterance_id]
+            for word, (begin, end) in zip(ctm.words, ctm.word_times.tolist()):
+                if end - begin <= 0:
+                    continue
+                if cleanup_textgrids and word in silence_words:
+                    continue
+                file_words[file_id].append((begin, end, word, speaker_name))
+            for (begin, end, _), phone_mapping_id in zip(
+                ctm.phone_times.tolist(), ctm.phone_ids.tolist()
+            ):
+                if end - begin <= 0:
+                    continue
+                phone, phone_type = phones[phone_mapping_id]
+                if cleanup_textgrids and phone_type is PhoneType.silence:
+                    continue
+                file_phones[file_id].append((begin, end, phone, speaker_name))
+            remaining_utterances[file_id] -= 1
+            if remaining_utterances[file_id] <= 0:
+                yield export_file(file_id)
+
+    batch = []
+    for result in results:
+        batch.append(result)
+        if len(batch) >= batch_size:
+            yield from process_batch(batch)
+            batch = []
+    if batch:
+        yield from process_batch(batch)
+    for file_id in sorted(file_batch.keys()):
+        yield export_file(file_id)
+
+
+def textgrid_interval_queries(
+    workflow_id: int, file_ids: typing.List[int], cleanup_textgrids: bool
+) -> typing.Tuple[sqlalchemy.Select, sqlalchemy.Select]:
+    """
+    Construct the queries for the phone and word intervals of files, ordered by file and time
+
+    Parameters
+    ----------
+    workflow_id: int
+        Workflow of the intervals
+    file_ids: list[int]
+        Files to get intervals for
+    cleanup_textgrids: bool
+        Flag for excluding silence phones and words
+
+    Returns
+    -------
+    :class:`sqlalchemy.Select`
+        Query for phone intervals
+    :class:`sqlalchemy.Select`
+        Query for word intervals
+    """
     phone_interval_query = (
         sqlalchemy.select(
             PhoneInterval.begin, PhoneInterval.end, Phone.phone, Speaker.name, Utterance.file_id
@@ -295,9 +658,9 @@ def construct_textgrid_output(
         .join(PhoneInterval.phone)
         .join(PhoneInterval.utterance)
         .join(Utterance.speaker)
-        .filter(PhoneInterval.workflow_id == workflow.id)
-        .filter(PhoneInterval.duration > 0)
-        .filter(Utterance.file_id.in_(list(file_batch.keys())))
+        .filter(PhoneInterval.workflow_id == workflow_id)
+        .filter(PhoneInterval.end > PhoneInterval.begin)
+        .filter(Utterance.file_id.in_(file_ids))
     )
     word_interval_query = (
         sqlalchemy.select(
@@ -307,19 +670,49 @@ def construct_textgrid_output(
         .join(WordInterval.word)
         .join(WordInterval.utterance)
         .join(Utterance.speaker)
-        .filter(WordInterval.workflow_id == workflow.id)
-        .filter(WordInterval.duration > 0)
-        .filter(Utterance.file_id.in_(list(file_batch.keys())))
+        .filter(WordInterval.workflow_id == workflow_id)
+        .filter(WordInterval.end > WordInterval.begin)
+        .filter(Utterance.file_id.in_(file_ids))
     )
     if cleanup_textgrids:
         phone_interval_query = phone_interval_query.filter(Phone.phone_type != PhoneType.silence)
         word_interval_query = word_interval_query.filter(Word.word_type != WordType.silence)
-    phone_intervals = session.execute(
-        phone_interval_query.order_by(Utterance.file_id, PhoneInterval.begin)
+    return (
+        phone_interval_query.order_by(Utterance.file_id, PhoneInterval.begin),
+        word_interval_query.order_by(Utterance.file_id, WordInterval.begin),
     )
-    word_intervals = session.execute(
-        word_interval_query.order_by(Utterance.file_id, WordInterval.begin)
+
+
+def construct_textgrid_output(
+    session: Session,
+    file_batch: typing.Dict[int, typing.Tuple],
+    workflow: CorpusWorkflow,
+    cleanup_textgrids: bool,
+    clitic_marker: str,
+    output_directory: Path,
+    frame_shift: float,
+    output_format: str = TextgridFormats.SHORT_TEXTGRID,
+    include_original_text: bool = False,
+    interval_store: typing.Optional[IntervalStore] = None,
+):
+    if interval_store is not None:
+        yield from construct_textgrid_output_from_store(
+            session,
+            file_batch,
+            interval_store,
+            cleanup_textgrids,
+            clitic_marker,
+            output_directory,
+            frame_shift,
+            output_format,
+            include_original_text,
+        )
+        return
+    phone_interval_query, word_interval_query = textgrid_interval_queries(
+        workflow.id, list(file_batch.keys()), cleanup_textgrids
     )
+    phone_intervals = session.execute(phone_interval_query)
+    word_intervals = session.execute(word_interval_query)
     utterances = None
     if include_original_text:
         utterances = session.execute(
@@ -348,20 +741,9 @@ def construct_textgrid_output(
 
     def process_word_data():
         for beg, end, w, speaker_name in word_data:
-            if (
-                cleanup_textgrids
-                and data[speaker_name]["words"]
-                and beg - data[speaker_name]["words"][-1].end < 0.02
-                and clitic_marker
-                and (
-                    data[speaker_name]["words"][-1].label.endswith(clitic_marker)
-                    or w.startswith(clitic_marker)
-                )
-            ):
-                data[speaker_name]["words"][-1].end = end
-                data[speaker_name]["words"][-1].label += w
-            else:
-                data[speaker_name]["words"].append(CtmInterval(beg, end, w))
+            add_word_interval(
+                data[speaker_name]["words"], beg, end, w, cleanup_textgrids, clitic_marker
+            )
 
     def process_utterance_data():
         for beg, end, u, speaker_name in utterance_data:
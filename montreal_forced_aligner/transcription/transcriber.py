@@ -67,6 +67,7 @@ from montreal_forced_aligner.language_modeling.multiprocessing import (
     TrainSpeakerLmFunction,
 )
 from montreal_forced_aligner.models import AcousticModel, LanguageModel
+from montreal_forced_aligner.profiling import record_stage
 from montreal_forced_aligner.textgrid import construct_output_path
 from montreal_forced_aligner.transcription.models import FOUND_WHISPERX, load_model
 from montreal_forced_aligner.transcription.multiprocessing import (
@@ -665,6 +666,7 @@ class TranscriberMixin(CorpusAligner, TranscriptionEvaluationMixin):
             hclg_path = self.working_directory.joinpath("HCLG_phone.fst")
             compiler.export_hclg(None, hclg_path)
 
+    @record_stage()
     def transcribe(self, workflow_type: WorkflowType = WorkflowType.transcription):
         self.initialize_database()
         self.create_new_current_workflow(workflow_type)
@@ -1346,6 +1348,7 @@ class HuggingFaceTranscriber(
     def transcribe_arguments(self) -> typing.List:
         return []
 
+    @record_stage()
     def transcribe(self):
         self.setup()
         self.transcribe_utterances()
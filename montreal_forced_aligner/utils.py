@@ -5,11 +5,17 @@ Utility functions
 """
 from __future__ import annotations
 
+import collections
 import datetime
+import enum
+import functools
+import hashlib
+import json
 import logging
 import multiprocessing as mp
 import os
 import pathlib
+import pickle
 import queue
 import re
 import shutil
@@ -22,20 +28,33 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Dict, List
 
+import dataclassy
 import sqlalchemy
 from sqlalchemy.orm import Session
 from tqdm.rich import tqdm
 
 from montreal_forced_aligner import config
-from montreal_forced_aligner.abc import KaldiFunction
+from montreal_forced_aligner.abc import (
+    KaldiFunction,
+    dispose_process_engines,
+    get_process_engine,
+)
 from montreal_forced_aligner.data import CtmInterval, DatasetType
-from montreal_forced_aligner.db import Corpus, Dictionary
+from montreal_forced_aligner.db import Corpus, Dictionary, JobCheckpoint
 from montreal_forced_aligner.exceptions import (
     DictionaryError,
     KaldiProcessingError,
+    MultiprocessingError,
     ThirdpartyError,
 )
 from montreal_forced_aligner.helper import mfa_open
+from montreal_forced_aligner.profiling import PROFILER, ResourceUsage
+from montreal_forced_aligner.resources import (
+    ResourcePlan,
+    plan_resources,
+    plan_stage,
+    set_blas_threads,
+)
 from montreal_forced_aligner.textgrid import process_ctm_line
 
 __all__ = [
@@ -48,8 +67,19 @@ __all__ = [
     "Counter",
     "ProgressCallback",
     "KaldiProcessWorker",
+    "KaldiExecutor",
+    "KaldiWorkerPool",
+    "ResultBatch",
+    "ResultBatcher",
+    "ResultBudget",
+    "JobCheckpointer",
+    "get_executor",
+    "start_worker_pool",
+    "stop_worker_pool",
+    "load_cached_model",
     "parse_ctm_output",
     "run_kaldi_function",
+    "JOB_TIMINGS",
     "thread_logger",
     "parse_dictionary_file",
 ]
@@ -68,6 +98,9 @@ canary_kaldi_bins = [
 
 logger = logging.getLogger("mfa")
 
+#: Cumulative seconds spent in each job of multi-job :func:`run_kaldi_function` calls, keyed by function name and job name
+JOB_TIMINGS: typing.Dict[typing.Tuple[str, typing.Any], float] = {}
+
 
 def inspect_database(name: str) -> DatasetType:
     """
@@ -491,6 +524,197 @@ class ProgressCallback(object):
                 self.callback(self._progress, str(remaining_time))
 
 
+class ResultBatch:
+    """
+    Pickled results from a :class:`~montreal_forced_aligner.abc.KaldiFunction` callback that
+    are sent through the return queue together
+
+    Parameters
+    ----------
+    job_name: int
+        Job that generated the results
+    results: list
+        Callback results
+    """
+
+    __slots__ = ("job_name", "count", "payload")
+
+    def __init__(self, job_name: int, results: typing.List[typing.Any]):
+        self.job_name = job_name
+        self.count = len(results)
+        self.payload = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @property
+    def size(self) -> int:
+        """Size of the pickled results in bytes"""
+        return len(self.payload)
+
+    def unpack(self) -> typing.List[typing.Any]:
+        """
+        Unpickle the results
+
+        Returns
+        -------
+        list
+            Callback results
+        """
+        return pickle.loads(self.payload)
+
+
+class ResultBudget:
+    """
+    Limit on the bytes of :class:`~montreal_forced_aligner.utils.ResultBatch` objects that have
+    been sent by worker processes but not yet received by the main process, so that workers
+    pause rather than filling memory when the main process falls behind
+
+    Parameters
+    ----------
+    bytes_limit: int, optional
+        Maximum bytes in flight, defaults to :code:`config.RESULT_QUEUE_BYTES_LIMIT`
+    """
+
+    def __init__(self, bytes_limit: int = None):
+        if bytes_limit is None:
+            bytes_limit = config.RESULT_QUEUE_BYTES_LIMIT
+        self.bytes_limit = int(bytes_limit)
+        self._in_flight = mp.Value("q", 0)
+        self._condition = mp.Condition(self._in_flight.get_lock())
+
+    @property
+    def in_flight(self) -> int:
+        """Bytes sent but not yet received"""
+        return self._in_flight.value
+
+    def acquire(self, size: int, stopped: typing.Union[mp.Event, threading.Event]) -> None:
+        """
+        Wait until a batch fits in the limit and reserve its size, a batch is always
+        allowed when nothing else is in flight
+
+        Parameters
+        ----------
+        size: int
+            Size of the batch in bytes
+        stopped: :class:`~threading.Event`
+            Stop check, returns without waiting once set
+        """
+        with self._condition:
+            while (
+                self._in_flight.value > 0
+                and self._in_flight.value + size > self.bytes_limit
+                and not stopped.is_set()
+            ):
+                self._condition.wait(0.5)
+            self._in_flight.value += size
+
+    def release(self, size: int) -> None:
+        """
+        Free the size of a received batch
+
+        Parameters
+        ----------
+        size: int
+            Size of the batch in bytes
+        """
+        with self._condition:
+            self._in_flight.value = max(0, self._in_flight.value - size)
+            self._condition.notify_all()
+
+    def reset(self) -> None:
+        """Clear the bytes in flight once no workers are running"""
+        with self._condition:
+            self._in_flight.value = 0
+            self._condition.notify_all()
+
+
+class ResultBatcher:
+    """
+    Callback for worker processes that groups results into
+    :class:`~montreal_forced_aligner.utils.ResultBatch` objects, rather than pickling and
+    sending each result through the return queue separately
+
+    Batches are sent once they reach :code:`config.RESULT_BATCH_SIZE` results, when a result
+    arrives more than ``flush_interval`` seconds after the last batch, and when
+    :meth:`~montreal_forced_aligner.utils.ResultBatcher.flush` is called at the end of the job.
+
+    Parameters
+    ----------
+    job_name: int
+        Job that generates the results
+    return_q: :class:`~multiprocessing.Queue`
+        Queue for returning results
+    stopped: :class:`~multiprocessing.Event`
+        Stop check, results are dropped once set
+    budget: :class:`~montreal_forced_aligner.utils.ResultBudget`, optional
+        Limit on the bytes in flight
+    flush_interval: float
+        Seconds after which pending results are sent with the next result, defaults to 0.5
+    """
+
+    def __init__(
+        self,
+        job_name: int,
+        return_q: mp.Queue,
+        stopped: mp.Event,
+        budget: typing.Optional[ResultBudget] = None,
+        flush_interval: float = 0.5,
+    ):
+        self.job_name = job_name
+        self.return_q = return_q
+        self.stopped = stopped
+        self.budget = budget
+        self.batch_size = max(1, config.RESULT_BATCH_SIZE)
+        self.flush_interval = flush_interval
+        self.results = []
+        self.last_flush = time.time()
+
+    def __call__(self, result: typing.Any) -> None:
+        if self.stopped.is_set():
+            return
+        self.results.append(result)
+        if (
+            len(self.results) >= self.batch_size
+            or time.time() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Send any pending results"""
+        results = self.results
+        self.results = []
+        self.last_flush = time.time()
+        if not results or self.stopped.is_set():
+            return
+        batch = ResultBatch(self.job_name, results)
+        if self.budget is not None:
+            self.budget.acquire(batch.size, self.stopped)
+        self.return_q.put(batch)
+
+
+def unpack_results(
+    result: typing.Any, budget: typing.Optional[ResultBudget] = None
+) -> typing.List[typing.Any]:
+    """
+    Get the callback results from an item received from a return queue
+
+    Parameters
+    ----------
+    result: Any
+        :class:`~montreal_forced_aligner.utils.ResultBatch` or single callback result
+    budget: :class:`~montreal_forced_aligner.utils.ResultBudget`, optional
+        Limit on the bytes in flight to release a batch's size from
+
+    Returns
+    -------
+    list
+        Callback results
+    """
+    if not isinstance(result, ResultBatch):
+        return [result]
+    if budget is not None:
+        budget.release(result.size)
+    return result.unpack()
+
+
 class KaldiProcessWorker(threading.Thread):
     """
     Multiprocessing function work
@@ -521,6 +745,18 @@ class KaldiProcessWorker(threading.Thread):
         self.return_q = return_q
         self.stopped = stopped
         self.finished = threading.Event()
+        self._elapsed = 0.0
+        self._succeeded = False
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running the function"""
+        return self._elapsed
+
+    @property
+    def succeeded(self) -> bool:
+        """Flag for whether the function finished without an error"""
+        return self._succeeded
 
     def add_to_return_queue(self, result):
         if self.stopped.is_set():
@@ -535,14 +771,17 @@ class KaldiProcessWorker(threading.Thread):
         os.environ["OMP_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
         os.environ["OPENBLAS_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
         os.environ["MKL_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
+        begin = time.time()
         try:
             self.function.run()
+            self._succeeded = True
         except Exception as e:
             self.stopped.set()
             if isinstance(e, KaldiProcessingError):
                 e.job_name = self.job_name
             self.return_q.put(e)
         finally:
+            self._elapsed = time.time() - begin
             self.finished.set()
 
 
@@ -560,6 +799,12 @@ class KaldiProcessWorkerMp(mp.Process):
         Multiprocessing function to call on arguments from job_q
     stopped: :class:`~threading.Event`
         Stop check
+    budget: :class:`~montreal_forced_aligner.utils.ResultBudget`, optional
+        Limit on the bytes of results in flight
+    resources: :class:`~montreal_forced_aligner.resources.ResourcePlan`, optional
+        Plan for BLAS threads and CPUs of the stage's processes
+    slot: int
+        Index of the process in the resource plan
     """
 
     def __init__(
@@ -568,39 +813,495 @@ class KaldiProcessWorkerMp(mp.Process):
         return_q: mp.Queue,
         function: KaldiFunction,
         stopped: mp.Event,
+        budget: typing.Optional[ResultBudget] = None,
+        resources: typing.Optional[ResourcePlan] = None,
+        slot: int = 0,
     ):
         super().__init__(name=str(job_name))
         self.job_name = job_name
+        self.resources = resources
+        self.slot = slot
         self.function = function
-        self.function.callback = self.add_to_return_queue
         self.return_q = return_q
         self.stopped = stopped
+        self.batcher = ResultBatcher(job_name, return_q, stopped, budget)
+        self.function.callback = self.batcher
         self.finished = mp.Event()
+        self._elapsed = mp.Value("d", 0.0)
+        self._succeeded = mp.Value("b", 0)
+        self._usage = mp.Array("d", 4)
 
-    def add_to_return_queue(self, result):
-        if self.stopped.is_set():
-            return
-        self.return_q.put(result)
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running the function"""
+        return self._elapsed.value
+
+    @property
+    def usage(self) -> ResourceUsage:
+        """CPU time, peak RSS and storage I/O of the process and the Kaldi binaries it ran"""
+        cpu_time, peak_rss, read_bytes, write_bytes = self._usage[:]
+        return ResourceUsage(cpu_time, int(peak_rss), int(read_bytes), int(write_bytes))
+
+    @property
+    def succeeded(self) -> bool:
+        """Flag for whether the function finished without an error"""
+        return bool(self._succeeded.value)
 
     def run(self) -> None:
         """
         Run through the arguments in the queue apply the function to them
         """
-
-        os.environ["OMP_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
-        os.environ["OPENBLAS_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
-        os.environ["MKL_NUM_THREADS"] = f"{config.BLAS_NUM_THREADS}"
+        if self.resources is not None:
+            self.resources.apply(self.slot)
+        else:
+            set_blas_threads(config.BLAS_NUM_THREADS)
+        begin = time.time()
         try:
             self.function.run()
+            self.batcher.flush()
+            self._succeeded.value = 1
         except Exception as e:
             self.stopped.set()
             if isinstance(e, KaldiProcessingError):
                 e.job_name = self.job_name
             self.return_q.put(e)
         finally:
+            dispose_process_engines()
+            self._elapsed.value = time.time() - begin
+            usage = ResourceUsage.current()
+            self._usage[:] = [
+                usage.cpu_time,
+                usage.peak_rss,
+                usage.read_bytes,
+                usage.write_bytes,
+            ]
             self.finished.set()
 
 
+class JobFinished:
+    """
+    Marker sent by :class:`~montreal_forced_aligner.utils.PersistentKaldiWorker` when a job is done
+
+    Parameters
+    ----------
+    job_name: int
+        Job that finished
+    elapsed: float
+        Seconds spent running the job
+    succeeded: bool
+        Flag for whether the job finished without an error
+    usage: :class:`~montreal_forced_aligner.profiling.ResourceUsage`, optional
+        Resources used by the worker process while running the job
+    """
+
+    def __init__(
+        self,
+        job_name,
+        elapsed: float,
+        succeeded: bool = True,
+        usage: typing.Optional[ResourceUsage] = None,
+    ):
+        self.job_name = job_name
+        self.elapsed = elapsed
+        self.succeeded = succeeded
+        self.usage = usage
+
+
+_MODEL_CACHE: typing.Dict[typing.Tuple[typing.Any, ...], typing.Any] = {}
+
+
+def load_cached_model(
+    path: typing.Union[pathlib.Path, str],
+    loader: typing.Callable[..., typing.Any],
+    *args: typing.Hashable,
+) -> typing.Any:
+    """
+    Load a read-only model, reusing the copy already loaded in this process if the file has not changed
+
+    Parameters
+    ----------
+    path: :class:`~pathlib.Path` or str
+        Path to the model file
+    loader: Callable
+        Function that loads the model from a path
+    *args
+        Extra hashable arguments passed to the loader after the path, which are also part of the
+        cache key
+
+    Returns
+    -------
+    Any
+        Loaded model
+    """
+    path = str(path)
+    key = (
+        f"{loader.__module__}.{loader.__qualname__}",
+        path,
+        os.stat(path).st_mtime_ns,
+        *args,
+    )
+    if key not in _MODEL_CACHE:
+        for k in [k for k in _MODEL_CACHE.keys() if k[:2] == key[:2]]:
+            del _MODEL_CACHE[k]
+        if len(_MODEL_CACHE) >= 16:
+            del _MODEL_CACHE[next(iter(_MODEL_CACHE))]
+        _MODEL_CACHE[key] = loader(path, *args)
+    return _MODEL_CACHE[key]
+
+
+class PersistentKaldiWorker(mp.Process):
+    """
+    Worker process that runs :class:`~montreal_forced_aligner.abc.KaldiFunction` tasks until it receives a stop sentinel
+
+    Parameters
+    ----------
+    worker_id: int
+        Worker index
+    task_q: :class:`~multiprocessing.Queue`
+        Queue of function classes and arguments to run
+    return_q: :class:`~multiprocessing.Queue`
+        Queue for returning results
+    stopped: :class:`~multiprocessing.Event`
+        Stop check for the current batch of tasks
+    budget: :class:`~montreal_forced_aligner.utils.ResultBudget`, optional
+        Limit on the bytes of results in flight
+    resources: :class:`~montreal_forced_aligner.resources.ResourcePlan`, optional
+        Plan for BLAS threads and CPUs of the pool's processes
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        task_q: mp.Queue,
+        return_q: mp.Queue,
+        stopped: mp.Event,
+        budget: typing.Optional[ResultBudget] = None,
+        resources: typing.Optional[ResourcePlan] = None,
+    ):
+        super().__init__(name=f"persistent_worker_{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.resources = resources
+        self.task_q = task_q
+        self.return_q = return_q
+        self.stopped = stopped
+        self.budget = budget
+
+    def run(self) -> None:
+        """
+        Run tasks from the task queue
+        """
+        if self.resources is not None:
+            self.resources.apply(self.worker_id)
+            current_blas_threads = self.resources.blas_threads
+        else:
+            set_blas_threads(config.BLAS_NUM_THREADS)
+        while True:
+            task = self.task_q.get()
+            if task is None:
+                break
+            function_class, args = task
+            if self.resources is not None:
+                blas_threads = self.resources.stage_threads(
+                    function_class.__name__, self.worker_id
+                )
+                if blas_threads != current_blas_threads:
+                    set_blas_threads(blas_threads)
+                    current_blas_threads = blas_threads
+            begin = time.time()
+            begin_usage = ResourceUsage.current()
+            succeeded = False
+            try:
+                if not self.stopped.is_set():
+                    function = function_class(args)
+                    batcher = ResultBatcher(
+                        args.job_name, self.return_q, self.stopped, self.budget
+                    )
+                    function.callback = batcher
+                    function.run()
+                    batcher.flush()
+                    succeeded = True
+            except Exception as e:
+                self.stopped.set()
+                if isinstance(e, KaldiProcessingError):
+                    e.job_name = args.job_name
+                self.return_q.put(e)
+            finally:
+                self.return_q.put(
+                    JobFinished(
+                        args.job_name,
+                        time.time() - begin,
+                        succeeded,
+                        ResourceUsage.current().since(begin_usage),
+                    )
+                )
+        dispose_process_engines()
+
+
+class KaldiExecutor:
+    """
+    Base class for backends that run :class:`~montreal_forced_aligner.abc.KaldiFunction` jobs
+    outside of :func:`~montreal_forced_aligner.utils.run_kaldi_function`'s own worker processes
+
+    Subclasses provide a ``task_queue`` that accepts tuples of a function class and its arguments,
+    a ``return_queue`` that receives callback results, exceptions and
+    :class:`~montreal_forced_aligner.utils.JobFinished` markers, and a ``stopped`` event, along
+    with a ``budget`` if their workers limit the bytes of results in flight.
+    """
+
+    task_queue: typing.Union[mp.Queue, queue.Queue]
+    return_queue: typing.Union[mp.Queue, queue.Queue]
+    stopped: typing.Union[mp.Event, threading.Event]
+    budget: typing.Optional[ResultBudget] = None
+
+    @property
+    def num_workers(self) -> int:
+        """Number of jobs that can run at once"""
+        raise NotImplementedError
+
+    @property
+    def max_in_flight(self) -> int:
+        """Maximum number of jobs to submit at once"""
+        return min(config.NUM_JOBS, self.num_workers)
+
+    def is_alive(self) -> bool:
+        """Check that the backend can still run jobs"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Shut down the backend"""
+        raise NotImplementedError
+
+    @staticmethod
+    def can_run(function, arguments: typing.List) -> bool:
+        """
+        Check whether a function and its arguments can be sent to the backend
+
+        Parameters
+        ----------
+        function: type
+            KaldiFunction class
+        arguments: list
+            Arguments for each job
+
+        Returns
+        -------
+        bool
+            True if everything can be pickled
+        """
+        try:
+            pickle.dumps((function, arguments))
+        except Exception:
+            return False
+        return True
+
+    def run(
+        self,
+        function,
+        arguments: typing.List,
+        job_finished: typing.Optional[typing.Callable[[int], None]] = None,
+    ):
+        """
+        Run a function over arguments on the backend, yielding results as they arrive
+
+        Parameters
+        ----------
+        function: type
+            KaldiFunction class
+        arguments: list
+            Arguments for each job
+        job_finished: Callable[[int], None], optional
+            Called with the job name of each job that finishes without an error
+
+        Yields
+        ------
+        Any
+            Results from the function callbacks
+        """
+        self.stopped.clear()
+        if self.budget is not None:
+            self.budget.reset()
+        pending = collections.deque(arguments)
+        num_submitted = 0
+        num_finished = 0
+        error_dict = {}
+        try:
+            while pending or num_finished < num_submitted:
+                while (
+                    pending
+                    and num_submitted - num_finished < self.max_in_flight
+                    and not self.stopped.is_set()
+                ):
+                    self.task_queue.put((function, pending.popleft()))
+                    num_submitted += 1
+                if self.stopped.is_set():
+                    pending.clear()
+                try:
+                    result = self.return_queue.get(timeout=1)
+                except queue.Empty:
+                    if not self.is_alive():
+                        raise MultiprocessingError(
+                            0, f"{type(self).__name__} stopped unexpectedly."
+                        )
+                    continue
+                if isinstance(result, JobFinished):
+                    num_finished += 1
+                    if result.usage is not None:
+                        PROFILER.add_worker_usage(result.usage)
+                    if result.succeeded and job_finished is not None:
+                        job_finished(result.job_name)
+                    if len(arguments) > 1:
+                        key = (function.__name__, result.job_name)
+                        JOB_TIMINGS[key] = JOB_TIMINGS.get(key, 0.0) + result.elapsed
+                    continue
+                if isinstance(result, Exception):
+                    error_dict[getattr(result, "job_name", 0)] = result
+                    self.stopped.set()
+                    continue
+                results = unpack_results(result, self.budget)
+                if self.stopped.is_set():
+                    continue
+                yield from results
+        finally:
+            if num_finished < num_submitted:
+                self.stopped.set()
+                while num_finished < num_submitted and self.is_alive():
+                    try:
+                        result = self.return_queue.get(timeout=1)
+                    except queue.Empty:
+                        continue
+                    if isinstance(result, JobFinished):
+                        num_finished += 1
+                        if result.usage is not None:
+                            PROFILER.add_worker_usage(result.usage)
+                        if result.succeeded and job_finished is not None:
+                            job_finished(result.job_name)
+        if error_dict:
+            for v in error_dict.values():
+                raise v
+
+
+class KaldiWorkerPool(KaldiExecutor):
+    """
+    Pool of long-lived worker processes shared by
+    :func:`~montreal_forced_aligner.utils.run_kaldi_function`
+    calls, so that each stage does not pay for starting processes and re-importing libraries
+
+    Parameters
+    ----------
+    num_workers: int, optional
+        Number of worker processes, defaults to the number of jobs
+    """
+
+    def __init__(self, num_workers: int = None):
+        if num_workers is None:
+            num_workers = config.NUM_JOBS
+        self.task_queue = mp.Queue()
+        self.return_queue = mp.Queue(10000)
+        self.stopped = mp.Event()
+        self.budget = ResultBudget()
+        self.resources = plan_resources(num_workers)
+        self.workers = [
+            PersistentKaldiWorker(
+                i, self.task_queue, self.return_queue, self.stopped, self.budget, self.resources
+            )
+            for i in range(num_workers)
+        ]
+        for w in self.workers:
+            w.start()
+
+    @property
+    def num_workers(self) -> int:
+        """Number of worker processes"""
+        return len(self.workers)
+
+    def is_alive(self) -> bool:
+        """Check that all worker processes are still running"""
+        return all(w.is_alive() for w in self.workers)
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        self.stopped.set()
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for w in self.workers:
+            w.join(timeout=10)
+            if w.is_alive():
+                w.terminate()
+        self.task_queue.close()
+        self.return_queue.close()
+        self.workers = []
+
+
+_WORKER_POOL: typing.Optional[KaldiWorkerPool] = None
+_WORKER_POOL_ENABLED = False
+_REMOTE_EXECUTOR: typing.Optional[KaldiExecutor] = None
+
+
+def start_worker_pool() -> None:
+    """
+    Enable the persistent worker pool for subsequent :func:`~montreal_forced_aligner.utils.run_kaldi_function`
+    calls, the processes are started on first use
+    """
+    global _WORKER_POOL_ENABLED
+    _WORKER_POOL_ENABLED = True
+
+
+def stop_worker_pool() -> None:
+    """Shut down the persistent worker pool and any connections to worker nodes"""
+    global _WORKER_POOL, _WORKER_POOL_ENABLED, _REMOTE_EXECUTOR
+    _WORKER_POOL_ENABLED = False
+    if _WORKER_POOL is not None:
+        _WORKER_POOL.close()
+        _WORKER_POOL = None
+    if _REMOTE_EXECUTOR is not None:
+        _REMOTE_EXECUTOR.close()
+        _REMOTE_EXECUTOR = None
+
+
+def get_worker_pool() -> typing.Optional[KaldiWorkerPool]:
+    """
+    Get the persistent worker pool, starting it if it is enabled
+
+    Returns
+    -------
+    :class:`~montreal_forced_aligner.utils.KaldiWorkerPool`, optional
+        Worker pool, or None if it is not enabled or multiprocessing is turned off
+    """
+    global _WORKER_POOL
+    if not _WORKER_POOL_ENABLED or not config.USE_MP or config.USE_THREADING:
+        return None
+    if _WORKER_POOL is not None and not _WORKER_POOL.is_alive():
+        _WORKER_POOL.close()
+        _WORKER_POOL = None
+    if _WORKER_POOL is None:
+        _WORKER_POOL = KaldiWorkerPool()
+    return _WORKER_POOL
+
+
+def get_executor() -> typing.Optional[KaldiExecutor]:
+    """
+    Get the backend for running multiprocessing jobs, connecting to the worker nodes in
+    :code:`config.WORKER_NODES` if any are specified, or otherwise the persistent worker pool
+
+    Returns
+    -------
+    :class:`~montreal_forced_aligner.utils.KaldiExecutor`, optional
+        Executor, or None if jobs should be run in processes started by
+        :func:`~montreal_forced_aligner.utils.run_kaldi_function`
+    """
+    global _REMOTE_EXECUTOR
+    if not config.WORKER_NODES or config.USE_THREADING:
+        return get_worker_pool()
+    if _REMOTE_EXECUTOR is not None and not _REMOTE_EXECUTOR.is_alive():
+        _REMOTE_EXECUTOR.close()
+        _REMOTE_EXECUTOR = None
+    if _REMOTE_EXECUTOR is None:
+        from montreal_forced_aligner.distributed import RemoteKaldiExecutor
+
+        _REMOTE_EXECUTOR = RemoteKaldiExecutor.from_config()
+    return _REMOTE_EXECUTOR
+
+
 @contextmanager
 def thread_logger(
     log_name: str, log_path: typing.Union[pathlib.Path, str], job_name: int = None
@@ -650,9 +1351,168 @@ class IgnoreThreadsFilter(logging.Filter):
         return record.thread == self._main_thread_id
 
 
+def _fingerprint_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Path):
+        return value.as_posix()
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, dict):
+        return {str(k): _fingerprint_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint_value(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(str(_fingerprint_value(v)) for v in value)
+    parameters = getattr(value, "parameters", None)
+    if isinstance(parameters, dict):
+        return {type(value).__name__: _fingerprint_value(parameters)}
+    return type(value).__name__
+
+
+class JobCheckpointer:
+    """
+    Record jobs that have finished a resumable stage, so that a rerun after an interruption
+    only processes the remaining jobs
+
+    Completed jobs are stored as :class:`~montreal_forced_aligner.db.JobCheckpoint` rows keyed by
+    the function name, along with a fingerprint of the job's arguments so that changed settings
+    cause the job to be rerun.  Checkpoints are cleared once every job in the stage has finished,
+    after which the stage's own completion flags apply.
+
+    Parameters
+    ----------
+    function: type
+        KaldiFunction class for the stage
+    arguments: list[:class:`~montreal_forced_aligner.data.MfaArguments`]
+        Arguments for each job
+    """
+
+    def __init__(self, function, arguments: typing.List):
+        self.stage = function.__name__
+        self.db_session = arguments[0].session if arguments else None
+        self.fingerprints = {args.job_name: self.argument_fingerprint(args) for args in arguments}
+        self.recorded = set()
+
+    @staticmethod
+    def argument_fingerprint(args) -> str:
+        """
+        Hash the settings in a job's arguments
+
+        Parameters
+        ----------
+        args: :class:`~montreal_forced_aligner.data.MfaArguments`
+            Arguments for a job
+
+        Returns
+        -------
+        str
+            Fingerprint of the arguments
+        """
+        values = {
+            k: _fingerprint_value(getattr(args, k))
+            for k in dataclassy.fields(args)
+            if k not in {"job_name", "session", "log_path"}
+        }
+        return hashlib.sha1(
+            json.dumps(values, sort_keys=True, default=str).encode("utf8")
+        ).hexdigest()
+
+    @contextmanager
+    def session(self) -> Session:
+        """Database session for checkpoints"""
+        if isinstance(self.db_session, str):
+            with Session(get_process_engine(self.db_session)) as session:
+                yield session
+        else:
+            with self.db_session() as session:
+                yield session
+
+    def completed_jobs(self) -> typing.Set[int]:
+        """
+        Jobs that were completed by a previous run with the same arguments
+
+        Returns
+        -------
+        set[int]
+            Job names
+        """
+        with self.session() as session:
+            query = session.query(JobCheckpoint.job_id, JobCheckpoint.fingerprint).filter(
+                JobCheckpoint.stage == self.stage
+            )
+            return {
+                job_id
+                for job_id, fingerprint in query
+                if self.fingerprints.get(job_id) == fingerprint
+            }
+
+    def mark(self, job_name: int) -> None:
+        """
+        Record that a job has finished the stage
+
+        Parameters
+        ----------
+        job_name: int
+            Job that finished
+        """
+        if job_name in self.recorded or job_name not in self.fingerprints:
+            return
+        self.recorded.add(job_name)
+        with self.session() as session:
+            session.merge(
+                JobCheckpoint(
+                    job_id=job_name, stage=self.stage, fingerprint=self.fingerprints[job_name]
+                )
+            )
+            session.commit()
+
+    def clear(self) -> None:
+        """Remove the stage's checkpoints once all jobs are done"""
+        with self.session() as session:
+            session.query(JobCheckpoint).filter(JobCheckpoint.stage == self.stage).delete()
+            session.commit()
+
+
 def run_kaldi_function(
     function, arguments, stopped: threading.Event = None, total_count: int = None
 ):
+    """
+    Run a KaldiFunction over the arguments for each job, yielding results as they arrive
+
+    The call is recorded in :data:`~montreal_forced_aligner.profiling.PROFILER` along with the
+    time spent on each job.
+
+    Parameters
+    ----------
+    function: type
+        KaldiFunction class
+    arguments: list
+        Arguments for each job
+    stopped: :class:`~threading.Event`, optional
+        Stop check, if specified jobs are run in processes for this call only
+    total_count: int, optional
+        Number of results expected, for showing progress
+
+    Yields
+    ------
+    Any
+        Results from the function callbacks
+    """
+    with PROFILER.record(function.__name__, "function", total_count) as stage_record:
+        job_timings = {k: v for k, v in JOB_TIMINGS.items() if k[0] == function.__name__}
+        try:
+            yield from _run_kaldi_function(function, arguments, stopped, total_count)
+        finally:
+            for key, elapsed in JOB_TIMINGS.items():
+                if key[0] == function.__name__ and elapsed > job_timings.get(key, 0.0):
+                    stage_record.job_times[key[1]] = elapsed - job_timings.get(key, 0.0)
+
+
+def _run_kaldi_function(
+    function, arguments, stopped: threading.Event = None, total_count: int = None
+):
+    budget = None
     if config.USE_THREADING:
         Event = threading.Event
         Queue = queue.Queue
@@ -660,8 +1520,11 @@ def run_kaldi_function(
     else:
         Event = mp.Event
         Queue = mp.Queue
-        Worker = KaldiProcessWorkerMp
+        budget = ResultBudget()
+        Worker = functools.partial(KaldiProcessWorkerMp, budget=budget)
+    pool = None
     if stopped is None:
+        pool = get_executor()
         stopped = Event()
     error_dict = {}
     return_queue = Queue(10000)
@@ -674,29 +1537,91 @@ def run_kaldi_function(
         pbar = tqdm(total=total_count, maxinterval=0)
         progress_callback = pbar.update
     update_time = time.time()
-    if config.USE_MP:
+    checkpointer = None
+    if getattr(function, "resumable", False):
+        arguments = list(arguments)
+        if arguments:
+            checkpointer = JobCheckpointer(function, arguments)
+            completed = checkpointer.completed_jobs()
+            if completed:
+                logger.info(
+                    f"Skipping {len(completed)} jobs that were completed in a previous run."
+                )
+                arguments = [x for x in arguments if x.job_name not in completed]
+            num_to_run = len(arguments)
+    if pool is not None:
+        arguments = list(arguments)
+        if not pool.can_run(function, arguments):
+            pool = None
+    if pool is not None:
+        for result in pool.run(
+            function,
+            arguments,
+            job_finished=checkpointer.mark if checkpointer is not None else None,
+        ):
+            yield result
+            if progress_callback is not None:
+                if isinstance(result, int):
+                    num_done += result
+                else:
+                    num_done += 1
+                if time.time() - update_time >= callback_interval:
+                    if num_done - last_update > 0:
+                        progress_callback(num_done - last_update)
+                        last_update = num_done
+                    update_time = time.time()
+    elif config.USE_MP:
         procs = []
-        for args in arguments:
-            f = function(args)
-            p = Worker(args.job_name, return_queue, f, stopped)
-            procs.append(p)
-            p.start()
+        pending = collections.deque(arguments)
+        schedule_time = 0
+        resources = None
+        if not config.USE_THREADING:
+            resources = plan_stage(function.__name__, min(config.NUM_JOBS, len(pending)))
+        running_slots = {}
+
+        def schedule_jobs():
+            for proc in procs:
+                if proc.finished.is_set():
+                    running_slots.pop(proc.job_name, None)
+            while pending and len(running_slots) < config.NUM_JOBS and not stopped.is_set():
+                args = pending.popleft()
+                f = function(args)
+                slot = min(set(range(config.NUM_JOBS)) - set(running_slots.values()))
+                if resources is None:
+                    proc = Worker(args.job_name, return_queue, f, stopped)
+                else:
+                    proc = Worker(
+                        args.job_name, return_queue, f, stopped, resources=resources, slot=slot
+                    )
+                running_slots[args.job_name] = slot
+                procs.append(proc)
+                proc.start()
+
+        def record_checkpoints():
+            for proc in procs:
+                if proc.finished.is_set() and proc.succeeded:
+                    checkpointer.mark(proc.job_name)
+
         try:
             while True:
+                if time.time() - schedule_time >= 0.1:
+                    if pending:
+                        schedule_jobs()
+                    if checkpointer is not None:
+                        record_checkpoints()
+                    schedule_time = time.time()
                 try:
                     result = return_queue.get(timeout=1)
                     if isinstance(result, Exception):
                         error_dict[getattr(result, "job_name", 0)] = result
                         stopped.set()
                         continue
+                    results = unpack_results(result, budget)
                     if stopped.is_set():
                         continue
-                    yield result
+                    yield from results
                     if progress_callback is not None:
-                        if isinstance(result, int):
-                            num_done += result
-                        else:
-                            num_done += 1
+                        num_done += sum(x if isinstance(x, int) else 1 for x in results)
                         if time.time() - update_time >= callback_interval:
                             if num_done - last_update > 0:
                                 progress_callback(num_done - last_update)
@@ -705,6 +1630,8 @@ def run_kaldi_function(
                     if isinstance(return_queue, queue.Queue):
                         return_queue.task_done()
                 except queue.Empty:
+                    if pending and not stopped.is_set():
+                        continue
                     for proc in procs:
                         if not proc.finished.is_set():
                             break
@@ -728,6 +1655,11 @@ def run_kaldi_function(
         finally:
             for p in procs:
                 p.join()
+                if checkpointer is not None and p.succeeded:
+                    checkpointer.mark(p.job_name)
+                if len(procs) > 1:
+                    key = (function.__name__, p.job_name)
+                    JOB_TIMINGS[key] = JOB_TIMINGS.get(key, 0.0) + p.elapsed
                 del p.function
             del procs
             del return_queue
@@ -738,6 +1670,7 @@ def run_kaldi_function(
             for v in error_dict.values():
                 raise v
     else:
+        arguments = list(arguments)
         for args in arguments:
             f = function(args)
             p = Worker(args.job_name, return_queue, f, stopped)
@@ -750,14 +1683,12 @@ def run_kaldi_function(
                             error_dict[getattr(result, "job_name", 0)] = result
                             stopped.set()
                             continue
+                        results = unpack_results(result, budget)
                         if stopped.is_set():
                             continue
-                        yield result
+                        yield from results
                         if progress_callback is not None:
-                            if isinstance(result, int):
-                                num_done += result
-                            else:
-                                num_done += 1
+                            num_done += sum(x if isinstance(x, int) else 1 for x in results)
                             if num_done - last_update >= callback_interval:
                                 progress_callback(num_done - last_update)
                                 last_update = num_done
@@ -790,10 +1721,17 @@ def run_kaldi_function(
 
             finally:
                 p.join()
+                if checkpointer is not None and p.succeeded:
+                    checkpointer.mark(p.job_name)
+                if len(arguments) > 1:
+                    key = (function.__name__, p.job_name)
+                    JOB_TIMINGS[key] = JOB_TIMINGS.get(key, 0.0) + p.elapsed
 
         if error_dict:
             for v in error_dict.values():
                 raise v
+    if checkpointer is not None and len(checkpointer.recorded) == num_to_run:
+        checkpointer.clear()
     if pbar is not None and num_done > last_update:
         progress_callback(num_done - last_update)
         pbar.refresh()
@@ -1,6 +1,41 @@
-from montreal_forced_aligner.abc import MfaWorker, TrainerMixin
+import multiprocessing as mp
+import os
+import threading
+import time
+
+import pytest
+import sqlalchemy.exc
+import sqlalchemy.orm
+
+from montreal_forced_aligner import config
+from montreal_forced_aligner.abc import (
+    KaldiFunction,
+    MfaWorker,
+    TrainerMixin,
+    dispose_process_engines,
+    get_process_engine,
+)
 from montreal_forced_aligner.acoustic_modeling import SatTrainer, TrainableAligner
 from montreal_forced_aligner.alignment import AlignMixin
+from montreal_forced_aligner.data import MfaArguments
+from montreal_forced_aligner.db import JobCheckpoint, MfaSqlBase
+from montreal_forced_aligner.distributed import (
+    WORKER_AUTHKEY_VARIABLE,
+    KaldiWorkerNode,
+    get_worker_authkey,
+)
+from montreal_forced_aligner.profiling import PROFILER
+from montreal_forced_aligner.utils import (
+    JOB_TIMINGS,
+    JobCheckpointer,
+    ResultBudget,
+    get_executor,
+    get_worker_pool,
+    load_cached_model,
+    run_kaldi_function,
+    start_worker_pool,
+    stop_worker_pool,
+)
 
 
 def test_typing(basic_corpus_dir, basic_dict_path, temp_dir):
@@ -14,3 +49,286 @@ def test_typing(basic_corpus_dir, basic_dict_path, temp_dir):
     assert isinstance(trainer, AlignMixin)
     assert isinstance(trainer, MfaWorker)
     assert isinstance(am_trainer, MfaWorker)
+
+
+class SleepFunction(KaldiFunction):
+    def _run(self) -> None:
+        time.sleep(0.05 * self.job_name)
+        self.callback(self.job_name)
+
+
+def test_run_kaldi_function_scheduling(temp_dir):
+    use_mp = config.USE_MP
+    use_threading = config.USE_THREADING
+    num_jobs = config.NUM_JOBS
+    config.USE_MP = True
+    config.USE_THREADING = True
+    config.NUM_JOBS = 2
+    try:
+        arguments = [
+            MfaArguments(i, sqlalchemy.orm.scoped_session(sqlalchemy.orm.sessionmaker()), None)
+            for i in range(1, 7)
+        ]
+        JOB_TIMINGS.clear()
+        results = list(run_kaldi_function(SleepFunction, arguments))
+        assert sorted(results) == list(range(1, 7))
+        assert len(JOB_TIMINGS) == 6
+        assert all(v > 0 for v in JOB_TIMINGS.values())
+    finally:
+        JOB_TIMINGS.clear()
+        config.USE_MP = use_mp
+        config.USE_THREADING = use_threading
+        config.NUM_JOBS = num_jobs
+
+
+def test_run_kaldi_function_profile(temp_dir):
+    use_mp = config.USE_MP
+    use_threading = config.USE_THREADING
+    config.USE_MP = True
+    config.USE_THREADING = False
+    PROFILER.reset()
+    try:
+        arguments = [MfaArguments(i, "sqlite://", None) for i in range(1, 4)]
+        results = list(run_kaldi_function(SleepFunction, arguments, total_count=3))
+        assert sorted(results) == [1, 2, 3]
+        assert len(PROFILER.records) == 1
+        record = PROFILER.records[0]
+        assert record.name == "SleepFunction"
+        assert record.kind == "function"
+        assert record.num_utterances == 3
+        assert record.wall_time > 0
+        assert record.usage is not None
+        assert sorted(record.job_times.keys()) == [1, 2, 3]
+        assert record.straggler_ratio > 1
+        json_path, csv_path = PROFILER.save(temp_dir, "profile_test")
+        assert json_path.exists()
+        assert csv_path.exists()
+        assert "SleepFunction" in PROFILER.summary()
+    finally:
+        PROFILER.reset()
+        JOB_TIMINGS.clear()
+        config.USE_MP = use_mp
+        config.USE_THREADING = use_threading
+
+
+class PidFunction(KaldiFunction):
+    def _run(self) -> None:
+        self.callback((self.job_name, os.getpid()))
+
+
+class ManyResultsFunction(KaldiFunction):
+    def _run(self) -> None:
+        for i in range(1000):
+            self.callback((self.job_name, i, "x" * 100))
+
+
+def test_run_kaldi_function_result_batches(temp_dir):
+    use_mp = config.USE_MP
+    use_threading = config.USE_THREADING
+    batch_size = config.RESULT_BATCH_SIZE
+    bytes_limit = config.RESULT_QUEUE_BYTES_LIMIT
+    config.USE_MP = True
+    config.USE_THREADING = False
+    config.RESULT_BATCH_SIZE = 64
+    config.RESULT_QUEUE_BYTES_LIMIT = 10000
+    try:
+        arguments = [MfaArguments(i, "sqlite://", None) for i in range(1, 4)]
+        results = {}
+        for job_name, i, _ in run_kaldi_function(ManyResultsFunction, arguments):
+            results.setdefault(job_name, []).append(i)
+        assert sorted(results.keys()) == [1, 2, 3]
+        for v in results.values():
+            assert v == list(range(1000))
+    finally:
+        config.USE_MP = use_mp
+        config.USE_THREADING = use_threading
+        config.RESULT_BATCH_SIZE = batch_size
+        config.RESULT_QUEUE_BYTES_LIMIT = bytes_limit
+
+
+def test_result_budget():
+    budget = ResultBudget(100)
+    stopped = mp.Event()
+    budget.acquire(80, stopped)
+    assert budget.in_flight == 80
+    waiter = threading.Thread(target=budget.acquire, args=(50, stopped))
+    waiter.start()
+    waiter.join(timeout=0.5)
+    assert waiter.is_alive()
+    budget.release(80)
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert budget.in_flight == 50
+    budget.release(50)
+    budget.acquire(500, stopped)
+    assert budget.in_flight == 500
+    stopped.set()
+    budget.acquire(10, stopped)
+    assert budget.in_flight == 510
+    budget.reset()
+    assert budget.in_flight == 0
+
+
+def test_run_kaldi_function_worker_pool(temp_dir):
+    use_mp = config.USE_MP
+    use_threading = config.USE_THREADING
+    num_jobs = config.NUM_JOBS
+    config.USE_MP = True
+    config.USE_THREADING = False
+    config.NUM_JOBS = 2
+    try:
+        start_worker_pool()
+        arguments = [MfaArguments(i, "sqlite://", None) for i in range(1, 7)]
+        first_pids = set()
+        results = list(run_kaldi_function(PidFunction, arguments))
+        assert sorted(x[0] for x in results) == list(range(1, 7))
+        first_pids.update(x[1] for x in results)
+        pool = get_worker_pool()
+        assert pool is not None
+        assert first_pids <= {w.pid for w in pool.workers}
+        JOB_TIMINGS.clear()
+        results = list(run_kaldi_function(SleepFunction, arguments))
+        assert sorted(results) == list(range(1, 7))
+        assert len(JOB_TIMINGS) == 6
+        results = list(run_kaldi_function(PidFunction, arguments))
+        assert {x[1] for x in results} <= {w.pid for w in pool.workers}
+        assert get_worker_pool() is pool
+    finally:
+        stop_worker_pool()
+        JOB_TIMINGS.clear()
+        config.USE_MP = use_mp
+        config.USE_THREADING = use_threading
+        config.NUM_JOBS = num_jobs
+    assert get_worker_pool() is None
+
+
+def test_load_cached_model(temp_dir):
+    model_path = temp_dir.joinpath("cached_model.txt")
+    model_path.write_text("model")
+    loads = []
+
+    def loader(path, *args):
+        loads.append((path, args))
+        return object()
+
+    first = load_cached_model(model_path, loader, 1.0, (1, 2))
+    assert load_cached_model(model_path, loader, 1.0, (1, 2)) is first
+    assert len(loads) == 1
+    second = load_cached_model(model_path, loader, 2.0, (1, 2))
+    assert second is not first
+    assert loads[-1] == (str(model_path), (2.0, (1, 2)))
+
+
+def test_remote_executor(temp_dir):
+    use_mp = config.USE_MP
+    use_threading = config.USE_THREADING
+    worker_nodes = config.WORKER_NODES
+    authkey = os.environ.get(WORKER_AUTHKEY_VARIABLE, None)
+    os.environ[WORKER_AUTHKEY_VARIABLE] = "test_key"
+    config.USE_MP = True
+    config.USE_THREADING = False
+    processes = []
+    try:
+        addresses = []
+        for _ in range(2):
+            node = KaldiWorkerNode(("127.0.0.1", 0), get_worker_authkey(), num_workers=2)
+            addresses.append(node.address)
+            proc = mp.Process(target=node.serve_forever, daemon=True)
+            proc.start()
+            node.listener.close()
+            processes.append(proc)
+        config.WORKER_NODES = ",".join(f"{host}:{port}" for host, port in addresses)
+        executor = get_executor()
+        assert executor.num_workers == 4
+        arguments = [MfaArguments(i, "sqlite://", None) for i in range(1, 7)]
+        results = list(run_kaldi_function(PidFunction, arguments))
+        assert sorted(x[0] for x in results) == list(range(1, 7))
+        assert os.getpid() not in {x[1] for x in results}
+        JOB_TIMINGS.clear()
+        results = list(run_kaldi_function(SleepFunction, arguments))
+        assert sorted(results) == list(range(1, 7))
+        assert len(JOB_TIMINGS) == 6
+        assert get_executor() is executor
+    finally:
+        stop_worker_pool()
+        for proc in processes:
+            proc.terminate()
+            proc.join()
+        JOB_TIMINGS.clear()
+        config.USE_MP = use_mp
+        config.USE_THREADING = use_threading
+        config.WORKER_NODES = worker_nodes
+        if authkey is None:
+            os.environ.pop(WORKER_AUTHKEY_VARIABLE)
+        else:
+            os.environ[WORKER_AUTHKEY_VARIABLE] = authkey
+
+
+def test_process_engine_cache(temp_dir):
+    db_path = temp_dir.joinpath("engine_cache.db")
+    if db_path.exists():
+        db_path.unlink()
+    db_string = f"sqlite:///{db_path}"
+    try:
+        engine = get_process_engine(db_string)
+        assert get_process_engine(db_string) is engine
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("CREATE TABLE test (id INTEGER PRIMARY KEY)"))
+            conn.execute(sqlalchemy.text("INSERT INTO test (id) VALUES (1)"))
+        read_only_engine = get_process_engine(db_string, read_only=True)
+        assert read_only_engine is not engine
+        with read_only_engine.connect() as conn:
+            assert conn.execute(sqlalchemy.text("SELECT count(*) FROM test")).scalar() == 1
+            with pytest.raises(sqlalchemy.exc.OperationalError):
+                conn.execute(sqlalchemy.text("INSERT INTO test (id) VALUES (2)"))
+    finally:
+        dispose_process_engines()
+    assert get_process_engine(db_string) is not engine
+    dispose_process_engines()
+
+
+FAILING_JOBS = set()
+
+
+class ResumableFunction(KaldiFunction):
+    resumable = True
+
+    def _run(self) -> None:
+        if self.job_name in FAILING_JOBS:
+            raise ValueError(f"Job {self.job_name} failed")
+        self.callback(self.job_name)
+
+
+def test_run_kaldi_function_checkpoints(temp_dir):
+    use_mp = config.USE_MP
+    use_threading = config.USE_THREADING
+    db_path = temp_dir.joinpath("checkpoints.db")
+    if db_path.exists():
+        db_path.unlink()
+    db_string = f"sqlite:///{db_path}"
+    engine = sqlalchemy.create_engine(db_string)
+    MfaSqlBase.metadata.create_all(engine)
+    engine.dispose()
+    config.USE_MP = False
+    config.USE_THREADING = True
+    try:
+        arguments = [MfaArguments(i, db_string, None) for i in range(1, 5)]
+        FAILING_JOBS.add(3)
+        with pytest.raises(Exception):
+            list(run_kaldi_function(ResumableFunction, arguments))
+        checkpointer = JobCheckpointer(ResumableFunction, arguments)
+        assert checkpointer.completed_jobs() == {1, 2, 4}
+
+        FAILING_JOBS.clear()
+        config.USE_THREADING = True
+        results = list(run_kaldi_function(ResumableFunction, arguments))
+        assert results == [3]
+        with checkpointer.session() as session:
+            assert session.query(JobCheckpoint).count() == 0
+        results = list(run_kaldi_function(ResumableFunction, arguments))
+        assert sorted(results) == [1, 2, 3, 4]
+    finally:
+        FAILING_JOBS.clear()
+        dispose_process_engines()
+        config.USE_MP = use_mp
+        config.USE_THREADING = use_threading
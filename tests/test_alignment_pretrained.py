@@ -1,6 +1,7 @@
 import os
 import shutil
 
+from montreal_forced_aligner import config
 from montreal_forced_aligner.alignment import PretrainedAligner
 from montreal_forced_aligner.data import WordType, WorkflowType
 from montreal_forced_aligner.db import (
@@ -51,6 +52,51 @@ def test_align_sick(
     a.clean_working_directory()
 
 
+def test_export_from_archives(
+    english_dictionary,
+    english_acoustic_model,
+    basic_corpus_dir,
+    temp_dir,
+    test_align_config,
+    db_setup,
+    monkeypatch,
+):
+    monkeypatch.setattr(config, "EXPORT_FROM_ARCHIVES", True)
+    a = PretrainedAligner(
+        corpus_directory=basic_corpus_dir,
+        dictionary_path=english_dictionary,
+        acoustic_model_path=english_acoustic_model,
+        oov_count_threshold=1,
+        **test_align_config,
+    )
+    a.align()
+    archive_directory = temp_dir.joinpath("test_archive_export")
+    shutil.rmtree(archive_directory, ignore_errors=True)
+    a.export_files(archive_directory)
+    assert not a.current_workflow.alignments_collected
+    with a.session() as session:
+        assert session.query(WordInterval).count() == 0
+        assert session.query(PhoneInterval).count() == 0
+    a.collect_alignments()
+    database_directory = temp_dir.joinpath("test_database_export")
+    shutil.rmtree(database_directory, ignore_errors=True)
+    a.export_files(database_directory)
+    archive_paths = sorted(
+        p.relative_to(archive_directory) for p in archive_directory.glob("**/*.TextGrid")
+    )
+    assert archive_paths
+    assert archive_paths == sorted(
+        p.relative_to(database_directory) for p in database_directory.glob("**/*.TextGrid")
+    )
+    for path in archive_paths:
+        assert (
+            archive_directory.joinpath(path).read_text()
+            == database_directory.joinpath(path).read_text()
+        )
+    a.cleanup()
+    a.clean_working_directory()
+
+
 def test_align_sick_mfa(
     english_us_mfa_dictionary,
     english_mfa_acoustic_model,
@@ -137,6 +183,94 @@ def test_align_one(
     a.clean_working_directory()
 
 
+def test_align_online_utterances(
+    english_dictionary,
+    english_acoustic_model,
+    basic_corpus_dir,
+    temp_dir,
+    test_align_config,
+    db_setup,
+):
+    a = PretrainedAligner(
+        corpus_directory=basic_corpus_dir,
+        dictionary_path=english_dictionary,
+        acoustic_model_path=english_acoustic_model,
+        clean=True,
+        **test_align_config,
+    )
+    a.initialize_database()
+    a.create_new_current_workflow(WorkflowType.online_alignment)
+    a.setup()
+    utterance_ids = [1, 2, 3]
+    with a.session() as session:
+        utterances = [session.get(Utterance, x) for x in utterance_ids]
+        a.align_online_utterances(utterances, session)
+
+    with a.session() as session:
+        first_counts = {}
+        for utterance_id in utterance_ids:
+            utterance = session.get(Utterance, utterance_id)
+            assert utterance.alignment_log_likelihood is not None
+            assert len(utterance.phone_intervals) > 0
+            assert all(x.word_interval_id is not None for x in utterance.phone_intervals)
+            first_counts[utterance_id] = len(utterance.word_intervals)
+        utterances = [session.get(Utterance, x) for x in utterance_ids]
+        a.align_online_utterances(utterances, session)
+
+    with a.session() as session:
+        for utterance_id in utterance_ids:
+            word_interval_count = (
+                session.query(WordInterval)
+                .filter(WordInterval.utterance_id == utterance_id)
+                .count()
+            )
+            assert word_interval_count == first_counts[utterance_id]
+        assert (
+            session.query(Word)
+            .filter(Word.word_type == WordType.oov)
+            .filter(Word.dictionary_id != 1)
+            .count()
+            == 0
+        )
+    a.cleanup()
+    a.clean_working_directory()
+
+
+def test_align_after_online_alignment(
+    english_dictionary,
+    english_acoustic_model,
+    basic_corpus_dir,
+    temp_dir,
+    test_align_config,
+    db_setup,
+):
+    a = PretrainedAligner(
+        corpus_directory=basic_corpus_dir,
+        dictionary_path=english_dictionary,
+        acoustic_model_path=english_acoustic_model,
+        clean=True,
+        **test_align_config,
+    )
+    a.initialize_database()
+    a.create_new_current_workflow(WorkflowType.online_alignment)
+    a.setup()
+    with a.session() as session:
+        a.align_one_utterance(session.get(Utterance, 1), session)
+    a.align()
+    with a.session() as session:
+        workflow = a.get_latest_workflow_run(WorkflowType.alignment, session)
+        assert workflow.done
+        aligned_utterances = (
+            session.query(WordInterval.utterance_id)
+            .filter(WordInterval.workflow_id == workflow.id)
+            .distinct()
+            .count()
+        )
+        assert aligned_utterances > 1
+    a.cleanup()
+    a.clean_working_directory()
+
+
 def test_no_silence(
     english_us_mfa_reduced_dict,
     english_mfa_acoustic_model,
@@ -280,3 +414,109 @@ def test_transcript_verification(
                 assert utterance.word_error_rate > 0
 
         print(f"Successful: {successes} of {len(utterances)}")
+
+
+def test_streaming_aligner(
+    english_dictionary, english_acoustic_model, wav_dir, lab_dir, monkeypatch
+):
+    import soundfile
+    from kalpy.utterance import Utterance as KalpyUtterance
+
+    from montreal_forced_aligner.models import AcousticModel, DictionaryModel
+    from montreal_forced_aligner.online.alignment import StreamingAligner
+
+    acoustic_model = AcousticModel(AcousticModel.get_pretrained_path(english_acoustic_model))
+    lexicon_compiler = acoustic_model.lexicon_compiler
+    lexicon_compiler.load_pronunciations(DictionaryModel.get_pretrained_path(english_dictionary))
+    wav_path = wav_dir.joinpath("acoustic_corpus.wav")
+    transcript = lab_dir.joinpath("acoustic_corpus.lab").read_text(encoding="utf8").strip()
+    duration = soundfile.info(str(wav_path)).duration
+    frame_shift = acoustic_model.mfcc_computer.frame_shift
+    lookahead = 1.0
+    aligner = StreamingAligner(
+        acoustic_model,
+        lexicon_compiler,
+        transcript,
+        wav_path,
+        lookahead=lookahead,
+        minimum_window=2.0,
+    )
+    computed_frames = []
+    generate_mfccs = KalpyUtterance.generate_mfccs
+
+    def counting_generate_mfccs(utterance, mfcc_computer):
+        generate_mfccs(utterance, mfcc_computer)
+        computed_frames.append(utterance.mfccs.NumRows())
+
+    monkeypatch.setattr(KalpyUtterance, "generate_mfccs", counting_generate_mfccs)
+    assert aligner.extend(1.0) == []
+    assert aligner.num_committed_words == 0
+    assert aligner.committed_time == 0
+    committed = []
+    end = 1.0
+    while end < duration - 0.5:
+        end += 0.5
+        new_intervals = aligner.extend(end)
+        for interval in new_intervals:
+            assert interval.end <= end - lookahead + frame_shift
+        if new_intervals:
+            assert aligner.committed_time == new_intervals[-1].end
+            assert new_intervals[-1].label != aligner.silence_word
+        committed.extend(new_intervals)
+    assert committed
+    assert not aligner.finished
+    # Committed audio is only kept as running CMVN statistics
+    committed_frames = int(round(aligner.committed_time / frame_shift))
+    assert abs(aligner._cmvn_stats[0, -1] - committed_frames) <= 1
+    # Each chunk of audio is only featurized once
+    assert sum(computed_frames) <= round(duration / frame_shift) + len(computed_frames)
+    committed.extend(aligner.finalize(duration))
+    assert aligner.finished
+    assert aligner.aligner.beam == aligner.beam
+    assert aligner.extend(duration + 1) == []
+    assert aligner.finalize() == []
+    assert committed == aligner.ctm.word_intervals
+    for previous, interval in zip(committed, committed[1:]):
+        assert previous.end <= interval.begin + frame_shift
+    words = [x.label for x in committed if x.label != aligner.silence_word]
+    assert len(words) == len(aligner.words)
+
+
+def test_streaming_aligner_bounded_window(
+    english_dictionary, english_acoustic_model, wav_dir, lab_dir, temp_dir
+):
+    import numpy as np
+    import soundfile
+
+    from montreal_forced_aligner.models import AcousticModel, DictionaryModel
+    from montreal_forced_aligner.online.alignment import StreamingAligner
+
+    acoustic_model = AcousticModel(AcousticModel.get_pretrained_path(english_acoustic_model))
+    lexicon_compiler = acoustic_model.lexicon_compiler
+    lexicon_compiler.load_pronunciations(DictionaryModel.get_pretrained_path(english_dictionary))
+    speech, sample_rate = soundfile.read(str(wav_dir.joinpath("acoustic_corpus.wav")))
+    if speech.ndim > 1:
+        speech = speech[:, 0]
+    # A long stretch of near silence before the speech
+    silence = np.random.default_rng(0).normal(0, 1e-4, sample_rate * 12)
+    wav_path = temp_dir.joinpath("streaming_silence.wav")
+    soundfile.write(str(wav_path), np.concatenate([silence, speech]), sample_rate)
+    duration = soundfile.info(str(wav_path)).duration
+    transcript = lab_dir.joinpath("acoustic_corpus.lab").read_text(encoding="utf8").strip()
+    chunk = 0.5
+    aligner = StreamingAligner(
+        acoustic_model,
+        lexicon_compiler,
+        transcript,
+        wav_path,
+        lookahead=1.0,
+        minimum_window=2.0,
+        maximum_window=5.0,
+    )
+    end = 0.0
+    while end < duration - chunk:
+        end += chunk
+        aligner.extend(end)
+        assert aligner.buffer_end - aligner.committed_time <= aligner.maximum_window + chunk
+    aligner.finalize(duration)
+    assert aligner.finished
@@ -77,6 +77,52 @@ def test_align_one_lab(
     assert t
 
 
+def test_align_one_feature_cache(
+    basic_corpus_dir,
+    generated_dir,
+    english_us_mfa_dictionary,
+    temp_dir,
+    english_mfa_acoustic_model,
+    db_setup,
+):
+    output_directory = generated_dir.joinpath("basic_output")
+    wav_path = basic_corpus_dir.joinpath("michael", "acoustic_corpus.wav")
+    lab_path = basic_corpus_dir.joinpath("michael", "acoustic_corpus.lab")
+    output_path = output_directory.joinpath("align_one_output_cache.TextGrid")
+    cache_directory = temp_dir.joinpath("feature_cache")
+    command = [
+        "align_one",
+        wav_path,
+        lab_path,
+        english_us_mfa_dictionary,
+        english_mfa_acoustic_model,
+        output_path,
+        "-q",
+        "--debug",
+        "--verbose",
+        "--no_clean",
+        "-p",
+        "test",
+    ]
+    command = [str(x) for x in command]
+    cached_mtimes = []
+    for _ in range(2):
+        result = click.testing.CliRunner(mix_stderr=False).invoke(
+            mfa_cli, command, catch_exceptions=True
+        )
+        print(result.stdout)
+        print(result.stderr)
+        if result.exception:
+            print(result.exc_info)
+            raise result.exception
+        assert not result.return_value
+        assert os.path.exists(output_path)
+        cached_mtimes.append({p: p.stat().st_mtime_ns for p in cache_directory.glob("*/*.ark")})
+    assert cached_mtimes[0]
+    # The second run loads every utterance from the cache instead of computing and saving it
+    assert cached_mtimes[1] == cached_mtimes[0]
+
+
 def test_align_one_tg(
     multilingual_ipa_tg_corpus_dir,
     generated_dir,
@@ -195,6 +241,43 @@ def test_align_no_speaker_adaptation(
     assert not temp_path.exists()
 
 
+def test_align_pipeline_extraction(
+    basic_corpus_dir,
+    generated_dir,
+    english_us_mfa_reduced_dict,
+    temp_dir,
+    english_mfa_acoustic_model,
+    db_setup,
+):
+    output_directory = generated_dir.joinpath("pipeline_extraction_output")
+    command = [
+        "align",
+        basic_corpus_dir,
+        english_us_mfa_reduced_dict,
+        english_mfa_acoustic_model,
+        output_directory,
+        "-q",
+        "--clean",
+        "--debug",
+        "--pipeline_extraction",
+        "true",
+        "-p",
+        "test",
+    ]
+    command = [str(x) for x in command]
+    result = click.testing.CliRunner(mix_stderr=False).invoke(
+        mfa_cli, command, catch_exceptions=True
+    )
+    print(result.stdout)
+    print(result.stderr)
+    if result.exception:
+        print(result.exc_info)
+        raise result.exception
+    assert not result.return_value
+
+    assert len(list(output_directory.rglob("*.TextGrid"))) > 0
+
+
 def test_align_single_speaker(
     basic_corpus_dir,
     generated_dir,
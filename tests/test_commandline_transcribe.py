@@ -1,4 +1,5 @@
 import os
+import threading
 
 import click.testing
 import pytest
@@ -243,3 +244,56 @@ def test_transcribe_speaker_dictionaries_evaluate(
     assert not result.return_value
 
     assert os.path.exists(output_path)
+
+
+def test_transcription_server(
+    basic_corpus_dir,
+    basic_dict_path,
+    transcription_acoustic_model,
+    transcription_language_model,
+    generated_dir,
+    temp_dir,
+    db_setup,
+):
+    import json
+    import socket
+
+    from kalpy.decoder.decode_graph import DecodeGraphCompiler
+
+    from montreal_forced_aligner.models import AcousticModel, LanguageModel
+    from montreal_forced_aligner.online.server import TranscriptionServer, TranscriptionWorker
+
+    acoustic_model = AcousticModel(transcription_acoustic_model)
+    language_model = LanguageModel(transcription_language_model)
+    lexicon_compiler = acoustic_model.lexicon_compiler
+    lexicon_compiler.disambiguation = True
+    lexicon_compiler.load_pronunciations(basic_dict_path)
+    hclg_path = generated_dir.joinpath("transcription_server_HCLG.fst")
+    compiler = DecodeGraphCompiler(
+        acoustic_model.model_path, acoustic_model.tree_path, lexicon_compiler
+    )
+    compiler.export_hclg(language_model.small_arpa_path, hclg_path)
+    worker = TranscriptionWorker(
+        acoustic_model=acoustic_model,
+        lexicon_compiler=lexicon_compiler,
+        hclg_path=hclg_path,
+    )
+    server = TranscriptionServer(worker)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        wav_path = basic_corpus_dir.joinpath("michael", "acoustic_corpus.wav")
+        with socket.create_connection(server.address) as conn:
+            f = conn.makefile("rwb")
+            for request in [{"path": str(wav_path)}, {"path": str(wav_path), "end": 1.0}]:
+                f.write(json.dumps(request).encode("utf8") + b"\n")
+                f.flush()
+                response = json.loads(f.readline())
+                assert "error" not in response
+                assert isinstance(response["text"], str)
+                assert response["intervals"] is not None
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert not worker.is_alive() or worker.stopped.is_set()
@@ -168,3 +168,52 @@ def test_load(basic_corpus_dir, basic_dict_path, temp_dir, config_directory):
     with pytest.raises(ConfigError):
         params = TrainableAligner.parse_parameters(path)
     am_trainer.cleanup()
+
+
+def test_plan_resources(monkeypatch):
+    from montreal_forced_aligner import resources
+
+    assert resources.parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    monkeypatch.setattr(resources, "numa_nodes", lambda: [list(range(0, 8)), list(range(8, 16))])
+    plan = resources.plan_resources(4, 4)
+    assert plan.blas_threads == 4
+    assert plan.cpu_sets == [[0, 1, 2, 3], [8, 9, 10, 11], [4, 5, 6, 7], [12, 13, 14, 15]]
+    plan = resources.plan_resources(5, 4)
+    assert plan.blas_threads == 2
+    assert len(plan.cpu_sets) == 5
+    pinned = [cpu for cpus in plan.cpu_sets for cpu in cpus]
+    assert len(pinned) == len(set(pinned))
+    plan = resources.plan_resources(3, 0)
+    assert plan.blas_threads == 4
+    plan = resources.plan_resources(20, 1)
+    assert plan.blas_threads == 1
+    assert plan.cpu_sets is None
+    plan = resources.plan_stage("AlignFunction", 4)
+    assert plan.blas_threads == 1
+    plan = resources.plan_stage("CalcFmllrFunction", 4)
+    assert plan.blas_threads == 4
+    monkeypatch.setattr(resources.config, "USE_CPU_AFFINITY", True)
+    plan = resources.plan_resources(8, 1)
+    assert plan.stage_threads("CalcFmllrFunction", 0) == 1
+    assert plan.stage_threads("AlignFunction", 0) == 1
+    plan = resources.plan_resources(4, 4)
+    assert plan.stage_threads("CalcFmllrFunction", 0) == 4
+
+
+def test_resource_plan_affinity():
+    from montreal_forced_aligner import config, resources
+
+    if not hasattr(os, "sched_setaffinity"):
+        pytest.skip("CPU affinity is not supported on this platform")
+    original = os.sched_getaffinity(0)
+    use_cpu_affinity = config.USE_CPU_AFFINITY
+    config.USE_CPU_AFFINITY = True
+    try:
+        plan = resources.plan_resources(1, 1)
+        plan.apply(0)
+        assert os.sched_getaffinity(0) == set(plan.cpu_sets[0])
+        assert os.environ["OMP_NUM_THREADS"] == "1"
+    finally:
+        os.sched_setaffinity(0, original)
+        config.USE_CPU_AFFINITY = use_cpu_affinity
+        resources.set_blas_threads(config.BLAS_NUM_THREADS)
@@ -7,11 +7,12 @@ from montreal_forced_aligner.corpus.acoustic_corpus import (
     AcousticCorpus,
     AcousticCorpusWithPronunciations,
 )
+from montreal_forced_aligner.corpus.base import JobCostModel
 from montreal_forced_aligner.corpus.classes import FileData, UtteranceData
 from montreal_forced_aligner.corpus.helper import get_wav_info
 from montreal_forced_aligner.corpus.text_corpus import DictionaryTextCorpus, TextCorpus
 from montreal_forced_aligner.data import TextFileType, WordType
-from montreal_forced_aligner.db import Word
+from montreal_forced_aligner.db import Corpus, Dictionary2Job, Job, Utterance, Word
 
 
 def test_mp3(mp3_test_path):
@@ -59,6 +60,90 @@ def test_add(basic_corpus_dir, generated_dir, db_setup):
     corpus.cleanup_connections()
 
 
+def test_job_cost_model(generated_dir):
+    cost_model = JobCostModel()
+    assert cost_model.cost(10, 5) == 10
+    assert not cost_model.update([(10, 5, 20)])
+    assert cost_model.update([(10, 5, 25), (20, 5, 45), (10, 10, 30)])
+    assert abs(cost_model.seconds_per_second - 2) < 1e-6
+    assert abs(cost_model.seconds_per_utterance - 1) < 1e-6
+    path = generated_dir.joinpath("job_cost_model.json")
+    cost_model.save(path)
+    loaded = JobCostModel.load(path)
+    assert loaded.num_updates == 1
+    assert abs(loaded.cost(10, 5) - 25) < 1e-6
+    assert not list(generated_dir.glob("job_cost_model*.tmp"))
+    first_path = JobCostModel.default_path(generated_dir.joinpath("corpus_one"))
+    second_path = JobCostModel.default_path(generated_dir.joinpath("corpus_two"))
+    assert first_path != second_path
+    assert first_path == JobCostModel.default_path(generated_dir.joinpath("corpus_one"))
+
+
+def test_duration_balanced_jobs(basic_corpus_dir, generated_dir, db_setup):
+    import sqlalchemy
+
+    output_directory = generated_dir.joinpath("corpus_tests_jobs")
+    if os.path.exists(output_directory):
+        shutil.rmtree(output_directory, ignore_errors=True)
+    config.TEMPORARY_DIRECTORY = output_directory
+    config.SINGLE_SPEAKER = True
+    try:
+        corpus = AcousticCorpus(corpus_directory=basic_corpus_dir)
+        corpus.load_corpus()
+        with corpus.session() as session:
+            assert not session.query(Utterance).filter(Utterance.job_id == None).count()  # noqa
+            durations = [
+                x
+                for x, in session.query(sqlalchemy.func.sum(Utterance.duration)).group_by(
+                    Utterance.job_id
+                )
+            ]
+        assert len(durations) == config.NUM_JOBS
+        longest_utterance = max(u.duration for u in corpus.get_utterances())
+        assert max(durations) - min(durations) <= 2 * longest_utterance
+        corpus.cleanup_connections()
+    finally:
+        config.SINGLE_SPEAKER = False
+
+
+def test_fewer_chunks_removes_stale_jobs(basic_corpus_dir, generated_dir, db_setup):
+    output_directory = generated_dir.joinpath("corpus_tests_stale_jobs")
+    if os.path.exists(output_directory):
+        shutil.rmtree(output_directory, ignore_errors=True)
+    config.TEMPORARY_DIRECTORY = output_directory
+    config.SINGLE_SPEAKER = True
+    chunks_per_job = config.CHUNKS_PER_JOB
+    config.CHUNKS_PER_JOB = 2
+    try:
+        corpus = AcousticCorpus(corpus_directory=basic_corpus_dir)
+        corpus.load_corpus()
+        with corpus.session() as session:
+            assert session.query(Job).count() == config.NUM_JOBS * 2
+            stale_job_id = session.query(Job.id).order_by(Job.id.desc()).first()[0]
+        stale_path = corpus.split_directory.joinpath(f"feats.{stale_job_id}.scp")
+        kept_path = corpus.split_directory.joinpath("feats.1.scp")
+        stale_path.touch()
+        kept_path.touch()
+        config.CHUNKS_PER_JOB = 1
+        with corpus.session() as session:
+            session.query(Utterance).update({Utterance.job_id: 1})
+            session.commit()
+        corpus.initialize_jobs()
+        with corpus.session() as session:
+            assert session.query(Job).count() == config.NUM_JOBS
+            assert session.query(Corpus.num_jobs).scalar() == config.NUM_JOBS
+            assert not session.query(Utterance).filter(Utterance.job_id > config.NUM_JOBS).count()
+            assert not session.query(Dictionary2Job).filter(
+                Dictionary2Job.c.job_id > config.NUM_JOBS
+            ).count()
+        assert not stale_path.exists()
+        assert kept_path.exists()
+        corpus.cleanup_connections()
+    finally:
+        config.CHUNKS_PER_JOB = chunks_per_job
+        config.SINGLE_SPEAKER = False
+
+
 def test_basic_txt(basic_corpus_txt_dir, basic_dict_path, generated_dir, db_setup):
     output_directory = generated_dir.joinpath("corpus_tests")
     if os.path.exists(output_directory):
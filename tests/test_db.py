@@ -0,0 +1,510 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+import sqlalchemy.orm
+
+from montreal_forced_aligner import config, db
+from montreal_forced_aligner.abc import dispose_process_engines, get_process_engine
+from montreal_forced_aligner.command_line.utils import (
+    PG_TUNING_PROFILES,
+    PG_UNLOGGED_TABLES,
+    apply_tuning_profile,
+    check_databases,
+    server_engine,
+    template_database_name,
+    tuning_profile_changes,
+)
+from montreal_forced_aligner.data import BulkUpdateStrategy, PhoneType, WordType
+from montreal_forced_aligner.db import (
+    IdAllocation,
+    MfaSqlBase,
+    Phone,
+    PhoneInterval,
+    SqliteBulkLoader,
+    Utterance,
+    Word,
+    WordInterval,
+    bulk_update,
+    bulk_update_strategy,
+    deferred_indexes,
+    get_id_allocator,
+    migrate_indexes,
+)
+from montreal_forced_aligner.exceptions import DatabaseError
+from montreal_forced_aligner.interval_store import PYARROW_ENABLED, IntervalStore
+from montreal_forced_aligner.query_plans import benchmark_query_plans, sequential_scans
+
+
+def test_sqlite_connection_profile(temp_dir):
+    db_path = temp_dir.joinpath("connection_profile.db")
+    if db_path.exists():
+        db_path.unlink()
+    db_string = f"sqlite:///{db_path}"
+    try:
+        engine = get_process_engine(db_string)
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("CREATE TABLE test (id INTEGER PRIMARY KEY)"))
+            conn.execute(sqlalchemy.text("INSERT INTO test (id) VALUES (1)"))
+        with engine.connect() as conn:
+            pragmas = {
+                x: conn.execute(sqlalchemy.text(f"PRAGMA {x}")).scalar()
+                for x in ["journal_mode", "synchronous", "temp_store", "busy_timeout"]
+            }
+            assert pragmas == {
+                "journal_mode": "wal",
+                "synchronous": 1,
+                "temp_store": 2,
+                "busy_timeout": config.SQLITE_BUSY_TIMEOUT,
+            }
+            cache_size = conn.execute(sqlalchemy.text("PRAGMA cache_size")).scalar()
+            assert cache_size == config.SQLITE_CACHE_SIZE
+        read_only_engine = get_process_engine(db_string, read_only=True)
+        with read_only_engine.connect() as conn:
+            assert conn.execute(sqlalchemy.text("PRAGMA query_only")).scalar() == 1
+            assert conn.execute(sqlalchemy.text("SELECT count(*) FROM test")).scalar() == 1
+    finally:
+        dispose_process_engines()
+
+
+def test_database_tuning_profiles():
+    assert set(PG_UNLOGGED_TABLES) == set(PG_TUNING_PROFILES)
+    assert config.DATABASE_TUNING_PROFILE in PG_TUNING_PROFILES
+    with pytest.raises(DatabaseError):
+        apply_tuning_profile("unknown")
+    template_name = template_database_name()
+    assert template_name.startswith("mfa_template_")
+    assert template_name == template_database_name()
+    for unlogged_tables in PG_UNLOGGED_TABLES.values():
+        for table in MfaSqlBase.metadata.sorted_tables:
+            if table.name in unlogged_tables:
+                continue
+            for foreign_key in table.foreign_keys:
+                assert foreign_key.column.table.name not in unlogged_tables
+    bulk_load = PG_TUNING_PROFILES["bulk_load"]
+    to_set, to_reset = tuning_profile_changes(bulk_load, {}, {})
+    assert to_set == bulk_load and not to_reset
+    assert tuning_profile_changes(bulk_load, dict(bulk_load), bulk_load) == ({}, [])
+    current = dict(bulk_load, fsync="on", work_mem="64MB")
+    to_set, to_reset = tuning_profile_changes({}, current, bulk_load)
+    assert not to_set
+    assert "fsync" not in to_reset and "work_mem" not in to_reset
+    assert set(to_reset) == set(bulk_load) - {"fsync"}
+
+
+def test_sqlite_bulk_loader(temp_dir):
+    db_path = temp_dir.joinpath("bulk_loader.db")
+    if db_path.exists():
+        db_path.unlink()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    WordInterval.__table__.create(engine)
+    PhoneInterval.__table__.create(engine)
+    try:
+        with SqliteBulkLoader(engine, batch_size=10) as loader:
+            for i in range(1, 26):
+                loader.add(
+                    WordInterval,
+                    [
+                        {
+                            "id": i,
+                            "begin": i,
+                            "end": i + 1,
+                            "word_id": 1,
+                            "pronunciation_id": None,
+                            "utterance_id": 1,
+                            "workflow_id": 1,
+                        }
+                    ],
+                )
+                loader.add(
+                    PhoneInterval,
+                    [
+                        {
+                            "id": i,
+                            "begin": i,
+                            "end": i + 1,
+                            "phone_id": 1,
+                            "utterance_id": 1,
+                            "workflow_id": 1,
+                            "word_interval_id": i,
+                            "phone_goodness": 0.0,
+                        }
+                    ],
+                )
+        with pytest.raises(ValueError):
+            with SqliteBulkLoader(engine) as loader:
+                loader.add(
+                    WordInterval,
+                    [
+                        {
+                            "id": 100,
+                            "begin": 0,
+                            "end": 1,
+                            "word_id": 1,
+                            "utterance_id": 1,
+                            "workflow_id": 1,
+                        }
+                    ],
+                )
+                loader.flush()
+                raise ValueError
+        assert loader.conn is None
+        loader = SqliteBulkLoader(engine, cache_size="0 invalid")
+        with pytest.raises(sqlite3.OperationalError):
+            loader.begin()
+        assert loader.conn is None
+        with engine.connect() as conn:
+            for table in ["word_interval", "phone_interval"]:
+                query = sqlalchemy.text(f"SELECT count(*) FROM {table}")
+                assert conn.execute(query).scalar() == 25
+            assert conn.execute(sqlalchemy.text("PRAGMA journal_mode")).scalar() == "wal"
+    finally:
+        engine.dispose()
+
+
+def test_deferred_indexes(temp_dir):
+    db_path = temp_dir.joinpath("deferred_indexes.db")
+    if db_path.exists():
+        db_path.unlink()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    PhoneInterval.__table__.create(engine)
+    expected = {x.name for x in PhoneInterval.__table__.indexes}
+    try:
+        with sqlalchemy.orm.Session(engine) as session:
+            with deferred_indexes(session, [PhoneInterval]):
+                assert not sqlalchemy.inspect(engine).get_indexes("phone_interval")
+                session.execute(
+                    sqlalchemy.insert(PhoneInterval.__table__),
+                    [
+                        {
+                            "id": i,
+                            "begin": i,
+                            "end": i + 1,
+                            "phone_id": 1,
+                            "utterance_id": 1,
+                            "workflow_id": 1,
+                        }
+                        for i in range(1, 101)
+                    ],
+                )
+                session.commit()
+        indexes = {x["name"] for x in sqlalchemy.inspect(engine).get_indexes("phone_interval")}
+        assert indexes == expected
+    finally:
+        engine.dispose()
+
+
+def test_interval_store(temp_dir):
+    if not PYARROW_ENABLED:
+        pytest.skip("pyarrow not installed")
+    store = IntervalStore(temp_dir.joinpath("interval_store"))
+    word_id = 1
+    phone_id = 1
+    with store.writer(2) as writer:
+        for utterance_id in range(1, 7):
+            word_rows = [
+                {
+                    "id": word_id + i,
+                    "begin": i,
+                    "end": i + 1,
+                    "word_id": 10 + i,
+                    "pronunciation_id": None,
+                    "utterance_id": utterance_id,
+                    "workflow_id": 2,
+                }
+                for i in range(2)
+            ]
+            phone_rows = [
+                {
+                    "id": phone_id + i,
+                    "begin": i / 2,
+                    "end": (i + 1) / 2,
+                    "phone_id": i,
+                    "utterance_id": utterance_id,
+                    "workflow_id": 2,
+                    "word_interval_id": word_id + i // 2 if i < 4 else None,
+                    "phone_goodness": 0.0,
+                }
+                for i in range(5)
+            ]
+            writer.add(utterance_id % 2 + 1, word_rows, phone_rows)
+            word_id += 2
+            phone_id += 5
+    assert store.exists()
+    assert store.manifest["jobs"] == [1, 2]
+    assert store.read_words().num_rows == 12
+    phones = store.read_phones([3, 4], ["utterance_id"])
+    assert sorted(set(phones.column("utterance_id").to_pylist())) == [3, 4]
+    words = store.read_words(columns=["utterance_id"], job_names=[2])
+    assert sorted(set(words.column("utterance_id").to_pylist())) == [1, 3, 5]
+    empty = store.read_phones([3, 4], ["utterance_id", "begin"], job_names=[])
+    assert empty.num_rows == 0
+    assert empty.column_names == ["utterance_id", "begin"]
+    word_rows = []
+    phone_rows = []
+    for words, phones in store.database_rows(101, 201, 3):
+        word_rows.extend(words)
+        phone_rows.extend(phones)
+    assert [x["id"] for x in word_rows] == list(range(101, 113))
+    assert [x["id"] for x in phone_rows] == list(range(201, 231))
+    word_intervals = {x["id"]: x for x in word_rows}
+    for row in phone_rows:
+        assert row["workflow_id"] == 3
+        if row["word_interval_id"] is None:
+            continue
+        word_interval = word_intervals[row["word_interval_id"]]
+        assert word_interval["utterance_id"] == row["utterance_id"]
+        assert word_interval["begin"] <= row["begin"] < word_interval["end"]
+    store.delete()
+    assert not store.exists()
+
+
+@pytest.mark.parametrize("strategy", list(BulkUpdateStrategy))
+def test_bulk_update_strategies(temp_dir, strategy):
+    db_path = temp_dir.joinpath(f"bulk_update_{strategy.value}.db")
+    if db_path.exists():
+        db_path.unlink()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    Word.__table__.create(engine)
+    num_rows = 20000
+    try:
+        with sqlalchemy.orm.Session(engine) as session:
+            session.execute(
+                sqlalchemy.insert(Word.__table__),
+                [
+                    {
+                        "id": i,
+                        "mapping_id": i,
+                        "word": f"word_{i}",
+                        "count": 0,
+                        "word_type": WordType.speech,
+                        "dictionary_id": 1,
+                    }
+                    for i in range(1, num_rows + 1)
+                ],
+            )
+            session.commit()
+            update_mappings = [
+                {
+                    "id": i,
+                    "count": i,
+                    "word": f'"word", {i}',
+                    "word_type": WordType.oov,
+                    "initial_cost": None if i % 2 else i / 2,
+                }
+                for i in range(1, num_rows + 1)
+            ]
+            begin = time.time()
+            bulk_update(session, Word, update_mappings, strategy=strategy)
+            session.commit()
+            duration = time.time() - begin
+            print(f"{strategy.value}: updated {num_rows} rows in {duration:.3f} seconds")
+            assert duration < 30
+            for word in session.query(Word).filter(Word.id.in_([1, 2, num_rows])):
+                assert word.count == word.id
+                assert word.word == f'"word", {word.id}'
+                assert word.word_type is WordType.oov
+                assert word.initial_cost == (None if word.id % 2 else word.id / 2)
+            assert session.query(Word).filter(Word.count == 0).count() == 0
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.postgres
+def test_bulk_update_staging_postgres(global_config):
+    try:
+        check_databases("postgres")
+    except DatabaseError:
+        pytest.skip("MFA database server is not running")
+    db_name = "mfa_bulk_update_test"
+    with server_engine().connect() as conn:
+        conn.execute(sqlalchemy.text(f'DROP DATABASE IF EXISTS "{db_name}"'))
+        conn.execute(sqlalchemy.text(f'CREATE DATABASE "{db_name}"'))
+    engine = sqlalchemy.create_engine(
+        f"postgresql+psycopg2://@/{db_name}?host={config.database_socket()}"
+    )
+    try:
+        Phone.__table__.create(engine)
+        with sqlalchemy.orm.Session(engine) as session:
+            session.execute(
+                sqlalchemy.insert(Phone.__table__),
+                [
+                    {
+                        "id": i,
+                        "mapping_id": i,
+                        "phone": f"p{i}",
+                        "kaldi_label": f"p{i}",
+                        "position": "B",
+                        "phone_type": PhoneType.non_silence,
+                        "mean_duration": 0.1,
+                    }
+                    for i in range(1, 11)
+                ],
+            )
+            session.commit()
+            update_mappings = [
+                {
+                    "id": i,
+                    "position": None if i % 2 else "",
+                    "phone": f'"p", {i}',
+                    "mean_duration": None if i % 3 else i / 10,
+                }
+                for i in range(1, 11)
+            ]
+            bulk_update(session, Phone, update_mappings, strategy=BulkUpdateStrategy.staging)
+            session.commit()
+            for phone in session.query(Phone):
+                assert phone.position == (None if phone.id % 2 else "")
+                assert phone.phone == f'"p", {phone.id}'
+                assert phone.mean_duration == (None if phone.id % 3 else phone.id / 10)
+    finally:
+        engine.dispose()
+        with server_engine().connect() as conn:
+            conn.execute(sqlalchemy.text(f'DROP DATABASE IF EXISTS "{db_name}"'))
+
+
+def test_bulk_update_strategy_selection():
+    assert bulk_update_strategy(10, "sqlite") is BulkUpdateStrategy.executemany
+    assert bulk_update_strategy(1000000, "sqlite") is BulkUpdateStrategy.executemany
+    assert bulk_update_strategy(10, "postgresql") is BulkUpdateStrategy.executemany
+    assert bulk_update_strategy(50000, "postgresql") is BulkUpdateStrategy.values
+    assert bulk_update_strategy(1000000, "postgresql") is BulkUpdateStrategy.staging
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_id_allocator(temp_dir, monkeypatch, returning):
+    if returning and not db.SQLITE_RETURNING:
+        pytest.skip("SQLite is older than 3.35")
+    monkeypatch.setattr(db, "SQLITE_RETURNING", returning)
+    db_path = temp_dir.joinpath(f"id_allocator_{returning}.db")
+    if db_path.exists():
+        db_path.unlink()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    WordInterval.__table__.create(engine)
+    Word.__table__.create(engine)
+    IdAllocation.__table__.create(engine)
+    interval = {"begin": 0, "end": 1, "word_id": 1, "utterance_id": 1, "workflow_id": 1}
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.insert(WordInterval.__table__),
+                [{"id": i, **interval} for i in range(1, 6)],
+            )
+        allocator = get_id_allocator(engine)
+        assert get_id_allocator(engine) is allocator
+        assert allocator.reserve(WordInterval, 10) == 6
+        assert allocator.reserve(WordInterval, 3) == 16
+
+        # Rows inserted without the allocator are skipped over
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.insert(WordInterval.__table__), [{"id": 100, **interval}])
+        assert allocator.reserve(WordInterval, 2) == 101
+
+        ids = allocator.ids(WordInterval, block_size=4)
+        assert [next(ids) for _ in range(6)] == [103, 104, 105, 106, 107, 108]
+
+        # Reservations in a transaction are discarded with it
+        conn = engine.raw_connection()
+        try:
+            assert allocator.reserve(WordInterval, 5, conn) == 111
+            conn.rollback()
+        finally:
+            conn.close()
+
+        reserved = []
+
+        def reserve():
+            for _ in range(10):
+                first_id = allocator.reserve(WordInterval, 5)
+                reserved.extend(range(first_id, first_id + 5))
+
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(reserved) == len(set(reserved)) == 200
+        assert min(reserved) == 111
+
+        # Other columns are reserved independently of the primary key
+        with engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.insert(Word.__table__),
+                [
+                    {
+                        "id": i,
+                        "mapping_id": i + 20,
+                        "word": f"word_{i}",
+                        "word_type": WordType.speech,
+                        "dictionary_id": 1,
+                    }
+                    for i in range(1, 4)
+                ],
+            )
+        assert allocator.reserve(Word, 2, column="mapping_id") == 24
+        assert allocator.reserve(Word, 2) == 4
+        mapping_ids = allocator.ids(Word, block_size=2, column="mapping_id")
+        assert [next(mapping_ids) for _ in range(3)] == [26, 27, 28]
+    finally:
+        engine.dispose()
+
+
+def test_query_plans(temp_dir):
+    db_path = temp_dir.joinpath("query_plans.db")
+    if db_path.exists():
+        db_path.unlink()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    try:
+        plans = benchmark_query_plans(engine, num_files=50, file_batch_size=10)
+    finally:
+        engine.dispose()
+    assert set(plans) == {
+        "textgrid_phone_intervals",
+        "textgrid_word_intervals",
+        "alignment_extraction_utterances",
+        "normalize_text_utterances",
+    }
+    for name, plan in plans.items():
+        assert plan.num_rows > 0, name
+        assert not plan.sequential_scans, "\n".join([name] + plan.plan)
+    assert plans["textgrid_phone_intervals"].num_rows == 10 * 10 * 8 * 4
+    assert sequential_scans(["SCAN utterance", "SEARCH speaker USING INDEX x"], "sqlite") == [
+        "utterance"
+    ]
+    assert sequential_scans(
+        ["Hash Join", "  ->  Seq Scan on phone_interval  (cost=0.00..1.00)"], "postgresql"
+    ) == ["phone_interval"]
+
+
+def test_migrate_indexes(temp_dir):
+    db_path = temp_dir.joinpath("migrate_indexes.db")
+    if db_path.exists():
+        db_path.unlink()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    try:
+        MfaSqlBase.metadata.create_all(engine)
+        assert migrate_indexes(engine) == []
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("DROP INDEX utterance_job_speaker_index"))
+            conn.execute(sqlalchemy.text("DROP INDEX phone_utterance_workflow_index"))
+            conn.execute(
+                sqlalchemy.text(
+                    "CREATE INDEX phone_utterance_workflow_index "
+                    "ON phone_interval (utterance_id, workflow_id)"
+                )
+            )
+        assert sorted(migrate_indexes(engine)) == [
+            "phone_utterance_workflow_index",
+            "utterance_job_speaker_index",
+        ]
+        inspector = sqlalchemy.inspect(engine)
+        for table in [PhoneInterval, Utterance]:
+            existing = {
+                x["name"]: x["column_names"] for x in inspector.get_indexes(table.__tablename__)
+            }
+            for index in table.__table__.indexes:
+                assert existing[index.name] == [x.name for x in index.columns]
+        assert migrate_indexes(engine) == []
+    finally:
+        engine.dispose()
@@ -1,6 +1,8 @@
+import functools
 import os
 import pathlib
 import shutil
+from multiprocessing.pool import ThreadPool
 
 from montreal_forced_aligner import config
 from montreal_forced_aligner.dictionary import MultispeakerDictionary
@@ -91,3 +93,34 @@ def test_generator_pretrained(english_g2p_model, temp_dir, db_setup):
         if word == "petted":
             assert len(prons) == 3
     gen.cleanup()
+
+
+def test_oov_pronunciation_cache(english_us_mfa_g2p_model, generated_dir):
+    from montreal_forced_aligner.online.alignment import OovPronunciationCache
+
+    g2p_model = G2PModel(G2PModel.get_pretrained_path(english_us_mfa_g2p_model))
+    cache_path = generated_dir.joinpath("oov_cache", "oov_pronunciations.json")
+    if cache_path.exists():
+        os.remove(cache_path)
+    cache = OovPronunciationCache(max_size=2, cache_path=cache_path)
+    pronunciation = cache.pronounce(g2p_model, "montreal")
+    assert pronunciation
+    assert cache.pronounce(g2p_model, "montreal") == pronunciation
+    assert cache.hits == 1
+    assert cache.misses == 1
+    cache.pronounce(g2p_model, "aligner")
+    cache.pronounce(g2p_model, "forced")
+    assert len(cache) == 2
+    assert (OovPronunciationCache.model_key(g2p_model), "montreal") not in cache.pronunciations
+    cache.save()
+    reloaded = OovPronunciationCache(cache_path=cache_path)
+    assert len(reloaded) == 2
+    assert reloaded.pronounce(g2p_model, "forced") == cache.pronounce(g2p_model, "forced")
+    assert reloaded.misses == 0
+    assert OovPronunciationCache.model_key(g2p_model).startswith(str(g2p_model.source))
+    words = ["montreal", "aligner", "forced", "phonetic", "lexicon", "pronunciation"]
+    cache = OovPronunciationCache()
+    with ThreadPool(3) as pool:
+        threaded = pool.map(functools.partial(cache.pronounce, g2p_model), words)
+    assert threaded == [reloaded.pronounce(g2p_model, w) for w in words]
+    assert cache.misses == len(words)
@@ -1,5 +1,14 @@
-from montreal_forced_aligner.data import CtmInterval
-from montreal_forced_aligner.helper import align_phones, load_evaluation_mapping
+import types
+
+import pytest
+
+from montreal_forced_aligner.data import BeamScheduler, CtmInterval
+from montreal_forced_aligner.helper import (
+    align_phones,
+    atomic_archive,
+    load_evaluation_mapping,
+)
+from montreal_forced_aligner.online import alignment as online_alignment
 
 
 def test_align_phones(basic_corpus_dir, basic_dict_path, temp_dir, eval_mapping_path):
@@ -96,3 +105,120 @@ def test_align_phones(basic_corpus_dir, basic_dict_path, temp_dir, eval_mapping_
 
     assert score < 1
     assert phone_errors < 1
+
+
+def test_beam_scheduler():
+    scheduler = BeamScheduler(10, 400, likelihood_threshold=-10)
+    assert scheduler.beams == [10, 40, 160, 400]
+    assert scheduler.beams_for_speaker(1) == [10, 40, 160, 400]
+    assert not scheduler.accept(None, 100)
+    assert not scheduler.accept(-1500, 100)
+    assert scheduler.accept(-500, 100)
+    scheduler.record(1, 40)
+    scheduler.record(2, None)
+    assert scheduler.beams_for_speaker(1) == [40, 160, 400]
+    assert scheduler.beams_for_speaker(2) == [10, 40, 160, 400]
+    other = BeamScheduler(10, 400)
+    other.record(2, 160)
+    scheduler.add_counts(other)
+    assert scheduler.beams_for_speaker(2) == [160, 400]
+    assert scheduler.distribution == {"10": 0, "40": 1, "160": 1, "400": 0, "failed": 1}
+    scheduler = BeamScheduler(10, 400, decay_after=2)
+    scheduler.record(1, 160)
+    assert scheduler.beams_for_speaker(1) == [160, 400]
+    scheduler.record(1, 160)
+    assert scheduler.beams_for_speaker(1) == [160, 400]
+    scheduler.record(1, 160)
+    assert scheduler.beams_for_speaker(1) == [40, 160, 400]
+    scheduler.record(1, 160)
+    scheduler.record(1, 40)
+    assert scheduler.beams_for_speaker(1) == [160, 400]
+    scheduler.record(1, 160)
+    assert scheduler.beams_for_speaker(1) == [40, 160, 400]
+    scheduler.record(1, 40)
+    scheduler.record(1, 40)
+    assert scheduler.beams_for_speaker(1) == [10, 40, 160, 400]
+
+
+def test_align_with_beam_schedule(monkeypatch):
+    decodes = []
+
+    class Features:
+        def NumRows(self):
+            return 100
+
+    def fake_align(
+        transition_model, acoustic_model, graph, features, beam=10, retry_beam=40, **kwargs
+    ):
+        assert graph == ("copy", graph[1])
+        required_beam = graph[1]
+        decodes.append(beam)
+        if beam >= required_beam:
+            return [1], [1], -float(beam), None, True, False
+        if retry_beam == 0:
+            return [], [], 0.0, None, False, False
+        decodes.append(retry_beam)
+        if retry_beam >= required_beam:
+            return [1], [1], -float(retry_beam), None, True, True
+        return [], [], 0.0, None, False, True
+
+    monkeypatch.setattr(online_alignment, "gmm_align_compiled", fake_align)
+    monkeypatch.setattr(online_alignment, "VectorFst", lambda graph: ("copy", graph))
+    aligner = types.SimpleNamespace(
+        transition_model=None,
+        acoustic_model=None,
+        acoustic_scale=0.1,
+        transition_scale=1.0,
+        self_loop_scale=0.1,
+        careful=False,
+    )
+    scheduler = BeamScheduler(10, 400)
+    expected = {
+        10: ([10], 10),
+        40: ([10, 40], 40),
+        160: ([10, 40, 160], 160),
+        400: ([10, 40, 160, 400], 400),
+        1000: ([10, 40, 160, 400], None),
+    }
+    for required_beam, (expected_decodes, expected_beam) in expected.items():
+        decodes.clear()
+        alignment, beam = online_alignment.align_with_beam_schedule(
+            aligner, scheduler, required_beam, required_beam, Features()
+        )
+        assert decodes == expected_decodes
+        assert beam == expected_beam
+        if expected_beam is None:
+            assert alignment is None
+        else:
+            assert alignment.likelihood == -expected_beam
+    assert scheduler.distribution == {"10": 1, "40": 1, "160": 1, "400": 1, "failed": 1}
+    assert scheduler.beams_for_speaker(160) == [160, 400]
+    decodes.clear()
+    online_alignment.align_with_beam_schedule(aligner, scheduler, 160, 400, Features())
+    assert decodes == [160, 400]
+    assert scheduler.beams_for_speaker(160) == [400]
+
+
+def test_atomic_archive(temp_dir):
+    ark_path = temp_dir.joinpath("atomic", "feats.1.ark")
+    scp_path = ark_path.with_suffix(".scp")
+    ark_path.parent.mkdir(parents=True, exist_ok=True)
+    for path in (ark_path, scp_path):
+        if path.exists():
+            path.unlink()
+    with pytest.raises(ValueError):
+        with atomic_archive(ark_path, scp_path) as (temp_ark_path, temp_scp_path):
+            temp_ark_path.write_bytes(b"partial")
+            raise ValueError("interrupted")
+    assert not ark_path.exists()
+    assert not temp_ark_path.exists()
+
+    with atomic_archive(ark_path, scp_path) as (temp_ark_path, temp_scp_path):
+        assert temp_ark_path != ark_path
+        temp_ark_path.write_bytes(b"data")
+        temp_scp_path.write_text(f"utt1 {temp_ark_path}:5\n", encoding="utf8")
+        assert not ark_path.exists()
+    assert ark_path.read_bytes() == b"data"
+    assert scp_path.read_text(encoding="utf8") == f"utt1 {ark_path}:5\n"
+    assert not temp_ark_path.exists()
+    assert not temp_scp_path.exists()